@@ -0,0 +1,47 @@
+"""Rotation des clés Fernet — table key_rotation_checkpoints.
+
+Revision ID: 013_key_rotation_checkpoints
+Revises: 012_phase9_user_profile_fields
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "013_key_rotation_checkpoints"
+down_revision = "012_phase9_user_profile_fields"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "key_rotation_checkpoints",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("key_kind", sa.String(10), nullable=False),
+        sa.Column("table_name", sa.String(100), nullable=False),
+        sa.Column("key_fingerprint", sa.String(16), nullable=False),
+        sa.Column("last_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("rows_scanned", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("rows_rewritten", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column(
+            "started_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("key_kind", "table_name", name="uq_key_rotation_checkpoints_kind_table"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("key_rotation_checkpoints")
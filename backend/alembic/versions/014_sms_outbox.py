@@ -0,0 +1,39 @@
+"""Outbox SMS — sms_logs : essais, prochaine tentative, clé d'idempotence.
+
+Revision ID: 014_sms_outbox
+Revises: 013_key_rotation_checkpoints
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "014_sms_outbox"
+down_revision = "013_key_rotation_checkpoints"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("sms_logs", sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("sms_logs", sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("sms_logs", sa.Column("dedup_key", sa.String(128), nullable=True))
+    # SMS système (OTP) : pas de coach émetteur
+    op.alter_column("sms_logs", "coach_id", existing_type=postgresql.UUID(as_uuid=True), nullable=True)
+    op.create_index("ix_sms_logs_due", "sms_logs", ["status", "next_attempt_at"])
+    op.create_index(
+        "uq_sms_logs_dedup_key", "sms_logs", ["dedup_key"],
+        unique=True, postgresql_where=sa.text("dedup_key IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_sms_logs_dedup_key", table_name="sms_logs")
+    op.drop_index("ix_sms_logs_due", table_name="sms_logs")
+    op.execute("DELETE FROM sms_logs WHERE coach_id IS NULL")
+    op.alter_column("sms_logs", "coach_id", existing_type=postgresql.UUID(as_uuid=True), nullable=False)
+    op.drop_column("sms_logs", "dedup_key")
+    op.drop_column("sms_logs", "next_attempt_at")
+    op.drop_column("sms_logs", "attempts")
@@ -0,0 +1,49 @@
+"""File des notifications push — table push_intents.
+
+Revision ID: 015_push_intents
+Revises: 014_sms_outbox
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "015_push_intents"
+down_revision = "014_sms_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "push_intents",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("title_key", sa.String(100), nullable=False),
+        sa.Column("body_key", sa.String(100), nullable=False),
+        sa.Column("params", postgresql.JSONB(), nullable=False, server_default="{}"),
+        sa.Column("data", postgresql.JSONB(), nullable=False, server_default="{}"),
+        sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index("ix_push_intents_user_id", "push_intents", ["user_id"])
+    op.create_index("ix_push_intents_due", "push_intents", ["status", "next_attempt_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("push_intents")
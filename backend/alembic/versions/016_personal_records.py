@@ -0,0 +1,98 @@
+"""Records personnels — table personal_records + reprise de l'historique.
+
+Revision ID: 016_personal_records
+Revises: 015_push_intents
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "016_personal_records"
+down_revision = "015_push_intents"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "personal_records",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "exercise_type_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("exercise_types.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("max_weight_kg", sa.Numeric(6, 2), nullable=True),
+        sa.Column("max_weight_reps", sa.Integer(), nullable=True),
+        sa.Column("max_weight_set_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("max_weight_session_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("max_weight_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("best_e1rm_kg", sa.Numeric(7, 2), nullable=True),
+        sa.Column("best_e1rm_set_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("max_volume_kg", sa.Numeric(10, 2), nullable=True),
+        sa.Column("max_volume_set_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.UniqueConstraint("user_id", "exercise_type_id", name="uq_personal_records_user_exercise"),
+    )
+
+    # Reprise : meilleur set par métrique (le plus ancien en cas d'égalité)
+    op.execute(
+        """
+        WITH s AS (
+            SELECT es.id, es.session_id, es.exercise_type_id, es.reps, es.weight_kg,
+                   ps.user_id, ps.session_date, es.set_order,
+                   CASE WHEN es.reps IS NULL OR es.reps = 0 THEN NULL
+                        WHEN es.reps = 1 THEN es.weight_kg
+                        ELSE round(es.weight_kg * (1 + es.reps / 30.0), 2) END AS e1rm,
+                   CASE WHEN es.reps IS NULL OR es.reps = 0 THEN NULL
+                        ELSE es.weight_kg * es.reps END AS volume
+            FROM exercise_sets es
+            JOIN performance_sessions ps ON ps.id = es.session_id
+            WHERE es.weight_kg IS NOT NULL
+        ),
+        w AS (
+            SELECT DISTINCT ON (user_id, exercise_type_id) *
+            FROM s ORDER BY user_id, exercise_type_id, weight_kg DESC, session_date, set_order
+        ),
+        e AS (
+            SELECT DISTINCT ON (user_id, exercise_type_id) user_id, exercise_type_id, id, e1rm
+            FROM s WHERE e1rm IS NOT NULL
+            ORDER BY user_id, exercise_type_id, e1rm DESC, session_date, set_order
+        ),
+        v AS (
+            SELECT DISTINCT ON (user_id, exercise_type_id) user_id, exercise_type_id, id, volume
+            FROM s WHERE volume IS NOT NULL
+            ORDER BY user_id, exercise_type_id, volume DESC, session_date, set_order
+        )
+        INSERT INTO personal_records (
+            id, user_id, exercise_type_id,
+            max_weight_kg, max_weight_reps, max_weight_set_id, max_weight_session_id, max_weight_at,
+            best_e1rm_kg, best_e1rm_set_id, max_volume_kg, max_volume_set_id
+        )
+        SELECT gen_random_uuid(), w.user_id, w.exercise_type_id,
+               w.weight_kg, w.reps, w.id, w.session_id, w.session_date,
+               e.e1rm, e.id, v.volume, v.id
+        FROM w
+        LEFT JOIN e ON e.user_id = w.user_id AND e.exercise_type_id = w.exercise_type_id
+        LEFT JOIN v ON v.user_id = w.user_id AND v.exercise_type_id = w.exercise_type_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("personal_records")
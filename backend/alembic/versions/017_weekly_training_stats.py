@@ -0,0 +1,87 @@
+"""Rollups d'entraînement hebdomadaires — table weekly_training_stats + reprise.
+
+Revision ID: 017_weekly_training_stats
+Revises: 016_personal_records
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "017_weekly_training_stats"
+down_revision = "016_personal_records"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "weekly_training_stats",
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("week_start", sa.Date(), primary_key=True),
+        sa.Column("sessions_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_duration_min", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("feeling_sum", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("feeling_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_sets", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_volume_kg", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("muscle_sets", postgresql.JSONB(), nullable=False, server_default="{}"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+    # Reprise de l'historique — semaine ISO en UTC
+    op.execute(
+        """
+        WITH s AS (
+            SELECT ps.id, ps.user_id, ps.duration_min, ps.feeling,
+                   date_trunc('week', ps.session_date AT TIME ZONE 'UTC')::date AS week_start
+            FROM performance_sessions ps
+        ),
+        sets AS (
+            SELECT s.user_id, s.week_start, count(es.id) AS total_sets,
+                   coalesce(sum(es.weight_kg * es.reps), 0) AS total_volume_kg
+            FROM s JOIN exercise_sets es ON es.session_id = s.id
+            GROUP BY s.user_id, s.week_start
+        ),
+        muscles AS (
+            SELECT user_id, week_start, jsonb_object_agg(muscle_group, n) AS muscle_sets
+            FROM (
+                SELECT s.user_id, s.week_start, m.muscle_group, count(es.id) AS n
+                FROM s
+                JOIN exercise_sets es ON es.session_id = s.id
+                JOIN exercise_type_muscles m
+                  ON m.exercise_type_id = es.exercise_type_id AND m.role = 'primary'
+                GROUP BY s.user_id, s.week_start, m.muscle_group
+            ) per_muscle
+            GROUP BY user_id, week_start
+        )
+        INSERT INTO weekly_training_stats (
+            user_id, week_start, sessions_count, total_duration_min,
+            feeling_sum, feeling_count, total_sets, total_volume_kg, muscle_sets
+        )
+        SELECT s.user_id, s.week_start, count(*), coalesce(sum(s.duration_min), 0),
+               coalesce(sum(s.feeling), 0), count(s.feeling),
+               coalesce(max(sets.total_sets), 0), coalesce(max(sets.total_volume_kg), 0),
+               coalesce(max(muscles.muscle_sets::text), '{}')::jsonb
+        FROM s
+        LEFT JOIN sets ON sets.user_id = s.user_id AND sets.week_start = s.week_start
+        LEFT JOIN muscles ON muscles.user_id = s.user_id AND muscles.week_start = s.week_start
+        GROUP BY s.user_id, s.week_start
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("weekly_training_stats")
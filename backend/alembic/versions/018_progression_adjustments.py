@@ -0,0 +1,65 @@
+"""Journal des ajustements de progression — table progression_adjustments.
+
+Revision ID: 018_progression_adjustments
+Revises: 017_weekly_training_stats
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "018_progression_adjustments"
+down_revision = "017_weekly_training_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "progression_adjustments",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "planned_exercise_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("planned_exercises.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "client_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "exercise_type_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("exercise_types.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("previous_weight_kg", sa.Numeric(6, 2), nullable=True),
+        sa.Column("new_weight_kg", sa.Numeric(6, 2), nullable=False),
+        sa.Column("last_session_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("trigger", sa.String(20), nullable=False, server_default="session"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index(
+        "ix_progression_adjustments_planned",
+        "progression_adjustments",
+        ["planned_exercise_id", "created_at"],
+    )
+    op.create_index(
+        "ix_progression_adjustments_client_id", "progression_adjustments", ["client_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_progression_adjustments_client_id", table_name="progression_adjustments")
+    op.drop_index("ix_progression_adjustments_planned", table_name="progression_adjustments")
+    op.drop_table("progression_adjustments")
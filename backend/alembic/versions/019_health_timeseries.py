@@ -0,0 +1,189 @@
+"""Séries temporelles santé — partitions mensuelles, BRIN, rollup journalier.
+
+health_logs et body_measurements deviennent des tables partitionnées par mois
+(RANGE sur l'horodatage, clé primaire (id, horodatage)) : partitions couvrant
+l'historique jusqu'au mois courant + 3, partition DEFAULT pour les valeurs hors
+plage. Les partitions suivantes sont créées par la tâche health.timeseries.
+
+Revision ID: 019_health_timeseries
+Revises: 018_progression_adjustments
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from datetime import date
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "019_health_timeseries"
+down_revision = "018_progression_adjustments"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+
+def _health_log_columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("parameter_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("health_parameters.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("value", sa.Numeric(10, 3), nullable=False),
+        sa.Column("note", sa.Text, nullable=True),
+        sa.Column("source", sa.String(20), nullable=False, server_default="manual"),
+        sa.Column("logged_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    ]
+
+
+def _body_measurement_columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("measured_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("weight_kg", sa.Numeric(5, 2), nullable=True),
+        sa.Column("bmi", sa.Numeric(5, 2), nullable=True),
+        sa.Column("fat_pct", sa.Numeric(5, 2), nullable=True),
+        sa.Column("muscle_pct", sa.Numeric(5, 2), nullable=True),
+        sa.Column("bone_kg", sa.Numeric(5, 2), nullable=True),
+        sa.Column("water_pct", sa.Numeric(5, 2), nullable=True),
+        sa.Column("source", sa.String(20), nullable=False, server_default="manual"),
+    ]
+
+
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _months(table: str, column: str) -> list[date]:
+    """Du mois de la plus ancienne ligne (ou du mois courant) au mois courant + MONTHS_AHEAD."""
+    today = date.today().replace(day=1)
+    oldest = op.get_bind().execute(
+        sa.text(f"SELECT min({column} AT TIME ZONE 'UTC') FROM {table}")
+    ).scalar()
+    month = min(oldest.date().replace(day=1), today) if oldest else today
+    last = _add_months(today, MONTHS_AHEAD)
+    months = []
+    while month <= last:
+        months.append(month)
+        month = _add_months(month, 1)
+    return months
+
+
+def _partition(table: str, column: str, columns: list[sa.Column], legacy_indexes: list[str]) -> None:
+    legacy = f"{table}_legacy"
+    months = _months(table, column)
+    for index in legacy_indexes:
+        op.drop_index(index, table_name=table)
+    op.rename_table(table, legacy)
+    op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+
+    op.create_table(
+        table,
+        *columns,
+        sa.PrimaryKeyConstraint("id", column, name=f"{table}_pkey"),
+        postgresql_partition_by=f"RANGE ({column})",
+    )
+    for month in months:
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+            f"TO ('{_add_months(month, 1).isoformat()} 00:00:00+00')"
+        )
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    names = ", ".join(c.name for c in columns)
+    op.execute(f"INSERT INTO {table} ({names}) SELECT {names} FROM {legacy}")
+    op.drop_table(legacy)
+
+
+def _unpartition(table: str, columns: list[sa.Column]) -> None:
+    partitioned = f"{table}_partitioned"
+    op.rename_table(table, partitioned)
+    op.execute(f"ALTER TABLE {partitioned} RENAME CONSTRAINT {table}_pkey TO {partitioned}_pkey")
+    op.create_table(table, *columns, sa.PrimaryKeyConstraint("id", name=f"{table}_pkey"))
+    names = ", ".join(c.name for c in columns)
+    op.execute(f"INSERT INTO {table} ({names}) SELECT {names} FROM {partitioned}")
+    op.execute(f"DROP TABLE {partitioned} CASCADE")
+
+
+def upgrade() -> None:
+    # ── health_logs ───────────────────────────────────────────────────────────
+    _partition("health_logs", "logged_at", _health_log_columns(), ["ix_health_logs_user_id"])
+    op.create_index("ix_health_logs_user_logged", "health_logs", ["user_id", "logged_at", "id"])
+    op.create_index(
+        "ix_health_logs_user_param_logged", "health_logs", ["user_id", "parameter_id", "logged_at"]
+    )
+    op.create_index(
+        "brin_health_logs_logged_at", "health_logs", ["logged_at"], postgresql_using="brin"
+    )
+
+    # ── body_measurements ─────────────────────────────────────────────────────
+    _partition(
+        "body_measurements", "measured_at", _body_measurement_columns(),
+        ["ix_body_measurements_user_id", "ix_body_measurements_user_date"],
+    )
+    op.create_index(
+        "ix_body_measurements_user_date", "body_measurements", ["user_id", "measured_at"]
+    )
+    op.create_index(
+        "brin_body_measurements_measured_at", "body_measurements", ["measured_at"],
+        postgresql_using="brin",
+    )
+
+    # ── health_log_daily (rollup) ─────────────────────────────────────────────
+    op.create_table(
+        "health_log_daily",
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "parameter_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("health_parameters.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("sum_value", sa.Numeric(14, 3), nullable=False),
+        sa.Column("min_value", sa.Numeric(10, 3), nullable=False),
+        sa.Column("max_value", sa.Numeric(10, 3), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+    # Reprise de l'historique — jour UTC
+    op.execute(
+        """
+        INSERT INTO health_log_daily (
+            user_id, parameter_id, day, count, sum_value, min_value, max_value
+        )
+        SELECT user_id, parameter_id, (logged_at AT TIME ZONE 'UTC')::date,
+               count(*), sum(value), min(value), max(value)
+        FROM health_logs
+        GROUP BY user_id, parameter_id, (logged_at AT TIME ZONE 'UTC')::date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("health_log_daily")
+
+    _unpartition("body_measurements", _body_measurement_columns())
+    op.create_index("ix_body_measurements_user_id", "body_measurements", ["user_id"])
+    op.create_index(
+        "ix_body_measurements_user_date", "body_measurements", ["user_id", "measured_at"]
+    )
+
+    _unpartition("health_logs", _health_log_columns())
+    op.create_index("ix_health_logs_user_id", "health_logs", ["user_id"])
@@ -0,0 +1,52 @@
+"""Liste d'attente — unicité des entrées actives, index de tête de file.
+
+Doublons actifs existants (même client, même créneau) : la première entrée
+(position la plus basse) est conservée, les autres passent cancelled.
+
+Revision ID: 020_waitlist_positions
+Revises: 019_health_timeseries
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "020_waitlist_positions"
+down_revision = "019_health_timeseries"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE waitlist_entries w
+        SET status = 'cancelled'
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY coach_id, slot_datetime, client_id
+                ORDER BY position, created_at
+            ) AS rank
+            FROM waitlist_entries
+            WHERE status IN ('waiting', 'notified')
+        ) ranked
+        WHERE w.id = ranked.id AND ranked.rank > 1
+        """
+    )
+    op.create_index(
+        "uq_waitlist_active_client", "waitlist_entries",
+        ["coach_id", "slot_datetime", "client_id"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('waiting', 'notified')"),
+    )
+    op.create_index(
+        "ix_waitlist_first_waiting", "waitlist_entries",
+        ["coach_id", "slot_datetime", "position"],
+        postgresql_where=sa.text("status = 'waiting'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_waitlist_first_waiting", table_name="waitlist_entries")
+    op.drop_index("uq_waitlist_active_client", table_name="waitlist_entries")
@@ -0,0 +1,52 @@
+"""Liste d'attente — événements « place libérée » et index d'expiration.
+
+waitlist_slot_events : file des places libérées (annulations, départ d'un
+client notifié), vidée par le worker waitlist.promote. Index partiel sur
+expires_at des entrées notified : expiration en masse et amorçage de la roue.
+
+Revision ID: 021_waitlist_slot_events
+Revises: 020_waitlist_positions
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "021_waitlist_slot_events"
+down_revision = "020_waitlist_positions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "waitlist_slot_events",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "coach_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("slot_datetime", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("reason", sa.String(30), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.create_index("ix_waitlist_slot_events_created", "waitlist_slot_events", ["created_at"])
+    op.create_index(
+        "ix_waitlist_notified_expiry", "waitlist_entries", ["expires_at"],
+        postgresql_where=sa.text("status = 'notified'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_waitlist_notified_expiry", table_name="waitlist_entries")
+    op.drop_index("ix_waitlist_slot_events_created", table_name="waitlist_slot_events")
+    op.drop_table("waitlist_slot_events")
@@ -14,6 +14,7 @@ import logging
 from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.principal_cache import principal_cache
 from app.database import get_db
 from app.models.user import User
 from app.repositories.api_key_repository import api_key_repository
@@ -28,6 +29,7 @@ async def get_current_user(
 ) -> User:
     """
     Dépendance FastAPI — extrait et valide l'API Key du header X-API-Key.
+    L'User est servi par principal_cache quand c'est possible (pas d'aller-retour BDD).
 
     Raises:
         401 si la clé est absente, invalide ou révoquée.
@@ -39,7 +41,11 @@ async def get_current_user(
             headers={"WWW-Authenticate": "ApiKey"},
         )
     key_hash = hash_api_key(x_api_key)
-    user = await api_key_repository.get_user_by_key_hash(db, key_hash)
+    user = await principal_cache.get(db, key_hash)
+    if user is None:
+        user = await api_key_repository.get_user_by_key_hash(db, key_hash)
+        if user is not None:
+            principal_cache.put(key_hash, user)
 
     if user is None:
         logger.warning("Tentative d'accès avec clé invalide (hash=%s...)", key_hash[:8])
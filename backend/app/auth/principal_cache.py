@@ -0,0 +1,197 @@
+"""
+Cache in-process des utilisateurs authentifiés (principal), indexé par key_hash.
+
+Évite, pour chaque requête authentifiée, l'aller-retour PostgreSQL
+api_keys ⋈ users et le déchiffrement Fernet des colonnes EncryptedString.
+
+  - Borné : LRU sur PRINCIPAL_CACHE_MAX_SIZE entrées
+  - TTL   : PRINCIPAL_CACHE_TTL_SECONDS (0 = cache désactivé)
+  - Invalidation au COMMIT : logout, logout_all, reset password (auth_service)
+    + toute mise à jour ORM d'un User. Les clés / utilisateurs à invalider sont
+    notés dans session.info et purgés par le hook after_commit — invalider avant
+    le commit laisserait une requête concurrente remettre en cache l'état encore
+    committé (clé révoquée, statut périmé) pour tout le TTL.
+
+Le cache stocke un *snapshot détaché* (valeurs de colonnes uniquement) —
+jamais l'instance liée à une session. À chaque hit, le snapshot est rattaché
+à la session de la requête via merge(load=False), sans requête SQL.
+
+NB : last_used_at de la clé n'est rafraîchi qu'aux misses (au plus une fois par TTL).
+"""
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.models.user import User
+
+_PENDING_KEYS = "principal_cache.pending_keys"
+_PENDING_USERS = "principal_cache.pending_users"
+
+
+@dataclass
+class _Entry:
+    user_id: uuid.UUID
+    snapshot: User
+    expires_at: float
+
+
+class PrincipalCache:
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._keys_by_user: dict[uuid.UUID, set[str]] = {}
+        self._hits = metrics.counter("principal_cache.hits", "Requêtes servies sans aller-retour BDD")
+        self._misses = metrics.counter("principal_cache.misses", "Lookups api_keys ⋈ users effectués")
+        self._evictions = metrics.counter("principal_cache.evictions", "Entrées évincées (LRU ou TTL)")
+        self._invalidations = metrics.counter("principal_cache.invalidations", "Entrées invalidées")
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    # -----------------------------------------------------------------------
+    # Lecture / écriture
+    # -----------------------------------------------------------------------
+
+    async def get(self, db: AsyncSession, key_hash: str) -> User | None:
+        """
+        Retourne l'User associé à key_hash, rattaché à la session `db`,
+        ou None si absent / expiré (le caller doit alors interroger la BDD).
+        """
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key_hash)
+        if entry is None:
+            self._misses.inc()
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._drop(key_hash)
+            self._evictions.inc()
+            self._misses.inc()
+            return None
+
+        self._entries.move_to_end(key_hash)
+        self._hits.inc()
+        return await db.merge(entry.snapshot, load=False)
+
+    def put(self, key_hash: str, user: User) -> None:
+        """Mémorise un snapshot détaché de `user` pour key_hash."""
+        if not self.enabled:
+            return
+        self._drop(key_hash)
+        self._entries[key_hash] = _Entry(
+            user_id=user.id,
+            snapshot=_detached_snapshot(user),
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._keys_by_user.setdefault(user.id, set()).add(key_hash)
+        while len(self._entries) > self.max_size:
+            oldest, _ = next(iter(self._entries.items()))
+            self._drop(oldest)
+            self._evictions.inc()
+
+    # -----------------------------------------------------------------------
+    # Invalidation
+    # -----------------------------------------------------------------------
+
+    def invalidate_key(self, key_hash: str) -> None:
+        """Invalide une clé (logout, révocation)."""
+        if self._drop(key_hash):
+            self._invalidations.inc()
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        """Invalide toutes les clés d'un utilisateur (logout_all, suspension, suppression…)."""
+        for key_hash in list(self._keys_by_user.get(user_id, ())):
+            self.invalidate_key(key_hash)
+
+    def invalidate_key_on_commit(self, db: AsyncSession | Session, key_hash: str) -> None:
+        """Invalide la clé au commit de la transaction de `db` (rien si rollback)."""
+        db.info.setdefault(_PENDING_KEYS, set()).add(key_hash)
+
+    def invalidate_user_on_commit(self, db: AsyncSession | Session, user_id: uuid.UUID) -> None:
+        """Invalide les clés de l'utilisateur au commit de la transaction de `db`."""
+        db.info.setdefault(_PENDING_USERS, set()).add(user_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits.value,
+            "misses": self._misses.value,
+            "evictions": self._evictions.value,
+            "invalidations": self._invalidations.value,
+        }
+
+    def _drop(self, key_hash: str) -> bool:
+        entry = self._entries.pop(key_hash, None)
+        if entry is None:
+            return False
+        keys = self._keys_by_user.get(entry.user_id)
+        if keys is not None:
+            keys.discard(key_hash)
+            if not keys:
+                del self._keys_by_user[entry.user_id]
+        return True
+
+
+def _detached_snapshot(user: User) -> User:
+    """
+    Copie les colonnes (déjà déchiffrées) dans une instance détachée, état "committed".
+    Pas de @validates déclenché, pas de relation chargée.
+    """
+    mapper = User.__mapper__
+    snapshot = mapper.class_manager.new_instance()
+    for attr in mapper.column_attrs:
+        set_committed_value(snapshot, attr.key, getattr(user, attr.key))
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+def _make_cache() -> PrincipalCache:
+    settings = get_settings()
+    return PrincipalCache(
+        max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+        ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    )
+
+
+# Instance singleton
+principal_cache = _make_cache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_change(mapper, connection, target: User) -> None:
+    """Toute écriture ORM sur un User (profil, statut, anonymisation) invalide ses entrées au commit."""
+    session = object_session(target)
+    if session is not None:
+        principal_cache.invalidate_user_on_commit(session, target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    for key_hash in session.info.pop(_PENDING_KEYS, ()):
+        principal_cache.invalidate_key(key_hash)
+    for user_id in session.info.pop(_PENDING_USERS, ()):
+        principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEYS, None)
+    session.info.pop(_PENDING_USERS, None)
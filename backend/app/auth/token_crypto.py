@@ -4,14 +4,17 @@ from __future__ import annotations
 
 import os
 
-from cryptography.fernet import Fernet
+from cryptography.fernet import MultiFernet
 
+from app.core.encryption import parse_keys
 
-def _fernet() -> Fernet:
+
+def _fernet() -> MultiFernet:
     key = os.environ.get("TOKEN_ENCRYPTION_KEY", "")
     if not key:
         raise RuntimeError("TOKEN_ENCRYPTION_KEY non configurée")
-    return Fernet(key.encode() if isinstance(key, str) else key)
+    # Liste "nouvelle,ancienne" acceptée pendant une rotation (cf. key_rotation_service)
+    return MultiFernet(parse_keys(key))
 
 
 def encrypt_token(token: str) -> str:
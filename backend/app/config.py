@@ -35,6 +35,58 @@ class Settings(BaseSettings):
     # --- Rate limiting ---
     RATE_LIMIT_AUTH: str = "10/minute"   # login, google
 
+    # --- Cache des utilisateurs authentifiés (get_current_user) ---
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0   # 0 = désactivé
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000      # entrées (LRU)
+
+    # --- Cache des politiques d'annulation (transitions de réservation) ---
+    CANCELLATION_POLICY_CACHE_TTL_SECONDS: float = 60.0   # 0 = désactivé
+    CANCELLATION_POLICY_CACHE_MAX_SIZE: int = 10_000
+
+    # --- Index en mémoire du catalogue d'exercices (générateur de programmes) ---
+    EXERCISE_CATALOGUE_TTL_SECONDS: float = 300.0   # 0 = rechargé à chaque génération
+
+    # --- Pool bcrypt (hash/verify hors event loop) ---
+    PASSWORD_HASH_WORKERS: int = 4       # threads dédiés
+    PASSWORD_HASH_QUEUE_SIZE: int = 32   # appels en attente avant 429
+
+    # --- Déchiffrement Fernet en lot ---
+    FIELD_DECRYPT_OFFLOAD_THRESHOLD: int = 64  # lots ≥ N valeurs → thread
+
+    # --- Cache des valeurs déchiffrées (un pool PII, un pool tokens OAuth) ---
+    PLAINTEXT_CACHE_ENABLED: bool = False
+    PLAINTEXT_CACHE_TTL_SECONDS: float = 300.0
+    PLAINTEXT_CACHE_MAX_ENTRIES: int = 50_000      # par pool
+    PLAINTEXT_CACHE_MAX_BYTES: int = 8 * 1024 * 1024  # par pool
+
+    # --- Tâches de fond (auto-rejet 24h, expiration liste d'attente, alertes forfaits) ---
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_INTERVAL_SECONDS: float = 60.0
+    SCHEDULER_BATCH_SIZE: int = 500      # lignes par UPDATE … RETURNING
+    PROGRESSION_NIGHTLY_SECONDS: float = 86400.0  # passe complète du moteur de progression
+    WAITLIST_PROMOTE_POLL_SECONDS: float = 2.0    # places libérées → suivant notifié, fenêtres échues
+    WAITLIST_RESYNC_SECONDS: float = 300.0        # roue des échéances ré-amorcée depuis la base
+
+    # --- Séries temporelles santé (health_logs / body_measurements partitionnées par mois) ---
+    HEALTH_TIMESERIES_SECONDS: float = 86400.0    # partitions à venir + purge / compaction
+    HEALTH_PARTITION_MONTHS_AHEAD: int = 3
+    HEALTH_RAW_RETENTION_DAYS: int = 0            # logs bruts purgés (rollup conservé) — 0 = jamais
+    HEALTH_COMPACTION_LOOKBACK_DAYS: int = 7      # mesures de balance compactées sur [cutoff - N j, cutoff)
+
+    # --- Rotation des clés Fernet (scripts/rotate_keys.py) ---
+    KEY_ROTATION_BATCH_SIZE: int = 500             # lignes par lot keyset / UPDATE groupé
+    KEY_ROTATION_ROWS_PER_SECOND: float = 2000.0   # débit max (0 = illimité)
+
+    # --- SMS (outbox sms_logs vidée par le worker sms.outbox) ---
+    SMS_MAX_CONCURRENCY: int = 8         # requêtes provider en vol
+    SMS_RATE_PER_SECOND: float = 10.0    # débit max Twilio (0 = illimité)
+    SMS_OUTBOX_POLL_SECONDS: float = 2.0
+    SMS_OUTBOX_BATCH_SIZE: int = 100     # SMS réservés par lot
+    SMS_OUTBOX_LEASE_SECONDS: float = 300.0   # ligne réservée → réessayable après ce délai
+    SMS_MAX_ATTEMPTS: int = 5            # puis status=failed
+    SMS_RETRY_BASE_SECONDS: float = 30.0      # backoff : base × 2^(essai-1)
+    SMS_RETRY_MAX_SECONDS: float = 3600.0
+
     # --- Email (SMTP — phase 2) ---
     SMTP_HOST: str = ""
     SMTP_PORT: int = 587
@@ -43,7 +95,12 @@ class Settings(BaseSettings):
     EMAIL_FROM: str = "noreply@mycoach.app"
 
     # --- Firebase (push notifications — phase 2) ---
-    FIREBASE_CREDENTIALS_PATH: str = ""
+    FIREBASE_CREDENTIALS_PATH: str = ""  # vide = ConsolePushProvider (log uniquement)
+    PUSH_DISPATCH_POLL_SECONDS: float = 2.0
+    PUSH_DISPATCH_BATCH_SIZE: int = 500       # intentions réservées par lot
+    PUSH_DISPATCH_LEASE_SECONDS: float = 300.0
+    PUSH_MAX_ATTEMPTS: int = 3                # puis status=failed
+    PUSH_RETRY_BASE_SECONDS: float = 60.0     # backoff : base × 2^(essai-1)
 
     @property
     def is_test(self) -> bool:
@@ -0,0 +1,44 @@
+"""
+Verrous consultatifs PostgreSQL (pg_advisory_*) — sérialisation ciblée sans verrou de table.
+
+Clé 64 bits dérivée d'un tuple ("booking", coach_id, jour…) par BLAKE2b :
+deux ressources distinctes ne se bloquent pas mutuellement (aux collisions près,
+négligeables sur 64 bits).
+
+  xact_lock(db, *keys)             → pg_advisory_xact_lock, relâché au COMMIT/ROLLBACK
+  try_session_lock(conn, key)      → pg_try_advisory_lock, tenu par la connexion
+  session_unlock(conn, key)          jusqu'au unlock (élection de leader entre replicas)
+"""
+import hashlib
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+
+def lock_key(*parts: object) -> int:
+    """Clé bigint signée, stable entre processus et replicas."""
+    raw = ":".join(str(p) for p in parts).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "big", signed=True)
+
+
+async def xact_lock(db: AsyncSession, *keys: int) -> None:
+    """
+    Prend les verrous `keys` jusqu'à la fin de la transaction courante.
+    Toujours dans l'ordre croissant : deux transactions qui partagent des clés
+    ne peuvent pas s'interbloquer.
+    """
+    for key in sorted(set(keys)):
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": key})
+
+
+async def try_session_lock(conn: AsyncConnection, key: int) -> bool:
+    """Verrou de session non bloquant. False si une autre connexion le détient."""
+    acquired = (await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})).scalar()
+    await conn.commit()
+    return bool(acquired)
+
+
+async def session_unlock(conn: AsyncConnection, key: int) -> None:
+    await conn.rollback()  # transaction éventuellement avortée par la tâche
+    await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+    await conn.commit()
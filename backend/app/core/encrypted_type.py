@@ -6,10 +6,24 @@ EncryptedToken  → tokens OAuth (TOKEN_ENCRYPTION_KEY)
 
 Les deux TypeDecorators sont interchangeables en interface mais utilisent
 des clés Fernet distinctes → périmètres de compromission séparés.
+
+Mode lazy (opt-in, lazy=True) : la lecture ne déchiffre rien — la colonne
+contient un Ciphertext, déchiffré au premier accès via le descripteur
+lazy_decrypted(). Les endpoints de liste qui ne sérialisent jamais le champ
+ne paient plus le coût Fernet. Pour un lot d'instances qui vont toutes être
+lues, decrypt_loaded() déchiffre en une passe (thread si gros lot).
+
+    _phone: Mapped[str | None] = mapped_column("phone", EncryptedString(20, lazy=True))
+    phone = lazy_decrypted("_phone")
 """
+from collections.abc import Iterable
+
 from sqlalchemy import String, TypeDecorator
+from sqlalchemy.orm import synonym
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.core.encryption import (
+    decrypt_batch,
     decrypt_field,
     decrypt_token,
     encrypt_field,
@@ -17,6 +31,31 @@ from app.core.encryption import (
 )
 
 
+class Ciphertext:
+    """
+    Token Fernet lu en base, pas encore déchiffré (mode lazy).
+    Réécrit tel quel à l'écriture — jamais re-chiffré s'il n'a pas été modifié.
+    """
+
+    __slots__ = ("value", "is_token")
+
+    def __init__(self, value: str, is_token: bool = False) -> None:
+        self.value = value
+        self.is_token = is_token
+
+    def decrypt(self) -> str:
+        return decrypt_token(self.value) if self.is_token else decrypt_field(self.value)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Ciphertext) and other.value == self.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __repr__(self) -> str:
+        return "<Ciphertext>"  # jamais de token dans les logs
+
+
 class EncryptedString(TypeDecorator):
     """
     Chiffre/déchiffre automatiquement les champs PII à l'écriture/lecture.
@@ -29,14 +68,19 @@ class EncryptedString(TypeDecorator):
     impl = String
     cache_ok = True
 
-    def __init__(self, plaintext_max_length: int = 255, **kw):
+    def __init__(self, plaintext_max_length: int = 255, lazy: bool = False, **kw):
         encrypted_length = plaintext_max_length * 2 + 100
+        self.lazy = lazy
         super().__init__(encrypted_length, **kw)
 
     def process_bind_param(self, value, dialect):
+        if isinstance(value, Ciphertext):
+            return value.value
         return encrypt_field(value)
 
     def process_result_value(self, value, dialect):
+        if self.lazy and value is not None:
+            return Ciphertext(value)
         return decrypt_field(value)
 
 
@@ -51,12 +95,76 @@ class EncryptedToken(TypeDecorator):
     impl = String
     cache_ok = True
 
-    def __init__(self, plaintext_max_length: int = 2048, **kw):
+    def __init__(self, plaintext_max_length: int = 2048, lazy: bool = False, **kw):
         encrypted_length = plaintext_max_length * 2 + 100
+        self.lazy = lazy
         super().__init__(encrypted_length, **kw)
 
     def process_bind_param(self, value, dialect):
+        if isinstance(value, Ciphertext):
+            return value.value
         return encrypt_token(value)
 
     def process_result_value(self, value, dialect):
+        if self.lazy and value is not None:
+            return Ciphertext(value, is_token=True)
         return decrypt_token(value)
+
+
+# ---------------------------------------------------------------------------
+# Déchiffrement différé (mode lazy)
+# ---------------------------------------------------------------------------
+
+class _LazyDecrypted:
+    """
+    Descripteur public d'une colonne lazy : déchiffre au premier accès et
+    mémorise le clair comme valeur "committed" (l'objet ne devient pas dirty).
+    L'écriture passe le clair à la colonne → @validates et chiffrement au flush.
+    """
+
+    def __init__(self, column_attr: str) -> None:
+        self.column_attr = column_attr
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = getattr(instance, self.column_attr)
+        if isinstance(value, Ciphertext):
+            value = value.decrypt()
+            set_committed_value(instance, self.column_attr, value)
+        return value
+
+    def __set__(self, instance, value) -> None:
+        setattr(instance, self.column_attr, value)
+
+
+def lazy_decrypted(column_attr: str):
+    """
+    Attribut public d'une colonne EncryptedString/EncryptedToken(lazy=True).
+    Synonym SQLAlchemy : utilisable dans les constructeurs, update(**fields) et requêtes.
+    """
+    return synonym(column_attr, descriptor=_LazyDecrypted(column_attr))
+
+
+async def decrypt_loaded(instances: Iterable, *attrs: str) -> None:
+    """
+    Déchiffre en lot les attributs lazy `attrs` (noms publics) d'un résultat de requête.
+    Une seule passe Fernet par clé, hors event loop au-delà du seuil d'offload.
+    Sans effet sur les valeurs déjà déchiffrées.
+    """
+    pending: list[tuple[object, str, Ciphertext]] = []
+    for instance in instances:
+        mapper = type(instance).__mapper__
+        for attr in attrs:
+            column_attr = mapper.synonyms[attr].name
+            value = getattr(instance, column_attr)
+            if isinstance(value, Ciphertext):
+                pending.append((instance, column_attr, value))
+
+    for is_token in (False, True):
+        group = [item for item in pending if item[2].is_token is is_token]
+        if not group:
+            continue
+        plaintexts = await decrypt_batch([ct.value for _, _, ct in group], tokens=is_token)
+        for (instance, column_attr, _), plain in zip(group, plaintexts, strict=True):
+            set_committed_value(instance, column_attr, plain)
@@ -6,28 +6,137 @@ TOKEN_ENCRYPTION_KEY → tokens OAuth (Strava, Google Calendar, Withings...)
 
 La clé n'apparaît jamais dans les requêtes SQL — sécurité supérieure à pgcrypto.
 Un dump PostgreSQL sans les clés est entièrement illisible.
+
+Rotation : chaque variable accepte une liste "nouvelle,ancienne,…" (MultiFernet).
+La 1re clé chiffre, toutes déchiffrent ; key_rotation_service réécrit ensuite
+les colonnes existantes avec la nouvelle clé, puis l'ancienne peut être retirée.
+
+Option PLAINTEXT_CACHE_ENABLED : les déchiffrements passent par un cache
+token → clair (un pool par clé, voir app/core/plaintext_cache.py).
 """
+import asyncio
 import hashlib
 import unicodedata
+from collections.abc import Sequence
 from functools import lru_cache
 
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 
 from app.config import get_settings
+from app.core.plaintext_cache import PlaintextCache
+
+
+def parse_keys(value: str | bytes) -> list[Fernet]:
+    """ "k_new,k_old" → [Fernet(k_new), Fernet(k_old)] — la 1re clé est la clé primaire."""
+    raw = value.decode() if isinstance(value, bytes) else value
+    keys = [k.strip() for k in raw.split(",") if k.strip()]
+    if not keys:
+        raise ValueError("Aucune clé Fernet configurée")
+    return [Fernet(k.encode()) for k in keys]
 
 
 @lru_cache(maxsize=1)
-def _fernet_fields() -> Fernet:
+def _fernet_fields() -> MultiFernet:
     """Fernet A — champs PII. Instancié une seule fois."""
-    key = get_settings().FIELD_ENCRYPTION_KEY
-    return Fernet(key.encode() if isinstance(key, str) else key)
+    return MultiFernet(parse_keys(get_settings().FIELD_ENCRYPTION_KEY))
 
 
 @lru_cache(maxsize=1)
-def _fernet_tokens() -> Fernet:
+def _fernet_tokens() -> MultiFernet:
     """Fernet B — tokens OAuth. Instancié une seule fois."""
-    key = get_settings().TOKEN_ENCRYPTION_KEY
-    return Fernet(key.encode() if isinstance(key, str) else key)
+    return MultiFernet(parse_keys(get_settings().TOKEN_ENCRYPTION_KEY))
+
+
+@lru_cache(maxsize=2)
+def _primary(tokens: bool) -> Fernet:
+    setting = get_settings().TOKEN_ENCRYPTION_KEY if tokens else get_settings().FIELD_ENCRYPTION_KEY
+    return parse_keys(setting)[0]
+
+
+def primary_key_fingerprint(*, tokens: bool = False) -> str:
+    """Empreinte non réversible de la clé primaire (suivi de rotation, jamais la clé)."""
+    setting = get_settings().TOKEN_ENCRYPTION_KEY if tokens else get_settings().FIELD_ENCRYPTION_KEY
+    primary = setting.split(",")[0].strip()
+    return hashlib.sha256(primary.encode()).hexdigest()[:16]
+
+
+def rotate_value(value: str, *, tokens: bool = False) -> str | None:
+    """
+    Re-chiffre un token Fernet avec la clé primaire.
+    Returns None s'il l'est déjà (rien à réécrire) — rend la rotation idempotente.
+    Raises InvalidToken si aucune clé configurée ne le déchiffre.
+    """
+    token = value.encode("ascii")
+    try:
+        _primary(tokens).decrypt(token)
+        return None
+    except InvalidToken:
+        multi = _fernet_tokens() if tokens else _fernet_fields()
+        return multi.rotate(token).decode("ascii")
+
+
+def _make_plaintext_cache(name: str) -> PlaintextCache | None:
+    settings = get_settings()
+    if not settings.PLAINTEXT_CACHE_ENABLED:
+        return None
+    return PlaintextCache(
+        name,
+        max_entries=settings.PLAINTEXT_CACHE_MAX_ENTRIES,
+        max_bytes=settings.PLAINTEXT_CACHE_MAX_BYTES,
+        ttl_seconds=settings.PLAINTEXT_CACHE_TTL_SECONDS,
+    )
+
+
+@lru_cache(maxsize=1)
+def _field_cache() -> PlaintextCache | None:
+    """Pool de clairs PII — None si le cache est désactivé."""
+    return _make_plaintext_cache("field")
+
+
+@lru_cache(maxsize=1)
+def _token_cache() -> PlaintextCache | None:
+    """Pool de clairs tokens OAuth — séparé du pool PII."""
+    return _make_plaintext_cache("token")
+
+
+def _decrypt(fernet: MultiFernet, cache: PlaintextCache | None, value: str) -> str:
+    if cache is not None:
+        plain = cache.get(value)
+        if plain is not None:
+            return plain
+    plain = fernet.decrypt(value.encode("ascii")).decode("utf-8")
+    if cache is not None:
+        cache.put(value, plain)
+    return plain
+
+
+def wipe_plaintext_caches() -> None:
+    """Met à zéro et vide les deux pools de clairs (arrêt, rotation)."""
+    for cache in (_field_cache(), _token_cache()):
+        if cache is not None:
+            cache.wipe()
+
+
+def reload_keys() -> None:
+    """
+    Recharge les clés depuis la configuration et efface les caches de clairs.
+    À appeler à chaque rotation de FIELD_ENCRYPTION_KEY / TOKEN_ENCRYPTION_KEY.
+    """
+    wipe_plaintext_caches()
+    _fernet_fields.cache_clear()
+    _fernet_tokens.cache_clear()
+    _primary.cache_clear()
+    _field_cache.cache_clear()
+    _token_cache.cache_clear()
+
+
+def plaintext_cache_stats() -> dict:
+    """Statistiques des deux pools ({} si le cache est désactivé)."""
+    return {
+        name: cache.stats()
+        for name, cache in (("field", _field_cache()), ("token", _token_cache()))
+        if cache is not None
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -45,7 +154,13 @@ def decrypt_field(value: str | None) -> str | None:
     """Déchiffre un champ PII. None → None."""
     if value is None:
         return None
-    return _fernet_fields().decrypt(value.encode("ascii")).decode("utf-8")
+    return _decrypt(_fernet_fields(), _field_cache(), value)
+
+
+def decrypt_fields(values: Sequence[str | None]) -> list[str | None]:
+    """Déchiffrement en lot (un résultat de requête). None → None, ordre conservé."""
+    fernet, cache = _fernet_fields(), _field_cache()
+    return [None if v is None else _decrypt(fernet, cache, v) for v in values]
 
 
 # ---------------------------------------------------------------------------
@@ -63,7 +178,31 @@ def decrypt_token(value: str | None) -> str | None:
     """Déchiffre un token OAuth. None → None."""
     if value is None:
         return None
-    return _fernet_tokens().decrypt(value.encode("ascii")).decode("utf-8")
+    return _decrypt(_fernet_tokens(), _token_cache(), value)
+
+
+def decrypt_tokens(values: Sequence[str | None]) -> list[str | None]:
+    """Déchiffrement en lot des tokens OAuth. None → None, ordre conservé."""
+    fernet, cache = _fernet_tokens(), _token_cache()
+    return [None if v is None else _decrypt(fernet, cache, v) for v in values]
+
+
+# ---------------------------------------------------------------------------
+# Lots volumineux — hors event loop
+# ---------------------------------------------------------------------------
+
+async def decrypt_batch(
+    values: Sequence[str | None], *, tokens: bool = False
+) -> list[str | None]:
+    """
+    Déchiffre un lot (champs PII, ou tokens OAuth si tokens=True).
+    À partir de FIELD_DECRYPT_OFFLOAD_THRESHOLD valeurs, le lot part dans un thread
+    pour ne pas bloquer l'event loop ; en dessous, le coût du thread dépasse le gain.
+    """
+    fn = decrypt_tokens if tokens else decrypt_fields
+    if len(values) < get_settings().FIELD_DECRYPT_OFFLOAD_THRESHOLD:
+        return fn(values)
+    return await asyncio.to_thread(fn, values)
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,133 @@
+"""
+Métriques applicatives in-process — compteurs et histogrammes.
+
+Registre minimal, sans dépendance externe (pas de client Prometheus).
+Les valeurs sont propres à chaque worker uvicorn et exposées via GET /admin/metrics.
+Thread-safe : certains appels sont mesurés depuis des pools de threads.
+"""
+import threading
+from bisect import bisect_left
+
+# Bornes par défaut des histogrammes de latence (secondes)
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+class Counter:
+    """Compteur monotone (ex: hits/misses d'un cache)."""
+
+    def __init__(self, name: str, description: str = "") -> None:
+        self.name = name
+        self.description = description
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = 0
+
+    def snapshot(self) -> int:
+        return self._value
+
+
+class Histogram:
+    """Histogramme cumulatif à bornes fixes (style Prometheus : le=…)."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # dernière case = +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+            self._count += 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._sum = 0.0
+            self._count = 0
+
+    def snapshot(self) -> dict:
+        """Retourne {count, sum, buckets: {"0.005": n, ..., "+Inf": n}} (cumulatif)."""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative: dict[str, int] = {}
+        running = 0
+        for bound, n in zip(self.buckets, counts[:-1], strict=True):
+            running += n
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = running + counts[-1]
+        return {"count": count, "sum": round(total, 6), "buckets": cumulative}
+
+
+class MetricsRegistry:
+    """Registre nommé — get-or-create, une instance par nom."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = Counter(name, description)
+                self._metrics[name] = metric
+        return metric  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        description: str = "",
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = Histogram(name, description, buckets)
+                self._metrics[name] = metric
+        return metric  # type: ignore[return-value]
+
+    def snapshot(self) -> dict:
+        """Vue instantanée de toutes les métriques, triée par nom."""
+        with self._lock:
+            items = sorted(self._metrics.items())
+        return {name: metric.snapshot() for name, metric in items}
+
+    def reset(self) -> None:
+        """Remet toutes les valeurs à zéro (tests)."""
+        with self._lock:
+            metrics_list = list(self._metrics.values())
+        for metric in metrics_list:
+            metric.reset()
+
+
+# Instance singleton
+metrics = MetricsRegistry()
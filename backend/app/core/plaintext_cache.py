@@ -0,0 +1,105 @@
+"""
+Cache in-process des valeurs déchiffrées, indexé par empreinte du token Fernet.
+
+Les mêmes tokens (noms de coachs, emails, téléphones) sont déchiffrés à chaque
+requête ; ce cache les déchiffre une fois par TTL. Optionnel (PLAINTEXT_CACHE_ENABLED).
+
+  - Deux pools distincts : champs PII (FIELD_ENCRYPTION_KEY) / tokens OAuth
+    (TOKEN_ENCRYPTION_KEY) — un token ne peut jamais être servi par l'autre pool
+  - Borné en entrées ET en octets, LRU + TTL
+  - Clé = BLAKE2b(token) avec un sel aléatoire par processus : les clés ne
+    permettent pas de relier deux processus ni de retrouver le token
+  - Clair stocké en bytearray, mis à zéro à l'éviction, à l'expiration et au
+    wipe (rotation de clé). NB : les str retournées aux appelants sont des
+    copies immuables que Python ne permet pas d'effacer.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.metrics import metrics
+
+_DIGEST_KEY = os.urandom(32)
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode("ascii"), key=_DIGEST_KEY, digest_size=20).digest()
+
+
+def _zero(buf: bytearray) -> None:
+    buf[:] = b"\x00" * len(buf)
+
+
+class PlaintextCache:
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int, ttl_seconds: float) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[bytes, tuple[float, bytearray]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()  # decrypt_batch tourne aussi dans des threads
+        self._hits = metrics.counter(f"plaintext_cache.{name}.hits")
+        self._misses = metrics.counter(f"plaintext_cache.{name}.misses")
+        self._evictions = metrics.counter(f"plaintext_cache.{name}.evictions")
+
+    def get(self, token: str) -> str | None:
+        key = _digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses.inc()
+                return None
+            expires_at, buf = entry
+            if expires_at <= time.monotonic():
+                self._drop(key)
+                self._evictions.inc()
+                self._misses.inc()
+                return None
+            self._entries.move_to_end(key)
+            self._hits.inc()
+            return buf.decode("utf-8")
+
+    def put(self, token: str, plaintext: str) -> None:
+        buf = bytearray(plaintext.encode("utf-8"))
+        if len(buf) > self.max_bytes:
+            _zero(buf)
+            return
+        key = _digest(token)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, buf)
+            self._bytes += len(buf)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._evictions.inc()
+
+    def wipe(self) -> None:
+        """Efface tout le contenu (rotation de clé, arrêt)."""
+        with self._lock:
+            for _, buf in self._entries.values():
+                _zero(buf)
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits.value,
+            "misses": self._misses.value,
+            "evictions": self._evictions.value,
+        }
+
+    def _drop(self, key: bytes) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            _, buf = entry
+            self._bytes -= len(buf)
+            _zero(buf)
@@ -0,0 +1,99 @@
+"""Interface push + providers.
+
+Envoi multicast : un même message (titre, corps, data) vers une liste de tokens,
+au plus `max_tokens_per_call` par appel (limite FCM : 500). Le résultat est donné
+token par token ; `unregistered` signale un token mort à désactiver.
+"""
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PushTokenResult:
+    token: str
+    success: bool
+    unregistered: bool = False  # token désinstallé / invalide → à désactiver
+    error_message: str | None = None
+
+
+class PushProvider(ABC):
+    max_tokens_per_call: int = 500
+
+    @abstractmethod
+    async def send_multicast(
+        self, tokens: list[str], title: str, body: str, data: dict[str, str]
+    ) -> list[PushTokenResult]:
+        """Un résultat par token, dans l'ordre de `tokens`."""
+
+
+class ConsolePushProvider(PushProvider):
+    """Dev/test — log uniquement, pas d'envoi réel."""
+
+    async def send_multicast(
+        self, tokens: list[str], title: str, body: str, data: dict[str, str]
+    ) -> list[PushTokenResult]:
+        logger.info(f"[PUSH CONSOLE] tokens={len(tokens)} title={title!r} body={body[:50]!r}")
+        return [PushTokenResult(token=token, success=True) for token in tokens]
+
+
+class FirebasePushProvider(PushProvider):
+    def __init__(self, credentials_path: str):
+        self.credentials_path = credentials_path
+        self._app = None
+
+    def _get_app(self):
+        """App firebase_admin unique (connexions HTTP réutilisées entre envois)."""
+        if self._app is None:
+            import firebase_admin
+            from firebase_admin import credentials
+            self._app = firebase_admin.initialize_app(
+                credentials.Certificate(self.credentials_path), name="mycoach-push"
+            )
+        return self._app
+
+    async def send_multicast(
+        self, tokens: list[str], title: str, body: str, data: dict[str, str]
+    ) -> list[PushTokenResult]:
+        try:
+            from firebase_admin import messaging
+            message = messaging.MulticastMessage(
+                tokens=tokens,
+                notification=messaging.Notification(title=title, body=body),
+                data=data,
+            )
+            batch = await asyncio.to_thread(
+                messaging.send_each_for_multicast, message, app=self._get_app()
+            )
+        except Exception as e:
+            return [PushTokenResult(token=t, success=False, error_message=str(e)) for t in tokens]
+
+        results = []
+        for token, resp in zip(tokens, batch.responses, strict=True):
+            if resp.success:
+                results.append(PushTokenResult(token=token, success=True))
+                continue
+            results.append(PushTokenResult(
+                token=token,
+                success=False,
+                # Token désinstallé ou émis pour un autre projet : ne sera plus jamais valide
+                unregistered=isinstance(
+                    resp.exception, (messaging.UnregisteredError, messaging.SenderIdMismatchError)
+                ),
+                error_message=str(resp.exception),
+            ))
+        return results
+
+
+@lru_cache(maxsize=1)
+def get_push_provider() -> PushProvider:
+    """Provider unique du processus : Firebase si configuré, sinon console."""
+    from app.config import get_settings
+    settings = get_settings()
+    if settings.FIREBASE_CREDENTIALS_PATH:
+        return FirebasePushProvider(settings.FIREBASE_CREDENTIALS_PATH)
+    return ConsolePushProvider()
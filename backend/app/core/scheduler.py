@@ -0,0 +1,111 @@
+"""
+Planificateur de tâches de fond in-process (lifespan FastAPI).
+
+Chaque tâche tourne dans sa propre boucle asyncio, toutes les `interval_seconds`.
+Plusieurs replicas peuvent démarrer le même planificateur : à chaque passage, un
+verrou consultatif PostgreSQL *de session* (pg_try_advisory_lock) désigne le
+replica qui exécute la tâche — les autres sautent ce passage. Le verrou est tenu
+sur une connexion dédiée le temps de la tâche, même si elle commite par lots.
+
+Métriques par tâche (GET /admin/metrics) :
+  scheduler.<tâche>.duration_seconds  histogramme des durées d'exécution
+  scheduler.<tâche>.rows              lignes traitées (cumul)
+  scheduler.<tâche>.runs / skipped / errors
+"""
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core import advisory_lock
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+JobFn = Callable[[AsyncSession], Awaitable[int]]
+
+
+@dataclass
+class _Job:
+    name: str
+    fn: JobFn
+    interval_seconds: float
+    lock_key: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.lock_key = advisory_lock.lock_key("scheduler", self.name)
+        self.duration = metrics.histogram(
+            f"scheduler.{self.name}.duration_seconds", "Durée d'exécution de la tâche"
+        )
+        self.rows = metrics.counter(f"scheduler.{self.name}.rows", "Lignes traitées")
+        self.runs = metrics.counter(f"scheduler.{self.name}.runs", "Exécutions (replica leader)")
+        self.skipped = metrics.counter(
+            f"scheduler.{self.name}.skipped", "Passages sautés (tâche tenue par un autre replica)"
+        )
+        self.errors = metrics.counter(f"scheduler.{self.name}.errors", "Exécutions en erreur")
+
+
+class Scheduler:
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self._jobs: dict[str, _Job] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def add_job(self, name: str, fn: JobFn, interval_seconds: float) -> None:
+        """fn(db) → nombre de lignes traitées. fn gère ses propres commits (par lot)."""
+        self._jobs[name] = _Job(name, fn, interval_seconds)
+
+    @property
+    def job_names(self) -> list[str]:
+        return list(self._jobs)
+
+    async def run_once(self, name: str) -> int | None:
+        """
+        Exécute la tâche si ce replica obtient son verrou.
+        Returns le nombre de lignes traitées, ou None si un autre replica la tient.
+        """
+        job = self._jobs[name]
+        async with self.engine.connect() as conn:
+            if not await advisory_lock.try_session_lock(conn, job.lock_key):
+                job.skipped.inc()
+                return None
+            start = time.perf_counter()
+            try:
+                async with AsyncSession(bind=conn, expire_on_commit=False) as db:
+                    rows = await job.fn(db)
+                job.runs.inc()
+                job.rows.inc(rows)
+                return rows
+            except Exception:
+                job.errors.inc()
+                raise
+            finally:
+                job.duration.observe(time.perf_counter() - start)
+                await advisory_lock.session_unlock(conn, job.lock_key)
+
+    def start(self) -> None:
+        for name in self._jobs:
+            self._tasks.append(asyncio.create_task(self._loop(name), name=f"scheduler:{name}"))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _loop(self, name: str) -> None:
+        job = self._jobs[name]
+        while True:
+            try:
+                rows = await self.run_once(name)
+                if rows:
+                    logger.info("Tâche %s : %d ligne(s) traitée(s)", name, rows)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Tâche %s en erreur", name)
+            await asyncio.sleep(job.interval_seconds)
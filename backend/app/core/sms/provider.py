@@ -1,6 +1,15 @@
-"""Interface SMS + providers."""
+"""Interface SMS + providers.
+
+Les envois partent du worker sms.outbox (sms_outbox_service), jamais d'une requête
+HTTP. Envoi en lot : send_many() parallélise les envois (SMS_MAX_CONCURRENCY requêtes en
+vol au plus) tout en respectant le débit du provider (rate_per_second, partagé par
+toutes les instances d'un même provider dans le processus).
+"""
+import asyncio
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from functools import lru_cache
 
 
 @dataclass
@@ -10,14 +19,51 @@ class SmsResult:
     error_message: str | None = None
 
 
+class RateLimiter:
+    """Espacement minimal 1/rate entre deux envois (0 = illimité)."""
+
+    def __init__(self, rate_per_second: float, *, clock=time.monotonic, sleep=asyncio.sleep):
+        self.rate_per_second = rate_per_second
+        self._clock = clock
+        self._sleep = sleep
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate_per_second <= 0:
+            return
+        async with self._lock:
+            now = self._clock()
+            if self._next_at > now:
+                await self._sleep(self._next_at - now)
+                now = self._next_at
+            self._next_at = now + 1.0 / self.rate_per_second
+
+
+# Un limiteur par provider (nom) — get_sms_provider() crée des instances à la demande
+_limiters: dict[str, RateLimiter] = {}
+
+
 class SmsProvider(ABC):
+    name: str = "abstract"
+    rate_per_second: float = 0.0  # 0 = illimité
+
     @abstractmethod
     async def send(self, to: str, body: str) -> SmsResult: ...
 
+    @property
+    def limiter(self) -> RateLimiter:
+        limiter = _limiters.get(self.name)
+        if limiter is None or limiter.rate_per_second != self.rate_per_second:
+            limiter = _limiters[self.name] = RateLimiter(self.rate_per_second)
+        return limiter
+
 
 class ConsoleSmsProvider(SmsProvider):
     """Dev/test — log uniquement, pas d'envoi réel."""
 
+    name = "console"
+
     async def send(self, to: str, body: str) -> SmsResult:
         import logging
         logging.getLogger(__name__).info(f"[SMS CONSOLE] to={to} body={body[:50]}...")
@@ -25,28 +71,38 @@ class ConsoleSmsProvider(SmsProvider):
 
 
 class TwilioSmsProvider(SmsProvider):
-    def __init__(self, account_sid: str, auth_token: str, from_number: str):
+    name = "twilio"
+
+    def __init__(
+        self, account_sid: str, auth_token: str, from_number: str, rate_per_second: float = 0.0
+    ):
         self.account_sid = account_sid
         self.auth_token = auth_token
         self.from_number = from_number
+        self.rate_per_second = rate_per_second
+        self._client = None
+
+    def _get_client(self):
+        """Client Twilio unique (session HTTP keep-alive réutilisée entre envois)."""
+        if self._client is None:
+            from twilio.rest import Client as TwilioClient
+            self._client = TwilioClient(self.account_sid, self.auth_token)
+        return self._client
 
     async def send(self, to: str, body: str) -> SmsResult:
         try:
-            import asyncio
-            from twilio.rest import Client as TwilioClient
-            loop = asyncio.get_event_loop()
-            client = TwilioClient(self.account_sid, self.auth_token)
-            msg = await loop.run_in_executor(
-                None,
-                lambda: client.messages.create(body=body, from_=self.from_number, to=to)
+            client = self._get_client()
+            msg = await asyncio.to_thread(
+                client.messages.create, body=body, from_=self.from_number, to=to
             )
             return SmsResult(success=True, provider_message_id=msg.sid)
         except Exception as e:
             return SmsResult(success=False, error_message=str(e))
 
 
+@lru_cache(maxsize=1)
 def get_sms_provider() -> SmsProvider:
-    """Factory : retourne ConsoleSmsProvider en dev/test, Twilio en prod."""
+    """Provider unique du processus : ConsoleSmsProvider en dev/test, Twilio en prod."""
     from app.config import get_settings
     settings = get_settings()
     if getattr(settings, 'APP_ENV', 'development') == 'production':
@@ -54,5 +110,33 @@ def get_sms_provider() -> SmsProvider:
             account_sid=getattr(settings, 'TWILIO_ACCOUNT_SID', ''),
             auth_token=getattr(settings, 'TWILIO_AUTH_TOKEN', ''),
             from_number=getattr(settings, 'TWILIO_FROM_NUMBER', ''),
+            rate_per_second=settings.SMS_RATE_PER_SECOND,
         )
     return ConsoleSmsProvider()
+
+
+async def send_many(
+    provider: SmsProvider,
+    messages: list[tuple[str, str]],
+    *,
+    max_concurrency: int | None = None,
+) -> list[SmsResult]:
+    """Envoie (to, body) en parallèle borné — résultats dans l'ordre des messages.
+
+    Une exception du provider devient un SmsResult en échec : un envoi raté
+    n'interrompt pas les autres.
+    """
+    if max_concurrency is None:
+        from app.config import get_settings
+        max_concurrency = get_settings().SMS_MAX_CONCURRENCY
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _send(to: str, body: str) -> SmsResult:
+        async with semaphore:
+            await provider.limiter.acquire()
+            try:
+                return await provider.send(to, body)
+            except Exception as e:
+                return SmsResult(success=False, error_message=str(e))
+
+    return list(await asyncio.gather(*(_send(to, body) for to, body in messages)))
@@ -0,0 +1,65 @@
+"""
+Roue temporelle hachée (hashed timing wheel) — échéances en mémoire, sans scrutation par élément.
+
+Une échéance est rangée dans la case (tick % size) de son tick, arrondi au
+tick supérieur : elle n'est jamais signalée avant d'être atteinte. advance(now)
+ne visite que les cases des ticks écoulés depuis le dernier appel (toutes si le
+retard dépasse un tour) et retire les échéances atteintes ; les échéances d'un
+tour ultérieur restent dans leur case.
+
+  schedule(deadline)   O(1)
+  advance(now)         O(ticks écoulés + échéances des cases visitées)
+
+La roue ne porte que des horodatages (avec fuseau) : l'appelant traite ensuite
+en masse tout ce qui est échu (ex. waitlist_service, un UPDATE … RETURNING par lot).
+"""
+import math
+from datetime import datetime
+
+
+class TimerWheel:
+
+    def __init__(self, tick_seconds: float = 1.0, size: int = 512) -> None:
+        self.tick_seconds = tick_seconds
+        self.size = size
+        self._slots: list[list[int]] = [[] for _ in range(size)]
+        self._current: int | None = None  # dernier tick traité par advance
+        self._pending = 0
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def _tick(self, moment: datetime, *, ceil: bool = False) -> int:
+        value = moment.timestamp() / self.tick_seconds
+        return math.ceil(value) if ceil else math.floor(value)
+
+    def schedule(self, deadline: datetime) -> None:
+        tick = self._tick(deadline, ceil=True)
+        if self._current is not None and tick <= self._current:
+            tick = self._current + 1  # déjà passée : signalée au prochain advance
+        self._slots[tick % self.size].append(tick)
+        self._pending += 1
+
+    def advance(self, now: datetime) -> int:
+        """Fait tourner la roue jusqu'à `now`. Returns le nombre d'échéances atteintes."""
+        target = self._tick(now)
+        if self._current is not None and target <= self._current:
+            return 0
+        if self._current is None or target - self._current >= self.size:
+            indexes = range(self.size)
+        else:
+            indexes = [tick % self.size for tick in range(self._current + 1, target + 1)]
+        fired = 0
+        for index in indexes:
+            slot = self._slots[index]
+            if slot:
+                remaining = [tick for tick in slot if tick > target]
+                fired += len(slot) - len(remaining)
+                self._slots[index] = remaining
+        self._current = target
+        self._pending -= fired
+        return fired
+
+    def clear(self) -> None:
+        self._slots = [[] for _ in range(self.size)]
+        self._pending = 0
@@ -16,7 +16,10 @@ from sqlalchemy import text
 from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.config import get_settings
+from app.core.encryption import wipe_plaintext_caches
 from app.database import engine
+from app.services.maintenance_service import build_scheduler
+from app.utils.password_pool import password_pool
 import app.models  # noqa: F401 — charge tous les modèles pour SQLAlchemy mapper
 from app.routers import (
     auth, coaches, gyms, payments, cancellation_templates,
@@ -47,7 +50,14 @@ limiter = Limiter(key_func=get_remote_address)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🚀 MyCoach Backend démarrage (env=%s)", settings.ENVIRONMENT)
+    scheduler = build_scheduler() if settings.SCHEDULER_ENABLED else None
+    if scheduler is not None:
+        scheduler.start()
     yield
+    if scheduler is not None:
+        await scheduler.stop()
+    password_pool.shutdown()
+    wipe_plaintext_caches()
     await engine.dispose()
     logger.info("👋 MyCoach Backend arrêt propre")
 
@@ -136,6 +146,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        headers=exc.headers,  # Retry-After, WWW-Authenticate…
     )
 
 
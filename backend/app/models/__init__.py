@@ -8,11 +8,14 @@ from app.models.exercise_type import ExerciseType, ExerciseTypeMuscle
 from app.models.machine import Machine, MachineExercise
 from app.models.performance_session import PerformanceSession
 from app.models.exercise_set import ExerciseSet
+from app.models.personal_record import PersonalRecord
+from app.models.weekly_training_stats import WeeklyTrainingStats
 
 # Phase 4 — Programmes d'entraînement
 from app.models.workout_plan import (
     WorkoutPlan, PlanAssignment, PlannedSession, PlannedExercise, ExerciseVideo
 )
+from app.models.progression_adjustment import ProgressionAdjustment
 
 # Phase 5 — Intégrations OAuth
 from app.models.integration import OAuthToken, BodyMeasurement
@@ -30,6 +33,7 @@ from app.models.blocked_email_domain import BlockedEmailDomain
 from app.models.user_feedback import UserFeedback
 from app.models.health_parameter import HealthParameter
 from app.models.health_log import HealthLog
+from app.models.health_log_daily import HealthLogDaily
 from app.models.health_sharing_setting import HealthSharingSetting
 
 # Phase 9 — Liens d'enrôlement coach
@@ -38,6 +42,9 @@ from app.models.coach_enrollment_token import CoachEnrollmentToken
 # Phase 9 — Vérification téléphone OTP
 from app.models.phone_verification_token import PhoneVerificationToken
 
+# Rotation des clés de chiffrement
+from app.models.key_rotation_checkpoint import KeyRotationCheckpoint
+
 # Phase 0 — Auth
 from app.models.user import User
 from app.models.api_key import ApiKey
@@ -50,7 +57,9 @@ from app.models.client_gym import ClientGym
 from app.models.coaching_request import CoachingRequest
 from app.models.booking import Booking
 from app.models.waitlist_entry import WaitlistEntry
+from app.models.waitlist_slot_event import WaitlistSlotEvent
 from app.models.push_token import PushToken
+from app.models.push_intent import PushIntent
 from app.models.sms_log import SmsLog
 
 # Phase 1 — Profils & Gyms
@@ -83,7 +92,9 @@ __all__ = [
     "CoachingRequest",
     "Booking",
     "WaitlistEntry",
+    "WaitlistSlotEvent",
     "PushToken",
+    "PushIntent",
     "SmsLog",
     # Phase 1
     "GymChain",
@@ -109,12 +120,15 @@ __all__ = [
     "MachineExercise",
     "PerformanceSession",
     "ExerciseSet",
+    "PersonalRecord",
+    "WeeklyTrainingStats",
     # Phase 4
     "WorkoutPlan",
     "PlanAssignment",
     "PlannedSession",
     "PlannedExercise",
     "ExerciseVideo",
+    "ProgressionAdjustment",
     # Phase 5
     "OAuthToken",
     "BodyMeasurement",
@@ -131,4 +145,6 @@ __all__ = [
     # Phase 9
     "CoachEnrollmentToken",
     "PhoneVerificationToken",
+    # Rotation des clés
+    "KeyRotationCheckpoint",
 ]
@@ -1,8 +1,8 @@
 """Modèle ExerciseSet — B3-05.
 
 Décision architecture (CODING_AGENT.md) :
-- is_pr = TRUE pour les personal records — pas de table dédiée
-- Index partiel `WHERE is_pr = TRUE` pour queryabilité rapide
+- is_pr = TRUE si le set battait le record de charge au moment de sa saisie
+- Records courants (charge, 1RM estimé, volume) : table dérivée personal_records
 """
 
 from __future__ import annotations
@@ -52,7 +52,7 @@ class ExerciseSet(Base):
     weight_kg: Mapped[Decimal | None] = mapped_column(Numeric(6, 2), nullable=True)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
 
-    # Personal Record flag (décision archi : pas de table dédiée)
+    # Personal Record flag (historique — records courants dans personal_records)
     is_pr: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
 
     # Relations
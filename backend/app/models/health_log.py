@@ -2,7 +2,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Numeric, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Numeric, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -10,11 +10,19 @@ from app.database import Base
 
 
 class HealthLog(Base):
+    """Mesure brute horodatée.
+
+    PostgreSQL (migration 019) : table partitionnée par mois sur logged_at,
+    clé primaire (id, logged_at) ; partitions créées à l'avance et purgées par
+    health_timeseries_service. Index BRIN sur logged_at (balayages par période),
+    B-tree (user_id, logged_at) pour les lectures par utilisateur.
+    """
+
     __tablename__ = "health_logs"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     parameter_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("health_parameters.id", ondelete="CASCADE"), nullable=False
@@ -30,3 +38,9 @@ class HealthLog(Base):
 
     user: Mapped["User"] = relationship("User", back_populates="health_logs")
     parameter: Mapped["HealthParameter"] = relationship("HealthParameter")
+
+    __table_args__ = (
+        Index("ix_health_logs_user_logged", "user_id", "logged_at", "id"),
+        Index("ix_health_logs_user_param_logged", "user_id", "parameter_id", "logged_at"),
+        Index("brin_health_logs_logged_at", "logged_at", postgresql_using="brin"),
+    )
@@ -0,0 +1,45 @@
+"""Modèle HealthLogDaily — agrégats journaliers des mesures de santé."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, Numeric, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class HealthLogDaily(Base):
+    """Rollup (utilisateur, paramètre, jour UTC) servi aux graphiques.
+
+    Table dérivée de health_logs : le jour touché par un ajout / une suppression
+    de log est recalculé dans la même transaction (health_repository) ; au-delà
+    de la rétention des logs bruts, la mesure est fusionnée dans la ligne.
+    Survit à la purge des logs bruts (health_timeseries_service.compact) :
+    l'historique long terme des graphiques ne dépend que de cette table.
+    Jour sans mesure → pas de ligne.
+    """
+
+    __tablename__ = "health_log_daily"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    parameter_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("health_parameters.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Moyenne = sum_value / count (agrégeable par semaine sans repasser par les logs)
+    sum_value: Mapped[Decimal] = mapped_column(Numeric(14, 3), nullable=False)
+    min_value: Mapped[Decimal] = mapped_column(Numeric(10, 3), nullable=False)
+    max_value: Mapped[Decimal] = mapped_column(Numeric(10, 3), nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now()
+    )
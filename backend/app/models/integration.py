@@ -7,7 +7,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, Numeric, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Numeric, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
@@ -45,6 +45,13 @@ class OAuthToken(Base):
 # ── B5-02 — Mesures corporelles ───────────────────────────────────────────────
 
 class BodyMeasurement(Base):
+    """Mesure de balance (Withings / saisie).
+
+    PostgreSQL (migration 019) : partitionnée par mois sur measured_at, comme
+    health_logs ; au-delà de HEALTH_RAW_RETENTION_DAYS, une mesure par jour est
+    conservée (health_timeseries_service.compact).
+    """
+
     __tablename__ = "body_measurements"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -61,3 +68,8 @@ class BodyMeasurement(Base):
     bone_kg: Mapped[Decimal | None] = mapped_column(Numeric(5, 2), nullable=True)
     water_pct: Mapped[Decimal | None] = mapped_column(Numeric(5, 2), nullable=True)
     source: Mapped[str] = mapped_column(String(20), nullable=False, default="manual")
+
+    __table_args__ = (
+        Index("ix_body_measurements_user_date", "user_id", "measured_at"),
+        Index("brin_body_measurements_measured_at", "measured_at", postgresql_using="brin"),
+    )
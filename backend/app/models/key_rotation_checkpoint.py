@@ -0,0 +1,43 @@
+"""Modèle KeyRotationCheckpoint — reprise de la rotation des clés Fernet."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, String, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+KEY_KINDS = ["field", "token"]
+
+
+class KeyRotationCheckpoint(Base):
+    """Avancement du re-chiffrement d'une table pour une clé primaire donnée.
+
+    Une ligne par (key_kind, table_name). last_id = curseur keyset (dernier id traité) :
+    un job interrompu reprend après ce curseur. Si key_fingerprint ne correspond plus
+    à la clé primaire courante, une nouvelle rotation a commencé → repart de zéro.
+    """
+
+    __tablename__ = "key_rotation_checkpoints"
+    __table_args__ = (
+        UniqueConstraint("key_kind", "table_name", name="uq_key_rotation_checkpoints_kind_table"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    key_kind: Mapped[str] = mapped_column(String(10), nullable=False)  # KEY_KINDS
+    table_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    key_fingerprint: Mapped[str] = mapped_column(
+        String(16), nullable=False, comment="SHA-256 tronqué de la clé primaire — jamais la clé"
+    )
+    last_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    rows_scanned: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    rows_rewritten: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now()
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,58 @@
+"""Modèle PersonalRecord — meilleures performances par (utilisateur, exercice)."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class PersonalRecord(Base):
+    """Records courants d'un utilisateur sur un exercice, tenus à jour à chaque
+    création / modification / suppression de séance (personal_record_service).
+
+    Table dérivée de exercise_sets : les *_set_id désignent le set détenteur du
+    record (sans FK — un set supprimé déclenche le recalcul de l'exercice).
+    """
+
+    __tablename__ = "personal_records"
+    __table_args__ = (
+        UniqueConstraint("user_id", "exercise_type_id", name="uq_personal_records_user_exercise"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    exercise_type_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("exercise_types.id", ondelete="CASCADE"), nullable=False
+    )
+
+    # Charge max
+    max_weight_kg: Mapped[Decimal | None] = mapped_column(Numeric(6, 2), nullable=True)
+    max_weight_reps: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    max_weight_set_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    max_weight_session_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    max_weight_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # 1RM estimé (Epley)
+    best_e1rm_kg: Mapped[Decimal | None] = mapped_column(Numeric(7, 2), nullable=True)
+    best_e1rm_set_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+
+    # Volume max d'un set (charge × reps)
+    max_volume_kg: Mapped[Decimal | None] = mapped_column(Numeric(10, 2), nullable=True)
+    max_volume_set_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now()
+    )
+
+    @property
+    def set_ids(self) -> set[uuid.UUID]:
+        return {self.max_weight_set_id, self.best_e1rm_set_id, self.max_volume_set_id} - {None}
@@ -0,0 +1,48 @@
+"""Modèle ProgressionAdjustment — journal des ajustements automatiques de charge (B4-08)."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, ForeignKey, Index, Numeric, String, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+ADJUSTMENT_TRIGGERS = ["session", "nightly", "manual"]
+
+
+class ProgressionAdjustment(Base):
+    """Un ajustement de target_weight_kg décidé par le moteur de progression.
+
+    Sert aussi de point de départ : un exercice planifié n'est réévalué que sur
+    des séances postérieures à son dernier ajustement.
+    """
+
+    __tablename__ = "progression_adjustments"
+    __table_args__ = (
+        Index("ix_progression_adjustments_planned", "planned_exercise_id", "created_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    planned_exercise_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("planned_exercises.id", ondelete="CASCADE"), nullable=False
+    )
+    # Client dont les séances ont déclenché l'ajustement
+    client_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    exercise_type_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("exercise_types.id", ondelete="CASCADE"), nullable=False
+    )
+    previous_weight_kg: Mapped[Decimal | None] = mapped_column(Numeric(6, 2), nullable=True)
+    new_weight_kg: Mapped[Decimal] = mapped_column(Numeric(6, 2), nullable=False)
+    # Séance la plus récente prise en compte
+    last_session_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    trigger: Mapped[str] = mapped_column(String(20), nullable=False, default="session")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now()
+    )
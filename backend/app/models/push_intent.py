@@ -0,0 +1,52 @@
+"""Modèle PushIntent — file des notifications push à envoyer (B2-17)."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+PUSH_INTENT_STATUSES = ["pending", "sent", "no_token", "failed"]
+
+
+class PushIntent(Base):
+    """Intention de notification : clés i18n + paramètres, rendue à l'envoi.
+
+    Écrite dans la transaction métier (notification_service.send_push), envoyée par
+    le worker push.dispatch : le texte est rendu dans la locale du destinataire au
+    moment de l'envoi, une fois par (locale, clés, paramètres) et par lot.
+    """
+
+    __tablename__ = "push_intents"
+    __table_args__ = (
+        Index("ix_push_intents_due", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    title_key: Mapped[str] = mapped_column(String(100), nullable=False)
+    body_key: Mapped[str] = mapped_column(String(100), nullable=False)
+    params: Mapped[dict] = mapped_column(
+        JSONB, nullable=False, default=dict, comment="Variables d'interpolation i18n"
+    )
+    data: Mapped[dict] = mapped_column(
+        JSONB, nullable=False, default=dict, comment="Payload data FCM (deep link app)"
+    )
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default="pending",
+        comment="pending | sent | no_token | failed"
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+        comment="Prochain essai (status=pending) — NULL = dès que possible"
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now()
+    )
@@ -3,7 +3,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -11,18 +11,32 @@ from app.database import Base
 
 SMS_STATUSES = ["pending", "sent", "failed"]
 
+_HAS_DEDUP_KEY = text("dedup_key IS NOT NULL")
+
 
 class SmsLog(Base):
-    """Journal d'envoi de SMS (Twilio ou autre provider).
+    """Journal d'envoi de SMS (Twilio ou autre provider) — sert aussi d'outbox.
+
+    Les lignes sont écrites en `pending` dans la transaction métier, puis envoyées
+    par le worker sms.outbox (sms_outbox_service.drain) : retry avec backoff
+    exponentiel via attempts / next_attempt_at, `failed` une fois les essais épuisés.
+    dedup_key : une seule ligne par clé (ex. une annulation = un SMS), garanti par
+    l'index unique partiel uq_sms_logs_dedup_key, cible du ON CONFLICT de
+    sms_log_repository.enqueue_bulk.
 
     recipient_phone masqué dans les logs (stocké en clair pour audit coach).
     """
 
     __tablename__ = "sms_logs"
+    __table_args__ = (
+        Index("ix_sms_logs_due", "status", "next_attempt_at"),
+        Index("uq_sms_logs_dedup_key", "dedup_key", unique=True, postgresql_where=_HAS_DEDUP_KEY),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    coach_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="RESTRICT"), nullable=False
+    coach_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="RESTRICT"), nullable=True,
+        comment="NULL pour les SMS système (OTP de vérification)"
     )
     client_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True
@@ -51,11 +65,20 @@ class SmsLog(Base):
     sent_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+        comment="Prochain essai (status=pending) — NULL = dès que possible"
+    )
+    dedup_key: Mapped[str | None] = mapped_column(
+        String(128), nullable=True,
+        comment="Clé d'idempotence (ex: booking_cancel:<id>)"
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=func.now()
     )
 
-    coach: Mapped["User"] = relationship("User", foreign_keys=[coach_id])  # type: ignore[name-defined]
+    coach: Mapped["User | None"] = relationship("User", foreign_keys=[coach_id])  # type: ignore[name-defined]
     client: Mapped["User | None"] = relationship("User", foreign_keys=[client_id])  # type: ignore[name-defined]
     template: Mapped["CancellationMessageTemplate | None"] = relationship(  # type: ignore[name-defined]
         "CancellationMessageTemplate"
@@ -4,6 +4,9 @@ Modèle User — compte utilisateur commun à tous les rôles.
 Champs PII chiffrés via EncryptedString (FIELD_ENCRYPTION_KEY) :
   first_name, last_name, email, phone, google_sub
 
+email, phone et google_sub sont en mode lazy : déchiffrés au premier accès
+seulement (rarement sérialisés — inutile de les payer sur les listes).
+
 Colonnes de lookup/recherche stockées en clair (non-PII) :
   email_hash   → SHA-256(lower(email)) — lookup exact O(1)
   search_token → unaccent+lower(prénom + nom) — recherche fulltext GIN pg_trgm
@@ -15,7 +18,7 @@ from sqlalchemy import Boolean, DateTime, Index, Integer, SmallInteger, String,
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
-from app.core.encrypted_type import EncryptedString
+from app.core.encrypted_type import EncryptedString, lazy_decrypted
 from app.core.encryption import hash_for_lookup, normalize_for_search
 from app.database import Base
 
@@ -42,14 +45,20 @@ class User(Base):
     # -----------------------------------------------------------------------
     first_name: Mapped[str] = mapped_column(EncryptedString(150), nullable=False)
     last_name: Mapped[str] = mapped_column(EncryptedString(150), nullable=False)
-    email: Mapped[str] = mapped_column(EncryptedString(255), nullable=False)
-    phone: Mapped[str | None] = mapped_column(
-        EncryptedString(20), nullable=True
+    _email: Mapped[str] = mapped_column(
+        "email", EncryptedString(255, lazy=True), nullable=False
+    )
+    _phone: Mapped[str | None] = mapped_column(
+        "phone", EncryptedString(20, lazy=True), nullable=True
     )  # E.164 : +33612345678
-    google_sub: Mapped[str | None] = mapped_column(
-        EncryptedString(255), nullable=True
+    _google_sub: Mapped[str | None] = mapped_column(
+        "google_sub", EncryptedString(255, lazy=True), nullable=True
     )  # identifiant Google OAuth2
 
+    email = lazy_decrypted("_email")
+    phone = lazy_decrypted("_phone")
+    google_sub = lazy_decrypted("_google_sub")
+
     # -----------------------------------------------------------------------
     # Colonnes de lookup/recherche — stockées en clair, non-PII
     # -----------------------------------------------------------------------
@@ -141,7 +150,7 @@ class User(Base):
     # Validators — synchronisation automatique des colonnes de lookup
     # -----------------------------------------------------------------------
 
-    @validates("email")
+    @validates("_email")
     def _sync_email_hash(self, key: str, value: str) -> str:
         """
         Synchronise email_hash à chaque modification de email.
@@ -166,7 +175,7 @@ class User(Base):
             self.search_token = normalize_for_search(f"{current_first} {value}")
         return value
 
-    @validates("phone")
+    @validates("_phone")
     def _sync_phone_hash(self, key: str, value: str | None) -> str | None:
         """Synchronise phone_hash à chaque modification de phone."""
         if value:
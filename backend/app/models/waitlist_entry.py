@@ -3,20 +3,32 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 
 WAITLIST_STATUSES = ["waiting", "notified", "confirmed", "expired", "cancelled"]
+# Entrées qui occupent une position dans la file
+WAITLIST_ACTIVE_STATUSES = ("waiting", "notified")
+# Prédicat littéral de uq_waitlist_active_client (inférence du ON CONFLICT)
+WAITLIST_ACTIVE_WHERE = text("status IN ('waiting', 'notified')")
+_WAITING = text("status = 'waiting'")
+_NOTIFIED = text("status = 'notified'")
 
 
 class WaitlistEntry(Base):
     """Entrée dans la liste d'attente d'un créneau.
 
-    Quand une place se libère, le 1er en statut 'waiting' passe à 'notified'
-    et a 30 minutes pour confirmer (expires_at = now + 30min).
+    Quand une place se libère (événement waitlist_slot_events), le 1er en
+    statut 'waiting' passe à 'notified' et a 30 minutes pour confirmer
+    (expires_at = now + 30min) ; sans confirmation, il passe 'expired' et la
+    place revient au suivant (worker waitlist.promote).
+
+    Un client n'a qu'une entrée active (waiting / notified) par créneau :
+    index unique partiel uq_waitlist_active_client, cible du ON CONFLICT de
+    waitlist_repository.add_entry.
     """
 
     __tablename__ = "waitlist_entries"
@@ -59,3 +71,22 @@ class WaitlistEntry(Base):
     booking: Mapped["Booking | None"] = relationship("Booking", back_populates="waitlist_entries")  # type: ignore[name-defined]
     coach: Mapped["User"] = relationship("User", foreign_keys=[coach_id])  # type: ignore[name-defined]
     client: Mapped["User"] = relationship("User", foreign_keys=[client_id])  # type: ignore[name-defined]
+
+    __table_args__ = (
+        Index("ix_waitlist_coach_slot", "coach_id", "slot_datetime"),
+        Index("ix_waitlist_client_id", "client_id"),
+        Index(
+            "uq_waitlist_active_client", "coach_id", "slot_datetime", "client_id",
+            unique=True, postgresql_where=WAITLIST_ACTIVE_WHERE,
+        ),
+        # Têtes de file en attente (get_first_waiting, promote_waiting), par position
+        Index(
+            "ix_waitlist_first_waiting", "coach_id", "slot_datetime", "position",
+            postgresql_where=_WAITING,
+        ),
+        # Expiration des fenêtres (worker waitlist.promote) et amorçage de la roue
+        Index(
+            "ix_waitlist_notified_expiry", "expires_at",
+            postgresql_where=_NOTIFIED,
+        ),
+    )
@@ -0,0 +1,40 @@
+"""Modèle WaitlistSlotEvent — places libérées à proposer à la liste d'attente."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, String, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+SLOT_EVENT_REASONS = ["booking_cancelled", "left"]
+
+
+class WaitlistSlotEvent(Base):
+    """Événement « place libérée » sur un créneau (coach, slot_datetime).
+
+    Écrit dans la transaction qui libère la place (annulation de réservation,
+    départ d'un client notifié), consommé puis supprimé par le worker
+    waitlist.promote, qui notifie le suivant de la file. Une ligne = une place.
+    Les fenêtres expirées sont traitées par le worker lui-même, sans événement.
+    """
+
+    __tablename__ = "waitlist_slot_events"
+    __table_args__ = (
+        Index("ix_waitlist_slot_events_created", "created_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    coach_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    slot_datetime: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    reason: Mapped[str] = mapped_column(
+        String(30), nullable=False,
+        comment="booking_cancelled | left"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now()
+    )
@@ -0,0 +1,51 @@
+"""Modèle WeeklyTrainingStats — agrégats d'entraînement par (utilisateur, semaine)."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, Numeric, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class WeeklyTrainingStats(Base):
+    """Rollup hebdomadaire (semaine ISO, lundi 00:00 UTC) servi au tableau de bord.
+
+    Table dérivée de performance_sessions / exercise_sets : les semaines touchées
+    par une création / modification / suppression de séance sont recalculées
+    dans la même transaction (training_rollup_service). Semaine sans séance → pas de ligne.
+    """
+
+    __tablename__ = "weekly_training_stats"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    week_start: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    sessions_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_duration_min: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Ressenti moyen = feeling_sum / feeling_count (séances notées uniquement)
+    feeling_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    feeling_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_sets: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_volume_kg: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False, default=0)
+    # {muscle_group: nb de sets (muscle primaire)}
+    muscle_sets: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now()
+    )
+
+    @property
+    def avg_feeling(self) -> float | None:
+        return self.feeling_sum / self.feeling_count if self.feeling_count else None
+
+    @property
+    def muscles_worked(self) -> list[str]:
+        return sorted(m for m, n in self.muscle_sets.items() if n)
@@ -6,11 +6,14 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import case, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.booking import Booking, BOOKING_STATUSES
 
+# Statuts qui occupent une place sur un créneau
+ACTIVE_STATUSES = ["pending_coach_validation", "confirmed"]
+
 
 async def create(
     db: AsyncSession,
@@ -48,6 +51,96 @@ async def update_status(
     return booking
 
 
+async def get_states_for_update(
+    db: AsyncSession, booking_ids: list[uuid.UUID]
+) -> dict[uuid.UUID, tuple[uuid.UUID, str, uuid.UUID | None]]:
+    """{id: (coach_id, status, package_id)} pour un lot — une requête, lignes verrouillées."""
+    q = (
+        select(Booking.id, Booking.coach_id, Booking.status, Booking.package_id)
+        .where(Booking.id.in_(booking_ids))
+        .with_for_update()
+    )
+    return {row.id: (row.coach_id, row.status, row.package_id) for row in (await db.execute(q)).all()}
+
+
+async def bulk_update_status(
+    db: AsyncSession,
+    booking_ids: list[uuid.UUID],
+    from_status: str,
+    status: str,
+    **extra: Any,
+) -> list[tuple[uuid.UUID, uuid.UUID | None]]:
+    """Un UPDATE pour tout le lot (seulement les lignes encore en from_status).
+
+    Retourne (id, package_id) des lignes effectivement modifiées.
+    """
+    if not booking_ids:
+        return []
+    stmt = (
+        update(Booking)
+        .where(Booking.id.in_(booking_ids), Booking.status == from_status)
+        .values(status=status, updated_at=datetime.now(timezone.utc), **extra)
+        .returning(Booking.id, Booking.package_id)
+        .execution_options(synchronize_session="fetch")
+    )
+    return [tuple(row) for row in (await db.execute(stmt)).all()]
+
+
+async def get_owned_for_update(
+    db: AsyncSession, coach_id: uuid.UUID, booking_ids: list[uuid.UUID]
+) -> list[Booking]:
+    """Réservations du lot appartenant au coach — une requête, lignes verrouillées.
+
+    Les IDs inconnus ou d'un autre coach sont simplement absents du résultat.
+    """
+    if not booking_ids:
+        return []
+    q = (
+        select(Booking)
+        .where(Booking.id.in_(booking_ids), Booking.coach_id == coach_id)
+        .with_for_update()
+    )
+    return list((await db.execute(q)).scalars().all())
+
+
+async def bulk_coach_cancel(
+    db: AsyncSession,
+    coach_id: uuid.UUID,
+    booking_ids: list[uuid.UUID],
+    *,
+    late_before: datetime,
+    reason: str | None = None,
+) -> list[tuple[uuid.UUID, str]]:
+    """Annulation coach d'un lot en un seul UPDATE, statut calculé en SQL.
+
+    - pending_coach_validation → rejected
+    - confirmed, séance avant late_before → cancelled_by_coach_late
+    - confirmed sinon → cancelled_by_coach
+
+    Retourne (id, nouveau statut) des lignes effectivement modifiées.
+    """
+    if not booking_ids:
+        return []
+    now = datetime.now(timezone.utc)
+    new_status = case(
+        (Booking.status == "pending_coach_validation", "rejected"),
+        (Booking.scheduled_at < late_before, "cancelled_by_coach_late"),
+        else_="cancelled_by_coach",
+    )
+    stmt = (
+        update(Booking)
+        .where(
+            Booking.id.in_(booking_ids),
+            Booking.coach_id == coach_id,
+            Booking.status.in_(ACTIVE_STATUSES),
+        )
+        .values(status=new_status, coach_cancel_reason=reason, cancelled_at=now, updated_at=now)
+        .returning(Booking.id, Booking.status)
+        .execution_options(synchronize_session="fetch")
+    )
+    return [tuple(row) for row in (await db.execute(stmt)).all()]
+
+
 async def get_by_client(
     db: AsyncSession,
     client_id: uuid.UUID,
@@ -111,12 +204,34 @@ async def get_by_slot(
         Booking.scheduled_at == slot_datetime,
     )
     if active_only:
-        active_statuses = ["pending_coach_validation", "confirmed"]
-        q = q.where(Booking.status.in_(active_statuses))
+        q = q.where(Booking.status.in_(ACTIVE_STATUSES))
     result = await db.execute(q)
     return list(result.scalars().all())
 
 
+async def get_busy_intervals(
+    db: AsyncSession,
+    coach_id: uuid.UUID,
+    start: datetime,
+    end: datetime,
+) -> list[tuple[datetime, int]]:
+    """(scheduled_at, duration_min) des réservations actives qui débutent dans [start, end).
+
+    Une seule requête pour toute la fenêtre — colonnes seules, pas d'objets ORM.
+    """
+    q = (
+        select(Booking.scheduled_at, Booking.duration_min)
+        .where(
+            Booking.coach_id == coach_id,
+            Booking.status.in_(ACTIVE_STATUSES),
+            Booking.scheduled_at >= start,
+            Booking.scheduled_at < end,
+        )
+        .order_by(Booking.scheduled_at)
+    )
+    return [(row.scheduled_at, row.duration_min) for row in (await db.execute(q)).all()]
+
+
 async def count_pending_for_client(
     db: AsyncSession, client_id: uuid.UUID, coach_id: uuid.UUID
 ) -> int:
@@ -157,3 +272,30 @@ async def get_expired_pending(
     )
     result = await db.execute(q)
     return list(result.scalars().all())
+
+
+async def auto_reject_pending_batch(
+    db: AsyncSession, cutoff: datetime, limit: int
+) -> list[tuple[uuid.UUID, uuid.UUID, datetime]]:
+    """UPDATE … RETURNING : passe en auto_rejected au plus `limit` pending créés avant cutoff.
+
+    SKIP LOCKED : les lignes en cours de confirmation par un coach sont ignorées
+    (reprises au passage suivant). Retourne (id, coach_id, scheduled_at).
+    """
+    now = datetime.now(timezone.utc)
+    ids = (
+        select(Booking.id)
+        .where(Booking.status == "pending_coach_validation", Booking.created_at < cutoff)
+        .order_by(Booking.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Booking)
+        .where(Booking.id.in_(ids), Booking.status == "pending_coach_validation")
+        .values(status="auto_rejected", cancelled_at=now, updated_at=now)
+        .returning(Booking.id, Booking.coach_id, Booking.scheduled_at)
+        .execution_options(synchronize_session=False)
+    )
+    return [tuple(row) for row in (await db.execute(stmt)).all()]
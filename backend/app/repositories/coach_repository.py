@@ -15,6 +15,7 @@ from app.models.coach_certification import CoachCertification
 from app.models.coach_gym import CoachGym
 from app.models.coach_pricing import CoachPricing
 from app.models.coach_availability import CoachAvailability
+from app.models.coach_work_schedule import CoachWorkSchedule
 from app.models.cancellation_policy import CancellationPolicy
 from app.models.coaching_relation import CoachingRelation
 from app.models.coach_client_note import CoachClientNote
@@ -194,6 +195,25 @@ async def delete_availability(db: AsyncSession, obj: CoachAvailability) -> None:
     await db.flush()
 
 
+async def get_weekly_rules(
+    db: AsyncSession, coach_user_id: uuid.UUID
+) -> tuple[list[CoachAvailability], list[CoachWorkSchedule]]:
+    """Règles hebdomadaires actives + emploi du temps d'un coach (par users.id)."""
+    avail_q = (
+        select(CoachAvailability)
+        .join(CoachProfile, CoachAvailability.coach_id == CoachProfile.id)
+        .where(CoachProfile.user_id == coach_user_id, CoachAvailability.active.is_(True))
+    )
+    schedule_q = (
+        select(CoachWorkSchedule)
+        .join(CoachProfile, CoachWorkSchedule.coach_id == CoachProfile.id)
+        .where(CoachProfile.user_id == coach_user_id)
+    )
+    rules = list((await db.execute(avail_q)).scalars().all())
+    schedules = list((await db.execute(schedule_q)).scalars().all())
+    return rules, schedules
+
+
 # ── Politique d'annulation ────────────────────────────────────────────────────
 
 async def upsert_cancellation_policy(
@@ -241,6 +261,18 @@ async def get_relation(
     return result.scalar_one_or_none()
 
 
+async def get_active_client_ids(
+    db: AsyncSession, coach_id: uuid.UUID, client_ids: list[uuid.UUID]
+) -> set[uuid.UUID]:
+    """Parmi `client_ids`, ceux que le coach suit activement (relation active)."""
+    q = select(CoachingRelation.client_id).where(
+        CoachingRelation.coach_id == coach_id,
+        CoachingRelation.client_id.in_(client_ids),
+        CoachingRelation.status == "active",
+    )
+    return set((await db.execute(q)).scalars().all())
+
+
 async def upsert_relation(
     db: AsyncSession, coach_id: uuid.UUID, client_id: uuid.UUID, status: str
 ) -> CoachingRelation:
@@ -1,16 +1,21 @@
-"""Repository — HealthParameter, HealthLog, HealthSharingSetting."""
+"""Repository — HealthParameter, HealthLog (+ rollup journalier), HealthSharingSetting."""
 from __future__ import annotations
 
 import uuid
-from datetime import datetime
+from datetime import date, datetime, time, timedelta, timezone
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import Date, and_, cast, delete, exists, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
+from app.core import advisory_lock
 from app.models.health_log import HealthLog
+from app.models.health_log_daily import HealthLogDaily
 from app.models.health_parameter import HealthParameter
 from app.models.health_sharing_setting import HealthSharingSetting
+from app.repositories.performance_repository import bucket_start
 
 
 # ---------------------------------------------------------------------------
@@ -101,7 +106,13 @@ async def create_log(
     note: Optional[str],
     source: str,
     logged_at: datetime,
+    purged_until: date | None = None,
 ) -> HealthLog:
+    """Enregistre un log et met à jour le rollup de son jour.
+
+    Jour ≤ purged_until (logs bruts possiblement purgés) : valeur fusionnée
+    dans la ligne existante ; sinon jour recalculé depuis les logs bruts.
+    """
     log = HealthLog(
         user_id=user_id,
         parameter_id=parameter_id,
@@ -112,9 +123,12 @@ async def create_log(
     )
     db.add(log)
     await db.flush()
+    if purged_until is not None and _utc_date(logged_at) <= purged_until:
+        await merge_daily(db, log)
+    else:
+        await refresh_daily(db, user_id, parameter_id, [logged_at])
     # Reload with relationships eagerly via selectin
     q = select(HealthLog).where(HealthLog.id == log.id)
-    from sqlalchemy.orm import selectinload
     q = q.options(selectinload(HealthLog.parameter))
     result = (await db.execute(q)).scalar_one()
     return result
@@ -143,6 +157,110 @@ async def get_logs(
     return list((await db.execute(q)).scalars().all())
 
 
+def _shared_with(coach_id: uuid.UUID, user_col=HealthLog.user_id, parameter_col=HealthLog.parameter_id):
+    """Anti-jointure : aucun réglage shared=False pour (propriétaire, coach, paramètre).
+
+    Absence de ligne = partagé (modèle opt-out), comme is_parameter_shared.
+    """
+    return ~exists().where(
+        HealthSharingSetting.user_id == user_col,
+        HealthSharingSetting.coach_id == coach_id,
+        HealthSharingSetting.parameter_id == parameter_col,
+        HealthSharingSetting.shared.is_(False),
+    )
+
+
+def _log_filters(
+    user_id: uuid.UUID,
+    coach_id: uuid.UUID,
+    parameter_id: Optional[uuid.UUID],
+    from_date: Optional[datetime],
+    to_date: Optional[datetime],
+) -> list:
+    filters = [HealthLog.user_id == user_id, _shared_with(coach_id)]
+    if parameter_id:
+        filters.append(HealthLog.parameter_id == parameter_id)
+    if from_date:
+        filters.append(HealthLog.logged_at >= from_date)
+    if to_date:
+        filters.append(HealthLog.logged_at <= to_date)
+    return filters
+
+
+async def get_shared_logs(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    coach_id: uuid.UUID,
+    *,
+    limit: int,
+    parameter_id: Optional[uuid.UUID] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    after: Optional[tuple[datetime, uuid.UUID]] = None,
+) -> list[HealthLog]:
+    """Logs de l'utilisateur visibles par le coach, du plus récent au plus ancien.
+
+    Partage appliqué en SQL (anti-jointure) ; pagination keyset sur
+    (logged_at, id) : `after` = dernier (logged_at, id) de la page précédente.
+    """
+    q = (
+        select(HealthLog)
+        .where(*_log_filters(user_id, coach_id, parameter_id, from_date, to_date))
+        .options(selectinload(HealthLog.parameter))
+        .order_by(HealthLog.logged_at.desc(), HealthLog.id.desc())
+        .limit(limit)
+    )
+    if after is not None:
+        logged_at, log_id = after
+        q = q.where(or_(
+            HealthLog.logged_at < logged_at,
+            and_(HealthLog.logged_at == logged_at, HealthLog.id < log_id),
+        ))
+    return list((await db.execute(q)).scalars().all())
+
+
+async def get_shared_log_buckets(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    coach_id: uuid.UUID,
+    *,
+    bucket: str,
+    parameter_id: Optional[uuid.UUID] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+) -> list:
+    """Agrégats par (paramètre, période) visibles par le coach — une requête sur
+    le rollup journalier (jamais sur les logs bruts) ; bornes arrondies au jour UTC.
+
+    Returns des lignes (parameter_id, bucket, count, min_value, max_value, avg_value),
+    triées par paramètre puis chronologiquement.
+    """
+    bucket_col = bucket_start(bucket, HealthLogDaily.day)
+    q = (
+        select(
+            HealthLogDaily.parameter_id,
+            bucket_col.label("bucket"),
+            func.sum(HealthLogDaily.count).label("count"),
+            func.min(HealthLogDaily.min_value).label("min_value"),
+            func.max(HealthLogDaily.max_value).label("max_value"),
+            (func.sum(HealthLogDaily.sum_value) / func.sum(HealthLogDaily.count)).label("avg_value"),
+        )
+        .where(
+            HealthLogDaily.user_id == user_id,
+            _shared_with(coach_id, HealthLogDaily.user_id, HealthLogDaily.parameter_id),
+        )
+        .group_by(HealthLogDaily.parameter_id, bucket_col)
+        .order_by(HealthLogDaily.parameter_id, bucket_col)
+    )
+    if parameter_id:
+        q = q.where(HealthLogDaily.parameter_id == parameter_id)
+    if from_date:
+        q = q.where(HealthLogDaily.day >= _utc_date(from_date))
+    if to_date:
+        q = q.where(HealthLogDaily.day <= _utc_date(to_date))
+    return list((await db.execute(q)).all())
+
+
 async def get_log_by_id(
     db: AsyncSession,
     log_id: uuid.UUID,
@@ -161,15 +279,140 @@ async def delete_log(
     db: AsyncSession,
     log_id: uuid.UUID,
     user_id: uuid.UUID,
+    purged_until: date | None = None,
 ) -> bool:
+    """Supprime un log ; rollup de son jour mis à jour comme dans create_log."""
     log = await get_log_by_id(db, log_id, user_id)
     if log is None:
         return False
     await db.delete(log)
     await db.flush()
+    if purged_until is not None and _utc_date(log.logged_at) <= purged_until:
+        await unmerge_daily(db, log)
+    else:
+        await refresh_daily(db, user_id, log.parameter_id, [log.logged_at])
     return True
 
 
+# ---------------------------------------------------------------------------
+# HealthLogDaily (rollup)
+# ---------------------------------------------------------------------------
+
+def _utc_date(moment: datetime) -> date:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.date()
+
+
+async def refresh_daily(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    parameter_id: uuid.UUID,
+    moments: list[datetime],
+) -> None:
+    """Recalcule les jours (UTC) de ces mesures depuis les logs bruts.
+
+    DELETE des lignes de la plage puis INSERT … SELECT des agrégats : un jour
+    vidé disparaît du rollup. Verrou par (utilisateur, paramètre) contre deux
+    recalculs concurrents du même jour.
+    """
+    days = {_utc_date(m) for m in moments}
+    if not days:
+        return
+    await advisory_lock.xact_lock(
+        db, advisory_lock.lock_key("health_log_daily", user_id, parameter_id)
+    )
+    first, last = min(days), max(days)
+    await db.execute(
+        delete(HealthLogDaily).where(
+            HealthLogDaily.user_id == user_id,
+            HealthLogDaily.parameter_id == parameter_id,
+            HealthLogDaily.day.between(first, last),
+        )
+    )
+    day = cast(func.timezone("UTC", HealthLog.logged_at), Date)
+    aggregates = (
+        select(
+            HealthLog.user_id,
+            HealthLog.parameter_id,
+            day,
+            func.count(),
+            func.sum(HealthLog.value),
+            func.min(HealthLog.value),
+            func.max(HealthLog.value),
+            func.now(),
+        )
+        .where(
+            HealthLog.user_id == user_id,
+            HealthLog.parameter_id == parameter_id,
+            HealthLog.logged_at >= datetime.combine(first, time.min, tzinfo=timezone.utc),
+            HealthLog.logged_at < datetime.combine(last + timedelta(days=1), time.min, tzinfo=timezone.utc),
+        )
+        .group_by(HealthLog.user_id, HealthLog.parameter_id, day)
+    )
+    await db.execute(
+        insert(HealthLogDaily).from_select(
+            ["user_id", "parameter_id", "day", "count", "sum_value",
+             "min_value", "max_value", "updated_at"],
+            aggregates,
+        )
+    )
+
+
+def _daily_key(log: HealthLog):
+    return (
+        HealthLogDaily.user_id == log.user_id,
+        HealthLogDaily.parameter_id == log.parameter_id,
+        HealthLogDaily.day == _utc_date(log.logged_at),
+    )
+
+
+async def merge_daily(db: AsyncSession, log: HealthLog) -> None:
+    """Ajoute `log` au rollup de son jour sans relire les logs bruts — un upsert.
+
+    Pour les jours antérieurs à la rétention : un recalcul effacerait les
+    mesures déjà purgées.
+    """
+    stmt = pg_insert(HealthLogDaily).values(
+        user_id=log.user_id,
+        parameter_id=log.parameter_id,
+        day=_utc_date(log.logged_at),
+        count=1,
+        sum_value=log.value,
+        min_value=log.value,
+        max_value=log.value,
+        updated_at=func.now(),
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id", "parameter_id", "day"],
+        set_={
+            "count": HealthLogDaily.count + 1,
+            "sum_value": HealthLogDaily.sum_value + stmt.excluded.sum_value,
+            "min_value": func.least(HealthLogDaily.min_value, stmt.excluded.min_value),
+            "max_value": func.greatest(HealthLogDaily.max_value, stmt.excluded.max_value),
+            "updated_at": func.now(),
+        },
+    ))
+
+
+async def unmerge_daily(db: AsyncSession, log: HealthLog) -> None:
+    """Retire `log` du rollup de son jour sans relire les logs bruts.
+
+    min / max conservés (non recalculables sans les mesures purgées) ; ligne
+    supprimée quand le compte tombe à 0.
+    """
+    await db.execute(
+        update(HealthLogDaily)
+        .where(*_daily_key(log))
+        .values(
+            count=HealthLogDaily.count - 1,
+            sum_value=HealthLogDaily.sum_value - log.value,
+            updated_at=func.now(),
+        )
+    )
+    await db.execute(delete(HealthLogDaily).where(*_daily_key(log), HealthLogDaily.count <= 0))
+
+
 # ---------------------------------------------------------------------------
 # HealthSharingSetting
 # ---------------------------------------------------------------------------
@@ -0,0 +1,93 @@
+"""Repository — partitions mensuelles et purge des séries santé (health_logs, body_measurements).
+
+Partitions (migration 019) nommées <table>_pAAAAMM, bornes [1er du mois,
+1er du mois suivant) en UTC, plus <table>_default.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.health_log import HealthLog
+from app.models.integration import BodyMeasurement
+
+# table partitionnée → colonne de partitionnement
+TIMESERIES_TABLES = {"health_logs": "logged_at", "body_measurements": "measured_at"}
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def partition_month(table: str, name: str) -> date | None:
+    """Mois couvert par la partition `name` (None pour la partition DEFAULT)."""
+    suffix = name.removeprefix(f"{table}_p")
+    if suffix == name or len(suffix) != 6 or not suffix.isdigit():
+        return None
+    return date(int(suffix[:4]), int(suffix[4:]), 1)
+
+
+async def list_partitions(db: AsyncSession, table: str) -> list[str]:
+    q = text(
+        """
+        SELECT child.relname
+        FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE parent.relname = :table
+        ORDER BY child.relname
+        """
+    )
+    return list((await db.execute(q, {"table": table})).scalars().all())
+
+
+async def create_partition(db: AsyncSession, table: str, month: date, next_month: date) -> None:
+    """Partition [month, next_month). `table` et bornes validés par l'appelant (DDL inliné)."""
+    await db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+        f"TO ('{next_month.isoformat()} 00:00:00+00')"
+    ))
+
+
+async def drop_partition(db: AsyncSession, table: str, name: str) -> None:
+    await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+    await db.execute(text(f"DROP TABLE {name}"))
+
+
+async def delete_health_logs_before(db: AsyncSession, cutoff: datetime, limit: int) -> int:
+    """Supprime au plus `limit` logs bruts antérieurs à cutoff (le rollup n'est pas touché)."""
+    ids = select(HealthLog.id).where(HealthLog.logged_at < cutoff).limit(limit)
+    result = await db.execute(delete(HealthLog).where(HealthLog.id.in_(ids)))
+    return result.rowcount
+
+
+async def oldest_body_measurement(db: AsyncSession) -> datetime | None:
+    return (await db.execute(select(func.min(BodyMeasurement.measured_at)))).scalar_one()
+
+
+async def compact_body_measurements(db: AsyncSession, since: datetime, until: datetime) -> int:
+    """Sur [since, until), ne garde que la dernière mesure de chaque (utilisateur, jour UTC).
+
+    Un DELETE borné à la fenêtre (partitions élaguées) ; `since` à minuit UTC
+    pour qu'un jour ne soit jamais partagé entre deux fenêtres.
+    """
+    ranked = (
+        select(
+            BodyMeasurement.id,
+            func.row_number().over(
+                partition_by=(
+                    BodyMeasurement.user_id,
+                    func.date_trunc("day", func.timezone("UTC", BodyMeasurement.measured_at)),
+                ),
+                order_by=(BodyMeasurement.measured_at.desc(), BodyMeasurement.id.desc()),
+            ).label("rank"),
+        )
+        .where(BodyMeasurement.measured_at >= since, BodyMeasurement.measured_at < until)
+        .subquery()
+    )
+    extra = select(ranked.c.id).where(ranked.c.rank > 1)
+    result = await db.execute(delete(BodyMeasurement).where(BodyMeasurement.id.in_(extra)))
+    return result.rowcount
@@ -0,0 +1,131 @@
+"""
+Repository rotation des clés Fernet — accès brut aux colonnes chiffrées.
+
+Les tables sont lues via des TableClause légères (sa.table/sa.column) sans
+TypeDecorator : on manipule les tokens Fernet tels quels, sans déchiffrement
+automatique ni re-chiffrement à l'écriture.
+"""
+import uuid
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.key_rotation_checkpoint import KeyRotationCheckpoint
+
+
+def _raw_table(table_name: str, columns: list[str]) -> sa.TableClause:
+    return sa.table(
+        table_name,
+        sa.column("id", UUID(as_uuid=True)),
+        *(sa.column(name, sa.String) for name in columns),
+    )
+
+
+async def fetch_batch(
+    db: AsyncSession,
+    table_name: str,
+    columns: list[str],
+    *,
+    after_id: uuid.UUID | None,
+    limit: int,
+) -> list[sa.Row]:
+    """Pagination keyset sur id : lignes (id, *columns) strictement après after_id."""
+    t = _raw_table(table_name, columns)
+    q = select(t.c.id, *(t.c[name] for name in columns)).order_by(t.c.id).limit(limit)
+    if after_id is not None:
+        q = q.where(t.c.id > after_id)
+    return list((await db.execute(q)).all())
+
+
+async def bulk_rewrite(
+    db: AsyncSession,
+    table_name: str,
+    column: str,
+    rewrites: list[tuple[uuid.UUID, str, str]],
+) -> int:
+    """
+    UPDATE groupé (executemany) de `column` : [(id, ancien_token, nouveau_token), …].
+    La clause `column = ancien_token` protège les écritures concurrentes : une valeur
+    modifiée entre la lecture et l'écriture est laissée telle quelle (déjà sous la
+    nouvelle clé). Returns le nombre de lignes effectivement réécrites.
+    """
+    if not rewrites:
+        return 0
+    t = _raw_table(table_name, [column])
+    stmt = (
+        sa.update(t)
+        .where(t.c.id == sa.bindparam("_id"))
+        .where(t.c[column] == sa.bindparam("_old"))
+        .values({column: sa.bindparam("_new")})
+    )
+    result = await db.execute(
+        stmt, [{"_id": row_id, "_old": old, "_new": new} for row_id, old, new in rewrites]
+    )
+    return result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(rewrites)
+
+
+async def get_checkpoint(
+    db: AsyncSession, key_kind: str, table_name: str
+) -> KeyRotationCheckpoint | None:
+    result = await db.execute(
+        select(KeyRotationCheckpoint).where(
+            KeyRotationCheckpoint.key_kind == key_kind,
+            KeyRotationCheckpoint.table_name == table_name,
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def list_checkpoints(db: AsyncSession) -> list[KeyRotationCheckpoint]:
+    result = await db.execute(
+        select(KeyRotationCheckpoint).order_by(
+            KeyRotationCheckpoint.key_kind, KeyRotationCheckpoint.table_name
+        )
+    )
+    return list(result.scalars().all())
+
+
+async def start_checkpoint(
+    db: AsyncSession,
+    key_kind: str,
+    table_name: str,
+    key_fingerprint: str,
+    existing: KeyRotationCheckpoint | None = None,
+) -> KeyRotationCheckpoint:
+    """Crée le checkpoint, ou le remet à zéro pour une nouvelle clé primaire."""
+    checkpoint = existing or KeyRotationCheckpoint(
+        id=uuid.uuid4(), key_kind=key_kind, table_name=table_name
+    )
+    checkpoint.key_fingerprint = key_fingerprint
+    checkpoint.last_id = None
+    checkpoint.rows_scanned = 0
+    checkpoint.rows_rewritten = 0
+    checkpoint.started_at = datetime.now(timezone.utc)
+    checkpoint.completed_at = None
+    if existing is None:
+        db.add(checkpoint)
+    await db.flush()
+    return checkpoint
+
+
+async def advance_checkpoint(
+    db: AsyncSession,
+    checkpoint: KeyRotationCheckpoint,
+    *,
+    last_id: uuid.UUID | None,
+    scanned: int,
+    rewritten: int,
+    completed: bool = False,
+) -> KeyRotationCheckpoint:
+    if last_id is not None:
+        checkpoint.last_id = last_id
+    checkpoint.rows_scanned += scanned
+    checkpoint.rows_rewritten += rewritten
+    checkpoint.updated_at = datetime.now(timezone.utc)
+    if completed:
+        checkpoint.completed_at = datetime.now(timezone.utc)
+    await db.flush()
+    return checkpoint
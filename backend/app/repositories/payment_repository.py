@@ -6,7 +6,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import case, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.package import Package
@@ -70,12 +70,64 @@ async def deduct_session(db: AsyncSession, package: Package) -> Package:
     return package
 
 
+async def deduct_sessions_bulk(db: AsyncSession, counts: dict[uuid.UUID, int]) -> int:
+    """Décompte agrégé : {package_id: nb de séances} en un seul UPDATE.
+
+    Même règle que deduct_session : jamais sous zéro, statut 'exhausted' à 0,
+    forfaits déjà à 0 ignorés. Retourne le nombre de forfaits modifiés.
+    """
+    if not counts:
+        return 0
+    n = case(counts, value=Package.id)
+    remaining = Package.sessions_remaining - n
+    stmt = (
+        update(Package)
+        .where(Package.id.in_(list(counts)), Package.sessions_remaining > 0)
+        .values(
+            sessions_remaining=case((remaining < 0, 0), else_=remaining),
+            status=case((remaining <= 0, "exhausted"), else_=Package.status),
+            updated_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+    return (await db.execute(stmt)).rowcount
+
+
 async def mark_alert_sent(db: AsyncSession, package: Package) -> Package:
     package.alert_sent = True
     await db.flush()
     return package
 
 
+async def claim_low_package_alerts_batch(
+    db: AsyncSession, threshold: int, limit: int
+) -> list[tuple[uuid.UUID, uuid.UUID, str, int]]:
+    """UPDATE … RETURNING : marque alert_sent sur au plus `limit` forfaits actifs
+    à `threshold` séances ou moins. L'alerte est « réclamée » avant l'envoi :
+    un forfait n'est jamais notifié deux fois, même avec plusieurs workers.
+    Retourne (id, client_id, name, sessions_remaining).
+    """
+    ids = (
+        select(Package.id)
+        .where(
+            Package.status == "active",
+            Package.alert_sent.is_(False),
+            Package.sessions_remaining <= threshold,
+        )
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Package)
+        .where(Package.id.in_(ids), Package.alert_sent.is_(False))
+        .values(alert_sent=True, updated_at=datetime.now(timezone.utc))
+        .returning(Package.id, Package.client_id, Package.name, Package.sessions_remaining)
+        .execution_options(synchronize_session=False)
+    )
+    return [tuple(row) for row in (await db.execute(stmt)).all()]
+
+
 async def get_history(
     db: AsyncSession,
     client_id: uuid.UUID,
@@ -3,29 +3,22 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime, timedelta, timezone
-from decimal import Decimal
+from datetime import date, datetime, timezone
 
-from sqlalchemy import func, select
+from sqlalchemy import Date, DateTime, case, cast, delete, func, insert, literal_column, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.models.coaching_relation import CoachingRelation
 from app.models.exercise_set import ExerciseSet
 from app.models.exercise_type import ExerciseType, ExerciseTypeMuscle
 from app.models.performance_session import PerformanceSession
+from app.models.personal_record import PersonalRecord
+from app.models.weekly_training_stats import WeeklyTrainingStats
 
 
 # ── Sessions ──────────────────────────────────────────────────────────────────
 
-async def create_session(
-    db: AsyncSession, user_id: uuid.UUID, **kwargs
-) -> PerformanceSession:
-    session = PerformanceSession(id=uuid.uuid4(), user_id=user_id, **kwargs)
-    db.add(session)
-    await db.flush()
-    return session
-
-
 async def get_by_id(
     db: AsyncSession, session_id: uuid.UUID
 ) -> PerformanceSession | None:
@@ -90,31 +83,43 @@ async def get_history(
 
 # ── Exercise Sets ──────────────────────────────────────────────────────────────
 
-async def add_set(
-    db: AsyncSession, session_id: uuid.UUID, **kwargs
-) -> ExerciseSet:
-    ex_set = ExerciseSet(id=uuid.uuid4(), session_id=session_id, **kwargs)
-    db.add(ex_set)
-    await db.flush()
-    return ex_set
+# Lignes par INSERT multi-lignes : ~10 colonnes/ligne, sous la limite de
+# 32 767 paramètres par requête d'asyncpg.
+_INSERT_CHUNK_ROWS = 1000
+
+
+def _rows(objs: list) -> list[dict]:
+    return [{c.key: getattr(o, c.key) for c in o.__table__.columns} for o in objs]
+
+
+async def _insert_values(db: AsyncSession, model, objs: list) -> None:
+    rows = _rows(objs)
+    for start in range(0, len(rows), _INSERT_CHUNK_ROWS):
+        await db.execute(insert(model).values(rows[start:start + _INSERT_CHUNK_ROWS]))
+
+
+async def insert_sessions(db: AsyncSession, sessions: list[PerformanceSession]) -> None:
+    """Séances et leurs sets déjà construits (ids, created_at, is_pr renseignés).
+
+    Un INSERT multi-lignes par table (par tranches) ; les objets restent
+    détachés de la session ORM et servent tels quels de réponse — aucun rechargement.
+    """
+    await _insert_values(db, PerformanceSession, sessions)
+    await _insert_values(db, ExerciseSet, [s for session in sessions for s in session.exercise_sets])
 
 
 async def replace_sets(
     db: AsyncSession,
     session: PerformanceSession,
-    sets_data: list[dict],
+    new_sets: list[ExerciseSet],
 ) -> list[ExerciseSet]:
     """Remplace tous les sets d'une session (DELETE + INSERT)."""
     # Supprimer les anciens sets
     for ex_set in list(session.exercise_sets):
         await db.delete(ex_set)
     await db.flush()
-    # Insérer les nouveaux
-    new_sets = []
-    for data in sets_data:
-        ex_set = ExerciseSet(id=uuid.uuid4(), session_id=session.id, **data)
-        db.add(ex_set)
-        new_sets.append(ex_set)
+    # Insérer les nouveaux — la collection chargée reflète les nouveaux sets
+    session.exercise_sets = new_sets
     await db.flush()
     return new_sets
 
@@ -157,99 +162,293 @@ async def get_progression_stats(
     ]
 
 
-async def get_week_stats(
+PROGRESSION_BUCKETS = ("day", "week", "month")
+
+
+def bucket_start(bucket: str, column):
+    """Début de période UTC (timestamptz) : date_trunc sur l'heure UTC de `column`.
+
+    `bucket` validé contre PROGRESSION_BUCKETS puis inliné : une même expression
+    littérale dans SELECT et GROUP BY (un paramètre lié n'y serait pas reconnu).
+    Colonne DATE (rollups) : déjà un jour UTC, aucune conversion de fuseau avant
+    la troncature.
+    """
+    if bucket not in PROGRESSION_BUCKETS:
+        raise ValueError(f"bucket invalide : {bucket}")
+    utc = cast(column, DateTime()) if isinstance(column.type, Date) else func.timezone("UTC", column)
+    return func.timezone(
+        "UTC", func.date_trunc(literal_column(f"'{bucket}'"), utc), type_=DateTime(timezone=True)
+    )
+
+
+async def get_progression_series(
     db: AsyncSession,
     user_id: uuid.UUID,
-    week_start: datetime,
-) -> dict:
-    """Stats pour une semaine donnée."""
-    week_end = week_start + timedelta(days=7)
-    q = (
-        select(PerformanceSession)
+    exercise_type_id: uuid.UUID,
+    *,
+    bucket: str,
+    window: int,
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+) -> list:
+    """Série par période, tout en SQL : charge max, volume, nb de sets, 1RM estimé
+    (Epley) et moyennes mobiles sur `window` périodes (fonctions de fenêtre).
+
+    Returns des lignes (bucket, max_weight_kg, total_volume_kg, sets_count,
+    best_e1rm_kg, e1rm_moving_avg, volume_moving_avg), ordre chronologique.
+    """
+    e1rm = case(
+        (ExerciseSet.reps == 1, ExerciseSet.weight_kg),
+        (ExerciseSet.reps > 1, ExerciseSet.weight_kg * (1 + ExerciseSet.reps / 30.0)),
+        else_=None,
+    )
+    bucket_col = bucket_start(bucket, PerformanceSession.session_date)
+    per_bucket = (
+        select(
+            bucket_col.label("bucket"),
+            func.max(ExerciseSet.weight_kg).label("max_weight_kg"),
+            func.sum(ExerciseSet.weight_kg * ExerciseSet.reps).label("total_volume_kg"),
+            func.count(ExerciseSet.id).label("sets_count"),
+            func.max(e1rm).label("best_e1rm_kg"),
+        )
+        .join(ExerciseSet, ExerciseSet.session_id == PerformanceSession.id)
         .where(
             PerformanceSession.user_id == user_id,
-            PerformanceSession.session_date >= week_start,
-            PerformanceSession.session_date < week_end,
-        )
-        .options(
-            selectinload(PerformanceSession.exercise_sets).selectinload(
-                ExerciseSet.exercise_type
-            ).selectinload(ExerciseType.muscles)
+            ExerciseSet.exercise_type_id == exercise_type_id,
         )
+        .group_by(bucket_col)
     )
-    sessions = (await db.execute(q)).scalars().all()
-
-    total_duration = sum(s.duration_min or 0 for s in sessions)
-    feelings = [s.feeling for s in sessions if s.feeling]
-    avg_feeling = sum(feelings) / len(feelings) if feelings else None
-    total_sets = sum(len(s.exercise_sets) for s in sessions)
-
-    # Groupes musculaires travaillés (uniques)
-    muscles_worked: set[str] = set()
-    for session in sessions:
-        for ex_set in session.exercise_sets:
-            for muscle in ex_set.exercise_type.muscles:
-                if muscle.role == "primary":
-                    muscles_worked.add(muscle.muscle_group)
-
-    return {
-        "week_start": week_start,
-        "sessions_count": len(sessions),
-        "total_duration_min": total_duration,
-        "avg_feeling": avg_feeling,
-        "total_sets": total_sets,
-        "muscles_worked": sorted(muscles_worked),
-    }
+    if from_date is not None:
+        per_bucket = per_bucket.where(PerformanceSession.session_date >= from_date)
+    if to_date is not None:
+        per_bucket = per_bucket.where(PerformanceSession.session_date < to_date)
+    per_bucket = per_bucket.subquery()
+
+    frame = {"order_by": per_bucket.c.bucket, "rows": (-(window - 1), 0)}
+    q = select(
+        per_bucket,
+        func.avg(per_bucket.c.best_e1rm_kg).over(**frame).label("e1rm_moving_avg"),
+        func.avg(per_bucket.c.total_volume_kg).over(**frame).label("volume_moving_avg"),
+    ).order_by(per_bucket.c.bucket)
+    return list((await db.execute(q)).all())
+
+
+async def get_training_version(db: AsyncSession, user_id: uuid.UUID) -> tuple[int, datetime | None]:
+    """Empreinte des données d'entraînement de l'utilisateur (ETag).
+
+    Toute écriture de séance réécrit la ligne de rollup de sa semaine
+    (updated_at) ou la supprime (nombre de lignes) : l'empreinte change.
+    """
+    q = select(func.count(), func.max(WeeklyTrainingStats.updated_at)).where(
+        WeeklyTrainingStats.user_id == user_id
+    )
+    count, last = (await db.execute(q)).one()
+    return count, last
 
 
 async def get_personal_records(
     db: AsyncSession, user_id: uuid.UUID
 ) -> list[dict]:
-    """Retourne les PRs (is_pr=TRUE) de l'utilisateur."""
+    """Record de charge courant par exercice (table personal_records)."""
     q = (
-        select(
-            ExerciseSet,
-            PerformanceSession.session_date,
-            ExerciseType.name_key,
-        )
-        .join(PerformanceSession, ExerciseSet.session_id == PerformanceSession.id)
-        .join(ExerciseType, ExerciseSet.exercise_type_id == ExerciseType.id)
+        select(PersonalRecord, ExerciseType.name_key)
+        .join(ExerciseType, PersonalRecord.exercise_type_id == ExerciseType.id)
         .where(
-            PerformanceSession.user_id == user_id,
-            ExerciseSet.is_pr.is_(True),
+            PersonalRecord.user_id == user_id,
+            PersonalRecord.max_weight_kg.isnot(None),
         )
-        .order_by(PerformanceSession.session_date.desc())
+        .order_by(PersonalRecord.max_weight_at.desc())
     )
     rows = (await db.execute(q)).all()
     return [
         {
-            "id": r.ExerciseSet.id,
-            "exercise_type_id": r.ExerciseSet.exercise_type_id,
+            "id": r.PersonalRecord.max_weight_set_id,
+            "exercise_type_id": r.PersonalRecord.exercise_type_id,
             "exercise_name_key": r.name_key,
-            "weight_kg": r.ExerciseSet.weight_kg,
-            "reps": r.ExerciseSet.reps,
-            "achieved_at": r.session_date,
-            "session_id": r.ExerciseSet.session_id,
+            "weight_kg": r.PersonalRecord.max_weight_kg,
+            "reps": r.PersonalRecord.max_weight_reps,
+            "achieved_at": r.PersonalRecord.max_weight_at,
+            "session_id": r.PersonalRecord.max_weight_session_id,
+            "best_e1rm_kg": r.PersonalRecord.best_e1rm_kg,
+            "max_volume_kg": r.PersonalRecord.max_volume_kg,
         }
         for r in rows
     ]
 
 
-# ── Détection PR ──────────────────────────────────────────────────────────────
+# ── Records personnels (table dérivée) ────────────────────────────────────────
+
+async def get_records(
+    db: AsyncSession, user_id: uuid.UUID, exercise_type_ids: set[uuid.UUID]
+) -> dict[uuid.UUID, PersonalRecord]:
+    """Records courants de l'utilisateur pour ces exercices — une requête."""
+    if not exercise_type_ids:
+        return {}
+    q = select(PersonalRecord).where(
+        PersonalRecord.user_id == user_id,
+        PersonalRecord.exercise_type_id.in_(exercise_type_ids),
+    )
+    return {r.exercise_type_id: r for r in (await db.execute(q)).scalars().all()}
+
+
+async def get_record_history(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    exercise_type_ids: set[uuid.UUID],
+    *,
+    exclude_set_ids: set[uuid.UUID] = frozenset(),
+) -> list:
+    """Sets chargés de ces exercices, ordre chronologique — pour recalculer un record.
 
-async def get_max_weight_for_exercise(
-    db: AsyncSession, user_id: uuid.UUID, exercise_type_id: uuid.UUID
-) -> Decimal | None:
-    """Retourne le poids max historique pour un exercice donné."""
+    Retourne des lignes (id, session_id, exercise_type_id, reps, weight_kg, session_date).
+    """
     q = (
-        select(func.max(ExerciseSet.weight_kg))
+        select(
+            ExerciseSet.id,
+            ExerciseSet.session_id,
+            ExerciseSet.exercise_type_id,
+            ExerciseSet.reps,
+            ExerciseSet.weight_kg,
+            PerformanceSession.session_date,
+        )
         .join(PerformanceSession, ExerciseSet.session_id == PerformanceSession.id)
         .where(
             PerformanceSession.user_id == user_id,
-            ExerciseSet.exercise_type_id == exercise_type_id,
+            ExerciseSet.exercise_type_id.in_(exercise_type_ids),
+            ExerciseSet.weight_kg.isnot(None),
         )
+        .order_by(PerformanceSession.session_date, ExerciseSet.set_order)
     )
-    return (await db.execute(q)).scalar_one_or_none()
+    if exclude_set_ids:
+        q = q.where(ExerciseSet.id.notin_(exclude_set_ids))
+    return list((await db.execute(q)).all())
+
+
+async def move_record_dates(
+    db: AsyncSession, session_id: uuid.UUID, session_date: datetime
+) -> None:
+    """Date de séance modifiée → date des records de charge détenus par cette séance."""
+    await db.execute(
+        update(PersonalRecord)
+        .where(PersonalRecord.max_weight_session_id == session_id)
+        .values(max_weight_at=session_date)
+        .execution_options(synchronize_session="fetch")
+    )
+
+
+# ── Rollups hebdomadaires (table dérivée) ─────────────────────────────────────
+
+async def get_training_aggregates(
+    db: AsyncSession,
+    user_ids: list[uuid.UUID],
+    start: datetime,
+    end: datetime,
+) -> tuple[list, list]:
+    """Agrégats SQL des séances dans [start, end) — deux requêtes, aucun objet chargé.
+
+    Returns (séances, muscles) :
+      séances  (user_id, session_date, duration_min, feeling, sets_count, volume_kg)
+      muscles  (user_id, session_date, muscle_group, sets_count) — muscles primaires
+    """
+    in_range = (
+        PerformanceSession.user_id.in_(user_ids),
+        PerformanceSession.session_date >= start,
+        PerformanceSession.session_date < end,
+    )
+    sessions_q = (
+        select(
+            PerformanceSession.user_id,
+            PerformanceSession.session_date,
+            PerformanceSession.duration_min,
+            PerformanceSession.feeling,
+            func.count(ExerciseSet.id).label("sets_count"),
+            func.sum(ExerciseSet.weight_kg * ExerciseSet.reps).label("volume_kg"),
+        )
+        .outerjoin(ExerciseSet, ExerciseSet.session_id == PerformanceSession.id)
+        .where(*in_range)
+        .group_by(
+            PerformanceSession.id,
+            PerformanceSession.user_id,
+            PerformanceSession.session_date,
+            PerformanceSession.duration_min,
+            PerformanceSession.feeling,
+        )
+    )
+    muscles_q = (
+        select(
+            PerformanceSession.user_id,
+            PerformanceSession.session_date,
+            ExerciseTypeMuscle.muscle_group,
+            func.count(ExerciseSet.id).label("sets_count"),
+        )
+        .join(ExerciseSet, ExerciseSet.session_id == PerformanceSession.id)
+        .join(
+            ExerciseTypeMuscle,
+            (ExerciseTypeMuscle.exercise_type_id == ExerciseSet.exercise_type_id)
+            & (ExerciseTypeMuscle.role == "primary"),
+        )
+        .where(*in_range)
+        .group_by(
+            PerformanceSession.user_id,
+            PerformanceSession.session_date,
+            ExerciseTypeMuscle.muscle_group,
+        )
+    )
+    sessions = list((await db.execute(sessions_q)).all())
+    muscles = list((await db.execute(muscles_q)).all())
+    return sessions, muscles
+
+
+async def replace_week_rollups(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    weeks: set[date],
+    rollups: list[WeeklyTrainingStats],
+) -> None:
+    """Remplace les rollups de ces semaines (DELETE + INSERT multi-lignes).
+
+    `rollups` : objets non persistés, calculés par training_rollup_service.
+    """
+    await db.execute(
+        delete(WeeklyTrainingStats).where(
+            WeeklyTrainingStats.user_id == user_id,
+            WeeklyTrainingStats.week_start.in_(weeks),
+        )
+    )
+    if rollups:
+        now = datetime.now(timezone.utc)
+        rows = [{**row, "updated_at": now} for row in _rows(rollups)]
+        await db.execute(insert(WeeklyTrainingStats).values(rows))
+
+
+async def get_week_rollups(
+    db: AsyncSession, user_ids: list[uuid.UUID], week_start: date
+) -> dict[uuid.UUID, WeeklyTrainingStats]:
+    q = select(WeeklyTrainingStats).where(
+        WeeklyTrainingStats.user_id.in_(user_ids),
+        WeeklyTrainingStats.week_start == week_start,
+    )
+    return {r.user_id: r for r in (await db.execute(q)).scalars().all()}
+
+
+async def get_clients_week_rollups(
+    db: AsyncSession, coach_id: uuid.UUID, week_start: date, statuses: list[str]
+) -> list[tuple[uuid.UUID, WeeklyTrainingStats | None]]:
+    """Rollup de la semaine pour chaque client du coach — une requête (LEFT JOIN)."""
+    q = (
+        select(CoachingRelation.client_id, WeeklyTrainingStats)
+        .outerjoin(
+            WeeklyTrainingStats,
+            (WeeklyTrainingStats.user_id == CoachingRelation.client_id)
+            & (WeeklyTrainingStats.week_start == week_start),
+        )
+        .where(
+            CoachingRelation.coach_id == coach_id,
+            CoachingRelation.status.in_(statuses),
+        )
+        .order_by(CoachingRelation.created_at)
+    )
+    return [(r[0], r[1]) for r in (await db.execute(q)).all()]
 
 
 # ── Exercise Types ────────────────────────────────────────────────────────────
@@ -298,3 +497,28 @@ async def get_exercise_by_id(
         .options(selectinload(ExerciseType.muscles))
     )
     return (await db.execute(q)).scalar_one_or_none()
+
+
+async def get_active_catalogue(db: AsyncSession) -> list:
+    """Exercices actifs et leurs muscles primaires — une ligne par (exercice, muscle).
+
+    Colonnes seules (pas d'entités) : id, name_key, category, difficulty,
+    muscle_group (NULL si aucun muscle primaire).
+    """
+    q = (
+        select(
+            ExerciseType.id,
+            ExerciseType.name_key,
+            ExerciseType.category,
+            ExerciseType.difficulty,
+            ExerciseTypeMuscle.muscle_group,
+        )
+        .outerjoin(
+            ExerciseTypeMuscle,
+            (ExerciseTypeMuscle.exercise_type_id == ExerciseType.id)
+            & (ExerciseTypeMuscle.role == "primary"),
+        )
+        .where(ExerciseType.active.is_(True))
+        .order_by(ExerciseType.name_key)
+    )
+    return list((await db.execute(q)).all())
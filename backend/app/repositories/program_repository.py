@@ -3,17 +3,23 @@
 from __future__ import annotations
 
 import uuid
-from datetime import date
+from datetime import date, datetime, timezone
+from decimal import Decimal
 
-from sqlalchemy import func, select
+from sqlalchemy import case, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 
+from app.models.progression_adjustment import ProgressionAdjustment
 from app.models.workout_plan import (
     PlanAssignment, PlannedExercise, PlannedSession, WorkoutPlan
 )
 
 
+def _rows(objs: list) -> list[dict]:
+    return [{c.key: getattr(o, c.key) for c in o.__table__.columns} for o in objs]
+
+
 # ── Plans ──────────────────────────────────────────────────────────────────────
 
 async def create_plan(
@@ -30,6 +36,91 @@ async def create_plan(
     return plan
 
 
+async def insert_plan(db: AsyncSession, plan: WorkoutPlan) -> WorkoutPlan:
+    """Plan entièrement construit en mémoire (sessions, exercices, ids, created_at).
+
+    Un INSERT multi-lignes par table ; l'objet reste détaché de la session ORM.
+    """
+    sessions = plan.planned_sessions
+    exercises = [pe for ps in sessions for pe in ps.planned_exercises]
+    await db.execute(insert(WorkoutPlan).values(_rows([plan])))
+    if sessions:
+        await db.execute(insert(PlannedSession).values(_rows(sessions)))
+    if exercises:
+        await db.execute(insert(PlannedExercise).values(_rows(exercises)))
+    return plan
+
+
+# Lignes par INSERT multi-lignes : ~10 colonnes/ligne, sous la limite de
+# 32 767 paramètres par requête d'asyncpg.
+_INSERT_CHUNK_ROWS = 1000
+
+
+async def _insert_values(db: AsyncSession, model, objs: list) -> None:
+    rows = _rows(objs)
+    for start in range(0, len(rows), _INSERT_CHUNK_ROWS):
+        await db.execute(insert(model).values(rows[start:start + _INSERT_CHUNK_ROWS]))
+
+
+async def clone_plan(
+    db: AsyncSession, source: WorkoutPlan, count: int, **overrides
+) -> list[WorkoutPlan]:
+    """Copie profonde de `source` (chargé avec sessions + exercices) en `count` exemplaires.
+
+    Copies construites en mémoire (`overrides` appliqués aux plans) puis un
+    INSERT multi-lignes par table (par tranches) ; les objets restent détachés
+    de la session ORM et servent tels quels de réponse — aucun rechargement.
+    """
+    now = datetime.now(timezone.utc)
+    plans: list[WorkoutPlan] = []
+    for _ in range(count):
+        plan = WorkoutPlan(
+            id=uuid.uuid4(),
+            name=source.name,
+            description=source.description,
+            duration_weeks=source.duration_weeks,
+            level=source.level,
+            goal=source.goal,
+            created_by_id=source.created_by_id,
+            is_ai_generated=source.is_ai_generated,
+            archived=False,
+            created_at=now,
+        )
+        for key, value in overrides.items():
+            setattr(plan, key, value)
+        sessions = []
+        for ps in source.planned_sessions:
+            new_ps = PlannedSession(
+                id=uuid.uuid4(), plan_id=plan.id,
+                **{k: getattr(ps, k) for k in (
+                    "day_of_week", "session_name", "estimated_duration_min",
+                    "rest_seconds", "order_index",
+                )},
+            )
+            exercises = []
+            for pe in ps.planned_exercises:
+                new_pe = PlannedExercise(
+                    id=uuid.uuid4(), planned_session_id=new_ps.id,
+                    **{k: getattr(pe, k) for k in (
+                        "exercise_type_id", "target_sets", "target_reps",
+                        "target_weight_kg", "order_index",
+                    )},
+                )
+                exercises.append(new_pe)
+            new_ps.planned_exercises = exercises
+            sessions.append(new_ps)
+        plan.planned_sessions = sessions
+        plans.append(plan)
+
+    sessions = [ps for plan in plans for ps in plan.planned_sessions]
+    await _insert_values(db, WorkoutPlan, plans)
+    await _insert_values(db, PlannedSession, sessions)
+    await _insert_values(
+        db, PlannedExercise, [pe for ps in sessions for pe in ps.planned_exercises]
+    )
+    return plans
+
+
 async def get_plan_by_id(db: AsyncSession, plan_id: uuid.UUID) -> WorkoutPlan | None:
     q = (
         select(WorkoutPlan)
@@ -111,6 +202,42 @@ async def assign_plan(
     return assignment
 
 
+async def assign_plans(
+    db: AsyncSession,
+    plans_by_client: dict[uuid.UUID, WorkoutPlan],
+    start_date: date,
+    mode: str,
+    assigned_by_id: uuid.UUID | None,
+) -> list[PlanAssignment]:
+    """Un plan par client — un UPDATE (mode replace_ai) + un INSERT multi-lignes.
+
+    Les assignations retournées portent leur plan (workout_plan) sans rechargement.
+    """
+    if not plans_by_client:
+        return []
+    if mode == "replace_ai":
+        await db.execute(
+            update(PlanAssignment)
+            .where(
+                PlanAssignment.client_id.in_(plans_by_client),
+                PlanAssignment.active.is_(True),
+            )
+            .values(active=False)
+            .execution_options(synchronize_session=False)
+        )
+    now = datetime.now(timezone.utc)
+    assignments = []
+    for client_id, plan in plans_by_client.items():
+        assignment = PlanAssignment(
+            id=uuid.uuid4(), plan_id=plan.id, client_id=client_id, start_date=start_date,
+            mode=mode, assigned_by_id=assigned_by_id, active=True, created_at=now,
+        )
+        assignment.workout_plan = plan
+        assignments.append(assignment)
+    await db.execute(insert(PlanAssignment).values(_rows(assignments)))
+    return assignments
+
+
 async def get_assignment_by_id(
     db: AsyncSession, assignment_id: uuid.UUID
 ) -> PlanAssignment | None:
@@ -169,3 +296,145 @@ async def get_client_progress(
         "completed_sessions": completed,
         "completion_pct": pct,
     }
+
+
+# ── Moteur de progression (par lots) ─────────────────────────────────────────
+
+async def get_active_client_ids(
+    db: AsyncSession, *, after: uuid.UUID | None = None, limit: int = 500
+) -> list[uuid.UUID]:
+    """Clients ayant une assignation active, par id croissant (pagination keyset)."""
+    q = select(PlanAssignment.client_id).where(PlanAssignment.active.is_(True)).distinct()
+    if after is not None:
+        q = q.where(PlanAssignment.client_id > after)
+    q = q.order_by(PlanAssignment.client_id).limit(limit)
+    return list((await db.execute(q)).scalars().all())
+
+
+async def get_progression_candidates(
+    db: AsyncSession,
+    client_ids: list[uuid.UUID],
+    exercise_type_ids: set[uuid.UUID] | None = None,
+) -> list:
+    """Exercices planifiés du plan actif le plus récent de chaque client — une requête.
+
+    Returns des lignes (client_id, planned_exercise_id, exercise_type_id,
+    target_reps, target_weight_kg, last_adjusted_at).
+    """
+    latest = (
+        select(
+            PlanAssignment.client_id,
+            PlanAssignment.plan_id,
+            func.row_number().over(
+                partition_by=PlanAssignment.client_id,
+                order_by=PlanAssignment.created_at.desc(),
+            ).label("rn"),
+        )
+        .where(PlanAssignment.client_id.in_(client_ids), PlanAssignment.active.is_(True))
+        .subquery()
+    )
+    last_adjustment = (
+        select(
+            ProgressionAdjustment.planned_exercise_id,
+            func.max(ProgressionAdjustment.created_at).label("last_adjusted_at"),
+        )
+        .group_by(ProgressionAdjustment.planned_exercise_id)
+        .subquery()
+    )
+    q = (
+        select(
+            latest.c.client_id,
+            PlannedExercise.id.label("planned_exercise_id"),
+            PlannedExercise.exercise_type_id,
+            PlannedExercise.target_reps,
+            PlannedExercise.target_weight_kg,
+            last_adjustment.c.last_adjusted_at,
+        )
+        .join(PlannedSession, PlannedSession.plan_id == latest.c.plan_id)
+        .join(PlannedExercise, PlannedExercise.planned_session_id == PlannedSession.id)
+        .outerjoin(last_adjustment, last_adjustment.c.planned_exercise_id == PlannedExercise.id)
+        .where(latest.c.rn == 1)
+        .order_by(latest.c.client_id, PlannedSession.order_index, PlannedExercise.order_index)
+    )
+    if exercise_type_ids is not None:
+        q = q.where(PlannedExercise.exercise_type_id.in_(exercise_type_ids))
+    return list((await db.execute(q)).all())
+
+
+async def get_recent_exercise_sessions(
+    db: AsyncSession,
+    client_ids: list[uuid.UUID],
+    exercise_type_ids: set[uuid.UUID],
+    per_exercise: int,
+) -> list:
+    """Les `per_exercise` dernières séances de chaque (client, exercice) — une requête fenêtrée.
+
+    Returns des lignes (user_id, exercise_type_id, session_id, session_date, min_reps),
+    plus récente d'abord ; min_reps = reps du set le plus faible de la séance.
+    """
+    from app.models.exercise_set import ExerciseSet
+    from app.models.performance_session import PerformanceSession
+
+    per_session = (
+        select(
+            PerformanceSession.user_id,
+            ExerciseSet.exercise_type_id,
+            PerformanceSession.id.label("session_id"),
+            PerformanceSession.session_date,
+            func.min(func.coalesce(ExerciseSet.reps, 0)).label("min_reps"),
+            func.row_number().over(
+                partition_by=(PerformanceSession.user_id, ExerciseSet.exercise_type_id),
+                order_by=PerformanceSession.session_date.desc(),
+            ).label("rn"),
+        )
+        .join(ExerciseSet, ExerciseSet.session_id == PerformanceSession.id)
+        .where(
+            PerformanceSession.user_id.in_(client_ids),
+            ExerciseSet.exercise_type_id.in_(exercise_type_ids),
+        )
+        .group_by(
+            PerformanceSession.user_id,
+            ExerciseSet.exercise_type_id,
+            PerformanceSession.id,
+            PerformanceSession.session_date,
+        )
+        .subquery()
+    )
+    q = (
+        select(per_session)
+        .where(per_session.c.rn <= per_exercise)
+        .order_by(per_session.c.user_id, per_session.c.exercise_type_id, per_session.c.rn)
+    )
+    return list((await db.execute(q)).all())
+
+
+async def set_target_weights(db: AsyncSession, weights: dict[uuid.UUID, Decimal]) -> None:
+    """Nouveaux target_weight_kg — un seul UPDATE (CASE sur l'id)."""
+    if not weights:
+        return
+    await db.execute(
+        update(PlannedExercise)
+        .where(PlannedExercise.id.in_(weights))
+        .values(target_weight_kg=case(weights, value=PlannedExercise.id))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def add_adjustments(
+    db: AsyncSession, adjustments: list[ProgressionAdjustment]
+) -> list[ProgressionAdjustment]:
+    db.add_all(adjustments)
+    await db.flush()
+    return adjustments
+
+
+async def list_adjustments(
+    db: AsyncSession, client_id: uuid.UUID, *, limit: int = 50
+) -> list[ProgressionAdjustment]:
+    q = (
+        select(ProgressionAdjustment)
+        .where(ProgressionAdjustment.client_id == client_id)
+        .order_by(ProgressionAdjustment.created_at.desc())
+        .limit(limit)
+    )
+    return list((await db.execute(q)).scalars().all())
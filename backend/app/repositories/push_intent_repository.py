@@ -0,0 +1,68 @@
+"""Repository push_intents — file des notifications push."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.push_intent import PushIntent
+
+
+async def enqueue_bulk(db: AsyncSession, rows: list[dict[str, Any]]) -> int:
+    """Un INSERT multi-lignes (user_id, title_key, body_key, params, data)."""
+    if not rows:
+        return 0
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        insert(PushIntent),
+        [
+            {"params": {}, "data": {}, **row,
+             "id": uuid.uuid4(), "status": "pending", "attempts": 0, "created_at": now}
+            for row in rows
+        ],
+    )
+    return len(rows)
+
+
+async def claim_due_batch(
+    db: AsyncSession, limit: int, lease_seconds: float
+) -> list[PushIntent]:
+    """UPDATE … RETURNING : réserve au plus `limit` intentions pending arrivées à échéance.
+
+    Même bail que l'outbox SMS : attempts + 1, next_attempt_at repoussé de
+    `lease_seconds` — un worker mort laisse l'intention réessayable.
+    """
+    now = datetime.now(timezone.utc)
+    ids = (
+        select(PushIntent.id)
+        .where(
+            PushIntent.status == "pending",
+            or_(PushIntent.next_attempt_at.is_(None), PushIntent.next_attempt_at <= now),
+        )
+        .order_by(PushIntent.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(PushIntent)
+        .where(PushIntent.id.in_(ids), PushIntent.status == "pending")
+        .values(
+            attempts=PushIntent.attempts + 1,
+            next_attempt_at=now + timedelta(seconds=lease_seconds),
+        )
+        .returning(PushIntent)
+        # attempts à jour même si l'intention est déjà dans l'identity map de la session
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    return list((await db.execute(stmt)).scalars().all())
+
+
+async def record_outcomes(db: AsyncSession, outcomes: list[dict[str, Any]]) -> None:
+    """Statuts d'un lot — UPDATE par clé primaire en executemany (id, status, sent_at, next_attempt_at)."""
+    if outcomes:
+        await db.execute(update(PushIntent), outcomes)
@@ -1,6 +1,6 @@
 """Repository push_tokens."""
 import uuid
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.push_token import PushToken
 
@@ -32,3 +32,31 @@ async def deactivate_token(db, token_str: str) -> None:
     if obj:
         obj.active = False
         await db.flush()
+
+
+async def get_active_tokens_for_users(
+    db: AsyncSession, user_ids: list[uuid.UUID]
+) -> dict[uuid.UUID, list[str]]:
+    """{user_id: [token, …]} pour un lot d'utilisateurs — une seule requête."""
+    if not user_ids:
+        return {}
+    q = select(PushToken.user_id, PushToken.token).where(
+        PushToken.user_id.in_(set(user_ids)), PushToken.active.is_(True)
+    )
+    tokens: dict[uuid.UUID, list[str]] = {}
+    for user_id, token in (await db.execute(q)).all():
+        tokens.setdefault(user_id, []).append(token)
+    return tokens
+
+
+async def deactivate_tokens(db: AsyncSession, tokens: list[str]) -> int:
+    """Désactive en un UPDATE les tokens signalés morts par le provider."""
+    if not tokens:
+        return 0
+    stmt = (
+        update(PushToken)
+        .where(PushToken.token.in_(set(tokens)), PushToken.active.is_(True))
+        .values(active=False)
+        .execution_options(synchronize_session=False)
+    )
+    return (await db.execute(stmt)).rowcount
@@ -1,8 +1,9 @@
 """Repository sms_logs."""
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any
-from sqlalchemy import func, select
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.sms_log import SmsLog
 
@@ -22,6 +23,86 @@ async def create_log(db, coach_id, recipient_phone, message_body, *, client_id=N
     return obj
 
 
+async def enqueue_bulk(db: AsyncSession, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Met un lot de SMS en file (status=pending) — INSERT … ON CONFLICT DO NOTHING RETURNING.
+
+    Chaque dict porte les colonnes de SmsLog (coach_id, recipient_phone,
+    message_body, dedup_key…) ; id, status et created_at sont complétés ici.
+    Les lignes dont la dedup_key existe déjà — y compris écrite par une
+    transaction concurrente (index unique partiel) — ou est répétée dans le lot
+    sont ignorées. Retourne les lignes effectivement insérées.
+    """
+    now = datetime.now(timezone.utc)
+    batch_keys: set[str] = set()
+    fresh: list[dict[str, Any]] = []
+    for row in rows:
+        key = row.get("dedup_key")
+        if key:
+            if key in batch_keys:
+                continue
+            batch_keys.add(key)
+        fresh.append({
+            "coach_id": None, "client_id": None, "template_id": None, "dedup_key": None,
+            **row,
+            "id": uuid.uuid4(), "status": "pending", "attempts": 0, "created_at": now,
+        })
+    if not fresh:
+        return []
+    stmt = (
+        pg_insert(SmsLog)
+        .on_conflict_do_nothing(
+            index_elements=["dedup_key"], index_where=SmsLog.dedup_key.is_not(None)
+        )
+        .returning(SmsLog.id)
+    )
+    inserted = set((await db.execute(stmt, fresh)).scalars().all())
+    return [row for row in fresh if row["id"] in inserted]
+
+
+async def claim_due_batch(
+    db: AsyncSession, limit: int, lease_seconds: float
+) -> list[tuple[uuid.UUID, str, str, int]]:
+    """UPDATE … RETURNING : réserve au plus `limit` SMS pending arrivés à échéance.
+
+    La réservation repousse next_attempt_at de `lease_seconds` et incrémente
+    attempts : un worker qui meurt en plein envoi laisse la ligne réessayable
+    après le bail, et deux workers ne prennent jamais la même ligne.
+    Retourne (id, recipient_phone, message_body, attempts).
+    """
+    now = datetime.now(timezone.utc)
+    ids = (
+        select(SmsLog.id)
+        .where(
+            SmsLog.status == "pending",
+            or_(SmsLog.next_attempt_at.is_(None), SmsLog.next_attempt_at <= now),
+        )
+        .order_by(SmsLog.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(SmsLog)
+        .where(SmsLog.id.in_(ids), SmsLog.status == "pending")
+        .values(
+            attempts=SmsLog.attempts + 1,
+            next_attempt_at=now + timedelta(seconds=lease_seconds),
+        )
+        .returning(SmsLog.id, SmsLog.recipient_phone, SmsLog.message_body, SmsLog.attempts)
+        .execution_options(synchronize_session=False)
+    )
+    return [tuple(row) for row in (await db.execute(stmt)).all()]
+
+
+async def record_outcomes(db: AsyncSession, outcomes: list[dict[str, Any]]) -> None:
+    """Résultats d'envoi d'un lot — un UPDATE par clé primaire en executemany.
+
+    Chaque dict : id, status, provider_message_id, error_message, sent_at, next_attempt_at.
+    """
+    if outcomes:
+        await db.execute(update(SmsLog), outcomes)
+
+
 async def update_status(db, log: SmsLog, status: str, *, provider_message_id=None, error_message=None) -> SmsLog:
     log.status = status
     if provider_message_id:
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta, timezone
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.encrypted_type import decrypt_loaded
 from app.core.encryption import hash_for_lookup
 from app.models.email_verification_token import EmailVerificationToken
 from app.models.password_reset_token import PasswordResetToken
@@ -25,6 +26,25 @@ class UserRepository:
         result = await db.execute(select(User).where(User.id == user_id))
         return result.scalar_one_or_none()
 
+    async def get_by_ids(
+        self, db: AsyncSession, user_ids: list[uuid.UUID], *decrypt: str
+    ) -> dict[uuid.UUID, User]:
+        """Lot d'utilisateurs en une requête ; `decrypt` = attributs lazy déchiffrés en une passe."""
+        if not user_ids:
+            return {}
+        result = await db.execute(select(User).where(User.id.in_(set(user_ids))))
+        users = list(result.scalars())
+        if decrypt:
+            await decrypt_loaded(users, *decrypt)
+        return {u.id: u for u in users}
+
+    async def get_locales(self, db: AsyncSession, user_ids: list[uuid.UUID]) -> dict[uuid.UUID, str]:
+        """{user_id: locale} pour un lot — colonnes seules, aucun déchiffrement."""
+        if not user_ids:
+            return {}
+        result = await db.execute(select(User.id, User.locale).where(User.id.in_(set(user_ids))))
+        return dict(result.all())
+
     async def get_by_email(self, db: AsyncSession, email: str) -> User | None:
         """Lookup via email_hash (index unique) — jamais via scan du champ chiffré."""
         h = hash_for_lookup(email)
@@ -34,12 +54,15 @@ class UserRepository:
     async def get_by_google_sub(self, db: AsyncSession, google_sub: str) -> User | None:
         """
         Lookup par google_sub chiffré.
-        Nécessite un scan complet + déchiffrement côté Python.
+        Nécessite un scan des comptes Google + déchiffrement côté Python —
+        en un seul lot (hors event loop si volumineux), seul google_sub est déchiffré.
         Acceptable car utilisé uniquement au login Google (rare).
         Optimisation possible en phase 2 : ajouter google_sub_hash.
         """
-        result = await db.execute(select(User))
-        for user in result.scalars():
+        result = await db.execute(select(User).where(User.google_sub.isnot(None)))
+        users = list(result.scalars())
+        await decrypt_loaded(users, "google_sub")
+        for user in users:
             if user.google_sub == google_sub:
                 return user
         return None
@@ -57,6 +80,7 @@ class UserRepository:
         email: str,
         role: str,
         password_plain: str | None = None,
+        password_hash: str | None = None,
         google_sub: str | None = None,
         locale: str = "fr-FR",
         timezone: str = "Europe/Paris",
@@ -64,7 +88,8 @@ class UserRepository:
     ) -> User:
         """
         Crée un utilisateur.
-        Hache le password si fourni.
+        Hache password_plain si fourni (synchrone — scripts/tests) ;
+        les services passent password_hash déjà calculé par password_pool.
         email_hash et search_token sont synchronisés automatiquement via @validates.
         """
         user = User(
@@ -78,7 +103,9 @@ class UserRepository:
             country=country,
             status="unverified",
         )
-        if password_plain:
+        if password_hash:
+            user.password_hash = password_hash
+        elif password_plain:
             user.password_hash = hash_password(password_plain)
 
         db.add(user)
@@ -1,15 +1,38 @@
-"""Repository liste d'attente — B2-12."""
+"""Repository liste d'attente — B2-12.
+
+Positions tenues en SQL, nombre de requêtes constant quelle que soit la file :
+  - add_entry : position = max(active) + 1 calculée dans l'INSERT ; doublon
+    (client déjà actif sur le créneau) → ON CONFLICT DO NOTHING sur l'index
+    unique partiel uq_waitlist_active_client ;
+  - reorder : un UPDATE … FROM (row_number() OVER …) ;
+  - les deux sous verrou consultatif (coach, créneau).
+
+Places libérées : waitlist_slot_events (une ligne par place), réservées et
+supprimées par lot (claim_slot_events), puis promote_waiting notifie les
+premiers en attente de tous les créneaux du lot en un UPDATE … RETURNING.
+"""
 
 from __future__ import annotations
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import Integer, and_, column, delete, func, literal, select, update, values
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.waitlist_entry import WaitlistEntry
+from app.core import advisory_lock
+from app.models.waitlist_entry import (
+    WAITLIST_ACTIVE_STATUSES, WAITLIST_ACTIVE_WHERE, WaitlistEntry,
+)
+from app.models.waitlist_slot_event import WaitlistSlotEvent
+
+Slot = tuple[uuid.UUID, datetime]  # (coach_id, slot_datetime)
+
+
+def _slot_lock(coach_id: uuid.UUID, slot_datetime: datetime) -> int:
+    return advisory_lock.lock_key("waitlist", coach_id, slot_datetime.isoformat())
 
 
 async def add_entry(
@@ -17,21 +40,44 @@ async def add_entry(
     coach_id: uuid.UUID,
     slot_datetime: datetime,
     client_id: uuid.UUID,
-    position: int,
     booking_id: uuid.UUID | None = None,
-) -> WaitlistEntry:
-    entry = WaitlistEntry(
-        id=uuid.uuid4(),
-        booking_id=booking_id,
-        coach_id=coach_id,
-        slot_datetime=slot_datetime,
-        client_id=client_id,
-        position=position,
-        status="waiting",
-    )
-    db.add(entry)
-    await db.flush()
-    return entry
+) -> WaitlistEntry | None:
+    """Ajoute le client en fin de file — un INSERT … SELECT … RETURNING.
+
+    Returns None si le client a déjà une entrée active pour ce créneau.
+    """
+    await advisory_lock.xact_lock(db, _slot_lock(coach_id, slot_datetime))
+    next_position = (
+        select(func.coalesce(func.max(WaitlistEntry.position), 0) + 1)
+        .where(
+            WaitlistEntry.coach_id == coach_id,
+            WaitlistEntry.slot_datetime == slot_datetime,
+            WaitlistEntry.status.in_(WAITLIST_ACTIVE_STATUSES),
+        )
+        .scalar_subquery()
+    )
+    row = select(
+        literal(uuid.uuid4(), WaitlistEntry.id.type),
+        literal(booking_id, WaitlistEntry.booking_id.type),
+        literal(coach_id, WaitlistEntry.coach_id.type),
+        literal(slot_datetime, WaitlistEntry.slot_datetime.type),
+        literal(client_id, WaitlistEntry.client_id.type),
+        next_position,
+        literal("waiting"),
+    )
+    stmt = (
+        insert(WaitlistEntry)
+        .from_select(
+            ["id", "booking_id", "coach_id", "slot_datetime", "client_id", "position", "status"],
+            row,
+        )
+        .on_conflict_do_nothing(
+            index_elements=["coach_id", "slot_datetime", "client_id"],
+            index_where=WAITLIST_ACTIVE_WHERE,
+        )
+        .returning(WaitlistEntry)
+    )
+    return (await db.execute(stmt)).scalar_one_or_none()
 
 
 async def get_first_waiting(
@@ -71,7 +117,7 @@ async def get_by_client(
 ) -> list[WaitlistEntry]:
     q = select(WaitlistEntry).where(WaitlistEntry.client_id == client_id)
     if active_only:
-        q = q.where(WaitlistEntry.status.in_(["waiting", "notified"]))
+        q = q.where(WaitlistEntry.status.in_(WAITLIST_ACTIVE_STATUSES))
     q = q.order_by(WaitlistEntry.created_at.desc())
     result = await db.execute(q)
     return list(result.scalars().all())
@@ -91,7 +137,7 @@ async def count_waiting(
     q = select(func.count()).where(
         WaitlistEntry.coach_id == coach_id,
         WaitlistEntry.slot_datetime == slot_datetime,
-        WaitlistEntry.status.in_(["waiting", "notified"]),
+        WaitlistEntry.status.in_(WAITLIST_ACTIVE_STATUSES),
     )
     return (await db.execute(q)).scalar_one()
 
@@ -113,10 +159,157 @@ async def remove_entry(db: AsyncSession, entry: WaitlistEntry) -> None:
 
 async def reorder(
     db: AsyncSession, coach_id: uuid.UUID, slot_datetime: datetime
-) -> None:
-    """Recalcule les positions après suppression d'une entrée."""
-    entries = await get_all_for_slot(db, coach_id, slot_datetime)
-    waiting = [e for e in entries if e.status in ("waiting", "notified")]
-    for i, entry in enumerate(sorted(waiting, key=lambda x: x.position), start=1):
-        entry.position = i
-    await db.flush()
+) -> int:
+    """Renumérote 1..n les entrées actives du créneau (après suppression) — un UPDATE.
+
+    Seules les lignes dont la position change sont écrites ; les entrées déjà
+    chargées dans la session ne sont pas synchronisées. Returns le nombre de lignes.
+    """
+    await advisory_lock.xact_lock(db, _slot_lock(coach_id, slot_datetime))
+    ranked = (
+        select(
+            WaitlistEntry.id,
+            func.row_number().over(
+                order_by=(WaitlistEntry.position, WaitlistEntry.created_at)
+            ).label("rank"),
+        )
+        .where(
+            WaitlistEntry.coach_id == coach_id,
+            WaitlistEntry.slot_datetime == slot_datetime,
+            WaitlistEntry.status.in_(WAITLIST_ACTIVE_STATUSES),
+        )
+        .subquery()
+    )
+    stmt = (
+        update(WaitlistEntry)
+        .where(WaitlistEntry.id == ranked.c.id, WaitlistEntry.position != ranked.c.rank)
+        .values(position=ranked.c.rank)
+        .execution_options(synchronize_session=False)
+    )
+    return (await db.execute(stmt)).rowcount
+
+
+async def expire_notified_batch(
+    db: AsyncSession, now: datetime, limit: int
+) -> list[tuple[uuid.UUID, datetime]]:
+    """UPDATE … RETURNING : expire au plus `limit` entrées notified dont la fenêtre est passée.
+
+    Retourne (coach_id, slot_datetime) de chaque entrée expirée (une ligne par entrée).
+    """
+    ids = (
+        select(WaitlistEntry.id)
+        .where(WaitlistEntry.status == "notified", WaitlistEntry.expires_at < now)
+        .order_by(WaitlistEntry.expires_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(WaitlistEntry)
+        .where(WaitlistEntry.id.in_(ids), WaitlistEntry.status == "notified")
+        .values(status="expired")
+        .returning(WaitlistEntry.coach_id, WaitlistEntry.slot_datetime)
+        .execution_options(synchronize_session=False)
+    )
+    return [tuple(row) for row in (await db.execute(stmt)).all()]
+
+
+async def get_notified_deadlines(db: AsyncSession) -> list[datetime]:
+    """Échéances distinctes des entrées notified (amorçage de la roue temporelle)."""
+    q = (
+        select(WaitlistEntry.expires_at)
+        .where(WaitlistEntry.status == "notified", WaitlistEntry.expires_at.is_not(None))
+        .distinct()
+    )
+    return list((await db.execute(q)).scalars().all())
+
+
+# ── Places libérées ───────────────────────────────────────────────────────────
+
+async def publish_slot_events(db: AsyncSession, slots: list[Slot], reason: str) -> int:
+    """Un INSERT multi-lignes — une ligne par place libérée."""
+    if not slots:
+        return 0
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        insert(WaitlistSlotEvent),
+        [
+            {"id": uuid.uuid4(), "coach_id": coach_id, "slot_datetime": slot_datetime,
+             "reason": reason, "created_at": now}
+            for coach_id, slot_datetime in slots
+        ],
+    )
+    return len(slots)
+
+
+async def claim_slot_events(db: AsyncSession, limit: int) -> list[Slot]:
+    """DELETE … RETURNING des `limit` plus anciens événements (SKIP LOCKED).
+
+    Les événements ne sont supprimés qu'au commit de l'appelant : la promotion
+    se fait dans la même transaction.
+    """
+    ids = (
+        select(WaitlistSlotEvent.id)
+        .order_by(WaitlistSlotEvent.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        delete(WaitlistSlotEvent)
+        .where(WaitlistSlotEvent.id.in_(ids))
+        .returning(WaitlistSlotEvent.coach_id, WaitlistSlotEvent.slot_datetime)
+    )
+    return [tuple(row) for row in (await db.execute(stmt)).all()]
+
+
+def _freed(places: dict[Slot, int]):
+    """Liste VALUES (coach_id, slot_datetime, places) des places libérées."""
+    return values(
+        column("coach_id", WaitlistEntry.coach_id.type),
+        column("slot_datetime", WaitlistEntry.slot_datetime.type),
+        column("places", Integer),
+        name="freed",
+    ).data([(coach_id, slot, count) for (coach_id, slot), count in places.items()])
+
+
+async def promote_waiting(
+    db: AsyncSession, places: dict[Slot, int], now: datetime, expires_at: datetime
+) -> list[WaitlistEntry]:
+    """Passe notified les `places[créneau]` premiers en attente de chaque créneau.
+
+    Un UPDATE … FROM (row_number() par créneau) … RETURNING pour tout le lot,
+    sous verrous consultatifs (coach, créneau). Returns les entrées notifiées.
+    """
+    if not places:
+        return []
+    await advisory_lock.xact_lock(db, *(_slot_lock(c, s) for c, s in places))
+    freed = _freed(places)
+    ranked = (
+        select(
+            WaitlistEntry.id,
+            freed.c.places,
+            func.row_number().over(
+                partition_by=(WaitlistEntry.coach_id, WaitlistEntry.slot_datetime),
+                order_by=(WaitlistEntry.position, WaitlistEntry.created_at),
+            ).label("rank"),
+        )
+        .join(freed, and_(
+            freed.c.coach_id == WaitlistEntry.coach_id,
+            freed.c.slot_datetime == WaitlistEntry.slot_datetime,
+        ))
+        .where(WaitlistEntry.status == "waiting")
+        .subquery()
+    )
+    stmt = (
+        update(WaitlistEntry)
+        .where(
+            WaitlistEntry.id == ranked.c.id,
+            ranked.c.rank <= ranked.c.places,
+            WaitlistEntry.status == "waiting",
+        )
+        .values(status="notified", notified_at=now, expires_at=expires_at)
+        .returning(WaitlistEntry)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    return list((await db.execute(stmt)).scalars().all())
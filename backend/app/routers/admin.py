@@ -1,4 +1,4 @@
-"""Router admin — B3-14 (validation machines) + blocklist domaines email + feedback + santé."""
+"""Router admin — B3-14 (validation machines) + blocklist domaines email + feedback + santé + métriques + rotation des clés."""
 
 from __future__ import annotations
 
@@ -11,6 +11,9 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.middleware import get_current_user
+from app.auth.principal_cache import principal_cache
+from app.core.encryption import plaintext_cache_stats
+from app.core.metrics import metrics
 from app.database import get_db
 from app.models.machine import Machine
 from app.models.user import User
@@ -19,8 +22,9 @@ from app.schemas.common import MessageResponse
 from app.schemas.performance import MachineResponse
 from app.schemas.feedback import FeedbackAdminUpdate, FeedbackResponse
 from app.schemas.health import HealthParameterCreate, HealthParameterResponse, HealthParameterUpdate
-from app.services import feedback_service, health_service
+from app.services import feedback_service, health_service, key_rotation_service
 from app.services.feedback_service import FeedbackNotFoundError
+from app.services.cancellation_policy_service import policy_cache
 from app.services.health_service import ParameterNotFoundError
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -253,3 +257,35 @@ async def admin_delete_health_parameter(
         return param
     except ParameterNotFoundError:
         raise HTTPException(status_code=404, detail="Paramètre introuvable")
+
+
+# ---------------------------------------------------------------------------
+# Métriques in-process (compteurs de cache, latences…) — par worker
+# ---------------------------------------------------------------------------
+
+@router.get("/metrics")
+async def get_metrics(
+    current_user: User = Depends(get_current_user),
+):
+    """Snapshot des métriques du worker courant (admin seulement)."""
+    _require_admin(current_user)
+    return {
+        "metrics": metrics.snapshot(),
+        "principal_cache": principal_cache.stats(),
+        "plaintext_cache": plaintext_cache_stats(),
+        "cancellation_policy_cache": policy_cache.stats(),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Rotation des clés de chiffrement — suivi
+# ---------------------------------------------------------------------------
+
+@router.get("/key-rotation")
+async def get_key_rotation_progress(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Avancement du re-chiffrement par table et par clé (admin seulement)."""
+    _require_admin(current_user)
+    return {"targets": await key_rotation_service.get_progress(db)}
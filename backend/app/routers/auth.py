@@ -34,6 +34,7 @@ from app.services.auth_service import (
 from app.services.email_domain_service import BlockedDomainError
 from app.utils.hashing import hash_api_key
 from app.utils.i18n import get_locale_from_request, t
+from app.utils.password_pool import PasswordPoolSaturatedError
 
 logger = logging.getLogger(__name__)
 
@@ -77,6 +78,12 @@ async def register(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=str(e),
         )
+    except PasswordPoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=t("auth.error.server_busy", locale),
+            headers={"Retry-After": "1"},
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -144,6 +151,12 @@ async def login(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=t("auth.error.account_suspended", locale),
         )
+    except PasswordPoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=t("auth.error.server_busy", locale),
+            headers={"Retry-After": "1"},
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -263,3 +276,9 @@ async def reset_password(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=t("auth.error.token_expired", locale),
         )
+    except PasswordPoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=t("auth.error.server_busy", locale),
+            headers={"Retry-After": "1"},
+        )
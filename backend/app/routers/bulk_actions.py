@@ -1,4 +1,4 @@
-"""Router actions en masse (bulk cancel + SMS broadcast) — B2-34."""
+"""Router actions en masse (bulk cancel + SMS broadcast + transitions groupées) — B2-34."""
 
 from __future__ import annotations
 
@@ -8,6 +8,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth.middleware import require_coach
 from app.database import get_db
 from app.models.user import User
+from app.schemas.booking import BulkTransitionRequest, BulkTransitionResponse
+from app.services import booking_service
 from app.services.bulk_cancel_service import bulk_cancel_bookings, BulkCancelAuthError
 
 router = APIRouter(prefix="/coaches", tags=["bulk-actions"])
@@ -44,6 +46,27 @@ async def bulk_cancel(
         raise HTTPException(status_code=503, detail="Module SMS non disponible")
 
 
+# ── Transitions groupées (confirm / reject / done / no_show) ─────────────────────
+
+@router.post("/bookings/bulk-transition", response_model=BulkTransitionResponse)
+async def bulk_transition(
+    data: BulkTransitionRequest,
+    current_user: User = Depends(require_coach),
+    db: AsyncSession = Depends(get_db),
+):
+    """Applique une transition à un lot — résultat par réservation (échecs partiels)."""
+    items = await booking_service.bulk_transition(
+        db, current_user, data.booking_ids, data.action, data.reason
+    )
+    await db.commit()
+    succeeded = sum(1 for item in items if item.ok)
+    return BulkTransitionResponse(
+        succeeded=succeeded,
+        failed=len(items) - succeeded,
+        items=items,
+    )
+
+
 # ── SMS logs ───────────────────────────────────────────────────────────────────
 
 @router.get("/sms/logs")
@@ -3,11 +3,12 @@
 from __future__ import annotations
 
 import uuid
+from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth.middleware import require_coach
+from app.auth.middleware import get_current_user, require_coach
 from app.database import get_db
 from app.models.user import User
 from app.schemas.coach import (
@@ -18,10 +19,13 @@ from app.schemas.coach import (
     AvailabilityCreate, AvailabilityResponse,
     CancellationPolicyUpdate, CancellationPolicyResponse,
 )
+from app.schemas.booking import AvailableSlotResponse
 from app.schemas.client import RelationStatusUpdate, RelationResponse, CoachNoteUpdate
 from app.schemas.common import MessageResponse
-from app.services import coach_service
+from app.schemas.performance import ClientWeekStats
+from app.services import availability_service, coach_service, performance_service
 from app.repositories import coach_repository
+from app.services.availability_service import InvalidWindowError
 from app.services.coach_service import ProfileAlreadyExistsError, ProfileNotFoundError
 
 router = APIRouter(prefix="/coaches", tags=["coaches"])
@@ -251,6 +255,24 @@ async def delete_availability(
     return {"message": "Créneau supprimé"}
 
 
+@router.get("/{coach_id}/slots", response_model=list[AvailableSlotResponse])
+async def list_free_slots(
+    coach_id: uuid.UUID,
+    from_date: datetime = Query(..., alias="from"),
+    to_date: datetime = Query(..., alias="to"),
+    duration_min: int = Query(60, ge=15, le=480),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Créneaux encore réservables du coach entre `from` et `to` (UTC)."""
+    try:
+        return await availability_service.get_free_slots(
+            db, coach_id, from_date, to_date, duration_min=duration_min
+        )
+    except InvalidWindowError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
 # ── Politique d'annulation ────────────────────────────────────────────────────
 
 @router.put("/cancellation-policy", response_model=CancellationPolicyResponse)
@@ -285,6 +307,19 @@ async def list_clients(
         raise _profile_not_found()
 
 
+@router.get("/clients/stats/week", response_model=list[ClientWeekStats])
+async def get_clients_week_stats(
+    week_start: datetime = Query(..., description="Un instant de la semaine (normalisé au lundi UTC)"),
+    status: list[str] = Query(["active"], description="Statuts de relation inclus"),
+    current_user: User = Depends(require_coach),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stats de la semaine de tous les clients du coach — rollups, une requête."""
+    return await performance_service.get_clients_week_dashboard(
+        db, current_user, week_start, statuses=status
+    )
+
+
 @router.put("/clients/{client_id}/relation", response_model=RelationResponse)
 async def update_relation(
     client_id: uuid.UUID,
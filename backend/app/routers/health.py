@@ -5,13 +5,14 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.middleware import get_current_user, require_coach
 from app.database import get_db
 from app.models.user import User
 from app.schemas.health import (
+    HealthLogBucketResponse,
     HealthLogCreate,
     HealthLogResponse,
     HealthParameterResponse,
@@ -19,7 +20,7 @@ from app.schemas.health import (
     HealthSharingUpdate,
 )
 from app.services import health_service
-from app.services.health_service import LogNotFoundError
+from app.services.health_service import InvalidCursorError, LogNotFoundError
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -124,13 +125,45 @@ async def update_sharing(
 @router.get("/clients/{client_id}/logs", response_model=list[HealthLogResponse])
 async def get_client_logs(
     client_id: uuid.UUID,
+    response: Response,
     parameter_id: Optional[uuid.UUID] = Query(None),
     from_date: Optional[datetime] = Query(None, alias="from"),
     to_date: Optional[datetime] = Query(None, alias="to"),
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     current_user: User = Depends(require_coach),
     db: AsyncSession = Depends(get_db),
 ):
-    """Mesures partagées d'un client (coach seulement)."""
-    return await health_service.get_client_logs(
-        db, current_user.id, client_id, parameter_id, from_date, to_date
+    """Mesures partagées d'un client (coach seulement), plus récentes d'abord.
+
+    Page suivante : renvoyer l'en-tête X-Next-Cursor dans `cursor`.
+    """
+    try:
+        logs, next_cursor = await health_service.get_client_logs(
+            db, current_user.id, client_id, parameter_id, from_date, to_date,
+            limit=limit, cursor=cursor,
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=422, detail="Curseur invalide")
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return logs
+
+
+@router.get(
+    "/clients/{client_id}/logs/buckets", response_model=list[HealthLogBucketResponse]
+)
+async def get_client_log_buckets(
+    client_id: uuid.UUID,
+    bucket: str = Query("day", pattern="^(day|week)$"),
+    parameter_id: Optional[uuid.UUID] = Query(None),
+    from_date: Optional[datetime] = Query(None, alias="from"),
+    to_date: Optional[datetime] = Query(None, alias="to"),
+    current_user: User = Depends(require_coach),
+    db: AsyncSession = Depends(get_db),
+):
+    """Mesures partagées d'un client agrégées par jour / semaine (graphiques)."""
+    return await health_service.get_client_log_buckets(
+        db, current_user.id, client_id,
+        bucket=bucket, param_id=parameter_id, from_date=from_date, to_date=to_date,
     )
@@ -5,23 +5,25 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.middleware import get_current_user, require_coach
 from app.database import get_db
 from app.models.user import User
-from app.repositories import performance_repository as repo
 from app.schemas.performance import (
+    PerformanceSessionBatchCreate,
+    PerformanceSessionBatchResponse,
     PerformanceSessionCreate,
     PerformanceSessionResponse,
     PerformanceSessionUpdate,
+    ProgressionAnalytics,
     ProgressionStats,
     WeekStats,
     PersonalRecordResponse,
 )
 from app.schemas.common import MessageResponse
-from app.services import performance_service
+from app.services import performance_service, progression_analytics_service
 from app.services.performance_service import (
     SessionNotFoundError, NotAuthorizedError, EditWindowExpiredError
 )
@@ -49,7 +51,22 @@ async def create_session(
 ):
     session = await performance_service.create_session(db, current_user, data)
     await db.commit()
-    return await repo.get_by_id(db, session.id)
+    return session
+
+
+@router.post("/batch", response_model=PerformanceSessionBatchResponse, status_code=201)
+async def create_sessions_batch(
+    data: PerformanceSessionBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Synchro hors ligne : jusqu'à 100 séances en une transaction."""
+    sessions = await performance_service.create_sessions(db, current_user, data.sessions)
+    await db.commit()
+    return {
+        "items": sessions,
+        "pr_count": sum(s.is_pr for session in sessions for s in session.exercise_sets),
+    }
 
 
 @router.post("/for-client/{client_id}", response_model=PerformanceSessionResponse, status_code=201)
@@ -70,7 +87,7 @@ async def create_session_for_client(
         db, client, data, entered_by_id=current_user.id
     )
     await db.commit()
-    return await repo.get_by_id(db, session.id)
+    return session
 
 
 @router.get("", response_model=dict)
@@ -132,6 +149,43 @@ async def get_exercise_progression(
     )
 
 
+@router.get("/stats/exercise/{exercise_type_id}/analytics", response_model=ProgressionAnalytics)
+async def get_exercise_analytics(
+    exercise_type_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    bucket: str = Query("week", pattern="^(day|week|month)$"),
+    points: int = Query(100, ge=2, le=500, description="Nombre max de points (LTTB)"),
+    window: int = Query(4, ge=1, le=52, description="Moyenne mobile, en périodes"),
+    from_date: datetime | None = Query(None),
+    to_date: datetime | None = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    params = {"bucket": bucket, "points": points, "window": window,
+              "from_date": from_date, "to_date": to_date}
+    etag = await progression_analytics_service.compute_etag(
+        db, current_user.id, exercise_type_id, **params
+    )
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    from app.repositories.performance_repository import get_exercise_by_id
+    exercise = await get_exercise_by_id(db, exercise_type_id)
+    if exercise is None:
+        raise HTTPException(status_code=404, detail="Exercice introuvable")
+    analytics = await progression_analytics_service.get_analytics(
+        db, current_user.id, exercise_type_id, **params
+    )
+    response.headers.update(headers)
+    return ProgressionAnalytics(
+        exercise_type_id=exercise_type_id,
+        exercise_name_key=exercise.name_key,
+        **analytics,
+    )
+
+
 @router.put("/{session_id}", response_model=PerformanceSessionResponse)
 async def update_session(
     session_id: uuid.UUID,
@@ -11,8 +11,9 @@ from app.auth.middleware import get_current_user, require_coach, require_client
 from app.database import get_db
 from app.models.user import User
 from app.schemas.program import (
-    AssignPlanRequest, ClientProgressResponse,
-    GenerateProgramRequest, PlanAssignmentResponse,
+    AssignPlanRequest, ClientProgressResponse, DuplicatePlanForClientsRequest,
+    GenerateProgramRequest, PlanAssignmentResponse, PlannedExerciseCreate,
+    PlannedSessionCreate, ProgramPreview, ProgramPreviewRequest, ProgressionAdjustmentResponse,
     WorkoutPlanCreate, WorkoutPlanResponse, WorkoutPlanSummary,
 )
 from app.schemas.common import MessageResponse
@@ -114,6 +115,52 @@ async def create_plan(
     return plan
 
 
+@router.post("/coaches/programs/preview", response_model=list[ProgramPreview])
+async def preview_plans(
+    data: ProgramPreviewRequest,
+    current_user: User = Depends(require_coach),
+    db: AsyncSession = Depends(get_db),
+):
+    """Semaines alternatives générées (meilleur score d'abord), rien n'est enregistré."""
+    from app.services.program_generator_service import preview_programs
+
+    drafts = await preview_programs(
+        db,
+        goal=data.goal,
+        frequency_per_week=data.frequency_per_week,
+        level=data.level,
+        count=data.count,
+    )
+    return [
+        ProgramPreview(
+            score=d.layout.score,
+            plan=WorkoutPlanCreate(
+                name=d.name,
+                description=d.description,
+                level=d.level,
+                goal=d.goal,
+                planned_sessions=[
+                    PlannedSessionCreate(
+                        day_of_week=s.day_of_week,
+                        session_name=s.session_name,
+                        estimated_duration_min=s.block.estimated_duration_min,
+                        rest_seconds=s.block.rest_seconds,
+                        planned_exercises=[
+                            PlannedExerciseCreate(
+                                exercise_type_id=ex.id, target_sets=sets, target_reps=reps,
+                                order_index=idx + 1,
+                            )
+                            for idx, (ex, sets, reps) in enumerate(s.exercises)
+                        ],
+                    )
+                    for s in d.sessions
+                ],
+            ),
+        )
+        for d in drafts
+    ]
+
+
 @router.get("/coaches/programs/{plan_id}", response_model=WorkoutPlanResponse)
 async def get_plan(
     plan_id: uuid.UUID,
@@ -154,6 +201,27 @@ async def duplicate_plan(
         raise _plan_err(e)
 
 
+@router.post(
+    "/coaches/programs/{plan_id}/duplicate/clients",
+    response_model=list[PlanAssignmentResponse],
+)
+async def duplicate_plan_for_clients(
+    plan_id: uuid.UUID,
+    data: DuplicatePlanForClientsRequest,
+    current_user: User = Depends(require_coach),
+    db: AsyncSession = Depends(get_db),
+):
+    """Une copie du plan par client, chacune assignée à son client."""
+    try:
+        assignments = await program_service.duplicate_for_clients(
+            db, current_user, plan_id, data.client_ids, data.start_date, data.mode
+        )
+        await db.commit()
+        return assignments
+    except Exception as e:
+        raise _plan_err(e)
+
+
 @router.post("/coaches/programs/{plan_id}/assign", response_model=PlanAssignmentResponse)
 async def assign_plan(
     plan_id: uuid.UUID,
@@ -185,3 +253,21 @@ async def get_client_progress(
 ):
     progress = await program_service.get_client_progress(db, current_user, client_id, plan_id)
     return ClientProgressResponse(plan_id=plan_id, **progress)
+
+
+@router.get(
+    "/coaches/clients/{client_id}/progression-adjustments",
+    response_model=list[ProgressionAdjustmentResponse],
+)
+async def list_progression_adjustments(
+    client_id: uuid.UUID,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(require_coach),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        return await program_service.list_progression_adjustments(
+            db, current_user, client_id, limit=limit
+        )
+    except Exception as e:
+        raise _plan_err(e)
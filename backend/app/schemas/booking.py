@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -48,6 +48,38 @@ class BookingResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class BulkTransitionRequest(BaseModel):
+    """Transition d'un lot de réservations par le coach (cours collectifs)."""
+    booking_ids: Annotated[list[uuid.UUID], Field(min_length=1, max_length=200)]
+    action: Literal["confirm", "reject", "done", "no_show"]
+    reason: Annotated[str | None, Field(max_length=500)] = None
+
+
+class BulkTransitionItemResponse(BaseModel):
+    booking_id: uuid.UUID
+    ok: bool
+    status: str | None = None
+    error: str | None = None  # not_found | not_authorized | invalid_transition
+
+    model_config = {"from_attributes": True}
+
+
+class BulkTransitionResponse(BaseModel):
+    succeeded: int
+    failed: int
+    items: list[BulkTransitionItemResponse]
+
+
+class AvailableSlotResponse(BaseModel):
+    """Créneau libre d'un coach (moteur de disponibilités)."""
+    start: datetime  # UTC
+    end: datetime
+    capacity: int
+    remaining: int
+
+    model_config = {"from_attributes": True}
+
+
 class CancellationRequest(BaseModel):
     reason: Annotated[str | None, Field(max_length=500)] = None
 
@@ -108,6 +108,16 @@ class HealthLogResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class HealthLogBucketResponse(BaseModel):
+    """Agrégat d'un paramètre sur une période (mode graphique coach)."""
+    parameter_id: uuid.UUID
+    bucket_start: datetime
+    count: int
+    min_value: float
+    max_value: float
+    avg_value: float
+
+
 # ---------------------------------------------------------------------------
 # Préférences de partage
 # ---------------------------------------------------------------------------
@@ -79,6 +79,16 @@ class PerformanceSessionResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class PerformanceSessionBatchCreate(BaseModel):
+    """Synchro hors ligne : plusieurs séances en une requête."""
+    sessions: Annotated[list[PerformanceSessionCreate], Field(min_length=1, max_length=100)]
+
+
+class PerformanceSessionBatchResponse(BaseModel):
+    items: list[PerformanceSessionResponse]  # ordre de la requête
+    pr_count: int
+
+
 # ── Statistiques ───────────────────────────────────────────────────────────────
 
 class ProgressionPoint(BaseModel):
@@ -95,15 +105,41 @@ class ProgressionStats(BaseModel):
     data_points: list[ProgressionPoint]
 
 
+class ProgressionAnalyticsPoint(BaseModel):
+    """Une période (jour / semaine / mois) de la série analytics."""
+    bucket_start: datetime
+    max_weight_kg: Decimal | None
+    total_volume_kg: Decimal | None
+    sets_count: int
+    best_e1rm_kg: Decimal | None      # 1RM estimé (Epley), meilleur set de la période
+    e1rm_moving_avg: Decimal | None   # moyenne mobile sur `window` périodes
+    volume_moving_avg: Decimal | None
+
+
+class ProgressionAnalytics(BaseModel):
+    exercise_type_id: uuid.UUID
+    exercise_name_key: str
+    bucket: str
+    window: int
+    total_buckets: int  # avant sous-échantillonnage
+    data_points: list[ProgressionAnalyticsPoint]
+
+
 class WeekStats(BaseModel):
     week_start: datetime
     sessions_count: int
     total_duration_min: int
     avg_feeling: float | None
     total_sets: int
+    total_volume_kg: Decimal = Decimal("0.00")  # somme(reps * weight_kg) sur la semaine
     muscles_worked: list[str]
 
 
+class ClientWeekStats(WeekStats):
+    """Semaine d'un client — tableau de bord coach (tous les clients en une requête)."""
+    client_id: uuid.UUID
+
+
 class PersonalRecordResponse(BaseModel):
     id: uuid.UUID
     exercise_type_id: uuid.UUID
@@ -112,6 +148,8 @@ class PersonalRecordResponse(BaseModel):
     reps: int | None
     achieved_at: datetime
     session_id: uuid.UUID
+    best_e1rm_kg: Decimal | None = None
+    max_volume_kg: Decimal | None = None
 
     model_config = {"from_attributes": True}
 
@@ -132,6 +132,20 @@ class AssignPlanRequest(BaseModel):
         return v
 
 
+class DuplicatePlanForClientsRequest(BaseModel):
+    client_ids: Annotated[list[uuid.UUID], Field(min_length=1, max_length=100)]
+    start_date: date
+    mode: str = "replace_ai"
+
+    @field_validator("mode")
+    @classmethod
+    def validate_mode(cls, v: str) -> str:
+        from app.models.workout_plan import ASSIGN_MODES
+        if v not in ASSIGN_MODES:
+            raise ValueError(f"mode invalide. Valeurs : {ASSIGN_MODES}")
+        return v
+
+
 class PlanAssignmentResponse(BaseModel):
     id: uuid.UUID
     plan_id: uuid.UUID
@@ -154,9 +168,48 @@ class ClientProgressResponse(BaseModel):
     completion_pct: float
 
 
+class ProgressionAdjustmentResponse(BaseModel):
+    id: uuid.UUID
+    planned_exercise_id: uuid.UUID
+    exercise_type_id: uuid.UUID
+    previous_weight_kg: Decimal | None
+    new_weight_kg: Decimal
+    last_session_id: uuid.UUID | None
+    trigger: str
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
 # ── Génération IA ──────────────────────────────────────────────────────────────
 
 class GenerateProgramRequest(BaseModel):
     goal: str = "well_being"
     frequency_per_week: Annotated[int, Field(ge=1, le=7)] = 3
     level: str = "beginner"
+
+
+class ProgramPreviewRequest(GenerateProgramRequest):
+    count: Annotated[int, Field(ge=1, le=5)] = 3
+
+    @field_validator("level")
+    @classmethod
+    def validate_level(cls, v: str) -> str:
+        from app.models.workout_plan import PLAN_LEVELS
+        if v not in PLAN_LEVELS:
+            raise ValueError(f"level invalide. Valeurs : {PLAN_LEVELS}")
+        return v
+
+    @field_validator("goal")
+    @classmethod
+    def validate_goal(cls, v: str) -> str:
+        from app.models.workout_plan import PLAN_GOALS
+        if v not in PLAN_GOALS:
+            raise ValueError(f"goal invalide. Valeurs : {PLAN_GOALS}")
+        return v
+
+
+class ProgramPreview(BaseModel):
+    """Semaine générée non enregistrée ; `plan` se crée tel quel via POST /coaches/programs."""
+    score: float
+    plan: WorkoutPlanCreate
@@ -28,7 +28,7 @@ class BulkCancelRequest(BaseModel):
 
 class BulkCancelResponse(BaseModel):
     cancelled_count: int
-    sms_sent_count: int
+    sms_sent_count: int  # SMS mis en file d'envoi (outbox), envoyés en différé
     sms_failed_count: int
     failed_clients: list[str]
 
@@ -4,6 +4,8 @@ Service d'authentification — logique métier complète.
 Implémente : register, verify_email, login_with_email, login_with_google,
              logout, logout_all, forgot_password, reset_password.
 
+Toute révocation de clé invalide principal_cache au commit de la transaction.
+
 Aucun accès direct à la BDD — tout passe par les repositories.
 """
 import logging
@@ -11,12 +13,14 @@ from dataclasses import dataclass
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.principal_cache import principal_cache
 from app.auth.utils import GoogleTokenError, extract_google_user_info, verify_google_token
 from app.models.user import User
 from app.repositories.api_key_repository import api_key_repository
 from app.repositories.user_repository import user_repository
 from app.services.email_domain_service import BlockedDomainError, check_email_domain
-from app.utils.hashing import hash_password, hash_token, verify_password
+from app.utils.hashing import hash_token
+from app.utils.password_pool import password_pool
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +102,7 @@ class AuthService:
         Raises:
             EmailAlreadyUsedError: si l'email est déjà utilisé.
             BlockedDomainError: si le domaine de l'email est dans la blocklist.
+            PasswordPoolSaturatedError: pool bcrypt saturé (→ 429).
         """
         existing = await user_repository.get_by_email(db, email)
         if existing is not None:
@@ -106,13 +111,14 @@ class AuthService:
         # Vérifie que le domaine n'est pas dans la blocklist
         await check_email_domain(db, email)
 
+        password_hash = await password_pool.hash_password(password)
         user = await user_repository.create(
             db,
             first_name=first_name,
             last_name=last_name,
             email=email,
             role=role,
-            password_plain=password,
+            password_hash=password_hash,
             locale=locale,
             country=country,
         )
@@ -187,13 +193,16 @@ class AuthService:
             InvalidCredentialsError: mauvais email ou password.
             AccountNotVerifiedError: compte non vérifié.
             AccountSuspendedError: compte suspendu.
+            PasswordPoolSaturatedError: pool bcrypt saturé (→ 429).
         """
         user = await user_repository.get_by_email(db, email)
 
         # Vérification en temps constant — même si user est None pour éviter timing attack
         # NB : dummy_hash est un hash bcrypt valide (cost 4 pour la rapidité en test)
         _DUMMY_HASH = "$2b$04$UVdaihXuqAh612dvOfYDIuoszpGv/L2MUZWK7wGYzv/E/Y1nYyMTm"
-        valid = verify_password(password, user.password_hash if user and user.password_hash else _DUMMY_HASH)
+        valid = await password_pool.verify_password(
+            password, user.password_hash if user and user.password_hash else _DUMMY_HASH
+        )
 
         if user is None or not valid:
             raise InvalidCredentialsError()
@@ -267,6 +276,7 @@ class AuthService:
         from app.utils.hashing import hash_api_key
         key_hash = hash_api_key(plain_key)
         await api_key_repository.revoke(db, key_hash)
+        principal_cache.invalidate_key_on_commit(db, key_hash)
 
     async def logout_all(
         self,
@@ -274,7 +284,9 @@ class AuthService:
         user_id,
     ) -> int:
         """Révoque toutes les clés de l'utilisateur. Retourne le nombre révoqué."""
-        return await api_key_repository.revoke_all_for_user(db, user_id)
+        count = await api_key_repository.revoke_all_for_user(db, user_id)
+        principal_cache.invalidate_user_on_commit(db, user_id)
+        return count
 
     async def forgot_password(
         self,
@@ -308,6 +320,7 @@ class AuthService:
         Raises:
             TokenInvalidError: token introuvable ou déjà utilisé.
             TokenExpiredError: token expiré.
+            PasswordPoolSaturatedError: pool bcrypt saturé (→ 429).
         """
         token_hash = hash_token(plain_token)
         token = await user_repository.get_reset_token_by_hash(db, token_hash)
@@ -322,11 +335,13 @@ class AuthService:
         if user is None:
             raise TokenInvalidError("user_not_found")
 
-        await user_repository.update(db, user, password_hash=hash_password(new_password))
+        new_hash = await password_pool.hash_password(new_password)
+        await user_repository.update(db, user, password_hash=new_hash)
         await user_repository.consume_reset_token(db, token)
 
         # Révoque toutes les clés existantes (sécurité après reset)
         await api_key_repository.revoke_all_for_user(db, user.id)
+        principal_cache.invalidate_user_on_commit(db, user.id)
 
         return user
 
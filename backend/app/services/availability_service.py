@@ -0,0 +1,244 @@
+"""Service disponibilités — créneaux libres d'un coach.
+
+Déroulé d'une recherche "créneaux libres du coach X entre A et B" :
+  1. Règles hebdomadaires (CoachAvailability) et emploi du temps (CoachWorkSchedule)
+     → 2 petites requêtes indexées sur le coach.
+  2. Réservations actives de la fenêtre → 1 requête (colonnes seules).
+  3. En mémoire : dépliage des règles en créneaux concrets (heure locale du coach
+     → UTC), intersection avec les plages de travail, puis soustraction des
+     réservations par balayage d'intervalles (pic de chevauchement ≤ max_slots).
+
+Aucune requête par créneau — le coût SQL est constant quelle que soit la fenêtre.
+"""
+
+from __future__ import annotations
+
+import bisect
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.coach_availability import CoachAvailability
+from app.models.coach_work_schedule import CoachWorkSchedule
+from app.models.user import User
+from app.repositories import booking_repository, coach_repository
+
+# Durée max d'une séance (BookingCreate.duration_min ≤ 480) : une réservation
+# commencée jusqu'à 8h avant la fenêtre peut encore la chevaucher.
+MAX_BOOKING_DURATION = timedelta(minutes=480)
+MAX_WINDOW_DAYS = 62
+
+Interval = tuple[datetime, datetime]
+
+
+class InvalidWindowError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Slot:
+    start: datetime
+    end: datetime
+    capacity: int
+    booked: int = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(self.capacity - self.booked, 0)
+
+
+# ── Arithmétique d'intervalles ─────────────────────────────────────────────────
+
+def _parse_hhmm(value: str) -> time:
+    h, m = value.split(":")
+    return time(int(h), int(m))
+
+
+def _intersect(a: list[Interval], b: list[Interval]) -> list[Interval]:
+    """Intersection de deux listes d'intervalles [start, end) triées."""
+    out: list[Interval] = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            out.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+
+def _peak_overlap(busy: list[Interval], busy_starts: list[datetime], start: datetime, end: datetime) -> int:
+    """Nombre max de réservations simultanées sur [start, end) (balayage d'événements)."""
+    lo = bisect.bisect_left(busy_starts, start - MAX_BOOKING_DURATION)
+    hi = bisect.bisect_left(busy_starts, end)
+    events: list[tuple[datetime, int]] = []
+    for b_start, b_end in busy[lo:hi]:
+        if b_end <= start:
+            continue
+        events.append((max(b_start, start), 1))
+        events.append((min(b_end, end), -1))
+    events.sort(key=lambda e: (e[0], e[1]))  # fin (-1) avant début (+1) au même instant
+    peak = current = 0
+    for _, delta in events:
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+def _local_dt(day: date, t: time, tz: ZoneInfo) -> datetime:
+    return datetime.combine(day, t, tzinfo=tz).astimezone(timezone.utc)
+
+
+def _coach_tz(name: str | None) -> ZoneInfo:
+    try:
+        return ZoneInfo(name or "Europe/Paris")
+    except ZoneInfoNotFoundError:
+        return ZoneInfo("UTC")
+
+
+# ── Calcul en mémoire ──────────────────────────────────────────────────────────
+
+def _rule_windows(
+    rule: CoachAvailability,
+    day: date,
+    tz: ZoneInfo,
+    schedule_by_day: dict[int, CoachWorkSchedule] | None,
+) -> list[Interval]:
+    """Plage UTC d'une règle pour un jour donné, restreinte aux plages de travail du jour."""
+    windows = [(_local_dt(day, rule.start_time, tz), _local_dt(day, rule.end_time, tz))]
+    if schedule_by_day is None:
+        return windows
+    schedule = schedule_by_day.get(day.weekday())
+    if schedule is None or not schedule.is_working_day:
+        return []
+    work = sorted(
+        (_local_dt(day, _parse_hhmm(ts["start_time"]), tz),
+         _local_dt(day, _parse_hhmm(ts["end_time"]), tz))
+        for ts in schedule.time_slots or []
+    )
+    return _intersect(windows, work)
+
+
+def expand_slots(
+    rules: list[CoachAvailability],
+    schedules: list[CoachWorkSchedule],
+    busy: list[Interval],
+    *,
+    tz: ZoneInfo,
+    window_start: datetime,
+    window_end: datetime,
+    duration: timedelta,
+    now: datetime,
+) -> list[Slot]:
+    """
+    Déplie les règles hebdomadaires en créneaux de `duration` sur [window_start, window_end),
+    bornés par booking_horizon_days, et calcule l'occupation de chacun.
+    Sans emploi du temps : les règles seules font foi. Avec : jour non travaillé → aucun
+    créneau, sinon chaque règle est restreinte aux plages time_slots du jour.
+    """
+    schedule_by_day = {s.day_of_week: s for s in schedules} if schedules else None
+    busy = sorted(busy)
+    busy_starts = [b[0] for b in busy]
+    slots: dict[datetime, int] = {}
+
+    day = window_start.astimezone(tz).date()
+    last_day = window_end.astimezone(tz).date()
+    while day <= last_day:
+        for rule in rules:
+            if rule.day_of_week != day.weekday():  # 0=Lundi … 6=Dimanche
+                continue
+            horizon = now + timedelta(days=rule.booking_horizon_days)
+            for w_start, w_end in _rule_windows(rule, day, tz, schedule_by_day):
+                start = w_start
+                while start + duration <= w_end:
+                    if window_start <= start < window_end and now <= start <= horizon:
+                        slots[start] = max(slots.get(start, 0), rule.max_slots)
+                    start += duration
+        day += timedelta(days=1)
+
+    return [
+        Slot(
+            start=start,
+            end=start + duration,
+            capacity=capacity,
+            booked=_peak_overlap(busy, busy_starts, start, start + duration),
+        )
+        for start, capacity in sorted(slots.items())
+    ]
+
+
+# ── API service ────────────────────────────────────────────────────────────────
+
+async def _load(
+    db: AsyncSession, coach_id: uuid.UUID, start: datetime, end: datetime
+) -> tuple[list[CoachAvailability], list[CoachWorkSchedule], list[Interval], ZoneInfo]:
+    rules, schedules = await coach_repository.get_weekly_rules(db, coach_id)
+    tz_name = (await db.execute(select(User.timezone).where(User.id == coach_id))).scalar_one_or_none()
+    rows = await booking_repository.get_busy_intervals(db, coach_id, start - MAX_BOOKING_DURATION, end)
+    busy = [(s, s + timedelta(minutes=d)) for s, d in rows]
+    return rules, schedules, busy, _coach_tz(tz_name)
+
+
+async def get_free_slots(
+    db: AsyncSession,
+    coach_id: uuid.UUID,
+    start: datetime,
+    end: datetime,
+    *,
+    duration_min: int = 60,
+) -> list[Slot]:
+    """Créneaux du coach (users.id) sur [start, end) ayant encore au moins une place."""
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if end <= start:
+        raise InvalidWindowError("La fin de la fenêtre doit suivre son début")
+    if end - start > timedelta(days=MAX_WINDOW_DAYS):
+        raise InvalidWindowError(f"Fenêtre limitée à {MAX_WINDOW_DAYS} jours")
+
+    rules, schedules, busy, tz = await _load(db, coach_id, start, end)
+    slots = expand_slots(
+        rules, schedules, busy,
+        tz=tz, window_start=start, window_end=end,
+        duration=timedelta(minutes=duration_min), now=datetime.now(timezone.utc),
+    )
+    return [s for s in slots if s.remaining > 0]
+
+
+async def get_slot_capacity(
+    db: AsyncSession, coach_id: uuid.UUID, scheduled_at: datetime, duration_min: int
+) -> tuple[int, int] | None:
+    """
+    (capacité, places occupées) de l'intervalle demandé.
+    Coach sans règle de disponibilité → capacité 1 (séances individuelles).
+    Retourne None si l'intervalle sort des disponibilités déclarées.
+    """
+    if scheduled_at.tzinfo is None:
+        scheduled_at = scheduled_at.replace(tzinfo=timezone.utc)
+    end = scheduled_at + timedelta(minutes=duration_min)
+    rules, schedules, busy, tz = await _load(db, coach_id, scheduled_at, end)
+    busy.sort()
+    booked = _peak_overlap(busy, [b[0] for b in busy], scheduled_at, end)
+    if not rules:
+        return 1, booked
+
+    schedule_by_day = {s.day_of_week: s for s in schedules} if schedules else None
+    local_day = scheduled_at.astimezone(tz).date()
+    capacity = 0
+    for rule in rules:
+        if rule.day_of_week != local_day.weekday():
+            continue
+        windows = _rule_windows(rule, local_day, tz, schedule_by_day)
+        if any(w_start <= scheduled_at and end <= w_end for w_start, w_end in windows):
+            capacity = max(capacity, rule.max_slots)
+    if capacity == 0:
+        return None
+    return capacity, booked
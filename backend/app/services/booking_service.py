@@ -10,19 +10,27 @@ Transitions autorisées :
   confirmed → cancelled_by_coach             (coach annule, délai ok)
   confirmed → cancelled_by_coach_late        (coach annule, trop tard)
   confirmed → no_show_client                 (coach marque no-show)
+
+Chaque annulation publie une place libérée pour la liste d'attente du créneau
+(waitlist_service.publish_slot_freed, même transaction).
 """
 
 from __future__ import annotations
 
 import uuid
+from collections import Counter
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
+from app.core import advisory_lock
 from app.models.booking import Booking
 from app.models.user import User
 from app.repositories import booking_repository, payment_repository, coach_repository
 from app.schemas.booking import BookingCreate
+from app.services import availability_service, cancellation_policy_service, waitlist_service
 
 
 # ── Exceptions typées ──────────────────────────────────────────────────────────
@@ -45,24 +53,21 @@ class NotAuthorizedError(Exception):
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
 
-async def _get_cancellation_threshold(
-    db: AsyncSession, coach_id: uuid.UUID
-) -> int:
-    """Retourne le seuil d'annulation tardive en heures (défaut 24h).
+def _slot_lock_keys(
+    coach_id: uuid.UUID, scheduled_at: datetime, duration_min: int
+) -> list[int]:
+    """Verrous (coach, jour UTC) couvrant [début - durée max, fin).
 
-    Utilise une JOIN directe — pas de lazy loading (interdit en async SQLAlchemy).
+    Deux réservations qui se chevauchent ont toujours au moins un jour en commun
+    dans ces plages (le début de l'une tombe dans la plage de l'autre) → elles se
+    sérialisent ; des coachs différents ne se bloquent jamais.
     """
-    from sqlalchemy import select
-    from app.models.cancellation_policy import CancellationPolicy
-    from app.models.coach_profile import CoachProfile
-    q = (
-        select(CancellationPolicy)
-        .join(CoachProfile, CancellationPolicy.coach_id == CoachProfile.id)
-        .where(CoachProfile.user_id == coach_id)
-    )
-    result = await db.execute(q)
-    policy = result.scalar_one_or_none()
-    return policy.threshold_hours if policy else 24
+    if scheduled_at.tzinfo is None:
+        scheduled_at = scheduled_at.replace(tzinfo=timezone.utc)
+    first = (scheduled_at.astimezone(timezone.utc) - availability_service.MAX_BOOKING_DURATION).date()
+    last = (scheduled_at.astimezone(timezone.utc) + timedelta(minutes=duration_min)).date()
+    days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    return [advisory_lock.lock_key("booking", coach_id, day.isoformat()) for day in days]
 
 
 def _is_late(scheduled_at: datetime, threshold_hours: int) -> bool:
@@ -79,11 +84,18 @@ async def create_booking(
     if coach_profile is None:
         raise BookingNotFoundError("Profil coach introuvable")
 
-    # Compter les bookings actifs sur ce créneau
-    occupied = await booking_repository.get_by_slot(db, data.coach_id, data.scheduled_at)
-    # max_slots = 1 par défaut (séances individuelles) — à affiner avec availability
-    max_slots = 1
-    if len(occupied) >= max_slots:
+    # Sérialise les créations concurrentes qui pourraient se chevaucher chez ce coach
+    # (verrou par coach et par jour UTC, relâché au commit) — avant toute lecture.
+    await advisory_lock.xact_lock(db, *_slot_lock_keys(data.coach_id, data.scheduled_at, data.duration_min))
+
+    # Capacité du créneau (règles de disponibilité) vs réservations qui le chevauchent
+    slot = await availability_service.get_slot_capacity(
+        db, data.coach_id, data.scheduled_at, data.duration_min
+    )
+    if slot is None:
+        raise SlotFullError("Ce créneau est hors des disponibilités du coach")
+    max_slots, occupied = slot
+    if occupied >= max_slots:
         raise SlotFullError("Ce créneau est complet")
 
     # Vérifier doublon
@@ -184,16 +196,8 @@ async def mark_no_show(
         done_at=datetime.now(timezone.utc),
     )
     # Vérifier la politique no-show du coach
-    threshold = await _get_cancellation_threshold(db, coach.id)
-    from app.models.cancellation_policy import CancellationPolicy
-    from app.models.coach_profile import CoachProfile
-    from sqlalchemy import select
-    q = select(CancellationPolicy).join(
-        CoachProfile, CancellationPolicy.coach_id == CoachProfile.id
-    ).where(CoachProfile.user_id == coach.id)
-    result = await db.execute(q)
-    policy = result.scalar_one_or_none()
-    if (policy is None or policy.noshow_is_due) and booking.package_id:
+    policy = await cancellation_policy_service.get_policy(db, coach.id)
+    if policy.noshow_is_due and booking.package_id:
         pkg = await payment_repository.get_package_by_id(db, booking.package_id)
         if pkg and pkg.sessions_remaining > 0:
             await payment_repository.deduct_session(db, pkg)
@@ -212,14 +216,18 @@ async def coach_cancel_booking(
         raise InvalidTransitionError(
             f"Impossible d'annuler une réservation en statut '{booking.status}'"
         )
-    threshold = await _get_cancellation_threshold(db, coach.id)
-    is_late = _is_late(booking.scheduled_at, threshold)
+    policy = await cancellation_policy_service.get_policy(db, coach.id)
+    is_late = _is_late(booking.scheduled_at, policy.threshold_hours)
     new_status = "cancelled_by_coach_late" if is_late else "cancelled_by_coach"
-    return await booking_repository.update_status(
+    booking = await booking_repository.update_status(
         db, booking, new_status,
         coach_cancel_reason=reason,
         cancelled_at=datetime.now(timezone.utc),
     )
+    await waitlist_service.publish_slot_freed(
+        db, [(booking.coach_id, booking.scheduled_at)], "booking_cancelled"
+    )
+    return booking
 
 
 async def waive_penalty(
@@ -238,6 +246,77 @@ async def waive_penalty(
     )
 
 
+# ── Transitions coach en masse (cours collectifs) ──────────────────────────────
+
+# action → (statut de départ, statut d'arrivée, horodatage renseigné)
+BULK_TRANSITIONS: dict[str, tuple[str, str, str]] = {
+    "confirm": ("pending_coach_validation", "confirmed", "confirmed_at"),
+    "reject": ("pending_coach_validation", "rejected", "cancelled_at"),
+    "done": ("confirmed", "done", "done_at"),
+    "no_show": ("confirmed", "no_show_client", "done_at"),
+}
+
+
+@dataclass
+class BulkTransitionItem:
+    booking_id: uuid.UUID
+    ok: bool
+    status: str | None = None
+    error: str | None = None  # not_found | not_authorized | invalid_transition
+
+
+async def bulk_transition(
+    db: AsyncSession,
+    coach: User,
+    booking_ids: list[uuid.UUID],
+    action: str,
+    reason: str | None = None,
+) -> list[BulkTransitionItem]:
+    """Applique `action` à N réservations du coach.
+
+    1 SELECT (propriété + statut, lignes verrouillées), 1 UPDATE pour toutes les
+    réservations valides, 1 UPDATE agrégé des forfaits (done, no-show dû).
+    Échecs partiels : un résultat par réservation, dans l'ordre demandé.
+    """
+    if action not in BULK_TRANSITIONS:
+        raise InvalidTransitionError(f"Action inconnue : '{action}'")
+    from_status, to_status, timestamp_field = BULK_TRANSITIONS[action]
+    booking_ids = list(dict.fromkeys(booking_ids))
+
+    states = await booking_repository.get_states_for_update(db, booking_ids)
+    errors: dict[uuid.UUID, str] = {}
+    for booking_id in booking_ids:
+        state = states.get(booking_id)
+        if state is None:
+            errors[booking_id] = "not_found"
+        elif state[0] != coach.id:
+            errors[booking_id] = "not_authorized"
+        elif state[1] != from_status:
+            errors[booking_id] = "invalid_transition"
+
+    extra = {timestamp_field: datetime.now(timezone.utc)}
+    if action == "reject":
+        extra["coach_cancel_reason"] = reason
+    updated = await booking_repository.bulk_update_status(
+        db, [b for b in booking_ids if b not in errors], from_status, to_status, **extra
+    )
+    updated_ids = {booking_id for booking_id, _ in updated}
+
+    deduct = action == "done"
+    if action == "no_show":
+        deduct = (await cancellation_policy_service.get_policy(db, coach.id)).noshow_is_due
+    if deduct:
+        counts = Counter(package_id for _, package_id in updated if package_id)
+        await payment_repository.deduct_sessions_bulk(db, dict(counts))
+
+    return [
+        BulkTransitionItem(booking_id, ok=True, status=to_status)
+        if booking_id in updated_ids
+        else BulkTransitionItem(booking_id, ok=False, error=errors.get(booking_id, "invalid_transition"))
+        for booking_id in booking_ids
+    ]
+
+
 # ── Transitions client ─────────────────────────────────────────────────────────
 
 async def client_cancel_booking(
@@ -255,26 +334,37 @@ async def client_cancel_booking(
     if booking.status == "pending_coach_validation":
         new_status = "cancelled_by_client"
     else:
-        threshold = await _get_cancellation_threshold(db, booking.coach_id)
-        is_late = _is_late(booking.scheduled_at, threshold)
+        policy = await cancellation_policy_service.get_policy(db, booking.coach_id)
+        is_late = _is_late(booking.scheduled_at, policy.threshold_hours)
         new_status = "cancelled_late_by_client" if is_late else "cancelled_by_client"
 
-    return await booking_repository.update_status(
+    booking = await booking_repository.update_status(
         db, booking, new_status,
         cancelled_at=datetime.now(timezone.utc),
     )
+    await waitlist_service.publish_slot_freed(
+        db, [(booking.coach_id, booking.scheduled_at)], "booking_cancelled"
+    )
+    return booking
 
 
 # ── Worker ─────────────────────────────────────────────────────────────────────
 
-async def auto_reject_expired(db: AsyncSession) -> int:
-    """Worker : passe en auto_rejected les pending depuis > 24h. Retourne le nb rejeté."""
-    expired = await booking_repository.get_expired_pending(db, older_than_hours=24)
-    count = 0
-    for booking in expired:
-        await booking_repository.update_status(
-            db, booking, "auto_rejected",
-            cancelled_at=datetime.now(timezone.utc),
-        )
-        count += 1
-    return count
+AUTO_REJECT_AFTER_HOURS = 24
+
+
+async def auto_reject_expired(db: AsyncSession, *, batch_size: int | None = None) -> int:
+    """Worker : passe en auto_rejected les pending depuis > 24h. Retourne le nb rejeté.
+
+    UPDATE … RETURNING par lots de SCHEDULER_BATCH_SIZE, commit après chaque lot
+    (verrous de lignes courts, progression conservée si le worker s'arrête).
+    """
+    batch_size = batch_size or get_settings().SCHEDULER_BATCH_SIZE
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=AUTO_REJECT_AFTER_HOURS)
+    total = 0
+    while True:
+        rejected = await booking_repository.auto_reject_pending_batch(db, cutoff, batch_size)
+        await db.commit()
+        total += len(rejected)
+        if len(rejected) < batch_size:
+            return total
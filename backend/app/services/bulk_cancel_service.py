@@ -1,15 +1,31 @@
-"""Service annulation en masse (bulk cancel) — B2-32."""
+"""Service annulation en masse (bulk cancel) — B2-32.
+
+Coût constant en requêtes quelle que soit la taille du lot :
+  1. un SELECT … WHERE id IN (…) AND coach_id = … (contrôle d'appartenance) ;
+  2. un UPDATE … RETURNING, statut tardif / dans les délais calculé en SQL à partir
+     du seuil de la politique du coach (en cache), puis un INSERT groupé des
+     places libérées pour la liste d'attente (worker waitlist.promote) ;
+  3. un SELECT des clients, téléphones déchiffrés en une passe ;
+  4. un INSERT groupé dans l'outbox sms_logs, dans la même transaction — l'envoi
+     est fait par le worker sms.outbox, hors requête HTTP.
+"""
 
 from __future__ import annotations
 
 import uuid
 from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.booking import Booking
+from app.models.coach_profile import CoachProfile
 from app.models.user import User
 from app.repositories import booking_repository
-from app.services import booking_service
+from app.repositories import cancellation_template_repository as tmpl_repo
+from app.repositories.user_repository import user_repository
+from app.services import cancellation_policy_service, sms_outbox_service, waitlist_service
 
 
 class BulkCancelAuthError(Exception):
@@ -24,6 +40,27 @@ class BulkCancelResult:
     failed_clients: list[str] = field(default_factory=list)
 
 
+def _render(template_body: str, client: User, booking: Booking, coach: User) -> str:
+    return (
+        template_body
+        .replace("{prénom}", client.first_name or "")
+        .replace("{date}", booking.scheduled_at.strftime("%d/%m/%Y"))
+        .replace("{heure}", booking.scheduled_at.strftime("%H:%M"))
+        .replace("{coach}", coach.first_name or "")
+    )
+
+
+async def _load_template_body(
+    db: AsyncSession, coach: User, template_id: uuid.UUID
+) -> str | None:
+    q = select(CoachProfile.id).where(CoachProfile.user_id == coach.id)
+    profile_id = (await db.execute(q)).scalar_one_or_none()
+    if profile_id is None:
+        return None
+    template = await tmpl_repo.get_by_id_and_coach(db, template_id, profile_id)
+    return template.body if template else None
+
+
 async def bulk_cancel_bookings(
     db: AsyncSession,
     coach: User,
@@ -36,94 +73,61 @@ async def bulk_cancel_bookings(
     """Annule en masse des séances et envoie les SMS d'annulation.
 
     Atomique pour les annulations DB (rollback si erreur).
-    SMS best-effort : un échec SMS n'annule pas les annulations.
+    SMS mis en file dans la même transaction : sms_sent_count = SMS acceptés
+    dans l'outbox (un échec d'envoi ultérieur est retenté par le worker).
     """
     result = BulkCancelResult()
-
-    # 1. Vérifier que tous les bookings appartiennent au coach
-    bookings = []
-    for bid in booking_ids:
-        booking = await booking_repository.get_by_id(db, bid)
-        if booking is None or booking.coach_id != coach.id:
-            raise BulkCancelAuthError(
-                f"Réservation {bid} introuvable ou n'appartient pas à ce coach"
-            )
-        bookings.append(booking)
-
-    # 2. Annuler chaque séance (DB) — atomique
-    from datetime import datetime, timezone
-    for booking in bookings:
-        if booking.status in ("confirmed", "pending_coach_validation"):
-            await booking_service.coach_cancel_booking(db, coach, booking.id)
-            result.cancelled_count += 1
-
-    # 3. Envoyer les SMS (best-effort)
-    if send_sms and (template_id or custom_message):
-        try:
-            from app.core.sms.provider import get_sms_provider
-            from app.repositories.sms_log_repository import create_log, update_status
-            from app.repositories import cancellation_template_repository as tmpl_repo
-            from app.schemas.cancellation_template import _extract_variables
-            from sqlalchemy import select
-            from app.models.user import User as UserModel
-
-            sms_provider = get_sms_provider()
-
-            # Charger le template si demandé
-            template = None
-            if template_id:
-                from app.models.coach_profile import CoachProfile
-                q = select(CoachProfile).where(CoachProfile.user_id == coach.id)
-                res = await db.execute(q)
-                profile = res.scalar_one_or_none()
-                if profile:
-                    template = await tmpl_repo.get_by_id_and_coach(db, template_id, profile.id)
-
-            for booking in bookings:
-                # Charger les infos client
-                q = select(UserModel).where(UserModel.id == booking.client_id)
-                client = (await db.execute(q)).scalar_one_or_none()
-                if not client or not client.phone:
-                    result.sms_failed_count += 1
-                    result.failed_clients.append(str(booking.client_id))
-                    continue
-
-                # Résoudre le message
-                if template:
-                    body = (
-                        template.body
-                        .replace("{prénom}", client.first_name or "")
-                        .replace("{date}", booking.scheduled_at.strftime("%d/%m/%Y"))
-                        .replace("{heure}", booking.scheduled_at.strftime("%H:%M"))
-                        .replace("{coach}", coach.first_name or "")
-                    )
-                elif custom_message:
-                    body = custom_message
-                else:
-                    continue
-
-                # Créer le log et envoyer
-                sms_log = await create_log(
-                    db, coach.id, client.phone, body,
-                    client_id=client.id, template_id=template_id
-                )
-                sms_result = await sms_provider.send(client.phone, body)
-                if sms_result.success:
-                    await update_status(
-                        db, sms_log, "sent",
-                        provider_message_id=sms_result.provider_message_id
-                    )
-                    result.sms_sent_count += 1
-                else:
-                    await update_status(
-                        db, sms_log, "failed",
-                        error_message=sms_result.error_message
-                    )
-                    result.sms_failed_count += 1
-                    result.failed_clients.append(client.first_name or str(client.id))
-
-        except ImportError:
-            # SMS module pas encore disponible (sous-agent pas fini)
-            pass
+    wanted = list(dict.fromkeys(booking_ids))
+
+    # 1. Appartenance : une requête, tout ID absent = refus global
+    bookings = {
+        b.id: b for b in await booking_repository.get_owned_for_update(db, coach.id, wanted)
+    }
+    missing = [bid for bid in wanted if bid not in bookings]
+    if missing:
+        raise BulkCancelAuthError(
+            f"Réservation {missing[0]} introuvable ou n'appartient pas à ce coach"
+        )
+
+    # 2. Annulation ensembliste — tardive si la séance tombe avant now + seuil
+    policy = await cancellation_policy_service.get_policy(db, coach.id)
+    late_before = datetime.now(timezone.utc) + timedelta(hours=policy.threshold_hours)
+    cancelled = await booking_repository.bulk_coach_cancel(
+        db, coach.id, wanted, late_before=late_before
+    )
+    result.cancelled_count = len(cancelled)
+    await waitlist_service.publish_slot_freed(
+        db, [(coach.id, bookings[bid].scheduled_at) for bid, _ in cancelled], "booking_cancelled"
+    )
+
+    # 3. SMS aux clients des séances effectivement annulées
+    if not (send_sms and (template_id or custom_message) and cancelled):
+        return result
+
+    template_body = await _load_template_body(db, coach, template_id) if template_id else None
+    if template_body is None and not custom_message:
+        return result
+
+    targets = [bookings[bid] for bid, _ in cancelled]
+    clients = await user_repository.get_by_ids(db, [b.client_id for b in targets], "phone")
+
+    outgoing: list[sms_outbox_service.OutgoingSms] = []
+    for booking in targets:
+        client = clients.get(booking.client_id)
+        if client is None or not client.phone:
+            result.sms_failed_count += 1
+            result.failed_clients.append(str(booking.client_id))
+            continue
+        outgoing.append(sms_outbox_service.OutgoingSms(
+            recipient_phone=client.phone,
+            message_body=_render(template_body, client, booking, coach) if template_body else custom_message,
+            coach_id=coach.id,
+            client_id=client.id,
+            template_id=template_id if template_body else None,
+            dedup_key=f"booking_cancel:{booking.id}",
+        ))
+
+    # Même transaction que les annulations ; envoi par le worker sms.outbox
+    result.sms_sent_count = await sms_outbox_service.enqueue(db, outgoing)
 
     return result
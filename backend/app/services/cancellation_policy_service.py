@@ -0,0 +1,169 @@
+"""Service politique d'annulation — résolution en cache, par coach.
+
+Chaque transition de réservation (annulation client/coach, no-show, bulk cancel)
+a besoin du seuil tardif et de noshow_is_due du coach. Plutôt qu'un JOIN
+CancellationPolicy ⋈ CoachProfile par transition :
+
+  - une seule requête (colonnes seules) résout la politique d'un coach — ou de N
+    coachs d'un coup (get_policies) ;
+  - le résultat est mis en cache par coach (users.id), TTL
+    CANCELLATION_POLICY_CACHE_TTL_SECONDS, LRU CANCELLATION_POLICY_CACHE_MAX_SIZE ;
+  - coach_service.set_cancellation_policy invalide l'entrée du coach au COMMIT
+    (hook after_commit) : invalidée avant, l'ancienne politique encore committée
+    pourrait être remise en cache par une lecture concurrente.
+
+Cache par processus : un autre worker voit la nouvelle politique au plus tard à
+l'expiration du TTL.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.models.cancellation_policy import CancellationPolicy
+from app.models.coach_profile import CoachProfile
+
+
+@dataclass(frozen=True)
+class ResolvedPolicy:
+    threshold_hours: int = 24
+    noshow_is_due: bool = True
+    mode: str = "auto"
+
+
+# Coach sans politique : 24h, no-show dû
+DEFAULT_POLICY = ResolvedPolicy()
+
+
+class PolicyCache:
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[uuid.UUID, tuple[float, ResolvedPolicy]] = OrderedDict()
+        self._hits = metrics.counter("cancellation_policy_cache.hits", "Politiques servies sans requête")
+        self._misses = metrics.counter("cancellation_policy_cache.misses", "Politiques lues en base")
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, coach_id: uuid.UUID) -> ResolvedPolicy | None:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(coach_id)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(coach_id, None)
+            self._misses.inc()
+            return None
+        self._entries.move_to_end(coach_id)
+        self._hits.inc()
+        return entry[1]
+
+    def put(self, coach_id: uuid.UUID, policy: ResolvedPolicy) -> None:
+        if not self.enabled:
+            return
+        self._entries.pop(coach_id, None)
+        self._entries[coach_id] = (time.monotonic() + self.ttl_seconds, policy)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, coach_id: uuid.UUID) -> None:
+        self._entries.pop(coach_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits.value,
+            "misses": self._misses.value,
+        }
+
+
+def _make_cache() -> PolicyCache:
+    settings = get_settings()
+    return PolicyCache(
+        max_size=settings.CANCELLATION_POLICY_CACHE_MAX_SIZE,
+        ttl_seconds=settings.CANCELLATION_POLICY_CACHE_TTL_SECONDS,
+    )
+
+
+# Instance singleton
+policy_cache = _make_cache()
+
+_PENDING = "cancellation_policy.pending_invalidations"
+
+
+async def get_policies(
+    db: AsyncSession, coach_ids: Iterable[uuid.UUID]
+) -> dict[uuid.UUID, ResolvedPolicy]:
+    """Politique de chaque coach (users.id) — une requête au plus pour tous les absents du cache."""
+    resolved: dict[uuid.UUID, ResolvedPolicy] = {}
+    missing: set[uuid.UUID] = set()
+    for coach_id in set(coach_ids):
+        cached = policy_cache.get(coach_id)
+        if cached is None:
+            missing.add(coach_id)
+        else:
+            resolved[coach_id] = cached
+
+    if missing:
+        q = (
+            select(
+                CoachProfile.user_id,
+                CancellationPolicy.threshold_hours,
+                CancellationPolicy.noshow_is_due,
+                CancellationPolicy.mode,
+            )
+            .join(CoachProfile, CancellationPolicy.coach_id == CoachProfile.id)
+            .where(CoachProfile.user_id.in_(missing))
+        )
+        found = {
+            row.user_id: ResolvedPolicy(row.threshold_hours, row.noshow_is_due, row.mode)
+            for row in (await db.execute(q)).all()
+        }
+        for coach_id in missing:
+            policy = found.get(coach_id, DEFAULT_POLICY)
+            policy_cache.put(coach_id, policy)
+            resolved[coach_id] = policy
+    return resolved
+
+
+async def get_policy(db: AsyncSession, coach_id: uuid.UUID) -> ResolvedPolicy:
+    """Politique d'annulation du coach (users.id), DEFAULT_POLICY s'il n'en a pas défini."""
+    return (await get_policies(db, [coach_id]))[coach_id]
+
+
+def invalidate(coach_id: uuid.UUID) -> None:
+    """Invalidation immédiate — la modification doit déjà être committée."""
+    policy_cache.invalidate(coach_id)
+
+
+def invalidate_on_commit(db: AsyncSession | Session, coach_id: uuid.UUID) -> None:
+    """Invalide la politique du coach (users.id) au commit de la transaction de `db`."""
+    db.info.setdefault(_PENDING, set()).add(coach_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    for coach_id in session.info.pop(_PENDING, ()):
+        policy_cache.invalidate(coach_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop(_PENDING, None)
@@ -14,6 +14,7 @@ from app.schemas.coach import (
     CoachProfileUpdate,
     CancellationPolicyUpdate,
 )
+from app.services import cancellation_policy_service
 
 
 class ProfileAlreadyExistsError(Exception):
@@ -113,4 +114,6 @@ async def set_cancellation_policy(
     if profile is None:
         raise ProfileNotFoundError("Profil coach introuvable")
     updates = {k: v for k, v in data.model_dump().items() if v is not None}
-    return await coach_repository.upsert_cancellation_policy(db, profile.id, **updates)
+    policy = await coach_repository.upsert_cancellation_policy(db, profile.id, **updates)
+    cancellation_policy_service.invalidate_on_commit(db, user.id)
+    return policy
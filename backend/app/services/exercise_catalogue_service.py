@@ -0,0 +1,169 @@
+"""Index in-process du catalogue d'exercices actifs — générateur de programmes.
+
+Le générateur n'interroge plus exercise_types slot par slot : il travaille sur
+un instantané immuable du catalogue, chargé en une requête puis indexé par
+catégorie, (catégorie, niveau) et muscle primaire.
+
+  - Versionné : toute transaction qui écrit un ExerciseType / ExerciseTypeMuscle
+    via l'ORM incrémente la version au commit → rechargement à l'appel suivant ;
+    un chargement concurrent d'une invalidation n'est pas conservé.
+  - TTL EXERCISE_CATALOGUE_TTL_SECONDS : les écritures d'un autre processus
+    (scripts/seed_exercises.py) sont vues au plus tard à l'expiration
+    (0 = rechargé à chaque génération).
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.models.exercise_type import ExerciseType, ExerciseTypeMuscle
+from app.repositories import performance_repository as repo
+
+_DIRTY_FLAG = "exercise_catalogue_dirty"
+
+
+@dataclass(frozen=True)
+class CatalogueExercise:
+    id: uuid.UUID
+    name_key: str
+    category: str
+    difficulty: str
+    primary_muscles: frozenset[str]
+
+
+class CatalogueIndex:
+    """Instantané du catalogue actif (ordre name_key), lecture seule."""
+
+    def __init__(self, exercises: list[CatalogueExercise], version: int) -> None:
+        self.version = version
+        self.exercises = tuple(exercises)
+        by_category: dict[str, list[CatalogueExercise]] = {}
+        by_level: dict[tuple[str, str], list[CatalogueExercise]] = {}
+        by_muscle: dict[str, list[CatalogueExercise]] = {}
+        for ex in self.exercises:
+            by_category.setdefault(ex.category, []).append(ex)
+            by_level.setdefault((ex.category, ex.difficulty), []).append(ex)
+            for muscle in ex.primary_muscles:
+                by_muscle.setdefault(muscle, []).append(ex)
+        self.by_category = {k: tuple(v) for k, v in by_category.items()}
+        self.by_category_level = {k: tuple(v) for k, v in by_level.items()}
+        self.by_muscle = {k: tuple(v) for k, v in by_muscle.items()}
+        self._matches: dict[tuple, tuple[CatalogueExercise, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.exercises)
+
+    def matching(
+        self, category: str, level: str, muscles: Iterable[str]
+    ) -> tuple[CatalogueExercise, ...]:
+        """Exercices de la catégorie, au niveau, dont un muscle primaire est ciblé (mémoïsé)."""
+        focus = frozenset(muscles)
+        key = (category, level, focus)
+        found = self._matches.get(key)
+        if found is None:
+            found = self._matches[key] = tuple(
+                ex for ex in self.by_category_level.get((category, level), ())
+                if ex.primary_muscles & focus
+            )
+        return found
+
+
+def _build(rows: list, version: int) -> CatalogueIndex:
+    exercises: dict[uuid.UUID, tuple] = {}
+    muscles: dict[uuid.UUID, set[str]] = {}
+    for row in rows:
+        exercises.setdefault(row.id, (row.name_key, row.category, row.difficulty))
+        bucket = muscles.setdefault(row.id, set())
+        if row.muscle_group is not None:
+            bucket.add(row.muscle_group)
+    return CatalogueIndex(
+        [
+            CatalogueExercise(ex_id, name_key, category, difficulty, frozenset(muscles[ex_id]))
+            for ex_id, (name_key, category, difficulty) in exercises.items()
+        ],
+        version,
+    )
+
+
+class ExerciseCatalogue:
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._index: CatalogueIndex | None = None
+        self._expires_at = 0.0
+        self._version = 0
+        self._hits = metrics.counter("exercise_catalogue.hits", "Générations servies par l'index en mémoire")
+        self._loads = metrics.counter("exercise_catalogue.loads", "Chargements du catalogue depuis la BDD")
+        self._invalidations = metrics.counter("exercise_catalogue.invalidations", "Index invalidés")
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    async def get(self, db: AsyncSession) -> CatalogueIndex:
+        """Index courant ; rechargé (une requête) si absent, invalidé ou expiré."""
+        index = self._index
+        if (
+            index is not None
+            and index.version == self._version
+            and self._expires_at > time.monotonic()
+        ):
+            self._hits.inc()
+            return index
+
+        version = self._version
+        index = _build(await repo.get_active_catalogue(db), version)
+        self._loads.inc()
+        if version == self._version:
+            # Pas d'invalidation pendant le chargement → instantané conservé
+            self._index = index
+            self._expires_at = time.monotonic() + self.ttl_seconds
+        return index
+
+    def invalidate(self) -> None:
+        self._version += 1
+        self._index = None
+        self._invalidations.inc()
+
+    def stats(self) -> dict:
+        return {
+            "version": self._version,
+            "size": len(self._index) if self._index is not None else 0,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits.value,
+            "loads": self._loads.value,
+            "invalidations": self._invalidations.value,
+        }
+
+
+# Instance singleton
+exercise_catalogue = ExerciseCatalogue(get_settings().EXERCISE_CATALOGUE_TTL_SECONDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_catalogue_writes(session: Session, flush_context) -> None:
+    """Marque la transaction si elle écrit dans le catalogue."""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (ExerciseType, ExerciseTypeMuscle)):
+            session.info[_DIRTY_FLAG] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    if session.info.pop(_DIRTY_FLAG, False):
+        exercise_catalogue.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY_FLAG, None)
@@ -1,13 +1,17 @@
 """Service — Paramètres de santé, logs, partage."""
 from __future__ import annotations
 
+import base64
+import binascii
 import uuid
-from datetime import datetime
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
 from typing import Optional
 
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.models.health_log import HealthLog
 from app.models.health_parameter import HealthParameter
 from app.models.health_sharing_setting import HealthSharingSetting
@@ -23,6 +27,13 @@ class ParameterNotFoundError(Exception):
     """Le paramètre de santé demandé n'existe pas."""
 
 
+class InvalidCursorError(Exception):
+    """Curseur de pagination illisible."""
+
+
+_MILLI = Decimal("0.001")
+
+
 async def get_active_parameters(db: AsyncSession) -> list[HealthParameter]:
     return await health_repository.get_parameters(db, active_only=True)
 
@@ -31,6 +42,14 @@ async def get_all_parameters(db: AsyncSession) -> list[HealthParameter]:
     return await health_repository.get_parameters(db, active_only=False)
 
 
+def _purged_until() -> date | None:
+    """Dernier jour UTC dont les logs bruts ont pu être purgés (None : rétention illimitée)."""
+    days = get_settings().HEALTH_RAW_RETENTION_DAYS
+    if days <= 0:
+        return None
+    return (datetime.now(timezone.utc) - timedelta(days=days)).date()
+
+
 async def log_measurement(
     db: AsyncSession,
     user_id: uuid.UUID,
@@ -49,6 +68,7 @@ async def log_measurement(
         note=data.note,
         source=data.source,
         logged_at=data.logged_at,
+        purged_until=_purged_until(),
     )
 
 
@@ -67,7 +87,7 @@ async def delete_log(
     user_id: uuid.UUID,
     log_id: uuid.UUID,
 ) -> None:
-    deleted = await health_repository.delete_log(db, log_id, user_id)
+    deleted = await health_repository.delete_log(db, log_id, user_id, _purged_until())
     if not deleted:
         raise LogNotFoundError(f"Log {log_id} introuvable pour cet utilisateur")
 
@@ -105,6 +125,20 @@ async def update_sharing(
     return results
 
 
+def encode_cursor(log: HealthLog) -> str:
+    """Curseur opaque : (logged_at, id) du dernier log de la page."""
+    raw = f"{log.logged_at.isoformat()}|{log.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        logged_at, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(logged_at), uuid.UUID(log_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursorError(cursor) from exc
+
+
 async def get_client_logs(
     db: AsyncSession,
     coach_id: uuid.UUID,
@@ -112,18 +146,57 @@ async def get_client_logs(
     param_id: Optional[uuid.UUID] = None,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
-) -> list[HealthLog]:
-    """Retourne les logs d'un client, filtrés par les paramètres partagés avec ce coach."""
-    all_logs = await health_repository.get_logs(db, client_id, param_id, from_date, to_date)
-    # Filter by sharing settings
-    filtered = []
-    for log in all_logs:
-        is_shared = await health_repository.is_parameter_shared(
-            db, client_id, coach_id, log.parameter_id
-        )
-        if is_shared:
-            filtered.append(log)
-    return filtered
+    *,
+    limit: int = 200,
+    cursor: Optional[str] = None,
+) -> tuple[list[HealthLog], Optional[str]]:
+    """Une page des logs d'un client, filtrés par les paramètres partagés avec ce coach.
+
+    Returns (logs, curseur de la page suivante ou None). Deux requêtes par page
+    (logs + paramètres), quel que soit le nombre de logs.
+    """
+    after = _decode_cursor(cursor) if cursor else None
+    logs = await health_repository.get_shared_logs(
+        db, client_id, coach_id,
+        limit=limit + 1,
+        parameter_id=param_id, from_date=from_date, to_date=to_date, after=after,
+    )
+    if len(logs) <= limit:
+        return logs, None
+    page = logs[:limit]
+    return page, encode_cursor(page[-1])
+
+
+def _value(value) -> float:
+    return float(Decimal(str(value)).quantize(_MILLI))
+
+
+async def get_client_log_buckets(
+    db: AsyncSession,
+    coach_id: uuid.UUID,
+    client_id: uuid.UUID,
+    *,
+    bucket: str,
+    param_id: Optional[uuid.UUID] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+) -> list[dict]:
+    """Mode graphique : min / max / moyenne par paramètre partagé et par jour ou semaine."""
+    rows = await health_repository.get_shared_log_buckets(
+        db, client_id, coach_id,
+        bucket=bucket, parameter_id=param_id, from_date=from_date, to_date=to_date,
+    )
+    return [
+        {
+            "parameter_id": r.parameter_id,
+            "bucket_start": r.bucket,
+            "count": r.count,
+            "min_value": _value(r.min_value),
+            "max_value": _value(r.max_value),
+            "avg_value": _value(r.avg_value),
+        }
+        for r in rows
+    ]
 
 
 async def admin_create_parameter(
@@ -0,0 +1,146 @@
+"""Service séries temporelles santé — tâche health.timeseries.
+
+health_logs et body_measurements sont partitionnées par mois (PostgreSQL,
+migration 019). Chaque passe :
+  1. crée les partitions du mois courant aux HEALTH_PARTITION_MONTHS_AHEAD
+     suivants (les lignes hors plage tombent dans <table>_default) ;
+  2. si HEALTH_RAW_RETENTION_DAYS > 0, purge les logs bruts plus anciens :
+     partitions entièrement expirées détachées puis supprimées, reste par lots
+     DELETE ; le rollup health_log_daily est conservé (graphiques long terme) ;
+  3. compacte les mesures de balance des HEALTH_COMPACTION_LOOKBACK_DAYS jours
+     précédant la limite : une par utilisateur et par jour. L'historique plus
+     ancien, déjà compacté, n'est pas relu ; reprise unique lors de l'activation
+     de la rétention : backfill_body_measurements (scripts/compact_body_measurements.py).
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.repositories import health_timeseries_repository as repo
+
+logger = logging.getLogger(__name__)
+
+_partitions_created = metrics.counter("health_timeseries.partitions_created", "Partitions mensuelles créées")
+_partitions_dropped = metrics.counter("health_timeseries.partitions_dropped", "Partitions expirées supprimées")
+_logs_purged = metrics.counter("health_timeseries.logs_purged", "Logs bruts purgés (hors partitions supprimées)")
+_measurements_compacted = metrics.counter("health_timeseries.measurements_compacted", "Mesures de balance compactées")
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _compaction_start(cutoff: datetime) -> datetime:
+    """Début de la fenêtre compactée à chaque passe (minuit UTC)."""
+    lookback = timedelta(days=get_settings().HEALTH_COMPACTION_LOOKBACK_DAYS)
+    return _midnight((cutoff - lookback).date())
+
+
+async def ensure_partitions(db: AsyncSession, today: date) -> int:
+    """Partitions du mois de `today` aux N mois suivants. Returns le nombre créé."""
+    current = today.replace(day=1)
+    months = [add_months(current, n) for n in range(get_settings().HEALTH_PARTITION_MONTHS_AHEAD + 1)]
+    created = 0
+    for table in repo.TIMESERIES_TABLES:
+        existing = set(await repo.list_partitions(db, table))
+        for month in months:
+            if repo.partition_name(table, month) in existing:
+                continue
+            try:
+                async with db.begin_nested():
+                    await repo.create_partition(db, table, month, add_months(month, 1))
+                created += 1
+            except DBAPIError:
+                # Lignes de ce mois déjà dans la partition DEFAULT : à déplacer à la main
+                logger.warning("Partition %s non créée", repo.partition_name(table, month), exc_info=True)
+    _partitions_created.inc(created)
+    return created
+
+
+async def _drop_expired_partitions(db: AsyncSession, cutoff: datetime) -> int:
+    """Partitions health_logs dont le mois entier précède cutoff."""
+    dropped = 0
+    for name in await repo.list_partitions(db, "health_logs"):
+        month = repo.partition_month("health_logs", name)
+        if month is None:
+            continue
+        end = _midnight(add_months(month, 1))
+        if end <= cutoff:
+            await repo.drop_partition(db, "health_logs", name)
+            dropped += 1
+    _partitions_dropped.inc(dropped)
+    return dropped
+
+
+async def compact(db: AsyncSession, now: datetime) -> int:
+    """Purge / compaction au-delà de HEALTH_RAW_RETENTION_DAYS, commit par lot.
+
+    Returns le nombre de lignes supprimées hors partitions entières.
+    """
+    settings = get_settings()
+    if settings.HEALTH_RAW_RETENTION_DAYS <= 0:
+        return 0
+    cutoff = now - timedelta(days=settings.HEALTH_RAW_RETENTION_DAYS)
+
+    await _drop_expired_partitions(db, cutoff)
+    await db.commit()
+
+    total = 0
+    while True:
+        deleted = await repo.delete_health_logs_before(db, cutoff, settings.SCHEDULER_BATCH_SIZE)
+        await db.commit()
+        total += deleted
+        if deleted < settings.SCHEDULER_BATCH_SIZE:
+            break
+    _logs_purged.inc(total)
+
+    compacted = await repo.compact_body_measurements(db, _compaction_start(cutoff), cutoff)
+    await db.commit()
+    _measurements_compacted.inc(compacted)
+    return total + compacted
+
+
+async def backfill_body_measurements(db: AsyncSession, now: datetime) -> int:
+    """Reprise unique : compacte l'historique antérieur à la fenêtre de compact.
+
+    Mois par mois (une partition par DELETE), commit après chaque mois.
+    Returns le nombre de mesures supprimées.
+    """
+    settings = get_settings()
+    if settings.HEALTH_RAW_RETENTION_DAYS <= 0:
+        return 0
+    end = _compaction_start(now - timedelta(days=settings.HEALTH_RAW_RETENTION_DAYS))
+    oldest = await repo.oldest_body_measurement(db)
+    if oldest is None:
+        return 0
+    total = 0
+    month = oldest.astimezone(timezone.utc).date().replace(day=1)
+    while _midnight(month) < end:
+        next_month = add_months(month, 1)
+        total += await repo.compact_body_measurements(
+            db, _midnight(month), min(_midnight(next_month), end)
+        )
+        await db.commit()
+        month = next_month
+    _measurements_compacted.inc(total)
+    return total
+
+
+async def run_maintenance(db: AsyncSession) -> int:
+    """Tâche planifiée : partitions à venir puis purge / compaction."""
+    now = datetime.now(timezone.utc)
+    created = await ensure_partitions(db, now.date())
+    await db.commit()
+    return created + await compact(db, now)
@@ -0,0 +1,218 @@
+"""
+Service rotation des clés Fernet — re-chiffrement en ligne, reprenable.
+
+Procédure (sans interruption de service) :
+  1. Déployer FIELD_ENCRYPTION_KEY="nouvelle,ancienne" (idem TOKEN_ENCRYPTION_KEY)
+     sur tous les processus : la nouvelle clé chiffre, les deux déchiffrent.
+  2. Lancer scripts/rotate_keys.py : chaque table portant une colonne
+     EncryptedString/EncryptedToken est parcourue par lots keyset (id), les tokens
+     encore sous une ancienne clé sont réécrits par UPDATE groupé.
+  3. Quand GET /admin/key-rotation indique toutes les tables "completed",
+     retirer l'ancienne clé de la configuration.
+
+Le job est idempotent et reprend après le dernier id traité (key_rotation_checkpoints).
+Un changement de clé primaire (empreinte différente) relance un parcours complet.
+Débit plafonné à KEY_ROTATION_ROWS_PER_SECOND lignes/s pour épargner la base.
+"""
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from cryptography.fernet import InvalidToken
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.models  # noqa: F401 — enregistre toutes les tables dans Base.metadata
+from app.config import get_settings
+from app.core.encrypted_type import EncryptedString, EncryptedToken
+from app.core.encryption import primary_key_fingerprint, rotate_value
+from app.core.metrics import metrics
+from app.database import Base
+from app.models.key_rotation_checkpoint import KeyRotationCheckpoint
+from app.repositories import key_rotation_repository
+
+logger = logging.getLogger(__name__)
+
+# Colonnes Text chiffrées manuellement (app/auth/token_crypto.py) — invisibles pour
+# la découverte par type, mais sous TOKEN_ENCRYPTION_KEY elles aussi.
+EXTRA_TOKEN_COLUMNS: dict[str, list[str]] = {
+    "oauth_tokens": ["access_token_enc", "refresh_token_enc"],
+}
+
+_rows_scanned = metrics.counter("key_rotation.rows_scanned", "Lignes parcourues par la rotation")
+_rows_rewritten = metrics.counter("key_rotation.rows_rewritten", "Tokens re-chiffrés")
+_rows_failed = metrics.counter(
+    "key_rotation.rows_failed", "Tokens indéchiffrables avec les clés configurées (ignorés)"
+)
+
+
+@dataclass(frozen=True)
+class RotationTarget:
+    table_name: str
+    columns: tuple[str, ...]
+    key_kind: str  # "field" | "token"
+
+    @property
+    def tokens(self) -> bool:
+        return self.key_kind == "token"
+
+
+def discover_targets() -> list[RotationTarget]:
+    """Toutes les (table, clé) à parcourir, déduites des types de colonnes."""
+    found: dict[tuple[str, str], list[str]] = {}
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            if isinstance(column.type, EncryptedToken):
+                kind = "token"
+            elif isinstance(column.type, EncryptedString):
+                kind = "field"
+            else:
+                continue
+            found.setdefault((table.name, kind), []).append(column.name)
+    for table_name, columns in EXTRA_TOKEN_COLUMNS.items():
+        existing = found.setdefault((table_name, "token"), [])
+        existing.extend(c for c in columns if c not in existing)
+    return [
+        RotationTarget(table_name=table_name, columns=tuple(columns), key_kind=kind)
+        for (table_name, kind), columns in sorted(found.items())
+    ]
+
+
+async def rotate_target(
+    db: AsyncSession,
+    target: RotationTarget,
+    *,
+    batch_size: int | None = None,
+    rows_per_second: float | None = None,
+    max_batches: int | None = None,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+) -> KeyRotationCheckpoint:
+    """
+    Re-chiffre une table avec la clé primaire courante, lot par lot.
+    Commit après chaque lot (checkpoint inclus) → reprise exacte après interruption.
+    max_batches borne le travail de cet appel (tests, exécutions découpées).
+    """
+    settings = get_settings()
+    batch_size = batch_size or settings.KEY_ROTATION_BATCH_SIZE
+    if rows_per_second is None:
+        rows_per_second = settings.KEY_ROTATION_ROWS_PER_SECOND
+    fingerprint = primary_key_fingerprint(tokens=target.tokens)
+
+    checkpoint = await key_rotation_repository.get_checkpoint(db, target.key_kind, target.table_name)
+    if checkpoint is None or checkpoint.key_fingerprint != fingerprint:
+        checkpoint = await key_rotation_repository.start_checkpoint(
+            db, target.key_kind, target.table_name, fingerprint, existing=checkpoint
+        )
+        await db.commit()
+    if checkpoint.completed_at is not None:
+        return checkpoint
+
+    columns = list(target.columns)
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        started = time.monotonic()
+        rows = await key_rotation_repository.fetch_batch(
+            db, target.table_name, columns, after_id=checkpoint.last_id, limit=batch_size
+        )
+        if not rows:
+            await key_rotation_repository.advance_checkpoint(
+                db, checkpoint, last_id=None, scanned=0, rewritten=0, completed=True
+            )
+            await db.commit()
+            logger.info(
+                "Rotation %s/%s terminée : %d lignes, %d tokens réécrits",
+                target.key_kind, target.table_name,
+                checkpoint.rows_scanned, checkpoint.rows_rewritten,
+            )
+            break
+
+        rewritten = 0
+        for index, column in enumerate(columns, start=1):
+            rewrites = []
+            for row in rows:
+                old = row[index]
+                if old is None:
+                    continue
+                try:
+                    new = rotate_value(old, tokens=target.tokens)
+                except InvalidToken:
+                    _rows_failed.inc()
+                    logger.warning(
+                        "Rotation %s : token indéchiffrable ignoré (id=%s, colonne=%s)",
+                        target.table_name, row[0], column,
+                    )
+                    continue
+                if new is not None:
+                    rewrites.append((row[0], old, new))
+            rewritten += await key_rotation_repository.bulk_rewrite(
+                db, target.table_name, column, rewrites
+            )
+
+        await key_rotation_repository.advance_checkpoint(
+            db, checkpoint, last_id=rows[-1][0], scanned=len(rows), rewritten=rewritten
+        )
+        await db.commit()
+        _rows_scanned.inc(len(rows))
+        _rows_rewritten.inc(rewritten)
+        batches += 1
+
+        if rows_per_second > 0:
+            budget = len(rows) / rows_per_second
+            elapsed = time.monotonic() - started
+            if budget > elapsed:
+                await sleep(budget - elapsed)
+
+    return checkpoint
+
+
+async def rotate_all(
+    db: AsyncSession,
+    *,
+    key_kinds: tuple[str, ...] = ("field", "token"),
+    **kwargs,
+) -> list[KeyRotationCheckpoint]:
+    """Parcourt toutes les cibles des clés demandées (voir rotate_target pour kwargs)."""
+    return [
+        await rotate_target(db, target, **kwargs)
+        for target in discover_targets()
+        if target.key_kind in key_kinds
+    ]
+
+
+async def get_progress(db: AsyncSession) -> list[dict]:
+    """
+    État de la rotation par (clé, table). status :
+      pending   → jamais parcourue, ou parcourue sous une ancienne clé primaire
+      running   → parcours en cours / interrompu (reprendra après last_id)
+      completed → tous les tokens sont sous la clé primaire courante
+    """
+    checkpoints = {
+        (c.key_kind, c.table_name): c for c in await key_rotation_repository.list_checkpoints(db)
+    }
+    fingerprints = {
+        "field": primary_key_fingerprint(tokens=False),
+        "token": primary_key_fingerprint(tokens=True),
+    }
+    progress = []
+    for target in discover_targets():
+        checkpoint = checkpoints.get((target.key_kind, target.table_name))
+        current = checkpoint is not None and checkpoint.key_fingerprint == fingerprints[target.key_kind]
+        if not current:
+            status = "pending"
+        elif checkpoint.completed_at is None:
+            status = "running"
+        else:
+            status = "completed"
+        progress.append({
+            "key_kind": target.key_kind,
+            "table_name": target.table_name,
+            "columns": list(target.columns),
+            "status": status,
+            "rows_scanned": checkpoint.rows_scanned if current else 0,
+            "rows_rewritten": checkpoint.rows_rewritten if current else 0,
+            "started_at": checkpoint.started_at if current else None,
+            "updated_at": checkpoint.updated_at if current else None,
+            "completed_at": checkpoint.completed_at if current else None,
+        })
+    return progress
@@ -0,0 +1,35 @@
+"""Service maintenance — tâches de fond planifiées dans le lifespan (voir app/core/scheduler.py).
+
+  booking.auto_reject      pending_coach_validation > 24h → auto_rejected
+  waitlist.promote         places libérées → suivant notifié ; fenêtres de 30 min échues (roue) → expired + suivant
+  package.low_alerts       forfaits à ≤ 2 séances → push client (une seule fois)
+  sms.outbox               SMS pending de sms_logs → provider (retry avec backoff)
+  push.dispatch            push_intents pending → multicast provider, tokens morts désactivés
+  progression.nightly      moteur de progression sur tous les clients ayant un plan actif
+  health.timeseries        partitions santé à venir, purge des logs bruts / compaction balance
+"""
+
+from __future__ import annotations
+
+from app.config import get_settings
+from app.core.scheduler import Scheduler
+from app.database import engine
+from app.services import (
+    booking_service, health_timeseries_service, payment_service, progression_service,
+    sms_outbox_service, waitlist_service,
+)
+from app.services.notification_service import notification_service
+
+
+def build_scheduler() -> Scheduler:
+    settings = get_settings()
+    interval = settings.SCHEDULER_INTERVAL_SECONDS
+    scheduler = Scheduler(engine)
+    scheduler.add_job("booking.auto_reject", booking_service.auto_reject_expired, interval)
+    scheduler.add_job("waitlist.promote", waitlist_service.run_promotion_worker, settings.WAITLIST_PROMOTE_POLL_SECONDS)
+    scheduler.add_job("package.low_alerts", payment_service.send_low_package_alerts, interval)
+    scheduler.add_job("sms.outbox", sms_outbox_service.drain, settings.SMS_OUTBOX_POLL_SECONDS)
+    scheduler.add_job("push.dispatch", notification_service.dispatch, settings.PUSH_DISPATCH_POLL_SECONDS)
+    scheduler.add_job("progression.nightly", progression_service.run_nightly, settings.PROGRESSION_NIGHTLY_SECONDS)
+    scheduler.add_job("health.timeseries", health_timeseries_service.run_maintenance, settings.HEALTH_TIMESERIES_SECONDS)
+    return scheduler
@@ -1,17 +1,170 @@
-"""Service notifications push — B2-16."""
-import logging
+"""Service notifications push — B2-16 / B2-17.
+
+Les services métier n'envoient rien eux-mêmes : send_push / send_push_many
+écrivent des intentions (push_intents) dans la transaction courante.
+
+Le worker push.dispatch (maintenance_service) les envoie par lots :
+  1. réservation UPDATE … RETURNING (SKIP LOCKED, bail PUSH_DISPATCH_LEASE_SECONDS) ;
+  2. locales des destinataires et tokens actifs : une requête chacun pour le lot ;
+  3. regroupement par (locale, clés i18n, paramètres, data) → t() une fois par groupe ;
+  4. envoi multicast par tranches de provider.max_tokens_per_call tokens ;
+  5. tokens signalés morts par le provider désactivés en un UPDATE ;
+  6. statuts en un UPDATE groupé — échec → nouvel essai avec backoff,
+     `failed` après PUSH_MAX_ATTEMPTS ; aucun token actif → `no_token`.
+"""
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.core.push.provider import get_push_provider
+from app.models.push_intent import PushIntent
+from app.repositories import push_intent_repository, push_token_repository
+from app.repositories.user_repository import user_repository
 from app.utils.i18n import t
 
-logger = logging.getLogger(__name__)
+_sent = metrics.counter("push.sent", "Notifications délivrées à au moins un appareil")
+_no_token = metrics.counter("push.no_token", "Notifications sans appareil actif")
+_retried = metrics.counter("push.retried", "Notifications reprogrammées après échec")
+_failed = metrics.counter("push.failed", "Notifications abandonnées (essais épuisés)")
+_pruned = metrics.counter("push.tokens_pruned", "Tokens morts désactivés")
+_renders = metrics.counter("push.renders", "Rendus i18n (un par groupe de lot)")
+
+
+def _group_key(locale: str, intent: PushIntent) -> tuple[str, str, str, str, str]:
+    return (
+        locale,
+        intent.title_key,
+        intent.body_key,
+        json.dumps(intent.params, sort_keys=True, default=str),
+        json.dumps(intent.data, sort_keys=True, default=str),
+    )
+
+
+def retry_delay(attempt: int) -> timedelta:
+    """Backoff exponentiel après l'essai n° `attempt` (1, 2, …)."""
+    return timedelta(seconds=get_settings().PUSH_RETRY_BASE_SECONDS * 2 ** max(attempt - 1, 0))
 
 
 class NotificationService:
-    async def send_push(self, user_id, title_key: str, body_key: str, data: dict, locale: str = "fr") -> bool:
-        """Stub Firebase — à remplacer avec firebase_admin en Phase 6."""
-        title = t(title_key, locale)
-        body = t(body_key, locale)
-        logger.info(f"[PUSH STUB] user={user_id} title={title!r} body={body!r} data={data}")
-        return True
+
+    async def send_push(
+        self, db: AsyncSession, user_id: uuid.UUID, title_key: str, body_key: str,
+        data: dict, **params,
+    ) -> None:
+        """Met une notification en file pour un utilisateur. params → interpolation i18n."""
+        await self.send_push_many(db, [user_id], title_key, body_key, data, **params)
+
+    async def send_push_many(
+        self, db: AsyncSession, user_ids: list[uuid.UUID], title_key: str, body_key: str,
+        data: dict, **params,
+    ) -> int:
+        """Même notification pour plusieurs utilisateurs — un INSERT, pas de commit.
+
+        Le texte est rendu à l'envoi, dans la locale de chaque destinataire.
+        """
+        return await push_intent_repository.enqueue_bulk(db, [
+            {"user_id": user_id, "title_key": title_key, "body_key": body_key,
+             "params": params, "data": data}
+            for user_id in dict.fromkeys(user_ids)
+        ])
+
+    async def send_push_batch(
+        self, db: AsyncSession, title_key: str, body_key: str,
+        messages: list[tuple[uuid.UUID, dict, dict]],
+    ) -> int:
+        """Même notification, data et paramètres propres à chaque message — un INSERT.
+
+        messages : [(user_id, data, params), …]
+        """
+        return await push_intent_repository.enqueue_bulk(db, [
+            {"user_id": user_id, "title_key": title_key, "body_key": body_key,
+             "params": params, "data": data}
+            for user_id, data, params in messages
+        ])
+
+    async def dispatch(self, db: AsyncSession, *, batch_size: int | None = None) -> int:
+        """Worker : envoie toutes les notifications dues, commit après chaque lot.
+
+        Returns le nombre d'intentions traitées.
+        """
+        settings = get_settings()
+        batch_size = batch_size or settings.PUSH_DISPATCH_BATCH_SIZE
+        total = 0
+        while True:
+            intents = await push_intent_repository.claim_due_batch(
+                db, batch_size, settings.PUSH_DISPATCH_LEASE_SECONDS
+            )
+            await db.commit()
+            if not intents:
+                return total
+            await self._send_batch(db, intents)
+            await db.commit()
+            total += len(intents)
+            if len(intents) < batch_size:
+                return total
+
+    async def _send_batch(self, db: AsyncSession, intents: list[PushIntent]) -> None:
+        settings = get_settings()
+        provider = get_push_provider()
+        user_ids = [i.user_id for i in intents]
+        locales = await user_repository.get_locales(db, user_ids)
+        tokens_by_user = await push_token_repository.get_active_tokens_for_users(db, user_ids)
+
+        groups: dict[tuple, list[PushIntent]] = {}
+        for intent in intents:
+            locale = locales.get(intent.user_id, "fr-FR")
+            groups.setdefault(_group_key(locale, intent), []).append(intent)
+
+        delivered: set[uuid.UUID] = set()   # intentions reçues par au moins un appareil
+        dead_tokens: list[str] = []
+        token_failures: set[uuid.UUID] = set()  # échecs réessayables
+        for (locale, *_), group in groups.items():
+            first = group[0]
+            title = t(first.title_key, locale, **first.params)
+            body = t(first.body_key, locale, **first.params)
+            _renders.inc()
+            data = {k: str(v) for k, v in first.data.items()}
+
+            owners: dict[str, list[uuid.UUID]] = {}  # token → intentions du groupe
+            for intent in group:
+                for token in tokens_by_user.get(intent.user_id, []):
+                    owners.setdefault(token, []).append(intent.id)
+            tokens = list(owners)
+            for start in range(0, len(tokens), provider.max_tokens_per_call):
+                chunk = tokens[start:start + provider.max_tokens_per_call]
+                for result in await provider.send_multicast(chunk, title, body, data):
+                    if result.success:
+                        delivered.update(owners[result.token])
+                    elif result.unregistered:
+                        dead_tokens.append(result.token)
+                    else:
+                        token_failures.update(owners[result.token])
+
+        _pruned.inc(await push_token_repository.deactivate_tokens(db, dead_tokens))
+
+        now = datetime.now(timezone.utc)
+        outcomes = []
+        for intent in intents:
+            outcome = {"id": intent.id, "sent_at": None, "next_attempt_at": None}
+            if intent.id in delivered:
+                outcome.update(status="sent", sent_at=now)
+                _sent.inc()
+            elif intent.id not in token_failures:
+                # Aucun token actif, ou uniquement des tokens morts
+                outcome.update(status="no_token")
+                _no_token.inc()
+            elif intent.attempts >= settings.PUSH_MAX_ATTEMPTS:
+                outcome.update(status="failed")
+                _failed.inc()
+            else:
+                outcome.update(status="pending", next_attempt_at=now + retry_delay(intent.attempts))
+                _retried.inc()
+            outcomes.append(outcome)
+        await push_intent_repository.record_outcomes(db, outcomes)
 
 
 notification_service = NotificationService()
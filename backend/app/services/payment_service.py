@@ -6,9 +6,11 @@ import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.models.user import User
 from app.repositories import payment_repository, coach_repository
 from app.schemas.payment import PackageCreate, PaymentRecord, HoursSummary
+from app.services.notification_service import notification_service
 
 
 class PackageNotFoundError(Exception):
@@ -19,6 +21,9 @@ class PackageExhaustedError(Exception):
     pass
 
 
+LOW_PACKAGE_THRESHOLD = 2  # alerte "2 séances restantes"
+
+
 # ── Forfaits ──────────────────────────────────────────────────────────────────
 
 async def create_package_for_client(
@@ -58,12 +63,46 @@ async def check_package_alerts(
     pkg = await payment_repository.get_active_package(db, client_id, coach.id)
     if pkg is None or pkg.alert_sent:
         return False
-    if pkg.sessions_remaining <= 2:
+    if pkg.sessions_remaining <= LOW_PACKAGE_THRESHOLD:
         await payment_repository.mark_alert_sent(db, pkg)
         return True
     return False
 
 
+async def send_low_package_alerts(db: AsyncSession, *, batch_size: int | None = None) -> int:
+    """Worker : alerte '2 séances restantes' pour tous les forfaits concernés.
+
+    Les forfaits sont réclamés par UPDATE … RETURNING (alert_sent=True) et les
+    notifications du lot mises en file (un INSERT) dans la même transaction →
+    ni doublon ni perte.
+    Commit après chaque lot. Retourne le nb d'alertes.
+    """
+    batch_size = batch_size or get_settings().SCHEDULER_BATCH_SIZE
+    total = 0
+    while True:
+        claimed = await payment_repository.claim_low_package_alerts_batch(
+            db, LOW_PACKAGE_THRESHOLD, batch_size
+        )
+        # Notifications du lot en file dans la même transaction que la réservation des alertes
+        await notification_service.send_push_batch(
+            db,
+            "notification.package_low.title",
+            "notification.package_low.body",
+            [
+                (
+                    client_id,
+                    {"type": "package_low", "package_id": str(package_id)},
+                    {"name": name, "remaining": remaining},
+                )
+                for package_id, client_id, name, remaining in claimed
+            ],
+        )
+        await db.commit()
+        total += len(claimed)
+        if len(claimed) < batch_size:
+            return total
+
+
 # ── Paiements ──────────────────────────────────────────────────────────────────
 
 async def record_payment(
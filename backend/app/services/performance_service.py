@@ -7,12 +7,16 @@ from datetime import datetime, timedelta, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.exercise_set import ExerciseSet
+from app.models.performance_session import PerformanceSession
 from app.models.user import User
 from app.repositories import performance_repository as repo
 from app.schemas.performance import (
     PerformanceSessionCreate,
     PerformanceSessionUpdate,
 )
+from app.services import personal_record_service, progression_service, training_rollup_service
+from app.services.notification_service import notification_service
 
 
 class SessionNotFoundError(Exception):
@@ -31,6 +35,23 @@ class EditWindowExpiredError(Exception):
 EDIT_WINDOW_HOURS = 48
 
 
+def _build_sets(session_id: uuid.UUID, sets_data: list) -> list[ExerciseSet]:
+    return [
+        ExerciseSet(
+            id=uuid.uuid4(),
+            session_id=session_id,
+            exercise_type_id=s.exercise_type_id,
+            machine_id=s.machine_id,
+            set_order=s.set_order,
+            sets_count=s.sets_count,
+            reps=s.reps,
+            weight_kg=s.weight_kg,
+            notes=s.notes,
+        )
+        for s in sets_data
+    ]
+
+
 def _assert_edit_window(session_created_at: datetime) -> None:
     """Vérifie qu'on est dans la fenêtre de 48h."""
     now = datetime.now(timezone.utc)
@@ -49,49 +70,67 @@ async def create_session(
     data: PerformanceSessionCreate,
     *,
     entered_by_id: uuid.UUID | None = None,
-) -> object:
+) -> PerformanceSession:
     """Crée une session de performance avec ses sets.
     Détecte automatiquement les nouveaux PRs.
     """
-    session = await repo.create_session(
-        db,
-        user_id=user.id,
-        session_type=data.session_type,
-        booking_id=data.booking_id,
-        entered_by_id=entered_by_id,
-        gym_id=data.gym_id,
-        session_date=data.session_date,
-        duration_min=data.duration_min,
-        feeling=data.feeling,
+    (session,) = await create_sessions(db, user, [data], entered_by_id=entered_by_id)
+    return session
+
+
+async def create_sessions(
+    db: AsyncSession,
+    user: User,
+    items: list[PerformanceSessionCreate],
+    *,
+    entered_by_id: uuid.UUID | None = None,
+) -> list[PerformanceSession]:
+    """Crée un lot de sessions (synchro hors ligne) — ordre de la requête conservé.
+
+    PRs calculés en une passe sur tout le lot (ordre chronologique), puis un
+    INSERT multi-lignes par table. Les objets retournés sont complets (sets
+    compris) : pas de rechargement. Une seule notification pour le lot.
+    """
+    now = datetime.now(timezone.utc)
+    sessions = []
+    for data in items:
+        session_id = uuid.uuid4()
+        session = PerformanceSession(
+            id=session_id,
+            user_id=user.id,
+            session_type=data.session_type,
+            booking_id=data.booking_id,
+            entered_by_id=entered_by_id,
+            gym_id=data.gym_id,
+            session_date=data.session_date,
+            duration_min=data.duration_min,
+            feeling=data.feeling,
+            strava_activity_id=None,
+            created_at=now,
+        )
+        session.exercise_sets = _build_sets(session_id, data.exercise_sets)
+        sessions.append(session)
+
+    pr_counts = await personal_record_service.apply_sessions(db, user.id, sessions)
+    await repo.insert_sessions(db, sessions)
+    await training_rollup_service.refresh(db, user.id, [s.session_date for s in sessions])
+    await progression_service.evaluate_session(
+        db, user.id, {s.exercise_type_id for session in sessions for s in session.exercise_sets}
     )
 
-    # Ajouter les sets + détecter les PRs
-    for set_data in data.exercise_sets:
-        is_pr = False
-        if set_data.weight_kg is not None:
-            max_prev = await repo.get_max_weight_for_exercise(
-                db, user.id, set_data.exercise_type_id
-            )
-            if max_prev is None or set_data.weight_kg > max_prev:
-                is_pr = True
-
-        await repo.add_set(
+    pr_count = sum(pr_counts.values())
+    if pr_count:
+        # Séance la plus récente ayant battu un record
+        latest = max((s for s in sessions if pr_counts[s.id]), key=lambda s: s.session_date)
+        await notification_service.send_push(
             db,
-            session_id=session.id,
-            exercise_type_id=set_data.exercise_type_id,
-            machine_id=set_data.machine_id,
-            set_order=set_data.set_order,
-            sets_count=set_data.sets_count,
-            reps=set_data.reps,
-            weight_kg=set_data.weight_kg,
-            notes=set_data.notes,
-            is_pr=is_pr,
+            user.id,
+            "notification.new_pr.title",
+            "notification.new_pr.body",
+            {"type": "new_pr", "session_id": str(latest.id)},
+            count=pr_count,
         )
-
-    # TODO B2-17 : notifier si nouveau PR détecté
-
-    # Recharger avec sets
-    return await repo.get_by_id(db, session.id)
+    return sessions
 
 
 async def update_session(
@@ -107,6 +146,7 @@ async def update_session(
     if session.user_id != user.id:
         raise NotAuthorizedError("Pas votre session")
     _assert_edit_window(session.created_at)
+    previous_date = session.session_date
 
     # Mise à jour des champs simples
     update_fields = {}
@@ -119,22 +159,19 @@ async def update_session(
     if update_fields:
         await repo.update_session(db, session, **update_fields)
 
-    # Mise à jour des sets (replace all)
+    # Mise à jour des sets (replace all) — records recalculés sans les anciens sets
     if data.exercise_sets is not None:
-        sets_dicts = [
-            {
-                "exercise_type_id": s.exercise_type_id,
-                "machine_id": s.machine_id,
-                "set_order": s.set_order,
-                "sets_count": s.sets_count,
-                "reps": s.reps,
-                "weight_kg": s.weight_kg,
-                "notes": s.notes,
-                "is_pr": False,  # recalcul simplifié
-            }
-            for s in data.exercise_sets
-        ]
-        await repo.replace_sets(db, session, sets_dicts)
+        await personal_record_service.forget_sets(db, user.id, list(session.exercise_sets))
+        new_sets = _build_sets(session.id, data.exercise_sets)
+        await personal_record_service.apply_sets(
+            db, user.id, new_sets, session.id, session.session_date
+        )
+        await repo.replace_sets(db, session, new_sets)
+    elif data.session_date is not None:
+        await repo.move_record_dates(db, session.id, session.session_date)
+
+    if update_fields or data.exercise_sets is not None:
+        await training_rollup_service.refresh(db, user.id, [previous_date, session.session_date])
 
     return await repo.get_by_id(db, session_id)
 
@@ -149,7 +186,9 @@ async def delete_session(
     if session.user_id != user.id:
         raise NotAuthorizedError("Pas votre session")
     _assert_edit_window(session.created_at)
+    await personal_record_service.forget_sets(db, user.id, list(session.exercise_sets))
     await repo.delete_session(db, session)
+    await training_rollup_service.refresh(db, user.id, [session.session_date])
 
 
 async def get_history(
@@ -184,7 +223,15 @@ async def get_progression(
 async def get_week_dashboard(
     db: AsyncSession, user: User, week_start: datetime
 ) -> dict:
-    return await repo.get_week_stats(db, user.id, week_start)
+    return await training_rollup_service.get_week_stats(db, user.id, week_start)
+
+
+async def get_clients_week_dashboard(
+    db: AsyncSession, coach: User, week_start: datetime, *, statuses: list[str] | None = None
+) -> list[dict]:
+    return await training_rollup_service.get_clients_week_stats(
+        db, coach.id, week_start, statuses=statuses
+    )
 
 
 async def get_personal_records(db: AsyncSession, user: User) -> list:
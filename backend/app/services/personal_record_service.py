@@ -0,0 +1,178 @@
+"""Service records personnels — index incrémental (table personal_records).
+
+Un set saisi est comparé au record courant de son exercice — une requête pour
+tous les exercices de la séance — au lieu d'un max() sur tout l'historique pour
+chaque set. Records suivis : charge max, 1RM estimé (Epley), volume max d'un set.
+
+Suppression ou modification d'un set détenteur d'un record : seul l'exercice
+concerné est recalculé, à partir de l'historique restant rejoué dans l'ordre.
+Verrou consultatif par utilisateur : deux saisies concurrentes ne peuvent pas
+perdre de mise à jour du même record.
+"""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import advisory_lock
+from app.models.exercise_set import ExerciseSet
+from app.models.performance_session import PerformanceSession
+from app.models.personal_record import PersonalRecord
+from app.repositories import performance_repository as repo
+
+_CENT = Decimal("0.01")
+
+
+def estimate_1rm(weight_kg: Decimal | None, reps: int | None) -> Decimal | None:
+    """1RM estimé (Epley) : charge × (1 + reps/30). 1 rep → la charge elle-même."""
+    if weight_kg is None or not reps:
+        return None
+    if reps == 1:
+        return Decimal(weight_kg).quantize(_CENT)
+    value = Decimal(weight_kg) * (1 + Decimal(reps) / 30)
+    return value.quantize(_CENT, rounding=ROUND_HALF_UP)
+
+
+def set_volume(weight_kg: Decimal | None, reps: int | None) -> Decimal | None:
+    """Volume d'un set : charge × reps."""
+    if weight_kg is None or not reps:
+        return None
+    return (Decimal(weight_kg) * reps).quantize(_CENT)
+
+
+def _apply(
+    record: PersonalRecord,
+    set_id: uuid.UUID,
+    session_id: uuid.UUID,
+    session_date: datetime,
+    weight_kg: Decimal,
+    reps: int | None,
+) -> bool:
+    """Intègre un set au record. True si la charge bat strictement le record."""
+    is_pr = record.max_weight_kg is None or weight_kg > record.max_weight_kg
+    if is_pr:
+        record.max_weight_kg = weight_kg
+        record.max_weight_reps = reps
+        record.max_weight_set_id = set_id
+        record.max_weight_session_id = session_id
+        record.max_weight_at = session_date
+
+    e1rm = estimate_1rm(weight_kg, reps)
+    if e1rm is not None and (record.best_e1rm_kg is None or e1rm > record.best_e1rm_kg):
+        record.best_e1rm_kg = e1rm
+        record.best_e1rm_set_id = set_id
+
+    volume = set_volume(weight_kg, reps)
+    if volume is not None and (record.max_volume_kg is None or volume > record.max_volume_kg):
+        record.max_volume_kg = volume
+        record.max_volume_set_id = set_id
+    return is_pr
+
+
+def _reset(record: PersonalRecord) -> None:
+    for field in (
+        "max_weight_kg", "max_weight_reps", "max_weight_set_id", "max_weight_session_id",
+        "max_weight_at", "best_e1rm_kg", "best_e1rm_set_id", "max_volume_kg", "max_volume_set_id",
+    ):
+        setattr(record, field, None)
+
+
+async def apply_sets(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    sets: list[ExerciseSet],
+    session_id: uuid.UUID,
+    session_date: datetime,
+) -> int:
+    """Met à jour les records avec les nouveaux sets d'une séance (ids déjà attribués).
+
+    Renseigne `is_pr` sur chaque set, dans l'ordre de saisie.
+    Returns le nombre de sets qui battent un record de charge.
+    """
+    (pr_count,) = await _apply_batch(db, user_id, [(session_id, session_date, sets)])
+    return pr_count
+
+
+async def apply_sessions(
+    db: AsyncSession, user_id: uuid.UUID, sessions: list[PerformanceSession]
+) -> dict[uuid.UUID, int]:
+    """Lot de séances (synchro hors ligne) : une lecture des records pour tout le lot,
+    séances rejouées dans l'ordre chronologique.
+
+    Returns {session_id: nombre de PR}.
+    """
+    ordered = sorted(sessions, key=lambda s: s.session_date)
+    counts = await _apply_batch(
+        db, user_id, [(s.id, s.session_date, s.exercise_sets) for s in ordered]
+    )
+    return {s.id: n for s, n in zip(ordered, counts, strict=True)}
+
+
+async def _apply_batch(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    batches: list[tuple[uuid.UUID, datetime, list[ExerciseSet]]],
+) -> list[int]:
+    counts = [0] * len(batches)
+    loaded = []
+    for _, _, sets in batches:
+        for ex_set in sets:
+            ex_set.is_pr = False
+            if ex_set.weight_kg is not None:
+                loaded.append(ex_set)
+    if not loaded:
+        return counts
+
+    await advisory_lock.xact_lock(db, advisory_lock.lock_key("personal_records", user_id))
+    records = await repo.get_records(db, user_id, {s.exercise_type_id for s in loaded})
+
+    for i, (session_id, session_date, sets) in enumerate(batches):
+        for ex_set in sets:
+            if ex_set.weight_kg is None:
+                continue
+            record = records.get(ex_set.exercise_type_id)
+            if record is None:
+                record = PersonalRecord(user_id=user_id, exercise_type_id=ex_set.exercise_type_id)
+                records[ex_set.exercise_type_id] = record
+                db.add(record)
+            if _apply(record, ex_set.id, session_id, session_date, ex_set.weight_kg, ex_set.reps):
+                ex_set.is_pr = True
+                counts[i] += 1
+    await db.flush()
+    return counts
+
+
+async def forget_sets(
+    db: AsyncSession, user_id: uuid.UUID, removed: list[ExerciseSet]
+) -> None:
+    """Sets retirés (suppression / remplacement) → recalcul des records qu'ils détenaient."""
+    removed_ids = {s.id for s in removed if s.weight_kg is not None}
+    if not removed_ids:
+        return
+
+    await advisory_lock.xact_lock(db, advisory_lock.lock_key("personal_records", user_id))
+    records = await repo.get_records(
+        db, user_id, {s.exercise_type_id for s in removed if s.weight_kg is not None}
+    )
+    stale = {ex_id: r for ex_id, r in records.items() if r.set_ids & removed_ids}
+    if not stale:
+        return
+
+    for record in stale.values():
+        _reset(record)
+    history = await repo.get_record_history(
+        db, user_id, set(stale), exclude_set_ids=removed_ids
+    )
+    for row in history:
+        _apply(stale[row.exercise_type_id], row.id, row.session_id, row.session_date,
+               row.weight_kg, row.reps)
+
+    for record in stale.values():
+        if record.max_weight_kg is None:
+            # Plus aucun set chargé pour cet exercice
+            await db.delete(record)
+    await db.flush()
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
 from app.repositories import phone_verification_repository
+from app.services import sms_outbox_service
 from app.utils.otp import (
     OTP_EXPIRY_MINUTES,
     OTP_MAX_ATTEMPTS,
@@ -50,7 +51,7 @@ async def request_phone_verification(db: AsyncSession, user: User) -> None:
 
     - Vérifie que le téléphone n'est pas déjà vérifié
     - Rate limit : max OTP_RATE_LIMIT_HOUR OTPs par heure
-    - Génère OTP, enregistre en DB, envoie SMS
+    - Génère OTP, enregistre en DB, met le SMS en file (envoyé par le worker sms.outbox)
     """
     if user.phone_verified_at is not None:
         raise PhoneAlreadyVerifiedError("Numéro de téléphone déjà vérifié")
@@ -67,9 +68,11 @@ async def request_phone_verification(db: AsyncSession, user: User) -> None:
     expires_at = datetime.now(timezone.utc) + timedelta(minutes=OTP_EXPIRY_MINUTES)
     await phone_verification_repository.create_token(db, user.id, user.phone, code, expires_at)
 
-    from app.core.sms.provider import get_sms_provider
-    sms = get_sms_provider()
-    await sms.send(user.phone, format_sms(code))
+    await sms_outbox_service.enqueue(db, [
+        sms_outbox_service.OutgoingSms(
+            recipient_phone=user.phone, message_body=format_sms(code), client_id=user.id,
+        )
+    ])
 
 
 async def confirm_phone_verification(db: AsyncSession, user: User, code: str) -> None:
@@ -1,199 +1,518 @@
 """Générateur de programmes d'entraînement (règles métier) — B4-07.
 
-Génère un programme hebdomadaire adapté au questionnaire du client.
-Règles :
+Génère un programme hebdomadaire adapté au questionnaire du client, pour
+toute fréquence de 1 à 7 séances, par recherche sous contraintes :
+
+Contraintes (strictes) :
 - Distribution musculaire équilibrée (pas 2 jours consécutifs sur le même groupe)
 - Alternance push/pull
 - Repos minimum 1 jour entre 2 séances d'intensité élevée
-- Adaptation au niveau et à l'objectif
+
+Score (choix entre les semaines admissibles) :
+- Adéquation des blocs de séance à l'objectif
+- Couverture des grands groupes musculaires (fréquence visée par objectif)
+- Régularité des jours de repos, variété des séances
+- Nombre de séances intenses plafonné selon le niveau
+
+La recherche ne dépend que de (objectif, fréquence, niveau) : elle est faite une
+fois par combinaison et mise en cache (solve). Chaque génération ne fait donc
+que tirer les exercices dans l'index en mémoire du catalogue
+(exercise_catalogue_service) : aucune requête par slot, tirage varié d'une
+génération à l'autre, pas de doublon dans un plan tant que le catalogue le
+permet. Banc d'essai : scripts/bench_program_generator.py.
 """
 
 from __future__ import annotations
 
+import random
 import uuid
-from dataclasses import dataclass, field
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import combinations, combinations_with_replacement
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
-from app.models.exercise_type import ExerciseType, ExerciseTypeMuscle
 from app.models.workout_plan import WorkoutPlan, PlannedSession, PlannedExercise
+from app.repositories import program_repository as repo
+from app.services.exercise_catalogue_service import (
+    CatalogueExercise, CatalogueIndex, exercise_catalogue
+)
+
 
+# ── Blocs de séance ────────────────────────────────────────────────────────────
 
-# ── Templates de programmes ────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class Slot:
+    category: str
+    sets: int
+    reps: int
+    # Muscles visés par le slot (None → muscles du bloc)
+    muscles: tuple[str, ...] | None = None
 
-@dataclass
-class SessionTemplate:
+
+@dataclass(frozen=True, eq=False)  # blocs uniques : hash par identité (recherche)
+class SessionBlock:
+    key: str
     name: str
-    day_of_week: int  # 0=Lundi
-    muscle_focus: list[str]  # groupes primaires ciblés
+    muscles: frozenset[str]  # groupes sollicités (contrainte jours consécutifs)
+    slots: tuple[Slot, ...]
     estimated_duration_min: int
     rest_seconds: int
-    # (category_filter, sets, reps, note)
-    exercises: list[tuple[str, int, int]]
-
-
-# Programmes selon fréquence et objectif
-PROGRAMS: dict[str, list[SessionTemplate]] = {
-    # Perte de poids (cardio + full body)
-    "lose_weight_3": [
-        SessionTemplate("Full Body A", 0, ["full_body", "quads", "chest"], 50, 60,
-                        [("strength", 3, 12), ("cardio", 1, 20), ("core", 3, 15)]),
-        SessionTemplate("Cardio + Core", 2, ["full_body", "core"], 40, 60,
-                        [("cardio", 1, 30), ("core", 3, 20), ("hiit", 2, 15)]),
-        SessionTemplate("Full Body B", 4, ["full_body", "back", "glutes"], 50, 60,
-                        [("strength", 3, 12), ("cardio", 1, 20), ("core", 3, 15)]),
-    ],
-    # Prise de muscle (split push/pull/legs)
-    "muscle_gain_3": [
-        SessionTemplate("Push (Poitrine + Épaules + Triceps)", 0,
-                        ["chest", "shoulders", "triceps"], 60, 90,
-                        [("strength", 4, 8), ("strength", 3, 10), ("strength", 3, 12)]),
-        SessionTemplate("Pull (Dos + Biceps)", 2, ["back", "biceps"], 60, 90,
-                        [("strength", 4, 8), ("strength", 3, 10), ("strength", 3, 12)]),
-        SessionTemplate("Legs (Jambes + Fessiers)", 4, ["quads", "hamstrings", "glutes"], 60, 90,
-                        [("strength", 4, 8), ("strength", 3, 10), ("strength", 3, 12)]),
-    ],
-    "muscle_gain_4": [
-        SessionTemplate("Push A (Poitrine + Épaules)", 0, ["chest", "shoulders"], 60, 90,
-                        [("strength", 4, 8), ("strength", 3, 10), ("strength", 3, 12)]),
-        SessionTemplate("Pull A (Dos + Biceps)", 1, ["back", "biceps"], 60, 90,
-                        [("strength", 4, 8), ("strength", 3, 10), ("strength", 3, 12)]),
-        SessionTemplate("Legs", 3, ["quads", "hamstrings", "glutes"], 60, 90,
-                        [("strength", 4, 8), ("strength", 3, 10), ("strength", 3, 12)]),
-        SessionTemplate("Push B (Épaules + Triceps)", 5, ["shoulders", "triceps"], 55, 90,
-                        [("strength", 4, 10), ("strength", 3, 12), ("strength", 3, 15)]),
-    ],
-    # Bien-être / maintenance
-    "well_being_3": [
-        SessionTemplate("Yoga + Core", 0, ["core", "full_body"], 45, 30,
-                        [("yoga", 1, 10), ("core", 3, 15), ("flexibility", 2, 20)]),
-        SessionTemplate("Cardio léger", 2, ["full_body"], 40, 30,
-                        [("cardio", 1, 30), ("flexibility", 2, 20), ("core", 2, 15)]),
-        SessionTemplate("Renforcement global", 4, ["full_body"], 50, 60,
-                        [("strength", 3, 12), ("core", 3, 15), ("yoga", 1, 15)]),
-    ],
-    # Endurance
-    "endurance_3": [
-        SessionTemplate("Cardio Long", 0, ["full_body"], 60, 30,
-                        [("cardio", 1, 45), ("core", 2, 20)]),
-        SessionTemplate("Fractionné", 2, ["full_body"], 45, 45,
-                        [("hiit", 4, 10), ("cardio", 1, 15), ("core", 2, 15)]),
-        SessionTemplate("Endurance + Renforcement", 4, ["full_body", "quads"], 55, 45,
-                        [("cardio", 1, 30), ("strength", 3, 15), ("core", 2, 15)]),
-    ],
+    pattern: str | None = None  # "push" | "pull" → alternance
+    intense: bool = False
+
+
+_CORE = ("core",)
+
+BLOCKS: dict[str, SessionBlock] = {b.key: b for b in [
+    SessionBlock("push", "Push (Poitrine + Épaules + Triceps)",
+                 frozenset({"chest", "shoulders", "triceps"}),
+                 (Slot("strength", 4, 8), Slot("strength", 3, 10), Slot("strength", 3, 12)),
+                 60, 90, pattern="push"),
+    SessionBlock("pull", "Pull (Dos + Biceps)",
+                 frozenset({"back", "biceps", "forearms"}),
+                 (Slot("strength", 4, 8), Slot("strength", 3, 10), Slot("strength", 3, 12)),
+                 60, 90, pattern="pull"),
+    SessionBlock("legs", "Legs (Jambes + Fessiers)",
+                 frozenset({"quads", "hamstrings", "glutes", "calves"}),
+                 (Slot("strength", 4, 8), Slot("strength", 3, 10), Slot("strength", 3, 12)),
+                 60, 90, intense=True),
+    SessionBlock("upper", "Haut du corps",
+                 frozenset({"chest", "back", "shoulders", "biceps", "triceps"}),
+                 (Slot("strength", 4, 8), Slot("strength", 4, 8),
+                  Slot("strength", 3, 10), Slot("strength", 3, 12)),
+                 65, 90),
+    SessionBlock("lower", "Bas du corps + Core",
+                 frozenset({"quads", "hamstrings", "glutes", "calves", "core"}),
+                 (Slot("strength", 4, 8), Slot("strength", 3, 10),
+                  Slot("strength", 3, 12), Slot("strength", 3, 15, _CORE)),
+                 60, 90, intense=True),
+    SessionBlock("full_body", "Full Body",
+                 frozenset({"full_body", "chest", "back", "quads", "glutes", "core"}),
+                 (Slot("strength", 3, 12), Slot("strength", 3, 10),
+                  Slot("strength", 3, 15, _CORE)),
+                 55, 60, intense=True),
+    SessionBlock("hiit", "Fractionné",
+                 frozenset({"full_body", "core"}),
+                 (Slot("hiit", 4, 10), Slot("cardio", 1, 15), Slot("strength", 2, 15, _CORE)),
+                 45, 45, intense=True),
+    SessionBlock("cardio", "Cardio",
+                 frozenset(),
+                 (Slot("cardio", 1, 30), Slot("flexibility", 2, 20)),
+                 40, 60),
+    SessionBlock("long_cardio", "Cardio Long",
+                 frozenset(),
+                 (Slot("cardio", 1, 45), Slot("flexibility", 1, 15)),
+                 60, 30),
+    SessionBlock("core_mobility", "Yoga + Core",
+                 frozenset({"core"}),
+                 (Slot("yoga", 1, 10), Slot("strength", 3, 15, _CORE), Slot("flexibility", 2, 20)),
+                 45, 30),
+    SessionBlock("mobility", "Mobilité & récupération active",
+                 frozenset(),
+                 (Slot("flexibility", 2, 20), Slot("yoga", 1, 15)),
+                 30, 30),
+]}
+
+
+@dataclass(frozen=True)
+class GoalProfile:
+    blocks: dict[str, float]  # blocs autorisés → préférence (0..3)
+    target_frequency: int     # séances par grand groupe musculaire et par semaine
+    coverage_weight: float    # poids de la couverture musculaire dans le score
+
+
+GOAL_PROFILES: dict[str, GoalProfile] = {
+    "lose_weight": GoalProfile({
+        "full_body": 3.0, "hiit": 2.5, "cardio": 2.5, "upper": 1.5, "lower": 1.5,
+        "core_mobility": 1.0, "mobility": 0.5,
+    }, target_frequency=2, coverage_weight=2.0),
+    "muscle_gain": GoalProfile({
+        "push": 3.0, "pull": 3.0, "legs": 3.0, "upper": 2.5, "lower": 2.5,
+        "full_body": 2.0, "cardio": 0.5, "mobility": 0.5,
+    }, target_frequency=2, coverage_weight=3.0),
+    "endurance": GoalProfile({
+        "long_cardio": 3.0, "hiit": 2.5, "cardio": 2.0, "full_body": 1.5, "lower": 1.5,
+        "core_mobility": 1.0, "mobility": 0.5,
+    }, target_frequency=1, coverage_weight=1.0),
+    "well_being": GoalProfile({
+        "core_mobility": 3.0, "full_body": 2.5, "cardio": 2.5, "mobility": 2.0,
+    }, target_frequency=1, coverage_weight=1.0),
+    "maintenance": GoalProfile({
+        "full_body": 3.0, "upper": 2.5, "lower": 2.5, "cardio": 2.0,
+        "core_mobility": 1.5, "mobility": 1.0,
+    }, target_frequency=1, coverage_weight=2.0),
+    "rehab": GoalProfile({
+        "mobility": 3.0, "core_mobility": 2.5, "cardio": 2.0, "full_body": 1.0,
+    }, target_frequency=1, coverage_weight=0.5),
 }
 
+MAJOR_MUSCLE_GROUPS = ("chest", "back", "shoulders", "quads", "hamstrings", "glutes", "core")
+# Séances intenses par semaine au-delà desquelles le score est pénalisé
+INTENSE_CAP = {"beginner": 2, "intermediate": 3, "advanced": 4}
+# Semaines distinctes (composition de blocs) conservées par combinaison
+ALTERNATIVES = 5
 
-async def generate_weekly_program(
-    db: AsyncSession,
+_W_VARIETY = 1.0
+_W_SPACING = 0.5
+_W_REPEAT = 0.25
+_W_INTENSE = 2.0
+
+
+# ── Recherche sous contraintes ─────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class WeekLayout:
+    """Une semaine admissible : un bloc par jour d'entraînement (jours croissants)."""
+    days: tuple[int, ...]
+    blocks: tuple[SessionBlock, ...]
+    score: float
+
+
+def _clash(a: SessionBlock, b: SessionBlock) -> bool:
+    """Deux blocs interdits sur deux jours consécutifs."""
+    return bool(a.muscles & b.muscles) or (a.intense and b.intense)
+
+
+def _admissible(days: tuple[int, ...], blocks: tuple[SessionBlock, ...]) -> bool:
+    """Règles d'une semaine complète (vérifiées pas à pas par _place)."""
+    last_pattern = None
+    for i, block in enumerate(blocks):
+        if block.pattern:
+            if block.pattern == last_pattern:
+                return False
+            last_pattern = block.pattern
+        if i and days[i] - days[i - 1] == 1 and _clash(blocks[i - 1], block):
+            return False
+    # Dimanche → lundi de la semaine suivante
+    return not (
+        len(days) > 1 and days[0] + 7 - days[-1] == 1 and _clash(blocks[-1], blocks[0])
+    )
+
+
+def _spacing_penalty(days: tuple[int, ...]) -> float:
+    """Écart quadratique moyen des jours de repos à une répartition régulière."""
+    n = len(days)
+    ideal = 7 / n
+    gaps = [(days[(i + 1) % n] - days[i]) % 7 or 7 for i in range(n)]
+    return sum((gap - ideal) ** 2 for gap in gaps) / n
+
+
+def _composition_score(
+    blocks: tuple[SessionBlock, ...], profile: GoalProfile, level: str
+) -> float:
+    """Part du score indépendante de l'ordre et des jours."""
+    n = len(blocks)
+    preference = sum(profile.blocks[b.key] for b in blocks) / (3 * n)
+    frequency = Counter(m for b in blocks for m in b.muscles)
+    target = profile.target_frequency
+    coverage = sum(
+        min(frequency[g], target) / target for g in MAJOR_MUSCLE_GROUPS
+    ) / len(MAJOR_MUSCLE_GROUPS)
+    variety = len({b.key for b in blocks}) / min(n, len(profile.blocks))
+    over = max(0, sum(b.intense for b in blocks) - INTENSE_CAP.get(level, 2))
+    return preference + profile.coverage_weight * coverage + _W_VARIETY * variety - _W_INTENSE * over
+
+
+def _place(
+    days: tuple[int, ...],
+    wrap: bool,
+    kinds: list[SessionBlock],
+    remaining: Counter,
+    order: list[SessionBlock],
+    last_pattern: str | None,
+    score: float,
+    best: tuple[WeekLayout | None, float],
+) -> tuple[WeekLayout | None, float]:
+    """Pose le bloc du jour len(order) puis récursivement les suivants.
+
+    Returns le meilleur (placement, score) entre `best` et les complétions de `order`.
+    """
+    if score <= best[1]:
+        return best
+    i = len(order)
+    if i == len(days):
+        if wrap and _clash(order[-1], order[0]):
+            return best
+        return WeekLayout(days, tuple(order), round(score, 4)), score
+    prev = order[-1] if order else None
+    adjacent = prev is not None and days[i] - days[i - 1] == 1
+    for kind in kinds:
+        if not remaining[kind]:
+            continue
+        if kind.pattern and kind.pattern == last_pattern:
+            continue
+        if adjacent and _clash(prev, kind):
+            continue
+        remaining[kind] -= 1
+        order.append(kind)
+        best = _place(
+            days, wrap, kinds, remaining, order,
+            kind.pattern or last_pattern,
+            score - (_W_REPEAT if prev is kind else 0.0),
+            best,
+        )
+        order.pop()
+        remaining[kind] += 1
+    return best
+
+
+def _arrange(
+    blocks: tuple[SessionBlock, ...], day_sets: list[tuple[int, ...]], base: float
+) -> WeekLayout | None:
+    """Meilleur placement admissible d'une composition (day_sets triés par régularité).
+
+    Retour arrière bloc par bloc : contraintes vérifiées à chaque pose, branche
+    abandonnée dès qu'elle ne peut plus dépasser le meilleur placement trouvé.
+    """
+    remaining = Counter(blocks)
+    kinds = list(remaining)
+    best: tuple[WeekLayout | None, float] = (None, float("-inf"))
+
+    for days in day_sets:
+        bound = base - _W_SPACING * _spacing_penalty(days)
+        if bound <= best[1]:
+            break  # jours suivants moins réguliers : impossible de faire mieux
+        wrap = len(days) > 1 and days[0] + 7 - days[-1] == 1
+        best = _place(days, wrap, kinds, remaining, [], None, bound, best)
+    return best[0]
+
+
+def _known(goal: str, frequency_per_week: int, level: str) -> tuple[str, int, str]:
+    """Paramètres ramenés aux valeurs connues du générateur (clé bornée du cache de solve)."""
+    return (
+        goal if goal in GOAL_PROFILES else "well_being",
+        max(1, min(frequency_per_week, 7)),
+        level if level in INTENSE_CAP else "beginner",
+    )
+
+
+@lru_cache(maxsize=len(GOAL_PROFILES) * 7 * len(INTENSE_CAP))
+def solve(goal: str, frequency_per_week: int, level: str) -> tuple[WeekLayout, ...]:
+    """Meilleures semaines admissibles, score décroissant, compositions distinctes.
+
+    Séance le lundi par convention (les rotations d'une même semaine sont équivalentes).
+    Compositions explorées par score décroissant avec coupure : une composition
+    dont le score, même idéalement placée, ne dépasse pas la dernière retenue
+    arrête la recherche.
+    """
+    profile = GOAL_PROFILES.get(goal, GOAL_PROFILES["well_being"])
+    n = max(1, min(frequency_per_week, 7))
+    day_sets = sorted(
+        ((0, *rest) for rest in combinations(range(1, 7), n - 1)),
+        key=lambda days: (_spacing_penalty(days), days),
+    )
+    best_spacing = _spacing_penalty(day_sets[0])
+    candidates = sorted(
+        (
+            (_composition_score(blocks, profile, level), blocks)
+            for blocks in combinations_with_replacement(
+                [BLOCKS[key] for key in profile.blocks], n
+            )
+        ),
+        key=lambda item: -item[0],
+    )
+
+    found: list[WeekLayout] = []
+    for base, blocks in candidates:
+        if len(found) >= ALTERNATIVES and base - _W_SPACING * best_spacing <= found[-1].score:
+            break
+        layout = _arrange(blocks, day_sets, base)
+        if layout is not None:
+            found.append(layout)
+            found.sort(key=lambda w: -w.score)
+            del found[ALTERNATIVES:]
+    if not found:
+        raise ValueError(f"Aucune semaine admissible pour {goal} × {n}")
+    return tuple(found)
+
+
+# ── Génération ─────────────────────────────────────────────────────────────────
+
+@dataclass(slots=True)
+class SessionDraft:
+    day_of_week: int
+    session_name: str
+    block: SessionBlock
+    exercises: list[tuple[CatalogueExercise, int, int]]  # (exercice, séries, reps)
+
+
+@dataclass(slots=True)
+class ProgramDraft:
+    """Programme généré en mémoire (objets simples, pas d'ORM) — aperçu ou insertion."""
+    name: str
+    description: str
+    goal: str
+    level: str
+    layout: WeekLayout
+    sessions: list[SessionDraft]
+
+
+def draft_program(
+    catalogue: CatalogueIndex,
     *,
     goal: str,
     frequency_per_week: int,
     level: str,
-    client_id: uuid.UUID | None = None,
-) -> WorkoutPlan:
-    """Génère un programme hebdomadaire en IA pure (règles métier).
+    rng: random.Random,
+    alternative: int = 0,
+) -> ProgramDraft:
+    """Programme complet en mémoire — aucune E/S.
 
-    Crée le plan + sessions + exercices en base.
+    `alternative` : rang de la semaine retenue parmi solve() (0 = meilleure).
     """
-    # Choisir le template
-    key = f"{goal}_{frequency_per_week}"
-    if key not in PROGRAMS:
-        # Fallback au plus proche
-        fallback_keys = [k for k in PROGRAMS if k.startswith(goal)]
-        if fallback_keys:
-            key = fallback_keys[0]
-        else:
-            key = "well_being_3"
+    layouts = solve(goal, frequency_per_week, level)
+    layout = layouts[min(alternative, len(layouts) - 1)]
+    used: set[uuid.UUID] = set()
+    return ProgramDraft(
+        name=_plan_name(goal, level),
+        description=_plan_description(goal, level, frequency_per_week),
+        goal=goal,
+        level=level,
+        layout=layout,
+        sessions=[
+            SessionDraft(day, name, block, _pick_exercises(catalogue, block, level, used, rng))
+            for day, block, name in zip(
+                layout.days, layout.blocks, _session_names(layout.blocks), strict=True
+            )
+        ],
+    )
 
-    templates = PROGRAMS[key]
 
-    # Créer le plan
+def _to_plan(draft: ProgramDraft) -> WorkoutPlan:
+    """Objets ORM (ids, created_at renseignés) prêts pour repo.insert_plan."""
     plan = WorkoutPlan(
         id=uuid.uuid4(),
-        name=_plan_name(goal, level),
-        description=_plan_description(goal, level, frequency_per_week),
+        name=draft.name,
+        description=draft.description,
         duration_weeks=4,
-        level=level,
-        goal=goal,
+        level=draft.level,
+        goal=draft.goal,
         created_by_id=None,  # IA : pas de fake user
         is_ai_generated=True,
         archived=False,
+        created_at=datetime.now(timezone.utc),
     )
-    db.add(plan)
-    await db.flush()
-
-    # Créer les sessions planifiées
-    for idx, tpl in enumerate(templates):
+    sessions = []
+    for idx, session in enumerate(draft.sessions):
         ps = PlannedSession(
             id=uuid.uuid4(),
             plan_id=plan.id,
-            day_of_week=tpl.day_of_week,
-            session_name=tpl.name,
-            estimated_duration_min=tpl.estimated_duration_min,
-            rest_seconds=tpl.rest_seconds,
+            day_of_week=session.day_of_week,
+            session_name=session.session_name,
+            estimated_duration_min=session.block.estimated_duration_min,
+            rest_seconds=session.block.rest_seconds,
             order_index=idx + 1,
         )
-        db.add(ps)
-        await db.flush()
-
-        # Ajouter des exercices selon les muscles cibles
-        exercises = await _pick_exercises(db, tpl, level)
-        for ex_idx, (ex_type, target_sets, target_reps) in enumerate(exercises):
-            pe = PlannedExercise(
+        ps.planned_exercises = [
+            PlannedExercise(
                 id=uuid.uuid4(),
                 planned_session_id=ps.id,
-                exercise_type_id=ex_type.id,
+                exercise_type_id=ex.id,
                 target_sets=target_sets,
                 target_reps=target_reps,
                 target_weight_kg=None,  # ajusté automatiquement après premières séances
                 order_index=ex_idx + 1,
             )
-            db.add(pe)
-
-    await db.flush()
+            for ex_idx, (ex, target_sets, target_reps) in enumerate(session.exercises)
+        ]
+        sessions.append(ps)
+    plan.planned_sessions = sessions
     return plan
 
 
-async def _pick_exercises(
+async def generate_weekly_program(
+    db: AsyncSession,
+    *,
+    goal: str,
+    frequency_per_week: int,
+    level: str,
+    client_id: uuid.UUID | None = None,
+    rng: random.Random | None = None,
+) -> WorkoutPlan:
+    """Génère un programme hebdomadaire en IA pure (règles métier).
+
+    Meilleure semaine admissible, exercices tirés en mémoire (aucune requête si
+    l'index du catalogue est à jour), puis plan + sessions + exercices insérés
+    en un INSERT par table. `rng` : source d'aléa (tests).
+    """
+    goal, frequency_per_week, level = _known(goal, frequency_per_week, level)
+    catalogue = await exercise_catalogue.get(db)
+    draft = draft_program(
+        catalogue, goal=goal, frequency_per_week=frequency_per_week, level=level,
+        rng=rng or random.Random(),
+    )
+    return await repo.insert_plan(db, _to_plan(draft))
+
+
+async def preview_programs(
     db: AsyncSession,
-    template: SessionTemplate,
+    *,
+    goal: str,
+    frequency_per_week: int,
+    level: str,
+    count: int = 3,
+    rng: random.Random | None = None,
+) -> list[ProgramDraft]:
+    """Semaines alternatives (meilleures d'abord), rien n'est écrit — aperçu coach."""
+    goal, frequency_per_week, level = _known(goal, frequency_per_week, level)
+    catalogue = await exercise_catalogue.get(db)
+    rng = rng or random.Random()
+    layouts = solve(goal, frequency_per_week, level)
+    return [
+        draft_program(
+            catalogue, goal=goal, frequency_per_week=frequency_per_week, level=level,
+            rng=rng, alternative=rank,
+        )
+        for rank in range(min(count, len(layouts)))
+    ]
+
+
+def _pick_exercises(
+    catalogue: CatalogueIndex,
+    block: SessionBlock,
     level: str,
-) -> list[tuple[ExerciseType, int, int]]:
-    """Sélectionne les exercices correspondant aux muscles et catégories cibles."""
+    used: set[uuid.UUID],
+    rng: random.Random,
+) -> list[tuple[CatalogueExercise, int, int]]:
+    """Sélectionne les exercices correspondant aux muscles et catégories cibles.
+
+    Tirage aléatoire parmi les candidats, en évitant de réutiliser un exercice
+    déjà retenu dans le plan tant qu'il reste d'autres candidats.
+    """
     result = []
-    for category, sets, reps in template.exercises:
-        # Chercher des exercices dans la catégorie ET dans les muscles cibles
-        q = (
-            select(ExerciseType)
-            .join(ExerciseTypeMuscle, ExerciseTypeMuscle.exercise_type_id == ExerciseType.id)
-            .where(
-                ExerciseType.category == category,
-                ExerciseType.difficulty == level,
-                ExerciseType.active.is_(True),
-                ExerciseTypeMuscle.muscle_group.in_(template.muscle_focus),
-                ExerciseTypeMuscle.role == "primary",
-            )
-            .limit(1)
+    for slot in block.slots:
+        # Catégorie + niveau + muscles ; à défaut catégorie + niveau, puis catégorie seule
+        candidates = (
+            catalogue.matching(slot.category, level, slot.muscles or block.muscles)
+            or catalogue.by_category_level.get((slot.category, level), ())
+            or catalogue.by_category.get(slot.category, ())
         )
-        ex = (await db.execute(q)).scalar_one_or_none()
-        if ex is None:
-            # Fallback : même catégorie sans contrainte muscle
-            q2 = (
-                select(ExerciseType)
-                .where(
-                    ExerciseType.category == category,
-                    ExerciseType.active.is_(True),
-                )
-                .limit(1)
-            )
-            ex = (await db.execute(q2)).scalar_one_or_none()
-        if ex:
-            result.append((ex, sets, reps))
+        if not candidates:
+            continue
+        fresh = [ex for ex in candidates if ex.id not in used]
+        ex = rng.choice(fresh or candidates)
+        used.add(ex.id)
+        result.append((ex, slot.sets, slot.reps))
     return result
 
 
+def _session_names(blocks: tuple[SessionBlock, ...]) -> list[str]:
+    """Nom du bloc, suffixé A, B… quand il revient dans la semaine."""
+    counts = Counter(b.key for b in blocks)
+    seen: Counter[str] = Counter()
+    names = []
+    for block in blocks:
+        if counts[block.key] > 1:
+            names.append(f"{block.name} {'ABCDEFG'[seen[block.key]]}")
+            seen[block.key] += 1
+        else:
+            names.append(block.name)
+    return names
+
+
 def _plan_name(goal: str, level: str) -> str:
     labels = {
         "lose_weight": "Programme Perte de Poids",
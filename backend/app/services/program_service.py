@@ -8,6 +8,7 @@ from datetime import date
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
+from app.repositories import coach_repository
 from app.repositories import program_repository as repo
 from app.schemas.program import (
     WorkoutPlanCreate, WorkoutPlanUpdate,
@@ -94,35 +95,41 @@ async def duplicate_plan(db: AsyncSession, coach: User, plan_id: uuid.UUID) -> o
     source = await repo.get_plan_by_id(db, plan_id)
     if source is None:
         raise PlanNotFoundError("Plan introuvable")
-    new_plan = await repo.create_plan(
-        db,
-        created_by_id=coach.id,
-        is_ai_generated=False,
-        name=f"{source.name} (copie)",
-        description=source.description,
-        duration_weeks=source.duration_weeks,
-        level=source.level,
-        goal=source.goal,
+    (copy,) = await repo.clone_plan(
+        db, source, 1,
+        created_by_id=coach.id, is_ai_generated=False, name=f"{source.name} (copie)",
+    )
+    return copy
+
+
+async def duplicate_for_clients(
+    db: AsyncSession,
+    coach: User,
+    plan_id: uuid.UUID,
+    client_ids: list[uuid.UUID],
+    start_date: date,
+    mode: str = "replace_ai",
+) -> list:
+    """Une copie du plan par client, assignée dans la foulée — nombre de requêtes constant.
+
+    Plan du coach et clients suivis activement par lui, vérifiés avant toute écriture.
+    """
+    source = await repo.get_plan_by_id(db, plan_id)
+    if source is None:
+        raise PlanNotFoundError("Plan introuvable")
+    if source.created_by_id != coach.id:
+        raise NotAuthorizedError("Ce plan ne vous appartient pas")
+    client_ids = list(dict.fromkeys(client_ids))
+    active = await coach_repository.get_active_client_ids(db, coach.id, client_ids)
+    if len(active) != len(client_ids):
+        raise NotAuthorizedError("Certains clients ne sont pas suivis par vous")
+    copies = await repo.clone_plan(
+        db, source, len(client_ids),
+        created_by_id=coach.id, is_ai_generated=False, name=f"{source.name} (copie)",
+    )
+    return await repo.assign_plans(
+        db, dict(zip(client_ids, copies, strict=True)), start_date, mode, assigned_by_id=coach.id
     )
-    for ps in source.planned_sessions:
-        new_ps = await repo.add_planned_session(
-            db, new_plan.id,
-            day_of_week=ps.day_of_week,
-            session_name=ps.session_name,
-            estimated_duration_min=ps.estimated_duration_min,
-            rest_seconds=ps.rest_seconds,
-            order_index=ps.order_index,
-        )
-        for pe in ps.planned_exercises:
-            await repo.add_planned_exercise(
-                db, new_ps.id,
-                exercise_type_id=pe.exercise_type_id,
-                target_sets=pe.target_sets,
-                target_reps=pe.target_reps,
-                target_weight_kg=pe.target_weight_kg,
-                order_index=pe.order_index,
-            )
-    return await repo.get_plan_by_id(db, new_plan.id)
 
 
 # ── Assignation ────────────────────────────────────────────────────────────────
@@ -154,6 +161,18 @@ async def get_client_progress(
     return await repo.get_client_progress(db, client_id, plan_id)
 
 
+async def list_progression_adjustments(
+    db: AsyncSession, coach: User, client_id: uuid.UUID, *, limit: int = 50
+) -> list:
+    """Journal des hausses de charge automatiques du client (plus récentes d'abord).
+
+    Réservé au coach qui suit activement ce client.
+    """
+    if not await coach_repository.get_active_client_ids(db, coach.id, [client_id]):
+        raise NotAuthorizedError("Ce client n'est pas suivi par vous")
+    return await repo.list_adjustments(db, client_id, limit=limit)
+
+
 # ── Programme client courant ───────────────────────────────────────────────────
 
 async def get_my_program(db: AsyncSession, client: User) -> object | None:
@@ -0,0 +1,86 @@
+"""Service analytics de progression — graphiques par exercice.
+
+Agrégation par période (jour / semaine / mois), 1RM estimé et moyennes mobiles
+calculés en SQL (fonctions de fenêtre) ; la série est ensuite réduite par LTTB
+au nombre de points demandé, les moyennes mobiles ayant été calculées sur la
+série complète.
+
+ETag : empreinte des données d'entraînement de l'utilisateur (rollups
+hebdomadaires) + paramètres — le client qui renvoie If-None-Match reçoit un
+304 sans que la série soit recalculée.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories import performance_repository as repo
+from app.utils.downsampling import lttb
+
+_CENT = Decimal("0.01")
+
+
+def _decimal(value) -> Decimal | None:
+    if value is None:
+        return None
+    return Decimal(str(value)).quantize(_CENT)
+
+
+def _point(row) -> dict:
+    return {
+        "bucket_start": row.bucket,
+        "max_weight_kg": _decimal(row.max_weight_kg),
+        "total_volume_kg": _decimal(row.total_volume_kg),
+        "sets_count": row.sets_count,
+        "best_e1rm_kg": _decimal(row.best_e1rm_kg),
+        "e1rm_moving_avg": _decimal(row.e1rm_moving_avg),
+        "volume_moving_avg": _decimal(row.volume_moving_avg),
+    }
+
+
+async def compute_etag(
+    db: AsyncSession, user_id: uuid.UUID, exercise_type_id: uuid.UUID, **params
+) -> str:
+    """ETag faible : une requête d'agrégat sur weekly_training_stats, aucune série calculée."""
+    count, last = await repo.get_training_version(db, user_id)
+    raw = json.dumps(
+        [str(user_id), str(exercise_type_id), params, count, last], default=str, sort_keys=True
+    )
+    return f'W/"{hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()}"'
+
+
+async def get_analytics(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    exercise_type_id: uuid.UUID,
+    *,
+    bucket: str = "week",
+    points: int = 100,
+    window: int = 4,
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+) -> dict:
+    rows = await repo.get_progression_series(
+        db, user_id, exercise_type_id,
+        bucket=bucket, window=window, from_date=from_date, to_date=to_date,
+    )
+    series = [_point(r) for r in rows]
+    if len(series) > points:
+        # Forme de la courbe 1RM (charge max pour les périodes sans reps)
+        xy = [
+            (p["bucket_start"].timestamp(), float(p["best_e1rm_kg"] or p["max_weight_kg"] or 0))
+            for p in series
+        ]
+        series = [series[i] for i in lttb(xy, points)]
+    return {
+        "bucket": bucket,
+        "window": window,
+        "total_buckets": len(rows),
+        "data_points": series,
+    }
@@ -1,91 +1,159 @@
 """Service de progression automatique des charges — B4-08.
 
 Règle : si l'utilisateur atteint les reps cibles sur 3 séances consécutives
-→ on augmente le target_weight_kg de 2.5 kg (ou 5% si pas de poids défini).
+→ on augmente le target_weight_kg de 2.5 kg (ou 5 kg si pas de poids défini).
+Seules comptent les séances postérieures au dernier ajustement de l'exercice
+planifié : pas de nouvelle hausse sans 3 nouvelles séances réussies.
+
+Moteur par lots, nombre de requêtes constant quel que soit le nombre d'exercices :
+  1. exercices planifiés des plans actifs des clients du lot   (1 requête)
+  2. 3 dernières séances par (client, exercice), fenêtrée      (1 requête)
+  3. nouvelles charges                                        (1 UPDATE)
+  4. journal progression_adjustments + notifications          (1 INSERT chacun)
+
+Déclenché après chaque saisie de séance (exercices de la séance) et chaque nuit
+pour tous les clients ayant un plan actif (tâche progression.nightly).
 """
 
 from __future__ import annotations
 
 import uuid
+from datetime import datetime, timezone
 from decimal import Decimal
 
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.exercise_set import ExerciseSet
-from app.models.performance_session import PerformanceSession
-from app.models.workout_plan import PlannedExercise, PlannedSession, WorkoutPlan, PlanAssignment
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.models.progression_adjustment import ProgressionAdjustment
+from app.models.workout_plan import PlannedExercise
+from app.repositories import program_repository as repo
+from app.services.notification_service import notification_service
 
 
 CONSECUTIVE_SESSIONS_REQUIRED = 3
 DEFAULT_INCREMENT_KG = Decimal("2.5")
+DEFAULT_START_WEIGHT_KG = Decimal("5.0")
 
+_adjusted = metrics.counter("progression.adjusted", "Charges cibles augmentées automatiquement")
 
-async def check_and_adjust(
-    db: AsyncSession, client_id: uuid.UUID, exercise_type_id: uuid.UUID
-) -> PlannedExercise | None:
-    """Analyse les dernières séances et ajuste target_weight_kg si règle atteinte.
 
-    Retourne l'exercice planifié modifié, ou None si pas d'ajustement.
+def _utc(moment: datetime) -> datetime:
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+
+def _next_weight(current: Decimal | None) -> Decimal:
+    if current and current > 0:
+        return current + DEFAULT_INCREMENT_KG
+    # Pas encore de poids cible défini → 5 kg par défaut
+    return DEFAULT_START_WEIGHT_KG
+
+
+async def evaluate(
+    db: AsyncSession,
+    client_ids: list[uuid.UUID],
+    exercise_type_ids: set[uuid.UUID] | None = None,
+    *,
+    trigger: str = "session",
+) -> list[ProgressionAdjustment]:
+    """Évalue les exercices planifiés des clients (limités à `exercise_type_ids`).
+
+    Returns les ajustements appliqués (pas de commit).
     """
-    # 1. Récupérer le plan actif du client
-    q = (
-        select(PlanAssignment)
-        .where(PlanAssignment.client_id == client_id, PlanAssignment.active.is_(True))
-        .order_by(PlanAssignment.created_at.desc())
-        .limit(1)
+    if not client_ids:
+        return []
+    candidates = await repo.get_progression_candidates(db, client_ids, exercise_type_ids)
+    if not candidates:
+        return []
+
+    recent = await repo.get_recent_exercise_sessions(
+        db,
+        list({c.client_id for c in candidates}),
+        {c.exercise_type_id for c in candidates},
+        CONSECUTIVE_SESSIONS_REQUIRED,
     )
-    assignment = (await db.execute(q)).scalar_one_or_none()
-    if assignment is None:
-        return None
-
-    # 2. Trouver l'exercice planifié correspondant
-    q = (
-        select(PlannedExercise)
-        .join(PlannedSession, PlannedExercise.planned_session_id == PlannedSession.id)
-        .where(
-            PlannedSession.plan_id == assignment.plan_id,
-            PlannedExercise.exercise_type_id == exercise_type_id,
+    sessions: dict[tuple[uuid.UUID, uuid.UUID], list] = {}
+    for row in recent:
+        sessions.setdefault((row.user_id, row.exercise_type_id), []).append(row)
+
+    adjustments: dict[uuid.UUID, ProgressionAdjustment] = {}
+    for c in candidates:
+        if c.planned_exercise_id in adjustments:
+            continue  # plan partagé : une hausse par exercice planifié et par passe
+        last = sessions.get((c.client_id, c.exercise_type_id), [])
+        if len(last) < CONSECUTIVE_SESSIONS_REQUIRED:
+            continue  # Pas assez de données
+        if c.last_adjusted_at is not None and _utc(last[-1].session_date) <= _utc(c.last_adjusted_at):
+            continue  # Séances déjà prises en compte par le dernier ajustement
+        if any(s.min_reps < c.target_reps for s in last):
+            continue
+        adjustments[c.planned_exercise_id] = ProgressionAdjustment(
+            id=uuid.uuid4(),
+            planned_exercise_id=c.planned_exercise_id,
+            client_id=c.client_id,
+            exercise_type_id=c.exercise_type_id,
+            previous_weight_kg=c.target_weight_kg,
+            new_weight_kg=_next_weight(c.target_weight_kg),
+            last_session_id=last[0].session_id,
+            trigger=trigger,
         )
-        .limit(1)
-    )
-    planned = (await db.execute(q)).scalar_one_or_none()
-    if planned is None:
-        return None
+    if not adjustments:
+        return []
 
-    # 3. Récupérer les N dernières séances avec cet exercice
-    q = (
-        select(ExerciseSet)
-        .join(PerformanceSession, ExerciseSet.session_id == PerformanceSession.id)
-        .where(
-            PerformanceSession.user_id == client_id,
-            ExerciseSet.exercise_type_id == exercise_type_id,
-        )
-        .order_by(PerformanceSession.session_date.desc())
-        .limit(CONSECUTIVE_SESSIONS_REQUIRED)
+    await repo.set_target_weights(
+        db, {pe_id: a.new_weight_kg for pe_id, a in adjustments.items()}
     )
-    last_sets = (await db.execute(q)).scalars().all()
-
-    if len(last_sets) < CONSECUTIVE_SESSIONS_REQUIRED:
-        return None  # Pas assez de données
-
-    # 4. Vérifier que les reps cibles sont atteintes sur chaque séance
-    target_reps = planned.target_reps
-    all_reached = all(
-        (s.reps or 0) >= target_reps for s in last_sets
+    applied = await repo.add_adjustments(db, list(adjustments.values()))
+    await notification_service.send_push_batch(
+        db,
+        "notification.load_increase.title",
+        "notification.load_increase.body",
+        [
+            (a.client_id,
+             {"type": "load_increase", "planned_exercise_id": str(a.planned_exercise_id)},
+             {"weight": f"{a.new_weight_kg.normalize():f}"})
+            for a in applied
+        ],
     )
-    if not all_reached:
-        return None
+    _adjusted.inc(len(applied))
+    return applied
+
+
+async def evaluate_session(
+    db: AsyncSession, client_id: uuid.UUID, exercise_type_ids: set[uuid.UUID]
+) -> list[ProgressionAdjustment]:
+    """Après une saisie : tous les exercices de la (ou des) séance(s) en une passe."""
+    if not exercise_type_ids:
+        return []
+    return await evaluate(db, [client_id], exercise_type_ids, trigger="session")
+
+
+async def run_nightly(db: AsyncSession) -> int:
+    """Tâche planifiée : tous les clients ayant un plan actif, par lots, commit par lot."""
+    batch_size = get_settings().SCHEDULER_BATCH_SIZE
+    total = 0
+    after = None
+    while True:
+        client_ids = await repo.get_active_client_ids(db, after=after, limit=batch_size)
+        if not client_ids:
+            return total
+        total += len(await evaluate(db, client_ids, trigger="nightly"))
+        await db.commit()
+        if len(client_ids) < batch_size:
+            return total
+        after = client_ids[-1]
 
-    # 5. Augmenter la charge
-    current = planned.target_weight_kg or Decimal("0")
-    if current > 0:
-        planned.target_weight_kg = current + DEFAULT_INCREMENT_KG
-    else:
-        # Pas encore de poids cible défini → mettre 5kg par défaut
-        planned.target_weight_kg = Decimal("5.0")
 
-    await db.flush()
+async def check_and_adjust(
+    db: AsyncSession, client_id: uuid.UUID, exercise_type_id: uuid.UUID
+) -> PlannedExercise | None:
+    """Évalue un seul (client, exercice) via le moteur par lots.
 
-    # TODO B2-17 : notifier le client de l'augmentation de charge
-    return planned
+    Retourne l'exercice planifié modifié, ou None si pas d'ajustement.
+    """
+    adjustments = await evaluate(db, [client_id], {exercise_type_id}, trigger="manual")
+    if not adjustments:
+        return None
+    return await db.get(
+        PlannedExercise, adjustments[0].planned_exercise_id, populate_existing=True
+    )
@@ -0,0 +1,121 @@
+"""Service outbox SMS — mise en file transactionnelle et worker d'envoi.
+
+Les services métier n'appellent jamais le provider : ils écrivent des lignes
+sms_logs `pending` dans leur propre transaction (enqueue). Si la transaction
+est annulée, aucun SMS ne part ; si elle commite, le SMS partira.
+
+Le worker `sms.outbox` (maintenance_service) vide la file par lots :
+  1. réservation UPDATE … RETURNING (SKIP LOCKED, bail SMS_OUTBOX_LEASE_SECONDS) ;
+  2. dédoublonnage par destinataire : même numéro + même texte → un seul envoi ;
+  3. envoi parallèle borné via le provider unique du processus (send_many) ;
+  4. résultats en un UPDATE groupé — échec → nouvel essai après
+     SMS_RETRY_BASE_SECONDS × 2^(essai-1), `failed` après SMS_MAX_ATTEMPTS.
+"""
+
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.core.sms.provider import get_sms_provider, send_many
+from app.repositories import sms_log_repository
+
+_sent = metrics.counter("sms_outbox.sent", "SMS envoyés par le worker")
+_retried = metrics.counter("sms_outbox.retried", "Envois en échec reprogrammés")
+_failed = metrics.counter("sms_outbox.failed", "SMS abandonnés (essais épuisés)")
+_deduplicated = metrics.counter("sms_outbox.deduplicated", "Doublons non renvoyés au provider")
+
+
+@dataclass
+class OutgoingSms:
+    recipient_phone: str
+    message_body: str
+    coach_id: uuid.UUID | None = None
+    client_id: uuid.UUID | None = None
+    template_id: uuid.UUID | None = None
+    dedup_key: str | None = None
+
+
+async def enqueue(db: AsyncSession, messages: list[OutgoingSms]) -> int:
+    """Met les SMS en file dans la transaction courante (pas de commit).
+
+    Returns le nombre de SMS mis en file (doublons de dedup_key exclus).
+    """
+    rows = [
+        {
+            "coach_id": m.coach_id,
+            "client_id": m.client_id,
+            "template_id": m.template_id,
+            "recipient_phone": m.recipient_phone,
+            "message_body": m.message_body,
+            "dedup_key": m.dedup_key,
+        }
+        for m in messages
+    ]
+    return len(await sms_log_repository.enqueue_bulk(db, rows))
+
+
+def retry_delay(attempt: int) -> timedelta:
+    """Backoff exponentiel après l'essai n° `attempt` (1, 2, …), plafonné."""
+    settings = get_settings()
+    seconds = settings.SMS_RETRY_BASE_SECONDS * 2 ** max(attempt - 1, 0)
+    return timedelta(seconds=min(seconds, settings.SMS_RETRY_MAX_SECONDS))
+
+
+async def drain(db: AsyncSession, *, batch_size: int | None = None) -> int:
+    """Worker : envoie tous les SMS dus, lot par lot, commit après chaque lot.
+
+    Returns le nombre de lignes traitées (envoyées, reprogrammées ou abandonnées).
+    """
+    settings = get_settings()
+    batch_size = batch_size or settings.SMS_OUTBOX_BATCH_SIZE
+    provider = get_sms_provider()
+    total = 0
+    while True:
+        claimed = await sms_log_repository.claim_due_batch(
+            db, batch_size, settings.SMS_OUTBOX_LEASE_SECONDS
+        )
+        await db.commit()
+        if not claimed:
+            return total
+
+        # Même destinataire, même texte → un seul appel provider pour le lot
+        groups: dict[tuple[str, str], list[tuple[uuid.UUID, int]]] = {}
+        for log_id, phone, body, attempts in claimed:
+            groups.setdefault((phone, body), []).append((log_id, attempts))
+        _deduplicated.inc(len(claimed) - len(groups))
+
+        results = await send_many(provider, list(groups))
+
+        now = datetime.now(timezone.utc)
+        outcomes = []
+        for rows, sms in zip(groups.values(), results, strict=True):
+            for log_id, attempts in rows:
+                if sms.success:
+                    status, next_attempt_at = "sent", None
+                    _sent.inc()
+                elif attempts >= settings.SMS_MAX_ATTEMPTS:
+                    status, next_attempt_at = "failed", None
+                    _failed.inc()
+                else:
+                    status, next_attempt_at = "pending", now + retry_delay(attempts)
+                    _retried.inc()
+                outcomes.append({
+                    "id": log_id,
+                    "status": status,
+                    "provider_message_id": sms.provider_message_id,
+                    "error_message": (sms.error_message or "")[:500] or None,
+                    "sent_at": now if sms.success else None,
+                    "next_attempt_at": next_attempt_at,
+                })
+        await sms_log_repository.record_outcomes(db, outcomes)
+        await db.commit()
+
+        total += len(claimed)
+        if len(claimed) < batch_size:
+            return total
@@ -0,0 +1,139 @@
+"""Service rollups d'entraînement hebdomadaires (table weekly_training_stats).
+
+Le tableau de bord coach lit des lignes pré-agrégées au lieu de charger
+séances → sets → exercice → muscles pour chaque client.
+
+Tenue à jour : toute création / modification / suppression de séance recalcule,
+dans la même transaction, la ou les semaines touchées de l'utilisateur — deux
+requêtes d'agrégat SQL sur ces seules semaines, puis DELETE + INSERT des lignes.
+Semaine = lundi 00:00 UTC (semaine ISO).
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import advisory_lock
+from app.models.weekly_training_stats import WeeklyTrainingStats
+from app.repositories import performance_repository as repo
+
+_CENT = Decimal("0.01")
+
+
+def _utc(moment: datetime) -> datetime:
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+def week_of(moment: datetime) -> date:
+    """Lundi (UTC) de la semaine contenant `moment`."""
+    day = _utc(moment).date()
+    return day - timedelta(days=day.weekday())
+
+
+def _week_start(week: date) -> datetime:
+    return datetime.combine(week, time.min, tzinfo=timezone.utc)
+
+
+def _accumulate(sessions: list, muscles: list, key) -> dict:
+    """Lignes d'agrégat → {key(user_id, session_date): WeeklyTrainingStats non persisté}."""
+    rollups: dict = {}
+
+    def _get(user_id: uuid.UUID, session_date: datetime) -> WeeklyTrainingStats:
+        k = key(user_id, session_date)
+        if k not in rollups:
+            rollups[k] = WeeklyTrainingStats(
+                user_id=user_id, week_start=week_of(session_date),
+                sessions_count=0, total_duration_min=0, feeling_sum=0, feeling_count=0,
+                total_sets=0, total_volume_kg=Decimal(0), muscle_sets={},
+            )
+        return rollups[k]
+
+    for row in sessions:
+        rollup = _get(row.user_id, row.session_date)
+        rollup.sessions_count += 1
+        rollup.total_duration_min += row.duration_min or 0
+        if row.feeling:
+            rollup.feeling_sum += row.feeling
+            rollup.feeling_count += 1
+        rollup.total_sets += row.sets_count
+        rollup.total_volume_kg += Decimal(row.volume_kg or 0)
+    for row in muscles:
+        rollup = _get(row.user_id, row.session_date)
+        rollup.muscle_sets[row.muscle_group] = rollup.muscle_sets.get(row.muscle_group, 0) + row.sets_count
+    for rollup in rollups.values():
+        rollup.total_volume_kg = rollup.total_volume_kg.quantize(_CENT)
+    return rollups
+
+
+def _stats(week_start: datetime, rollup: WeeklyTrainingStats | None) -> dict:
+    if rollup is None:
+        return {
+            "week_start": week_start, "sessions_count": 0, "total_duration_min": 0,
+            "avg_feeling": None, "total_sets": 0, "total_volume_kg": Decimal("0.00"),
+            "muscles_worked": [],
+        }
+    return {
+        "week_start": week_start,
+        "sessions_count": rollup.sessions_count,
+        "total_duration_min": rollup.total_duration_min,
+        "avg_feeling": rollup.avg_feeling,
+        "total_sets": rollup.total_sets,
+        "total_volume_kg": rollup.total_volume_kg,
+        "muscles_worked": rollup.muscles_worked,
+    }
+
+
+async def refresh(
+    db: AsyncSession, user_id: uuid.UUID, moments: Iterable[datetime]
+) -> None:
+    """Recalcule les semaines contenant ces dates de séance (anciennes et nouvelles)."""
+    weeks = {week_of(m) for m in moments}
+    if not weeks:
+        return
+    await advisory_lock.xact_lock(db, advisory_lock.lock_key("weekly_training_stats", user_id))
+    sessions, muscles = await repo.get_training_aggregates(
+        db, [user_id], _week_start(min(weeks)), _week_start(max(weeks)) + timedelta(days=7)
+    )
+    rollups = _accumulate(sessions, muscles, key=lambda u, d: week_of(d))
+    await repo.replace_week_rollups(
+        db, user_id, weeks, [r for week, r in rollups.items() if week in weeks]
+    )
+
+
+async def get_week_stats(
+    db: AsyncSession, user_id: uuid.UUID, week_start: datetime
+) -> dict:
+    """Stats de [week_start, week_start + 7j) — rollup si week_start est un lundi 00:00 UTC."""
+    week_start = _utc(week_start)
+    week = week_of(week_start)
+    if _week_start(week) == week_start:
+        rollup = (await repo.get_week_rollups(db, [user_id], week)).get(user_id)
+        return _stats(week_start, rollup)
+
+    # Fenêtre non alignée : agrégats à la volée sur la fenêtre demandée
+    sessions, muscles = await repo.get_training_aggregates(
+        db, [user_id], week_start, week_start + timedelta(days=7)
+    )
+    rollup = _accumulate(sessions, muscles, key=lambda u, d: u).get(user_id)
+    return _stats(week_start, rollup)
+
+
+async def get_clients_week_stats(
+    db: AsyncSession,
+    coach_id: uuid.UUID,
+    week_start: datetime,
+    *,
+    statuses: list[str] | None = None,
+) -> list[dict]:
+    """Semaine (contenant week_start) de tous les clients du coach — une requête."""
+    week = week_of(week_start)
+    rows = await repo.get_clients_week_rollups(db, coach_id, week, statuses or ["active"])
+    return [
+        {"client_id": client_id, **_stats(_week_start(week), rollup)}
+        for client_id, rollup in rows
+    ]
@@ -1,15 +1,39 @@
-"""Service liste d'attente — B2-15."""
+"""Service liste d'attente — B2-15.
+
+Promotion événementielle (worker waitlist.promote) :
+  - une place libérée (annulation de réservation, départ d'un client notifié)
+    publie un événement waitlist_slot_events dans la transaction métier ;
+  - le worker réserve les événements par lot et notifie le suivant de chaque
+    créneau : un UPDATE … RETURNING et un INSERT de push par lot ;
+  - chaque fenêtre de confirmation est rangée dans une roue temporelle en
+    mémoire : quand une échéance est atteinte, les fenêtres dépassées sont
+    expirées en masse et la place passe au suivant dans la même transaction.
+La roue est ré-amorcée depuis la base toutes les WAITLIST_RESYNC_SECONDS
+(changement de replica leader, promotions faites hors du worker).
+"""
 
 from __future__ import annotations
 
 import uuid
+from collections import Counter
 from datetime import datetime, timedelta, timezone
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.core.timer_wheel import TimerWheel
 from app.models.user import User
 from app.models.waitlist_entry import WaitlistEntry
 from app.repositories import waitlist_repository
+from app.repositories.waitlist_repository import Slot
+from app.services.notification_service import notification_service
+
+CONFIRMATION_WINDOW = timedelta(minutes=30)
+
+_promoted = metrics.counter("waitlist.promoted", "Entrées notifiées (place libérée)")
+_expired = metrics.counter("waitlist.expired", "Fenêtres de confirmation expirées")
+_events = metrics.counter("waitlist.slot_events", "Événements « place libérée » traités")
 
 
 class AlreadyInWaitlistError(Exception):
@@ -24,6 +48,32 @@ class ConfirmationWindowExpiredError(Exception):
     pass
 
 
+class ExpiryTimers:
+    """Échéances des fenêtres notified connues du processus (roue temporelle)."""
+
+    def __init__(self) -> None:
+        self.wheel = TimerWheel(tick_seconds=1.0)
+        self.synced_at: datetime | None = None
+
+    def needs_resync(self, now: datetime) -> bool:
+        return (
+            self.synced_at is None
+            or (now - self.synced_at).total_seconds() >= get_settings().WAITLIST_RESYNC_SECONDS
+        )
+
+    def reset(self, deadlines: list[datetime], now: datetime) -> None:
+        self.wheel.clear()
+        for deadline in deadlines:
+            self.wheel.schedule(deadline)
+        self.synced_at = now
+
+    def invalidate(self) -> None:
+        self.synced_at = None
+
+
+expiry_timers = ExpiryTimers()
+
+
 async def join_waitlist(
     db: AsyncSession,
     client: User,
@@ -31,58 +81,75 @@ async def join_waitlist(
     slot_datetime: datetime,
     booking_id: uuid.UUID | None = None,
 ) -> WaitlistEntry:
-    """Rejoindre la liste d'attente pour un créneau.
+    """Rejoindre la liste d'attente pour un créneau (en fin de file).
 
-    Vérifie que le client n'est pas déjà dans la file pour ce créneau.
+    Doublon (déjà waiting / notified sur ce créneau) détecté par l'index unique partiel.
     """
-    existing = await waitlist_repository.get_by_client(db, client.id)
-    for e in existing:
-        if e.coach_id == coach_id and e.slot_datetime == slot_datetime:
-            raise AlreadyInWaitlistError("Vous êtes déjà dans la liste d'attente pour ce créneau")
-
-    # Position = nombre d'entrées actives + 1
-    position = await waitlist_repository.count_waiting(db, coach_id, slot_datetime) + 1
-    return await waitlist_repository.add_entry(
-        db, coach_id, slot_datetime, client.id, position, booking_id
+    entry = await waitlist_repository.add_entry(
+        db, coach_id, slot_datetime, client.id, booking_id
     )
+    if entry is None:
+        raise AlreadyInWaitlistError("Vous êtes déjà dans la liste d'attente pour ce créneau")
+    return entry
 
 
-async def notify_next(
-    db: AsyncSession,
-    coach_id: uuid.UUID,
-    slot_datetime: datetime,
-) -> WaitlistEntry | None:
-    """Notifie le 1er en attente qu'une place est disponible.
+async def publish_slot_freed(db: AsyncSession, slots: list[Slot], reason: str) -> int:
+    """Une place libérée par élément de `slots`, traitée par le worker waitlist.promote.
 
-    Lui donne 30 minutes pour confirmer.
+    Écrit dans la transaction de l'appelant (pas de commit) : une annulation
+    annulée par rollback ne libère rien.
     """
-    entry = await waitlist_repository.get_first_waiting(db, coach_id, slot_datetime)
-    if entry is None:
-        return None
+    return await waitlist_repository.publish_slot_events(db, slots, reason)
+
+
+async def promote(db: AsyncSession, freed: list[Slot]) -> list[WaitlistEntry]:
+    """Notifie le suivant en attente pour chaque place libérée (un créneau peut revenir N fois).
 
+    Un UPDATE … RETURNING et un INSERT de push pour tout le lot ; chaque
+    notifié a CONFIRMATION_WINDOW pour confirmer. Pas de commit.
+    """
+    if not freed:
+        return []
     now = datetime.now(timezone.utc)
-    entry = await waitlist_repository.update_status(
-        db, entry, "notified",
-        notified_at=now,
-        expires_at=now + timedelta(minutes=30),
+    expires_at = now + CONFIRMATION_WINDOW
+    entries = await waitlist_repository.promote_waiting(db, dict(Counter(freed)), now, expires_at)
+    await notification_service.send_push_batch(
+        db,
+        "notification.waitlist_slot.title",
+        "notification.waitlist_slot.body",
+        [
+            (
+                entry.client_id,
+                {
+                    "type": "waitlist_slot",
+                    "entry_id": str(entry.id),
+                    "slot_datetime": entry.slot_datetime.isoformat(),
+                },
+                {},
+            )
+            for entry in entries
+        ],
     )
-    # TODO Phase 2 B2-17 : notification push via notification_service
-    return entry
+    if entries:
+        expiry_timers.wheel.schedule(expires_at)
+    _promoted.inc(len(entries))
+    return entries
 
 
 async def confirm_from_waitlist(
     db: AsyncSession, client: User, entry_id: uuid.UUID
 ) -> WaitlistEntry:
-    """Le client confirme depuis la liste d'attente (dans les 30 min)."""
+    """Le client confirme depuis la liste d'attente (dans les 30 min).
+
+    Fenêtre dépassée : refus ; l'entrée est expirée et la place proposée au
+    suivant par le worker waitlist.promote.
+    """
     entry = await waitlist_repository.get_by_id(db, entry_id)
     if entry is None or entry.client_id != client.id:
         raise WaitlistEntryNotFoundError("Entrée introuvable")
     if entry.status != "notified":
         raise ConfirmationWindowExpiredError("Vous n'avez pas reçu de notification pour ce créneau")
     if entry.expires_at and datetime.now(timezone.utc) > entry.expires_at:
-        # Fenêtre expirée → passer en expired, notifier le suivant
-        await waitlist_repository.update_status(db, entry, "expired")
-        await notify_next(db, entry.coach_id, entry.slot_datetime)
         raise ConfirmationWindowExpiredError("La fenêtre de confirmation de 30 minutes a expiré")
 
     return await waitlist_repository.update_status(db, entry, "confirmed")
@@ -91,29 +158,61 @@ async def confirm_from_waitlist(
 async def leave_waitlist(
     db: AsyncSession, client: User, entry_id: uuid.UUID
 ) -> None:
+    """Quitter la file ; un client déjà notifié rend sa place au suivant."""
     entry = await waitlist_repository.get_by_id(db, entry_id)
     if entry is None or entry.client_id != client.id:
         raise WaitlistEntryNotFoundError("Entrée introuvable")
-    coach_id = entry.coach_id
-    slot_datetime = entry.slot_datetime
+    slot = (entry.coach_id, entry.slot_datetime)
+    was_notified = entry.status == "notified"
     await waitlist_repository.remove_entry(db, entry)
-    await waitlist_repository.reorder(db, coach_id, slot_datetime)
+    await waitlist_repository.reorder(db, *slot)
+    if was_notified:
+        await publish_slot_freed(db, [slot], "left")
+
+
+async def expire_notified_entries(db: AsyncSession, *, batch_size: int | None = None) -> int:
+    """Expire les entrées 'notified' dont expires_at est dépassé.
 
+    UPDATE … RETURNING par lots ; les places des entrées expirées passent aux
+    suivants de leurs files (promote) dans la même transaction. Commit après
+    chaque lot.
+    """
+    batch_size = batch_size or get_settings().SCHEDULER_BATCH_SIZE
+    total = 0
+    while True:
+        expired = await waitlist_repository.expire_notified_batch(
+            db, datetime.now(timezone.utc), batch_size
+        )
+        await promote(db, expired)
+        await db.commit()
+        total += len(expired)
+        if len(expired) < batch_size:
+            _expired.inc(total)
+            return total
+
+
+async def run_promotion_worker(db: AsyncSession, *, batch_size: int | None = None) -> int:
+    """Tâche waitlist.promote : places libérées puis fenêtres échues.
+
+    Les expirations ne touchent la base que lorsque la roue signale une échéance
+    atteinte (ou au ré-amorçage). Returns le nombre d'entrées notifiées pour une
+    place libérée plus le nombre d'entrées expirées.
+    """
+    batch_size = batch_size or get_settings().SCHEDULER_BATCH_SIZE
+    total = 0
+    while True:
+        slots = await waitlist_repository.claim_slot_events(db, batch_size)
+        total += len(await promote(db, slots))
+        await db.commit()
+        _events.inc(len(slots))
+        if len(slots) < batch_size:
+            break
 
-async def expire_notified_entries(db: AsyncSession) -> int:
-    """Worker : expire les entrées 'notified' dont expires_at est dépassé."""
-    from sqlalchemy import select
-    from app.models.waitlist_entry import WaitlistEntry
     now = datetime.now(timezone.utc)
-    q = select(WaitlistEntry).where(
-        WaitlistEntry.status == "notified",
-        WaitlistEntry.expires_at < now,
-    )
-    result = await db.execute(q)
-    expired = list(result.scalars().all())
-    count = 0
-    for entry in expired:
-        await waitlist_repository.update_status(db, entry, "expired")
-        await notify_next(db, entry.coach_id, entry.slot_datetime)
-        count += 1
-    return count
+    if expiry_timers.needs_resync(now):
+        total += await expire_notified_entries(db, batch_size=batch_size)
+        expiry_timers.reset(await waitlist_repository.get_notified_deadlines(db), now)
+        await db.commit()
+    elif expiry_timers.wheel.advance(now):
+        total += await expire_notified_entries(db, batch_size=batch_size)
+    return total
@@ -0,0 +1,42 @@
+"""
+Sous-échantillonnage de séries pour les graphiques mobiles.
+
+LTTB (Largest-Triangle-Three-Buckets, S. Steinarsson 2013) : conserve la forme
+visuelle d'une courbe (pics, creux) en ne gardant que `threshold` points.
+Premier et dernier points toujours conservés.
+"""
+
+
+def lttb(points: list[tuple[float, float]], threshold: int) -> list[int]:
+    """Indices (croissants) des points retenus parmi `points` = [(x, y), …] triés par x."""
+    n = len(points)
+    if threshold >= n:
+        return list(range(n))
+    if threshold <= 2:
+        return [0, n - 1][:max(threshold, 0)]
+
+    kept = [0]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Moyenne du seau suivant : troisième sommet du triangle
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = points[next_start:next_end]
+        avg_x = sum(p[0] for p in span) / len(span)
+        avg_y = sum(p[1] for p in span) / len(span)
+
+        # Point du seau courant qui maximise l'aire du triangle (a, point, moyenne)
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = points[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
@@ -0,0 +1,95 @@
+"""
+Pool de workers dédié au hachage bcrypt — sort le coût 12 (~250 ms) de l'event loop.
+
+bcrypt relâche le GIL pendant hashpw/checkpw : un ThreadPoolExecutor suffit,
+pas besoin d'un pool de processus.
+
+  - Taille       : PASSWORD_HASH_WORKERS threads
+  - File bornée  : PASSWORD_HASH_QUEUE_SIZE appels en attente au-delà des workers
+  - Backpressure : PasswordPoolSaturatedError → 429 côté router
+  - Latence      : histogrammes password_pool.hash_seconds / verify_seconds (attente incluse)
+"""
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.utils.hashing import hash_password, verify_password
+
+T = TypeVar("T")
+
+
+class PasswordPoolSaturatedError(Exception):
+    """Tous les workers sont occupés et la file d'attente est pleine."""
+    pass
+
+
+class PasswordHashingPool:
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight = 0  # en cours + en attente (modifié uniquement depuis l'event loop)
+        self._rejected = metrics.counter(
+            "password_pool.rejected", "Appels refusés (pool saturé → 429)"
+        )
+        self._hash_latency = metrics.histogram(
+            "password_pool.hash_seconds", "Latence hash_password (attente + calcul)"
+        )
+        self._verify_latency = metrics.histogram(
+            "password_pool.verify_seconds", "Latence verify_password (attente + calcul)"
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def hash_password(self, plain_password: str) -> str:
+        return await self._run(self._hash_latency, hash_password, plain_password)
+
+    async def verify_password(self, plain_password: str, hashed: str) -> bool:
+        return await self._run(self._verify_latency, verify_password, plain_password, hashed)
+
+    def shutdown(self) -> None:
+        """Libère les threads (lifespan shutdown). Le pool est recréé à la demande."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, histogram, fn: Callable[..., T], *args) -> T:
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self._rejected.inc()
+            raise PasswordPoolSaturatedError()
+
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._in_flight -= 1
+            histogram.observe(time.perf_counter() - start)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="bcrypt",
+            )
+        return self._executor
+
+
+def _make_pool() -> PasswordHashingPool:
+    settings = get_settings()
+    return PasswordHashingPool(
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+    )
+
+
+# Instance singleton
+password_pool = _make_pool()
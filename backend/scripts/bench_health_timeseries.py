@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Banc d'essai — lectures santé coach sur 1 / 5 / 10 ans d'historique par utilisateur.
+
+Prérequis : PostgreSQL migré (alembic upgrade head, partitions de la migration 019).
+Crée un client par durée d'historique (--per-day mesures par jour et par paramètre,
+sur 3 paramètres), remplit le rollup, mesure puis supprime les données créées.
+
+Mesure (médiane de --runs exécutions, en ms) :
+  page       première page des logs partagés (keyset, 200 lignes)
+  30 jours   logs bruts des 30 derniers jours (un paramètre)
+  semaines   agrégats hebdomadaires sur tout l'historique (rollup health_log_daily)
+  brut       mêmes agrégats calculés sur health_logs (référence sans rollup)
+
+Usage:
+    python scripts/bench_health_timeseries.py [--per-day 24] [--runs 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import delete, func, insert, select, text
+
+from app.database import AsyncSessionLocal
+from app.models.health_log import HealthLog
+from app.models.health_parameter import HealthParameter
+from app.models.user import User
+from app.repositories import health_repository
+from app.repositories import health_timeseries_repository as ts_repo
+from app.repositories.performance_repository import bucket_start
+from app.repositories.user_repository import user_repository
+from app.services.health_timeseries_service import add_months
+
+YEARS = (1, 5, 10)
+SLUGS = ("bench_weight_kg", "bench_heart_rate_bpm", "bench_sleep_h")
+CHUNK_ROWS = 5_000
+
+
+async def _parameters(db) -> list[uuid.UUID]:
+    ids = []
+    for position, slug in enumerate(SLUGS):
+        param = await health_repository.get_parameter_by_slug(db, slug)
+        if param is None:
+            param = await health_repository.create_parameter(
+                db, slug=slug, label={"fr": slug, "en": slug}, unit=None,
+                data_type="float", category="other", position=100 + position,
+            )
+        ids.append(param.id)
+    await db.commit()
+    return ids
+
+
+async def _partitions(db, start: datetime) -> None:
+    """Partitions mensuelles de tout l'historique simulé (sinon tout tombe dans DEFAULT)."""
+    month = start.date().replace(day=1)
+    while month <= datetime.now(timezone.utc).date():
+        await ts_repo.create_partition(db, "health_logs", month, add_months(month, 1))
+        month = add_months(month, 1)
+    await db.commit()
+
+
+async def _seed(db, user_id: uuid.UUID, params: list[uuid.UUID], years: int, per_day: int, rng) -> int:
+    now = datetime.now(timezone.utc)
+    step = timedelta(days=1) / per_day
+    start = now - timedelta(days=365 * years)
+    await _partitions(db, start)
+    rows = []
+    total = 0
+    moment = start
+    while moment < now:
+        for param_id in params:
+            rows.append({
+                "id": uuid.uuid4(), "user_id": user_id, "parameter_id": param_id,
+                "value": round(rng.uniform(50, 100), 3), "source": "import",
+                "logged_at": moment, "created_at": now,
+            })
+        moment += step
+        if len(rows) >= CHUNK_ROWS:
+            await db.execute(insert(HealthLog), rows)
+            total += len(rows)
+            rows = []
+    if rows:
+        await db.execute(insert(HealthLog), rows)
+        total += len(rows)
+    await db.execute(
+        text(
+            """
+            INSERT INTO health_log_daily (user_id, parameter_id, day, count, sum_value, min_value, max_value)
+            SELECT user_id, parameter_id, (logged_at AT TIME ZONE 'UTC')::date,
+                   count(*), sum(value), min(value), max(value)
+            FROM health_logs WHERE user_id = :user_id
+            GROUP BY user_id, parameter_id, (logged_at AT TIME ZONE 'UTC')::date
+            """
+        ),
+        {"user_id": user_id},
+    )
+    await db.commit()
+    await db.execute(text("ANALYZE health_logs"))
+    await db.execute(text("ANALYZE health_log_daily"))
+    return total
+
+
+async def _raw_weekly(db, user_id: uuid.UUID):
+    bucket_col = bucket_start("week", HealthLog.logged_at)
+    q = (
+        select(
+            HealthLog.parameter_id, bucket_col, func.count(), func.min(HealthLog.value),
+            func.max(HealthLog.value), func.avg(HealthLog.value),
+        )
+        .where(HealthLog.user_id == user_id)
+        .group_by(HealthLog.parameter_id, bucket_col)
+    )
+    return (await db.execute(q)).all()
+
+
+async def _median_ms(runs: int, fn) -> float:
+    timings = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+async def run(per_day: int, runs: int, seed: int) -> None:
+    rng = random.Random(seed)
+    async with AsyncSessionLocal() as db:
+        params = await _parameters(db)
+        coach = await user_repository.create(
+            db, first_name="Bench", last_name="Coach", role="coach",
+            email=f"bench_coach_{uuid.uuid4().hex[:8]}@bench.local",
+        )
+        await db.commit()
+        users = [coach.id]
+        try:
+            print(f"{'historique':>10} {'logs':>10} {'page':>8} {'30 jours':>9} {'semaines':>9} {'brut':>8}")
+            for years in YEARS:
+                user = await user_repository.create(
+                    db, first_name="Bench", last_name=f"{years}y", role="client",
+                    email=f"bench_{years}y_{uuid.uuid4().hex[:8]}@bench.local",
+                )
+                users.append(user.id)
+                await db.commit()
+                count = await _seed(db, user.id, params, years, per_day, rng)
+                month_ago = datetime.now(timezone.utc) - timedelta(days=30)
+
+                page = await _median_ms(runs, partial(
+                    health_repository.get_shared_logs, db, user.id, coach.id, limit=200))
+                recent = await _median_ms(runs, partial(
+                    health_repository.get_shared_logs, db, user.id, coach.id,
+                    limit=10_000, parameter_id=params[0], from_date=month_ago))
+                weekly = await _median_ms(runs, partial(
+                    health_repository.get_shared_log_buckets, db, user.id, coach.id, bucket="week"))
+                raw = await _median_ms(max(runs // 4, 1), partial(_raw_weekly, db, user.id))
+                db.expunge_all()
+                print(f"{years:>8} an {count:>10,} {page:>8.1f} {recent:>9.1f} {weekly:>9.1f} {raw:>8.1f}")
+        finally:
+            await db.rollback()
+            await db.execute(delete(User).where(User.id.in_(users)))
+            await db.execute(delete(HealthParameter).where(HealthParameter.slug.in_(SLUGS)))
+            await db.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--per-day", type=int, default=24)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args.per_day, args.runs, args.seed))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Banc d'essai — générateur de programmes (recherche sous contraintes + tirage).
+
+Catalogue : les exercices de scripts/seed_exercises.py, indexés en mémoire
+(aucune base de données nécessaire).
+
+Mesure :
+  1. recherche à froid : solve() pour chaque (objectif, fréquence 1-7, niveau) ;
+  2. génération à chaud : plans complets (draft_program) par seconde.
+
+Usage:
+    python scripts/bench_program_generator.py [--plans 20000] [--seed 42]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from itertools import product
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.models.workout_plan import PLAN_LEVELS
+from app.services.exercise_catalogue_service import CatalogueExercise, CatalogueIndex
+from app.services.program_generator_service import GOAL_PROFILES, draft_program, solve
+from seed_exercises import EXERCISES
+
+
+def _catalogue() -> CatalogueIndex:
+    return CatalogueIndex(
+        [
+            CatalogueExercise(uuid.uuid4(), name_key, category, difficulty, frozenset(primary))
+            for name_key, category, difficulty, primary, _secondary in EXERCISES
+        ],
+        version=1,
+    )
+
+
+def run(plans: int, seed: int) -> None:
+    combos = list(product(GOAL_PROFILES, range(1, 8), PLAN_LEVELS))
+
+    solve.cache_clear()
+    slowest = (0.0, None)
+    start = time.perf_counter()
+    for goal, freq, level in combos:
+        t0 = time.perf_counter()
+        solve(goal, freq, level)
+        slowest = max(slowest, (time.perf_counter() - t0, (goal, freq, level)))
+    cold = time.perf_counter() - start
+    print(f"Recherche à froid : {len(combos)} combinaisons en {cold * 1000:.0f} ms "
+          f"(max {slowest[0] * 1000:.1f} ms pour {slowest[1]})")
+
+    catalogue = _catalogue()
+    rng = random.Random(seed)
+    sessions = exercises = 0
+    start = time.perf_counter()
+    for i in range(plans):
+        goal, freq, level = combos[i % len(combos)]
+        draft = draft_program(
+            catalogue, goal=goal, frequency_per_week=freq, level=level, rng=rng
+        )
+        sessions += len(draft.sessions)
+        exercises += sum(len(s.exercises) for s in draft.sessions)
+    warm = time.perf_counter() - start
+    print(f"Génération à chaud : {plans} plans ({sessions} séances, {exercises} exercices) "
+          f"en {warm:.2f} s → {plans / warm:,.0f} plans/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--plans", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.plans, args.seed)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""Reprise unique de la compaction des mesures de balance (une par utilisateur et par jour).
+
+La tâche health.timeseries ne compacte que les HEALTH_COMPACTION_LOOKBACK_DAYS
+jours précédant la limite de rétention : à lancer une fois quand
+HEALTH_RAW_RETENTION_DAYS est activé, pour l'historique plus ancien.
+Mois par mois, commit après chaque mois : une relance reprend sans surcoût.
+
+Usage:
+    python scripts/compact_body_measurements.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.database import AsyncSessionLocal  # noqa: E402
+from app.services import health_timeseries_service  # noqa: E402
+
+
+async def main() -> None:
+    async with AsyncSessionLocal() as db:
+        deleted = await health_timeseries_service.backfill_body_measurements(
+            db, datetime.now(timezone.utc)
+        )
+    print(f"{deleted} mesures compactées")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
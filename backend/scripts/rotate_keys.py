@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Rotation des clés Fernet — re-chiffre les colonnes avec la clé primaire courante.
+
+Prérequis : FIELD_ENCRYPTION_KEY / TOKEN_ENCRYPTION_KEY = "nouvelle,ancienne"
+déployées sur tous les processus. Interruptible : une relance reprend au dernier lot.
+
+Usage:
+    python scripts/rotate_keys.py [--kind field|token] [--batch-size N] [--rows-per-second N]
+    python scripts/rotate_keys.py --status
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.database import AsyncSessionLocal  # noqa: E402
+from app.services import key_rotation_service  # noqa: E402
+
+
+async def show_status() -> None:
+    async with AsyncSessionLocal() as db:
+        for item in await key_rotation_service.get_progress(db):
+            print(
+                f"{item['key_kind']:5} {item['table_name']:28} {item['status']:9} "
+                f"{item['rows_scanned']:>10} lignes  {item['rows_rewritten']:>10} réécrites"
+            )
+
+
+async def rotate(kinds: tuple[str, ...], batch_size: int | None, rows_per_second: float | None) -> None:
+    async with AsyncSessionLocal() as db:
+        for target in key_rotation_service.discover_targets():
+            if target.key_kind not in kinds:
+                continue
+            checkpoint = await key_rotation_service.rotate_target(
+                db, target, batch_size=batch_size, rows_per_second=rows_per_second
+            )
+            print(
+                f"{target.key_kind:5} {target.table_name:28} "
+                f"{checkpoint.rows_scanned:>10} lignes  {checkpoint.rows_rewritten:>10} réécrites"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kind", choices=["field", "token"], action="append")
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--rows-per-second", type=float)
+    parser.add_argument("--status", action="store_true")
+    args = parser.parse_args()
+    if args.status:
+        asyncio.run(show_status())
+    else:
+        asyncio.run(rotate(tuple(args.kind or ("field", "token")), args.batch_size, args.rows_per_second))
@@ -28,6 +28,7 @@ from app.database import Base, get_db
 from app.main import app
 from app.repositories.api_key_repository import api_key_repository
 from app.repositories.user_repository import user_repository
+from app.services.exercise_catalogue_service import exercise_catalogue
 
 settings = get_settings()
 
@@ -60,6 +61,8 @@ async def clean_tables(create_tables):
     async with _test_engine.begin() as conn:
         for table in reversed(Base.metadata.sorted_tables):
             await conn.execute(table.delete())
+    # DELETE hors ORM : l'index en mémoire du catalogue ne le voit pas
+    exercise_catalogue.invalidate()
 
 
 # ---------------------------------------------------------------------------
@@ -390,6 +390,155 @@ class TestPasswordReset:
         assert resp.status_code == 400
 
 
+# ===========================================================================
+# Cache des utilisateurs authentifiés (principal_cache)
+# ===========================================================================
+
+class TestPrincipalCache:
+
+    async def test_second_request_served_from_cache(self, client: AsyncClient, coach_api_key: str):
+        """✅ 2e requête avec la même clé → hit (pas de lookup BDD)."""
+        from app.auth.principal_cache import principal_cache
+        await client.get("/auth/me", headers={"X-API-Key": coach_api_key})
+        hits_before = principal_cache.stats()["hits"]
+        misses_before = principal_cache.stats()["misses"]
+
+        resp = await client.get("/auth/me", headers={"X-API-Key": coach_api_key})
+        assert resp.status_code == 200
+        assert principal_cache.stats()["hits"] == hits_before + 1
+        assert principal_cache.stats()["misses"] == misses_before
+
+    async def test_profile_update_invalidates(self, client: AsyncClient, coach_api_key: str):
+        """✅ Modification de l'User → entrée invalidée, /auth/me reflète la nouvelle valeur."""
+        headers = {"X-API-Key": coach_api_key}
+        await client.get("/auth/me", headers=headers)
+        resp = await client.patch("/users/me/profile", json={"gender": "female"}, headers=headers)
+        assert resp.status_code == 200
+
+        me = await client.get("/auth/me", headers=headers)
+        assert me.json()["user"]["gender"] == "female"
+
+    async def test_suspend_user_invalidates(
+        self, client: AsyncClient, coach_user: User, coach_api_key: str, db: AsyncSession
+    ):
+        """❌ Compte suspendu après mise en cache → 403 dès le commit."""
+        headers = {"X-API-Key": coach_api_key}
+        assert (await client.get("/auth/me", headers=headers)).status_code == 200
+
+        user = await user_repository.get_by_id(db, coach_user.id)
+        await user_repository.update(db, user, status="suspended")
+        await db.commit()
+
+        resp = await client.get("/auth/me", headers=headers)
+        assert resp.status_code == 403
+        assert resp.json()["detail"] == "account_suspended"
+
+    async def test_deletion_pending_invalidates(
+        self, client: AsyncClient, coach_user: User, coach_api_key: str, db: AsyncSession
+    ):
+        """❌ Compte en deletion_pending après mise en cache → 403."""
+        headers = {"X-API-Key": coach_api_key}
+        assert (await client.get("/auth/me", headers=headers)).status_code == 200
+
+        user = await user_repository.get_by_id(db, coach_user.id)
+        await user_repository.request_deletion(db, user)
+        await db.commit()
+
+        resp = await client.get("/auth/me", headers=headers)
+        assert resp.status_code == 403
+        assert resp.json()["detail"] == "account_pending_deletion"
+
+    async def test_invalidation_deferred_to_commit(
+        self, client: AsyncClient, coach_api_key: str, db: AsyncSession
+    ):
+        """✅ Logout non committé → entrée conservée (rollback : clé toujours valide) ;
+        ❌ après commit → 401."""
+        from app.auth.principal_cache import principal_cache
+        from app.services.auth_service import auth_service
+        headers = {"X-API-Key": coach_api_key}
+        assert (await client.get("/auth/me", headers=headers)).status_code == 200
+        size = principal_cache.stats()["size"]
+
+        await auth_service.logout(db, coach_api_key)
+        assert principal_cache.stats()["size"] == size
+        await db.rollback()
+        assert principal_cache.stats()["size"] == size
+        assert (await client.get("/auth/me", headers=headers)).status_code == 200
+
+        await auth_service.logout(db, coach_api_key)
+        await db.commit()
+        assert principal_cache.stats()["size"] == size - 1
+        assert (await client.get("/auth/me", headers=headers)).status_code == 401
+
+    async def test_lru_eviction_and_ttl(self):
+        """✅ Taille bornée (LRU) + TTL 0 → cache désactivé."""
+        from app.auth.principal_cache import PrincipalCache
+        cache = PrincipalCache(max_size=2, ttl_seconds=60)
+        users = [
+            User(id=uuid.uuid4(), role="client", status="active",
+                 first_name="A", last_name="B", email=f"lru{i}@test.com")
+            for i in range(3)
+        ]
+        for i, u in enumerate(users):
+            cache.put(f"hash-{i}", u)
+        assert cache.stats()["size"] == 2
+
+        cache.invalidate_user(users[2].id)
+        assert cache.stats()["size"] == 1
+
+        disabled = PrincipalCache(max_size=10, ttl_seconds=0)
+        disabled.put("hash", users[0])
+        assert disabled.stats()["size"] == 0
+
+
+# ===========================================================================
+# Pool bcrypt (password_pool)
+# ===========================================================================
+
+class TestPasswordPool:
+
+    async def test_hash_and_verify_off_loop(self):
+        """✅ hash/verify via le pool → résultat identique à bcrypt synchrone + latence mesurée."""
+        from app.utils.password_pool import PasswordHashingPool
+        pool = PasswordHashingPool(max_workers=2, max_queue=2)
+        try:
+            before = pool._hash_latency.count
+            hashed = await pool.hash_password("Password1")
+            assert await pool.verify_password("Password1", hashed) is True
+            assert await pool.verify_password("Wrong1", hashed) is False
+            assert pool._hash_latency.count == before + 1
+            assert pool.in_flight == 0
+        finally:
+            pool.shutdown()
+
+    async def test_saturated_pool_rejects(self):
+        """❌ Workers + file pleins → PasswordPoolSaturatedError (pas d'attente illimitée)."""
+        import asyncio
+        from app.utils.password_pool import PasswordHashingPool, PasswordPoolSaturatedError
+        pool = PasswordHashingPool(max_workers=1, max_queue=0)
+        try:
+            first = asyncio.create_task(pool.hash_password("Password1"))
+            await asyncio.sleep(0)  # le 1er appel occupe l'unique slot
+            with pytest.raises(PasswordPoolSaturatedError):
+                await pool.hash_password("Password2")
+            await first
+        finally:
+            pool.shutdown()
+
+    async def test_login_returns_429_when_saturated(
+        self, client: AsyncClient, coach_user: User, monkeypatch
+    ):
+        """❌ Pool saturé pendant un login → 429 + Retry-After."""
+        from app.utils.password_pool import password_pool
+        monkeypatch.setattr(password_pool, "max_workers", 0)
+        monkeypatch.setattr(password_pool, "max_queue", 0)
+        resp = await client.post("/auth/login", json={
+            "email": "whoever@test.com", "password": "Password1",
+        })
+        assert resp.status_code == 429
+        assert resp.headers["retry-after"] == "1"
+
+
 # ===========================================================================
 # GET /health
 # ===========================================================================
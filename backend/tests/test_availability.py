@@ -0,0 +1,177 @@
+"""
+Tests — moteur de disponibilités (créneaux libres d'un coach).
+
+Couvre :
+1. expand_slots     dépliage des règles hebdo, max_slots, chevauchements, horizon, emploi du temps
+2. GET /coaches/{id}/slots  créneaux libres via l'API, créneau complet exclu
+3. create_booking   capacité issue des règles, hors disponibilités → 409
+"""
+from datetime import datetime, time, timedelta, timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from httpx import AsyncClient
+
+from app.services.availability_service import expand_slots
+
+UTC = ZoneInfo("UTC")
+MONDAY = datetime(2030, 1, 7, tzinfo=timezone.utc)  # lundi
+NOW = MONDAY - timedelta(days=1)
+
+
+def _rule(day: int, start: str, end: str, max_slots: int = 1, horizon: int = 30):
+    h1, m1 = map(int, start.split(":"))
+    h2, m2 = map(int, end.split(":"))
+    return SimpleNamespace(
+        day_of_week=day, start_time=time(h1, m1), end_time=time(h2, m2),
+        max_slots=max_slots, booking_horizon_days=horizon,
+    )
+
+
+def _at(hour: int, minute: int = 0, day: datetime = MONDAY) -> datetime:
+    return day.replace(hour=hour, minute=minute)
+
+
+def _expand(rules, schedules=(), busy=(), *, days: int = 1, duration: int = 60, now=NOW):
+    return expand_slots(
+        list(rules), list(schedules), list(busy),
+        tz=UTC, window_start=MONDAY, window_end=MONDAY + timedelta(days=days),
+        duration=timedelta(minutes=duration), now=now,
+    )
+
+
+class TestExpandSlots:
+
+    def test_weekly_rule_expanded(self):
+        """✅ Lundi 09:00-12:00 → 3 créneaux d'1h, uniquement le lundi."""
+        slots = _expand([_rule(0, "09:00", "12:00", max_slots=2)], days=7)
+        assert [s.start for s in slots] == [_at(9), _at(10), _at(11)]
+        assert all(s.capacity == 2 and s.remaining == 2 for s in slots)
+
+    def test_bookings_subtracted_with_capacity(self):
+        """✅ 2 réservations sur 10:00 (max 2) → complet ; 1 sur 11:30 → 1 place sur 11:00."""
+        busy = [
+            (_at(10), _at(11)),
+            (_at(10), _at(11)),
+            (_at(11, 30), _at(12, 30)),
+        ]
+        slots = {s.start: s for s in _expand([_rule(0, "09:00", "12:00", max_slots=2)], busy=busy)}
+        assert slots[_at(9)].remaining == 2
+        assert slots[_at(10)].remaining == 0
+        assert slots[_at(11)].remaining == 1
+
+    def test_peak_overlap_not_sum(self):
+        """✅ Deux réservations successives dans un même créneau → pic 1, pas 2."""
+        busy = [(_at(9), _at(9, 30)), (_at(9, 30), _at(10))]
+        slots = _expand([_rule(0, "09:00", "10:00", max_slots=2)], busy=busy)
+        assert slots[0].booked == 1
+
+    def test_work_schedule_clips_rules(self):
+        """✅ Emploi du temps 09:00-10:00 + 14:00-18:00 → règle 08:00-16:00 restreinte."""
+        schedule = SimpleNamespace(
+            day_of_week=0, is_working_day=True,
+            time_slots=[{"start_time": "09:00", "end_time": "10:00"},
+                        {"start_time": "14:00", "end_time": "18:00"}],
+        )
+        slots = _expand([_rule(0, "08:00", "16:00")], schedules=[schedule])
+        assert [s.start for s in slots] == [_at(9), _at(14), _at(15)]
+
+    def test_non_working_day_has_no_slot(self):
+        """❌ Jour non travaillé → aucun créneau malgré la règle."""
+        schedule = SimpleNamespace(day_of_week=0, is_working_day=False, time_slots=[])
+        assert _expand([_rule(0, "09:00", "12:00")], schedules=[schedule]) == []
+
+    def test_booking_horizon(self):
+        """❌ Créneau au-delà de booking_horizon_days → exclu."""
+        rules = [_rule(0, "09:00", "10:00", horizon=7)]
+        assert len(_expand(rules, days=14)) == 1
+        assert _expand(rules, days=14, now=MONDAY - timedelta(days=10)) == []
+
+    def test_past_slots_excluded(self):
+        """❌ Créneau déjà commencé → exclu."""
+        slots = _expand([_rule(0, "09:00", "12:00")], now=_at(10, 30))
+        assert [s.start for s in slots] == [_at(11)]
+
+
+# ── API ────────────────────────────────────────────────────────────────────────
+
+async def _setup_coach(client: AsyncClient, coach_key: str, max_slots: int = 2) -> None:
+    headers = {"X-API-Key": coach_key}
+    await client.post("/coaches/profile", json={"bio": "Coach", "currency": "EUR"}, headers=headers)
+    for day in range(7):
+        await client.post(
+            "/coaches/availability",
+            json={"day_of_week": day, "start_time": "08:00", "end_time": "12:00", "max_slots": max_slots},
+            headers=headers,
+        )
+
+
+def _tomorrow_local(hour: int) -> datetime:
+    paris = ZoneInfo("Europe/Paris")
+    day = (datetime.now(paris) + timedelta(days=1)).date()
+    return datetime.combine(day, time(hour), tzinfo=paris).astimezone(timezone.utc)
+
+
+class TestFreeSlotsEndpoint:
+
+    async def test_free_slots_and_full_slot_excluded(
+        self, client: AsyncClient, coach_user, coach_api_key: str, client_api_key: str
+    ):
+        """✅ 4 créneaux demain ; 2 réservations à 09:00 (max 2) → 09:00 disparaît."""
+        await _setup_coach(client, coach_api_key)
+        params = {"from": _tomorrow_local(0).isoformat(), "to": _tomorrow_local(23).isoformat()}
+        url = f"/coaches/{coach_user.id}/slots"
+
+        resp = await client.get(url, params=params, headers={"X-API-Key": client_api_key})
+        assert resp.status_code == 200
+        assert len(resp.json()) == 4
+
+        for _ in range(2):
+            r = await client.post(
+                "/bookings",
+                json={"coach_id": str(coach_user.id), "scheduled_at": _tomorrow_local(9).isoformat()},
+                headers={"X-API-Key": client_api_key},
+            )
+            assert r.status_code == 201
+
+        slots = (await client.get(url, params=params, headers={"X-API-Key": client_api_key})).json()
+        starts = [datetime.fromisoformat(s["start"]) for s in slots]
+        assert _tomorrow_local(9) not in starts
+        assert len(slots) == 3
+
+    async def test_window_too_large(self, client: AsyncClient, coach_user, client_api_key: str):
+        """❌ Fenêtre > 62 jours → 422."""
+        start = datetime.now(timezone.utc)
+        resp = await client.get(
+            f"/coaches/{coach_user.id}/slots",
+            params={"from": start.isoformat(), "to": (start + timedelta(days=90)).isoformat()},
+            headers={"X-API-Key": client_api_key},
+        )
+        assert resp.status_code == 422
+
+
+class TestBookingCapacity:
+
+    async def test_booking_outside_availability_rejected(
+        self, client: AsyncClient, coach_user, coach_api_key: str, client_api_key: str
+    ):
+        """❌ Réservation à 15:00 alors que le coach est dispo 08:00-12:00 → 409."""
+        await _setup_coach(client, coach_api_key)
+        resp = await client.post(
+            "/bookings",
+            json={"coach_id": str(coach_user.id), "scheduled_at": _tomorrow_local(15).isoformat()},
+            headers={"X-API-Key": client_api_key},
+        )
+        assert resp.status_code == 409
+
+    async def test_third_booking_on_two_seat_slot_rejected(
+        self, client: AsyncClient, coach_user, coach_api_key: str, client_api_key: str
+    ):
+        """❌ max_slots=2 → 3e réservation sur le même créneau → 409."""
+        await _setup_coach(client, coach_api_key)
+        payload = {"coach_id": str(coach_user.id), "scheduled_at": _tomorrow_local(10).isoformat()}
+        codes = [
+            (await client.post("/bookings", json=payload, headers={"X-API-Key": client_api_key})).status_code
+            for _ in range(3)
+        ]
+        assert codes == [201, 201, 409]
@@ -7,6 +7,7 @@ import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.repositories import booking_repository, coach_repository
 
 BASE_COACH = {"bio": "Coach test", "currency": "EUR", "session_duration_min": 60}
@@ -294,3 +295,213 @@ class TestBookingListing:
         resp = await client.get("/bookings", headers={"X-API-Key": coach_api_key})
         assert resp.status_code == 200
         assert resp.json()["total"] >= 1
+
+
+class TestConcurrentBooking:
+    def test_overlapping_bookings_share_a_lock(self):
+        """✅ Deux séances qui se chevauchent (même à cheval sur minuit) partagent un verrou."""
+        from app.services.booking_service import _slot_lock_keys
+        coach = uuid.uuid4()
+        late = datetime(2030, 1, 7, 23, 0, tzinfo=timezone.utc)
+        early = datetime(2030, 1, 8, 0, 30, tzinfo=timezone.utc)
+        assert set(_slot_lock_keys(coach, late, 120)) & set(_slot_lock_keys(coach, early, 60))
+
+    def test_other_coach_never_blocked(self):
+        """✅ Coachs différents → aucun verrou commun."""
+        from app.services.booking_service import _slot_lock_keys
+        slot = datetime(2030, 1, 7, 10, 0, tzinfo=timezone.utc)
+        assert not set(_slot_lock_keys(uuid.uuid4(), slot, 60)) & set(_slot_lock_keys(uuid.uuid4(), slot, 60))
+
+    async def test_no_overbooking_under_load(self, db: AsyncSession, coach_user, client_user):
+        """✅ 300 créations simultanées sur un créneau de 3 places → exactement 3 réservations."""
+        import asyncio
+        from sqlalchemy import func, select
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from app.models.booking import Booking
+        from app.schemas.booking import BookingCreate
+        from app.services import booking_service
+        from app.services.booking_service import SlotFullError
+
+        profile = await coach_repository.create_profile(db, coach_user.id, bio="Charge")
+        for day in range(7):
+            await coach_repository.add_availability(
+                db, profile.id, day_of_week=day, start_time="00:00", end_time="23:59", max_slots=3,
+            )
+        await db.commit()
+        slot = (datetime.now(timezone.utc) + timedelta(days=2)).replace(minute=0, second=0, microsecond=0)
+        data = BookingCreate(coach_id=coach_user.id, scheduled_at=slot)
+
+        engine = create_async_engine(get_settings().DATABASE_URL, pool_size=50, max_overflow=0)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def _attempt() -> bool:
+            async with sessions() as session:
+                try:
+                    await booking_service.create_booking(session, client_user, data)
+                    await session.commit()
+                    return True
+                except SlotFullError:
+                    await session.rollback()
+                    return False
+
+        try:
+            results = await asyncio.gather(*(_attempt() for _ in range(300)))
+        finally:
+            await engine.dispose()
+
+        assert sum(results) == 3
+        count = (await db.execute(
+            select(func.count()).select_from(Booking).where(Booking.coach_id == coach_user.id)
+        )).scalar_one()
+        assert count == 3
+
+
+class TestCancellationPolicyCache:
+    async def test_policy_resolved_once(self, db: AsyncSession, coach_user):
+        """✅ 2e résolution servie par le cache (aucune requête)."""
+        from app.services import cancellation_policy_service as cps
+        misses = cps.policy_cache.stats()["misses"]
+        first = await cps.get_policy(db, coach_user.id)
+        second = await cps.get_policy(db, coach_user.id)
+        assert first == second == cps.DEFAULT_POLICY
+        assert cps.policy_cache.stats()["misses"] == misses + 1
+
+    async def test_set_policy_invalidated_on_commit(self, db: AsyncSession, coach_user):
+        """✅ Politique modifiée : ancienne valeur servie jusqu'au commit, nouvelle ensuite."""
+        from app.schemas.coach import CancellationPolicyUpdate
+        from app.services import cancellation_policy_service as cps, coach_service
+        await coach_repository.create_profile(db, coach_user.id, bio="x")
+        await db.commit()
+        assert (await cps.get_policy(db, coach_user.id)).threshold_hours == 24
+
+        await coach_service.set_cancellation_policy(
+            db, coach_user, CancellationPolicyUpdate(threshold_hours=2)
+        )
+        assert cps.policy_cache.get(coach_user.id) is not None
+        await db.commit()
+        assert cps.policy_cache.get(coach_user.id) is None
+        assert (await cps.get_policy(db, coach_user.id)).threshold_hours == 2
+
+    async def test_set_policy_invalidates_cache(
+        self, client: AsyncClient, db: AsyncSession, coach_api_key: str, coach_user, client_api_key: str
+    ):
+        """✅ Politique modifiée (seuil 2h) → annulation à 10h de la séance non tardive."""
+        from app.services import cancellation_policy_service as cps
+        await _create_coach_profile(client, coach_api_key)
+        assert (await cps.get_policy(db, coach_user.id)).threshold_hours == 24  # mis en cache
+
+        resp = await client.put(
+            "/coaches/cancellation-policy",
+            json={"threshold_hours": 2, "noshow_is_due": False},
+            headers={"X-API-Key": coach_api_key},
+        )
+        assert resp.status_code == 200
+        policy = await cps.get_policy(db, coach_user.id)
+        assert policy.threshold_hours == 2 and policy.noshow_is_due is False
+
+        r = await client.post(
+            "/bookings",
+            json={"coach_id": str(coach_user.id), "scheduled_at": _future_slot(10)},
+            headers={"X-API-Key": client_api_key},
+        )
+        booking_id = r.json()["id"]
+        await client.post(f"/bookings/{booking_id}/confirm", headers={"X-API-Key": coach_api_key})
+        resp = await client.delete(f"/bookings/{booking_id}", headers={"X-API-Key": client_api_key})
+        assert resp.json()["status"] == "cancelled_by_client"
+
+    async def test_batch_resolution(self, db: AsyncSession, coach_user, client_user):
+        """✅ get_policies → une politique par coach, défaut si aucune définie."""
+        from app.services import cancellation_policy_service as cps
+        profile = await coach_repository.create_profile(db, coach_user.id, bio="x")
+        await coach_repository.upsert_cancellation_policy(db, profile.id, threshold_hours=6)
+        await db.commit()
+        cps.invalidate(coach_user.id)
+
+        policies = await cps.get_policies(db, [coach_user.id, client_user.id])
+        assert policies[coach_user.id].threshold_hours == 6
+        assert policies[client_user.id] == cps.DEFAULT_POLICY
+
+
+class TestBulkTransition:
+    async def _bookings(self, db, coach_user, client_user, n, *, status="confirmed", package_id=None):
+        ids = []
+        for i in range(n):
+            b = await booking_repository.create(
+                db, client_user.id, coach_user.id,
+                scheduled_at=datetime.now(timezone.utc) + timedelta(hours=i + 1),
+                status=status, package_id=package_id,
+            )
+            ids.append(b.id)
+        await db.commit()
+        return ids
+
+    async def _package(self, db, coach_user, client_user, remaining):
+        from app.repositories import payment_repository
+        pkg = await payment_repository.create_package(
+            db, client_user.id, coach_user.id, name="Pack", sessions_total=10,
+            sessions_remaining=remaining, price_cents=1000,
+        )
+        await db.commit()
+        return pkg.id
+
+    async def test_bulk_done_partial_failures(
+        self, client: AsyncClient, db: AsyncSession, coach_user, client_user, coach_api_key: str
+    ):
+        """✅ 3 séances terminées + forfait décompté de 3 ; ❌ pending/inconnue → erreurs par item."""
+        from app.models.package import Package
+        pkg_id = await self._package(db, coach_user, client_user, 5)
+        done_ids = await self._bookings(db, coach_user, client_user, 3, package_id=pkg_id)
+        pending_id = (await self._bookings(db, coach_user, client_user, 1, status="pending_coach_validation"))[0]
+        unknown_id = uuid.uuid4()
+
+        resp = await client.post(
+            "/coaches/bookings/bulk-transition",
+            json={"action": "done", "booking_ids": [str(i) for i in [*done_ids, pending_id, unknown_id]]},
+            headers={"X-API-Key": coach_api_key},
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["succeeded"] == 3 and data["failed"] == 2
+        errors = {item["booking_id"]: item["error"] for item in data["items"] if not item["ok"]}
+        assert errors == {str(pending_id): "invalid_transition", str(unknown_id): "not_found"}
+
+        db.expunge_all()
+        pkg = await db.get(Package, pkg_id)
+        assert pkg.sessions_remaining == 2
+
+    async def test_bulk_done_exhausts_package(self, db: AsyncSession, coach_user, client_user):
+        """✅ Forfait à 1 séance, 2 séances terminées → 0 et 'exhausted' (jamais négatif)."""
+        from app.models.package import Package
+        from app.services import booking_service
+        pkg_id = await self._package(db, coach_user, client_user, 1)
+        ids = await self._bookings(db, coach_user, client_user, 2, package_id=pkg_id)
+
+        items = await booking_service.bulk_transition(db, coach_user, ids, "done")
+        await db.commit()
+        assert all(item.ok for item in items)
+        db.expunge_all()
+        pkg = await db.get(Package, pkg_id)
+        assert (pkg.sessions_remaining, pkg.status) == (0, "exhausted")
+
+    async def test_bulk_other_coach_not_authorized(self, db: AsyncSession, coach_user, client_user):
+        """❌ Réservations d'un autre coach → not_authorized, statut inchangé."""
+        from app.services import booking_service
+        ids = await self._bookings(db, coach_user, client_user, 2, status="pending_coach_validation")
+        items = await booking_service.bulk_transition(db, client_user, ids, "confirm")
+        assert [item.error for item in items] == ["not_authorized", "not_authorized"]
+
+    async def test_bulk_no_show_respects_policy(self, db: AsyncSession, coach_user, client_user):
+        """✅ noshow_is_due=False → no-show sans décompte du forfait."""
+        from app.models.package import Package
+        from app.services import booking_service, cancellation_policy_service
+        profile = await coach_repository.create_profile(db, coach_user.id, bio="x")
+        await coach_repository.upsert_cancellation_policy(db, profile.id, noshow_is_due=False)
+        cancellation_policy_service.invalidate(coach_user.id)
+        pkg_id = await self._package(db, coach_user, client_user, 5)
+        ids = await self._bookings(db, coach_user, client_user, 2, package_id=pkg_id)
+
+        items = await booking_service.bulk_transition(db, coach_user, ids, "no_show")
+        await db.commit()
+        assert [item.status for item in items] == ["no_show_client"] * 2
+        db.expunge_all()
+        assert (await db.get(Package, pkg_id)).sessions_remaining == 5
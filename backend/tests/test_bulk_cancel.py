@@ -3,10 +3,20 @@
 import uuid
 from datetime import datetime, timedelta, timezone
 
+import asyncio
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.sms.provider import RateLimiter, SmsProvider, SmsResult, send_many
+from app.models.booking import Booking
+from app.models.sms_log import SmsLog
+from app.repositories import booking_repository
+from app.services import sms_outbox_service
+from app.services.bulk_cancel_service import bulk_cancel_bookings
+
 BASE_PROFILE = {"bio": "Coach test", "currency": "EUR", "session_duration_min": 60}
 
 
@@ -173,6 +183,107 @@ class TestBulkCancel:
         assert resp.status_code == 401
 
 
+async def _confirmed(db: AsyncSession, coach_user, client_user, hours: int) -> uuid.UUID:
+    booking = await booking_repository.create(
+        db, client_user.id, coach_user.id,
+        scheduled_at=datetime.now(timezone.utc) + timedelta(hours=hours),
+    )
+    await db.execute(update(Booking).where(Booking.id == booking.id).values(status="confirmed"))
+    await db.commit()
+    return booking.id
+
+
+class TestBulkCancelSetBased:
+
+    async def test_late_status_computed_in_sql(self, db: AsyncSession, coach_user, client_user):
+        """✅ Séance dans 2h → cancelled_by_coach_late ; dans 72h → cancelled_by_coach (seuil 24h)."""
+        soon = await _confirmed(db, coach_user, client_user, 2)
+        later = await _confirmed(db, coach_user, client_user, 72)
+
+        result = await bulk_cancel_bookings(db, coach_user, [soon, later], send_sms=False)
+        await db.commit()
+
+        assert result.cancelled_count == 2
+        db.expunge_all()
+        statuses = dict((await db.execute(select(Booking.id, Booking.status))).all())
+        assert statuses == {soon: "cancelled_by_coach_late", later: "cancelled_by_coach"}
+
+    async def test_already_cancelled_not_counted(self, db: AsyncSession, coach_user, client_user):
+        """✅ Deuxième passage sur le même lot → 0 annulation, pas de SMS."""
+        ids = [await _confirmed(db, coach_user, client_user, 72)]
+        await bulk_cancel_bookings(db, coach_user, ids, send_sms=False)
+        result = await bulk_cancel_bookings(db, coach_user, ids, custom_message="Annulé")
+        assert result.cancelled_count == 0
+        assert result.sms_sent_count == 0
+
+    async def test_sms_queued_in_outbox(self, db: AsyncSession, coach_user, client_user):
+        """✅ 3 séances, client avec téléphone → 3 SMS en file, envoyés par le worker."""
+        client_user.phone = "+33612345678"
+        await db.commit()
+        ids = [await _confirmed(db, coach_user, client_user, 72 + i) for i in range(3)]
+
+        result = await bulk_cancel_bookings(db, coach_user, ids, custom_message="Séance annulée")
+        await db.commit()
+
+        assert result.sms_sent_count == 3
+        assert result.sms_failed_count == 0
+        statuses = (await db.execute(select(SmsLog.status))).scalars().all()
+        assert statuses == ["pending"] * 3
+
+        assert await sms_outbox_service.drain(db) == 3
+        logs = (await db.execute(select(SmsLog).execution_options(populate_existing=True))).scalars().all()
+        assert {log.status for log in logs} == {"sent"}
+        assert all(log.recipient_phone == "+33612345678" for log in logs)
+
+
+class _SlowProvider(SmsProvider):
+    name = "test_slow"
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.peak = 0
+
+    async def send(self, to: str, body: str) -> SmsResult:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if to == "boom":
+            raise RuntimeError("provider down")
+        return SmsResult(success=True, provider_message_id=to)
+
+
+class TestSmsFanOut:
+
+    async def test_concurrency_bounded(self):
+        """✅ 10 envois, max 3 en vol → pic 3, résultats dans l'ordre."""
+        provider = _SlowProvider()
+        results = await send_many(provider, [(str(i), "x") for i in range(10)], max_concurrency=3)
+        assert provider.peak == 3
+        assert [r.provider_message_id for r in results] == [str(i) for i in range(10)]
+
+    async def test_provider_exception_is_failed_result(self):
+        """❌ Exception du provider → SmsResult en échec, les autres envois aboutissent."""
+        results = await send_many(_SlowProvider(), [("a", "x"), ("boom", "x")], max_concurrency=2)
+        assert [r.success for r in results] == [True, False]
+        assert results[1].error_message == "provider down"
+
+    async def test_rate_limiter_spacing(self):
+        """✅ 4 envois à 2/s → 3 attentes de 0,5 s (horloge simulée)."""
+        clock = 0.0
+        waits: list[float] = []
+
+        async def _sleep(seconds: float) -> None:
+            nonlocal clock
+            waits.append(seconds)
+            clock += seconds
+
+        limiter = RateLimiter(2.0, clock=lambda: clock, sleep=_sleep)
+        for _ in range(4):
+            await limiter.acquire()
+        assert waits == [0.5, 0.5, 0.5]
+
+
 class TestSmsLogs:
     async def test_sms_logs_empty(self, client: AsyncClient, coach_api_key: str):
         """✅ Logs SMS vides au départ."""
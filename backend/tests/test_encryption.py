@@ -0,0 +1,177 @@
+"""
+Tests — chiffrement Fernet des champs PII (lot + mode lazy).
+
+Couvre :
+1. decrypt_fields / decrypt_batch    lot déchiffré dans l'ordre, None conservé, offload thread
+2. Mode lazy                         email/phone non déchiffrés au chargement, clair au 1er accès
+3. decrypt_loaded                    un résultat de requête déchiffré en une passe
+4. Réécriture                        un Ciphertext non modifié est réécrit tel quel
+5. PlaintextCache                    LRU octets/entrées, TTL, wipe, pools PII/tokens séparés
+"""
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.encrypted_type import Ciphertext, decrypt_loaded
+from app.core.encryption import decrypt_batch, decrypt_fields, encrypt_field
+from app.core.plaintext_cache import PlaintextCache
+from app.models.user import User
+from app.repositories.user_repository import user_repository
+
+
+async def _make_users(db: AsyncSession, n: int) -> list[uuid.UUID]:
+    ids = []
+    for i in range(n):
+        user = await user_repository.create(
+            db, first_name=f"Lot{i}", last_name="Test",
+            email=f"lot{i}_{uuid.uuid4().hex[:8]}@test.com",
+            role="client", password_plain=None,
+        )
+        user.phone = f"+3361234567{i}"
+        ids.append(user.id)
+    await db.commit()
+    return ids
+
+
+class TestBatchDecryption:
+
+    async def test_decrypt_fields_keeps_order_and_none(self):
+        """✅ Lot déchiffré dans l'ordre, None → None."""
+        values = [encrypt_field("a"), None, encrypt_field("é")]
+        assert decrypt_fields(values) == ["a", None, "é"]
+
+    async def test_decrypt_batch_offloaded(self, monkeypatch):
+        """✅ Lot au-delà du seuil → même résultat (via thread)."""
+        from app.config import get_settings
+        monkeypatch.setattr(get_settings(), "FIELD_DECRYPT_OFFLOAD_THRESHOLD", 2)
+        values = [encrypt_field(str(i)) for i in range(5)]
+        assert await decrypt_batch(values) == [str(i) for i in range(5)]
+
+    async def test_decrypt_fields_invalid_token(self):
+        """❌ Token corrompu → InvalidToken (jamais de clair erroné)."""
+        from cryptography.fernet import InvalidToken
+        with pytest.raises(InvalidToken):
+            decrypt_fields(["not-a-fernet-token"])
+
+
+class TestLazyDecryption:
+
+    async def test_lazy_columns_not_decrypted_on_load(self, db: AsyncSession):
+        """✅ Chargement → email/phone restent des Ciphertext ; first_name est déchiffré."""
+        ids = await _make_users(db, 1)
+        db.expunge_all()
+
+        user = (await db.execute(select(User).where(User.id == ids[0]))).scalar_one()
+        assert isinstance(user.__dict__["_email"], Ciphertext)
+        assert isinstance(user.__dict__["_phone"], Ciphertext)
+        assert user.first_name == "Lot0"
+
+        assert user.email.startswith("lot0_")
+        assert user.__dict__["_email"] == user.email  # clair mémorisé
+        assert user not in db.dirty
+
+    async def test_decrypt_loaded_batch(self, db: AsyncSession):
+        """✅ decrypt_loaded → toutes les valeurs déchiffrées en une passe."""
+        ids = await _make_users(db, 3)
+        db.expunge_all()
+
+        users = list((await db.execute(select(User).where(User.id.in_(ids)))).scalars())
+        await decrypt_loaded(users, "phone")
+        assert all(isinstance(u.__dict__["_phone"], str) for u in users)
+        assert isinstance(users[0].__dict__["_email"], Ciphertext)  # non demandé → intact
+
+    async def test_untouched_ciphertext_rewritten_verbatim(self, db: AsyncSession):
+        """✅ Update d'un autre champ → colonne email inchangée en base (pas de re-chiffrement)."""
+        ids = await _make_users(db, 1)
+        raw_before = (await db.execute(
+            select(User._email).where(User.id == ids[0])
+        )).scalar_one().value
+        db.expunge_all()
+
+        user = (await db.execute(select(User).where(User.id == ids[0]))).scalar_one()
+        await user_repository.update(db, user, gender="male")
+        await db.commit()
+
+        raw_after = (await db.execute(
+            select(User._email).where(User.id == ids[0])
+        )).scalar_one().value
+        assert raw_after == raw_before
+
+    async def test_setting_lazy_attribute_updates_hash(self, db: AsyncSession):
+        """✅ Écriture via l'attribut public → @validates (phone_hash) + chiffrement au flush."""
+        ids = await _make_users(db, 1)
+        user = await user_repository.get_by_id(db, ids[0])
+        await user_repository.update(db, user, phone="+33700000000")
+        await db.commit()
+        db.expunge_all()
+
+        reloaded = await user_repository.get_by_id(db, ids[0])
+        assert reloaded.phone == "+33700000000"
+        assert reloaded.phone_hash is not None
+
+
+class TestPlaintextCache:
+
+    async def test_hit_after_put(self):
+        """✅ put puis get → clair servi, hit comptabilisé."""
+        cache = PlaintextCache("test", max_entries=10, max_bytes=1024, ttl_seconds=60)
+        cache.put("tok-a", "Marie")
+        assert cache.get("tok-a") == "Marie"
+        assert cache.get("tok-b") is None
+        assert cache.stats()["hits"] >= 1
+
+    async def test_bounded_by_bytes_and_entries(self):
+        """✅ Dépassement entrées/octets → éviction LRU."""
+        cache = PlaintextCache("test", max_entries=2, max_bytes=10, ttl_seconds=60)
+        cache.put("t1", "aaaa")
+        cache.put("t2", "bbbb")
+        cache.get("t1")            # t1 devient le plus récent
+        cache.put("t3", "cccc")    # 12 octets > 10 → éviction de t2
+        assert cache.get("t2") is None
+        assert cache.get("t1") == "aaaa"
+        assert cache.stats()["bytes"] <= 10
+
+        cache.put("huge", "x" * 50)  # plus grand que le pool → jamais stocké
+        assert cache.get("huge") is None
+
+    async def test_expired_entry_is_miss(self, monkeypatch):
+        """❌ Entrée expirée → miss."""
+        import app.core.plaintext_cache as module
+        cache = PlaintextCache("test", max_entries=10, max_bytes=1024, ttl_seconds=5)
+        now = module.time.monotonic()
+        cache.put("tok", "Jean")
+        monkeypatch.setattr(module.time, "monotonic", lambda: now + 10)
+        assert cache.get("tok") is None
+        assert cache.stats()["entries"] == 0
+
+    async def test_wipe_zeroes_buffers(self):
+        """✅ wipe → buffers mis à zéro puis pool vidé."""
+        cache = PlaintextCache("test", max_entries=10, max_bytes=1024, ttl_seconds=60)
+        cache.put("tok", "secret")
+        buffers = [buf for _, buf in cache._entries.values()]
+        cache.wipe()
+        assert all(b == bytearray(len(b)) for b in buffers)
+        assert cache.stats()["entries"] == 0
+
+    async def test_field_and_token_pools_separated(self, monkeypatch):
+        """✅ Cache activé → decrypt_field et decrypt_token alimentent deux pools distincts."""
+        from app.config import get_settings
+        from app.core import encryption
+        monkeypatch.setattr(get_settings(), "PLAINTEXT_CACHE_ENABLED", True)
+        encryption.reload_keys()
+        try:
+            field_ct = encryption.encrypt_field("Dupont")
+            token_ct = encryption.encrypt_token("oauth-token")
+            assert encryption.decrypt_field(field_ct) == "Dupont"
+            assert encryption.decrypt_field(field_ct) == "Dupont"
+            assert encryption.decrypt_token(token_ct) == "oauth-token"
+
+            stats = encryption.plaintext_cache_stats()
+            assert stats["field"]["entries"] == 1
+            assert stats["token"]["entries"] == 1
+            assert encryption._token_cache().get(field_ct) is None
+        finally:
+            monkeypatch.setattr(get_settings(), "PLAINTEXT_CACHE_ENABLED", False)
+            encryption.reload_keys()
@@ -7,22 +7,28 @@ Couvre :
 - DELETE /health/logs/{id}
 - GET /health/sharing/{coach_id}
 - PATCH /health/sharing/{coach_id}
-- GET /health/clients/{client_id}/logs (coach)
+- GET /health/clients/{client_id}/logs (coach, pagination keyset)
+- GET /health/clients/{client_id}/logs/buckets (coach, agrégats jour/semaine)
 - Admin : POST /admin/health/parameters
 - Auth 401
 """
 from __future__ import annotations
 
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.health_log import HealthLog
+from app.models.health_log_daily import HealthLogDaily
+from app.models.integration import BodyMeasurement
 from app.models.health_parameter import HealthParameter
+from app.config import get_settings
+from app.repositories import health_repository
 from app.repositories.api_key_repository import api_key_repository
 from app.repositories.user_repository import user_repository
 
@@ -380,3 +386,359 @@ async def test_non_coach_cannot_access_client_logs(
         headers={"X-API-Key": client_api_key},
     )
     assert resp.status_code == 403
+
+
+# ---------------------------------------------------------------------------
+# Coach — partage en SQL, pagination keyset, agrégats
+# ---------------------------------------------------------------------------
+
+async def _seed_logs(db: AsyncSession, user_id, parameter_id, values, start: datetime):
+    """Un log par heure à partir de `start` (+ rollup journalier)."""
+    moments = [start + timedelta(hours=i) for i in range(len(values))]
+    for moment, value in zip(moments, values, strict=True):
+        db.add(HealthLog(
+            user_id=user_id, parameter_id=parameter_id, value=value,
+            source="manual", logged_at=moment,
+        ))
+    await db.flush()
+    await health_repository.refresh_daily(db, user_id, parameter_id, moments)
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_client_logs_keyset_pagination(
+    client: AsyncClient, health_params, db: AsyncSession
+):
+    """✅ Pages disjointes, ordre décroissant, pas de X-Next-Cursor en dernière page."""
+    client_user, _ = await _make_user(db, "client")
+    _, coach_key = await _make_user(db, "coach")
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    await _seed_logs(db, client_user.id, health_params["weight_kg"].id, range(60, 72), start)
+
+    seen, cursor = [], None
+    for _ in range(3):
+        params = {"limit": 5, **({"cursor": cursor} if cursor else {})}
+        resp = await client.get(
+            f"{BASE}/clients/{client_user.id}/logs", params=params,
+            headers={"X-API-Key": coach_key},
+        )
+        assert resp.status_code == 200
+        seen += [log["value"] for log in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+    assert seen == [float(v) for v in range(71, 59, -1)]
+    assert cursor is None
+
+
+@pytest.mark.asyncio
+async def test_client_logs_invalid_cursor(
+    client: AsyncClient, health_params, db: AsyncSession
+):
+    """❌ Curseur illisible → 422."""
+    client_user, _ = await _make_user(db, "client")
+    _, coach_key = await _make_user(db, "coach")
+    resp = await client.get(
+        f"{BASE}/clients/{client_user.id}/logs", params={"cursor": "pas-un-curseur"},
+        headers={"X-API-Key": coach_key},
+    )
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_client_logs_sharing_query_count(
+    client: AsyncClient, health_params, db: AsyncSession
+):
+    """✅ Partage filtré en SQL : nombre de requêtes indépendant du nombre de logs."""
+    from app.services import health_service
+
+    client_user, client_key = await _make_user(db, "client")
+    coach_user, _ = await _make_user(db, "coach")
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    await _seed_logs(db, client_user.id, health_params["weight_kg"].id, [70.0] * 40, start)
+    await _seed_logs(db, client_user.id, health_params["body_fat_pct"].id, [20.0] * 40, start)
+    await client.patch(
+        f"{BASE}/sharing/{coach_user.id}",
+        json={"updates": [{"parameter_id": str(health_params["weight_kg"].id), "shared": False}]},
+        headers={"X-API-Key": client_key},
+    )
+
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        logs, next_cursor = await health_service.get_client_logs(
+            db, coach_user.id, client_user.id, limit=100
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    assert len(logs) == 40
+    assert {log.parameter.slug for log in logs} == {"body_fat_pct"}
+    assert next_cursor is None
+    assert len(statements) <= 2
+
+
+@pytest.mark.asyncio
+async def test_client_log_buckets_daily(
+    client: AsyncClient, health_params, db: AsyncSession
+):
+    """✅ Mode agrégé : min / max / moyenne par jour, paramètres masqués exclus."""
+    client_user, client_key = await _make_user(db, "client")
+    coach_user, coach_key = await _make_user(db, "coach")
+    weight_id = health_params["weight_kg"].id
+    hr_id = health_params["resting_heart_rate_bpm"].id
+    day1 = datetime(2025, 3, 10, 6, tzinfo=timezone.utc)
+    day2 = datetime(2025, 3, 11, 6, tzinfo=timezone.utc)
+    await _seed_logs(db, client_user.id, weight_id, [70.0, 71.0, 72.5], day1)
+    await _seed_logs(db, client_user.id, weight_id, [69.5], day2)
+    await _seed_logs(db, client_user.id, hr_id, [55.0, 58.0], day1)
+    await client.patch(
+        f"{BASE}/sharing/{coach_user.id}",
+        json={"updates": [{"parameter_id": str(hr_id), "shared": False}]},
+        headers={"X-API-Key": client_key},
+    )
+
+    resp = await client.get(
+        f"{BASE}/clients/{client_user.id}/logs/buckets", params={"bucket": "day"},
+        headers={"X-API-Key": coach_key},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [b["parameter_id"] for b in data] == [str(weight_id)] * 2
+    first, second = data
+    assert datetime.fromisoformat(first["bucket_start"]) == datetime(2025, 3, 10, tzinfo=timezone.utc)
+    assert (first["count"], first["min_value"], first["max_value"]) == (3, 70.0, 72.5)
+    assert first["avg_value"] == pytest.approx(71.167, abs=1e-3)
+    assert datetime.fromisoformat(second["bucket_start"]) == datetime(2025, 3, 11, tzinfo=timezone.utc)
+    assert second["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_log_buckets_invalid_bucket(
+    client: AsyncClient, coach_api_key: str, health_params, db: AsyncSession
+):
+    """❌ bucket hors day/week → 422."""
+    other_user, _ = await _make_user(db, "client")
+    resp = await client.get(
+        f"{BASE}/clients/{other_user.id}/logs/buckets", params={"bucket": "month"},
+        headers={"X-API-Key": coach_api_key},
+    )
+    assert resp.status_code == 422
+
+
+# ---------------------------------------------------------------------------
+# Séries temporelles — rollup journalier, purge, compaction
+# ---------------------------------------------------------------------------
+
+async def _daily(db: AsyncSession, user_id) -> list[HealthLogDaily]:
+    db.expire_all()
+    q = select(HealthLogDaily).where(HealthLogDaily.user_id == user_id).order_by(HealthLogDaily.day)
+    return list((await db.execute(q)).scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_daily_rollup_follows_create_and_delete(
+    client: AsyncClient, health_params, db: AsyncSession
+):
+    """✅ POST / DELETE /health/logs → jour recalculé ; jour vidé → ligne supprimée."""
+    user, key = await _make_user(db, "client")
+    user_id, weight_id = user.id, health_params["weight_kg"].id
+    ids = []
+    for hour, value in [(7, 70.0), (19, 71.5)]:
+        resp = await client.post(
+            f"{BASE}/logs",
+            json={"parameter_id": str(weight_id), "value": value,
+                  "logged_at": datetime(2025, 5, 2, hour, tzinfo=timezone.utc).isoformat()},
+            headers={"X-API-Key": key},
+        )
+        ids.append(resp.json()["id"])
+
+    [row] = await _daily(db, user_id)
+    assert (row.day.isoformat(), row.count) == ("2025-05-02", 2)
+    assert (float(row.min_value), float(row.max_value), float(row.sum_value)) == (70.0, 71.5, 141.5)
+
+    await client.delete(f"{BASE}/logs/{ids[1]}", headers={"X-API-Key": key})
+    [row] = await _daily(db, user_id)
+    assert (row.count, float(row.max_value)) == (1, 70.0)
+
+    await client.delete(f"{BASE}/logs/{ids[0]}", headers={"X-API-Key": key})
+    assert await _daily(db, user_id) == []
+
+
+@pytest.mark.asyncio
+async def test_compact_purges_raw_logs_keeps_rollup(
+    client: AsyncClient, health_params, db: AsyncSession, monkeypatch
+):
+    """✅ Logs bruts au-delà de la rétention purgés, graphiques servis par le rollup."""
+    from app.services import health_timeseries_service
+
+    client_user, _ = await _make_user(db, "client")
+    _, coach_key = await _make_user(db, "coach")
+    weight_id = health_params["weight_kg"].id
+    now = datetime(2026, 6, 1, tzinfo=timezone.utc)
+    await _seed_logs(db, client_user.id, weight_id, [80.0, 82.0], now - timedelta(days=400))
+    await _seed_logs(db, client_user.id, weight_id, [75.0], now - timedelta(days=10))
+    monkeypatch.setattr(get_settings(), "HEALTH_RAW_RETENTION_DAYS", 365)
+    monkeypatch.setattr(get_settings(), "SCHEDULER_BATCH_SIZE", 1)
+
+    assert await health_timeseries_service.compact(db, now) == 2
+
+    resp = await client.get(
+        f"{BASE}/clients/{client_user.id}/logs", headers={"X-API-Key": coach_key}
+    )
+    assert [log["value"] for log in resp.json()] == [75.0]
+    resp = await client.get(
+        f"{BASE}/clients/{client_user.id}/logs/buckets", params={"bucket": "week"},
+        headers={"X-API-Key": coach_key},
+    )
+    assert [(b["count"], b["avg_value"]) for b in resp.json()] == [(2, 81.0), (1, 75.0)]
+
+
+@pytest.mark.asyncio
+async def test_backfill_after_purge_merges_into_rollup(
+    client: AsyncClient, health_params, db: AsyncSession, monkeypatch
+):
+    """✅ Log ajouté / supprimé sur un jour purgé → fusionné dans le rollup, pas recalculé."""
+    from app.services import health_timeseries_service
+
+    user, key = await _make_user(db, "client")
+    user_id, weight_id = user.id, health_params["weight_kg"].id
+    now = datetime.now(timezone.utc)
+    old_day = (now - timedelta(days=400)).replace(hour=6, minute=0, second=0, microsecond=0)
+    await _seed_logs(db, user_id, weight_id, [80.0, 82.0], old_day)
+    monkeypatch.setattr(get_settings(), "HEALTH_RAW_RETENTION_DAYS", 365)
+    assert await health_timeseries_service.compact(db, now) == 2
+
+    resp = await client.post(
+        f"{BASE}/logs",
+        json={"parameter_id": str(weight_id), "value": 78.0,
+              "logged_at": (old_day + timedelta(hours=12)).isoformat()},
+        headers={"X-API-Key": key},
+    )
+    assert resp.status_code == 201
+    [row] = await _daily(db, user_id)
+    assert row.count == 3
+    assert (float(row.sum_value), float(row.min_value), float(row.max_value)) == (240.0, 78.0, 82.0)
+
+    other_day = old_day - timedelta(days=3)
+    resp = await client.post(
+        f"{BASE}/logs",
+        json={"parameter_id": str(weight_id), "value": 90.0, "logged_at": other_day.isoformat()},
+        headers={"X-API-Key": key},
+    )
+    assert [(r.day, r.count) for r in await _daily(db, user_id)] == [
+        (other_day.date(), 1), (old_day.date(), 3),
+    ]
+
+    await client.delete(f"{BASE}/logs/{resp.json()['id']}", headers={"X-API-Key": key})
+    [row] = await _daily(db, user_id)
+    assert (row.day, row.count, float(row.sum_value)) == (old_day.date(), 3, 240.0)
+
+
+async def _body_weights(db: AsyncSession, user_id) -> list[float]:
+    q = select(BodyMeasurement.weight_kg).where(BodyMeasurement.user_id == user_id)
+    return sorted(float(w) for w in (await db.execute(q)).scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_compact_keeps_last_body_measurement_per_day(
+    health_params, db: AsyncSession, monkeypatch
+):
+    """✅ Mesures de balance de la fenêtre de compaction : la dernière de chaque jour conservée ;
+    historique plus ancien (déjà compacté) non relu."""
+    from app.services import health_timeseries_service
+
+    user, _ = await _make_user(db, "client")
+    user_id = user.id
+    now = datetime(2026, 6, 1, 12, tzinfo=timezone.utc)
+    window_day = datetime(2025, 5, 29, 6, tzinfo=timezone.utc)  # cutoff - 3 jours
+    older_day = datetime(2025, 1, 15, 6, tzinfo=timezone.utc)
+    recent_day = now - timedelta(days=3)
+    for moment, weight in [
+        (window_day, 80), (window_day + timedelta(hours=2), 79), (window_day + timedelta(hours=12), 78),
+        (older_day, 85), (older_day + timedelta(hours=1), 84),
+        (recent_day, 75), (recent_day + timedelta(hours=1), 74),
+    ]:
+        db.add(BodyMeasurement(user_id=user_id, measured_at=moment, weight_kg=weight, source="withings"))
+    await db.commit()
+    monkeypatch.setattr(get_settings(), "HEALTH_RAW_RETENTION_DAYS", 365)
+    monkeypatch.setattr(get_settings(), "HEALTH_COMPACTION_LOOKBACK_DAYS", 7)
+
+    assert await health_timeseries_service.compact(db, now) == 2
+    assert await _body_weights(db, user_id) == [74.0, 75.0, 78.0, 84.0, 85.0]
+
+    assert await health_timeseries_service.backfill_body_measurements(db, now) == 1
+    assert await _body_weights(db, user_id) == [74.0, 75.0, 78.0, 84.0]
+    assert await health_timeseries_service.backfill_body_measurements(db, now) == 0
+
+
+@pytest.mark.asyncio
+async def test_partitions_created_and_expired_dropped(db: AsyncSession, monkeypatch):
+    """✅ Tables partitionnées (schéma jetable) : partitions à venir créées une fois,
+    partitions health_logs entièrement expirées détachées puis supprimées."""
+    from datetime import date
+
+    from sqlalchemy import text
+
+    from app.repositories import health_timeseries_repository as ts_repo
+    from app.services import health_timeseries_service
+
+    monkeypatch.setattr(get_settings(), "HEALTH_PARTITION_MONTHS_AHEAD", 2)
+    # Transaction unique annulée en fin de test : le DDL PostgreSQL est transactionnel
+    for ddl in (
+        "CREATE SCHEMA ts_probe",
+        "SET LOCAL search_path TO ts_probe, public",
+        "CREATE TABLE health_logs (id uuid, logged_at timestamptz NOT NULL)"
+        " PARTITION BY RANGE (logged_at)",
+        "CREATE TABLE body_measurements (id uuid, measured_at timestamptz NOT NULL)"
+        " PARTITION BY RANGE (measured_at)",
+        "CREATE TABLE health_logs_default PARTITION OF health_logs DEFAULT",
+    ):
+        await db.execute(text(ddl))
+    try:
+        assert await health_timeseries_service.ensure_partitions(db, date(2026, 11, 20)) == 6
+        assert await health_timeseries_service.ensure_partitions(db, date(2026, 11, 20)) == 0
+        assert await ts_repo.list_partitions(db, "health_logs") == [
+            "health_logs_default", "health_logs_p202611", "health_logs_p202612", "health_logs_p202701",
+        ]
+        assert await ts_repo.list_partitions(db, "body_measurements") == [
+            "body_measurements_p202611", "body_measurements_p202612", "body_measurements_p202701",
+        ]
+
+        cutoff = datetime(2027, 1, 1, tzinfo=timezone.utc)
+        assert await health_timeseries_service._drop_expired_partitions(db, cutoff) == 2
+        assert await ts_repo.list_partitions(db, "health_logs") == [
+            "health_logs_default", "health_logs_p202701",
+        ]
+    finally:
+        await db.rollback()
+
+
+@pytest.mark.asyncio
+async def test_compact_disabled_by_default(health_params, db: AsyncSession):
+    """✅ HEALTH_RAW_RETENTION_DAYS=0 → aucune purge, rollup et logs bruts intacts."""
+    from app.services import health_timeseries_service
+
+    user, _ = await _make_user(db, "client")
+    await _seed_logs(
+        db, user.id, health_params["weight_kg"].id, [70.0], datetime(2015, 1, 1, tzinfo=timezone.utc)
+    )
+    assert await health_timeseries_service.run_maintenance(db) == 0
+    assert len(await _daily(db, user.id)) == 1
+    assert (await db.execute(select(HealthLog.id))).scalars().all()
+
+
+def test_partition_names():
+    """✅ Nom ↔ mois des partitions ; DEFAULT ignorée."""
+    from datetime import date
+
+    from app.repositories import health_timeseries_repository as ts_repo
+    from app.services.health_timeseries_service import add_months
+
+    assert ts_repo.partition_name("health_logs", date(2026, 3, 1)) == "health_logs_p202603"
+    assert ts_repo.partition_month("health_logs", "health_logs_p202603") == date(2026, 3, 1)
+    assert ts_repo.partition_month("health_logs", "health_logs_default") is None
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
@@ -0,0 +1,166 @@
+"""
+Tests — rotation en ligne des clés Fernet (MultiFernet + job reprenable).
+
+Couvre :
+1. MultiFernet        "nouvelle,ancienne" : anciens tokens lisibles, nouveaux sous la nouvelle clé
+2. rotate_value       None si déjà sous la clé primaire (idempotence)
+3. rotate_target      lots keyset, UPDATE groupé, reprise après interruption, throttle
+4. get_progress       pending → running → completed ; nouvelle clé → pending
+"""
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core import encryption
+from app.models.user import User
+from app.repositories.user_repository import user_repository
+from app.services import key_rotation_service
+
+USERS_TARGET = next(t for t in key_rotation_service.discover_targets() if t.table_name == "users")
+
+
+@pytest.fixture()
+def rotate_field_key(monkeypatch):
+    """Bascule FIELD_ENCRYPTION_KEY sur "nouvelle,ancienne" ; restaure l'ancienne en sortie."""
+    settings = get_settings()
+    old_key = settings.FIELD_ENCRYPTION_KEY
+
+    def _rotate() -> str:
+        new_key = Fernet.generate_key().decode()
+        monkeypatch.setattr(settings, "FIELD_ENCRYPTION_KEY", f"{new_key},{old_key}")
+        encryption.reload_keys()
+        return new_key
+
+    yield _rotate
+    monkeypatch.setattr(settings, "FIELD_ENCRYPTION_KEY", old_key)
+    encryption.reload_keys()
+
+
+async def _make_users(db: AsyncSession, n: int) -> None:
+    for i in range(n):
+        await user_repository.create(
+            db, first_name=f"Rot{i}", last_name="Test", email=f"rot{i}@test.com",
+            role="client", password_plain=None,
+        )
+    await db.commit()
+
+
+async def _raw_emails(db: AsyncSession) -> list[str]:
+    rows = (await db.execute(select(User._email).order_by(User.id))).scalars().all()
+    return [ct.value for ct in rows]
+
+
+class TestMultiFernet:
+
+    async def test_old_tokens_readable_after_key_added(self, rotate_field_key):
+        """✅ Token chiffré avec l'ancienne clé → toujours lisible pendant la rotation."""
+        token = encryption.encrypt_field("Dupont")
+        rotate_field_key()
+        assert encryption.decrypt_field(token) == "Dupont"
+
+    async def test_rotate_value_idempotent(self, rotate_field_key):
+        """✅ rotate_value : ancien token → réécrit ; déjà sous la clé primaire → None."""
+        old_token = encryption.encrypt_field("Marie")
+        new_key = rotate_field_key()
+        rotated = encryption.rotate_value(old_token)
+        assert Fernet(new_key.encode()).decrypt(rotated.encode()) == b"Marie"
+        assert encryption.rotate_value(rotated) is None
+
+    async def test_parse_keys_empty(self):
+        """❌ Liste de clés vide → ValueError."""
+        with pytest.raises(ValueError):
+            encryption.parse_keys(" , ")
+
+
+class TestRotationJob:
+
+    async def test_rotates_every_row(self, db: AsyncSession, rotate_field_key):
+        """✅ Tous les tokens réécrits sous la nouvelle clé, clairs inchangés."""
+        await _make_users(db, 5)
+        new_key = rotate_field_key()
+
+        checkpoint = await key_rotation_service.rotate_target(
+            db, USERS_TARGET, batch_size=2, rows_per_second=0
+        )
+        assert checkpoint.completed_at is not None
+        assert checkpoint.rows_scanned == 5
+        new_fernet = Fernet(new_key.encode())
+        for token in await _raw_emails(db):
+            new_fernet.decrypt(token.encode())  # lève InvalidToken sinon
+
+        db.expunge_all()
+        users = (await db.execute(select(User).order_by(User.id))).scalars().all()
+        assert sorted(u.first_name for u in users) == [f"Rot{i}" for i in range(5)]
+
+    async def test_second_run_rewrites_nothing(self, db: AsyncSession, rotate_field_key):
+        """✅ Relance avec la même clé → aucun UPDATE (checkpoint completed)."""
+        await _make_users(db, 3)
+        rotate_field_key()
+        await key_rotation_service.rotate_target(db, USERS_TARGET, rows_per_second=0)
+        before = await _raw_emails(db)
+        checkpoint = await key_rotation_service.rotate_target(db, USERS_TARGET, rows_per_second=0)
+        assert await _raw_emails(db) == before
+        assert checkpoint.rows_scanned == 3
+
+    async def test_resumes_after_interruption(self, db: AsyncSession, rotate_field_key):
+        """✅ Job interrompu après 1 lot → la relance reprend après last_id."""
+        await _make_users(db, 5)
+        rotate_field_key()
+        partial = await key_rotation_service.rotate_target(
+            db, USERS_TARGET, batch_size=2, rows_per_second=0, max_batches=1
+        )
+        assert partial.rows_scanned == 2
+        assert partial.completed_at is None
+
+        done = await key_rotation_service.rotate_target(
+            db, USERS_TARGET, batch_size=2, rows_per_second=0
+        )
+        assert done.rows_scanned == 5          # pas de re-parcours des 2 premières lignes
+        assert done.rows_rewritten == 5 * 3    # first_name + last_name + email par ligne
+        assert done.completed_at is not None
+
+    async def test_throttled_to_rows_per_second(self, db: AsyncSession, rotate_field_key):
+        """✅ Budget lignes/s → pause proportionnelle entre les lots."""
+        await _make_users(db, 4)
+        rotate_field_key()
+        pauses: list[float] = []
+
+        async def _sleep(seconds: float) -> None:
+            pauses.append(seconds)
+
+        await key_rotation_service.rotate_target(
+            db, USERS_TARGET, batch_size=2, rows_per_second=4, sleep=_sleep
+        )
+        assert len(pauses) == 2
+        assert all(0 < p <= 0.5 for p in pauses)
+
+
+class TestRotationProgress:
+
+    async def test_progress_statuses(self, db: AsyncSession, rotate_field_key):
+        """✅ pending → running → completed, puis pending à la clé suivante."""
+        await _make_users(db, 3)
+        rotate_field_key()
+
+        def _users(progress):
+            return next(p for p in progress if p["table_name"] == "users")
+
+        assert _users(await key_rotation_service.get_progress(db))["status"] == "pending"
+        await key_rotation_service.rotate_target(
+            db, USERS_TARGET, batch_size=1, rows_per_second=0, max_batches=1
+        )
+        assert _users(await key_rotation_service.get_progress(db))["status"] == "running"
+        await key_rotation_service.rotate_target(db, USERS_TARGET, rows_per_second=0)
+        item = _users(await key_rotation_service.get_progress(db))
+        assert item["status"] == "completed"
+        assert item["rows_scanned"] == 3
+
+        rotate_field_key()
+        assert _users(await key_rotation_service.get_progress(db))["status"] == "pending"
+
+    async def test_admin_endpoint_requires_admin(self, client, coach_api_key):
+        """❌ Non-admin → 403."""
+        resp = await client.get("/admin/key-rotation", headers={"X-API-Key": coach_api_key})
+        assert resp.status_code == 403
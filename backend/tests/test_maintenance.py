@@ -0,0 +1,141 @@
+"""
+Tests — tâches de fond planifiées (auto-rejet, expiration liste d'attente, alertes forfaits).
+
+Couvre :
+1. auto_reject_expired       UPDATE … RETURNING par lots, pending récents intacts
+2. expire_notified_entries   entrées expirées + suivant notifié
+3. send_low_package_alerts   une seule alerte par forfait
+4. Scheduler                 run_once → lignes + métriques ; start/stop propres
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.core.scheduler import Scheduler
+from app.models.booking import Booking
+from app.models.package import Package
+from app.models.push_intent import PushIntent
+from app.models.waitlist_entry import WaitlistEntry
+from app.repositories import booking_repository, payment_repository, waitlist_repository
+from app.services import booking_service, payment_service, waitlist_service
+
+
+def _slot(hours: int = 72) -> datetime:
+    return (datetime.now(timezone.utc) + timedelta(hours=hours)).replace(microsecond=0)
+
+
+async def _pending_bookings(db: AsyncSession, coach_user, client_user, n: int, *, age_hours: int) -> None:
+    for i in range(n):
+        booking = await booking_repository.create(
+            db, client_user.id, coach_user.id, scheduled_at=_slot(72 + i)
+        )
+        await db.execute(
+            update(Booking).where(Booking.id == booking.id)
+            .values(created_at=datetime.now(timezone.utc) - timedelta(hours=age_hours))
+        )
+    await db.commit()
+
+
+class TestAutoReject:
+
+    async def test_rejects_in_batches(self, db: AsyncSession, coach_user, client_user):
+        """✅ 5 pending > 24h (lots de 2) → 5 auto_rejected ; pending récent intact."""
+        await _pending_bookings(db, coach_user, client_user, 5, age_hours=30)
+        await _pending_bookings(db, coach_user, client_user, 1, age_hours=1)
+
+        assert await booking_service.auto_reject_expired(db, batch_size=2) == 5
+        statuses = (await db.execute(select(Booking.status))).scalars().all()
+        assert sorted(statuses).count("auto_rejected") == 5
+        assert statuses.count("pending_coach_validation") == 1
+
+    async def test_nothing_to_reject(self, db: AsyncSession):
+        """✅ Aucun pending expiré → 0."""
+        assert await booking_service.auto_reject_expired(db) == 0
+
+
+class TestWaitlistExpiry:
+
+    async def test_expired_entry_notifies_next(self, db: AsyncSession, coach_user, client_user):
+        """✅ Fenêtre de 30 min dépassée → expired, le suivant passe notified."""
+        slot = _slot()
+        first = await waitlist_repository.add_entry(db, coach_user.id, slot, client_user.id)
+        second = await waitlist_repository.add_entry(db, coach_user.id, slot, coach_user.id)
+        first.status = "notified"
+        first.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        await db.commit()
+
+        assert await waitlist_service.expire_notified_entries(db) == 1
+        db.expunge_all()
+        rows = {
+            e.id: e.status
+            for e in (await db.execute(select(WaitlistEntry))).scalars().all()
+        }
+        assert rows[first.id] == "expired"
+        assert rows[second.id] == "notified"
+
+
+class TestPackageAlerts:
+
+    async def test_alert_sent_once(self, db: AsyncSession, coach_user, client_user):
+        """✅ Forfait à 2 séances → 1 alerte, jamais deux ; forfait à 5 séances ignoré."""
+        for remaining in (2, 5):
+            await payment_repository.create_package(
+                db, client_user.id, coach_user.id,
+                name=f"Pack {remaining}", sessions_total=10, sessions_remaining=remaining,
+                price_cents=10000,
+            )
+        await db.commit()
+
+        assert await payment_service.send_low_package_alerts(db) == 1
+        assert await payment_service.send_low_package_alerts(db) == 0
+        flags = dict((await db.execute(select(Package.sessions_remaining, Package.alert_sent))).all())
+        assert flags == {2: True, 5: False}
+        (intent,) = (await db.execute(select(PushIntent))).scalars().all()
+        assert (intent.user_id, intent.title_key) == (client_user.id, "notification.package_low.title")
+        assert intent.params == {"name": "Pack 2", "remaining": 2}
+
+
+class TestScheduler:
+
+    async def test_run_once_records_metrics(self, db: AsyncSession, coach_user, client_user):
+        """✅ run_once → tâche exécutée, lignes et durée comptabilisées."""
+        await _pending_bookings(db, coach_user, client_user, 3, age_hours=30)
+        engine = create_async_engine(get_settings().DATABASE_URL)
+        try:
+            scheduler = Scheduler(engine)
+            scheduler.add_job("test.auto_reject", booking_service.auto_reject_expired, 60)
+            runs_before = metrics.counter("scheduler.test.auto_reject.runs").value
+            rows_before = metrics.counter("scheduler.test.auto_reject.rows").value
+
+            assert await scheduler.run_once("test.auto_reject") == 3
+            assert metrics.counter("scheduler.test.auto_reject.runs").value == runs_before + 1
+            assert metrics.counter("scheduler.test.auto_reject.rows").value == rows_before + 3
+            assert metrics.histogram("scheduler.test.auto_reject.duration_seconds").count >= 1
+        finally:
+            await engine.dispose()
+
+    async def test_failing_job_keeps_loop_alive(self):
+        """❌ Tâche en erreur → compteur errors, la boucle continue jusqu'à stop()."""
+        calls = 0
+
+        async def _boom(db: AsyncSession) -> int:
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("boom")
+
+        engine = create_async_engine(get_settings().DATABASE_URL)
+        try:
+            scheduler = Scheduler(engine)
+            scheduler.add_job("test.boom", _boom, 0.01)
+            errors_before = metrics.counter("scheduler.test.boom.errors").value
+            scheduler.start()
+            await asyncio.sleep(0.1)
+            await scheduler.stop()
+            assert calls >= 2
+            assert metrics.counter("scheduler.test.boom.errors").value >= errors_before + 2
+        finally:
+            await engine.dispose()
@@ -0,0 +1,164 @@
+"""
+Tests — pipeline de notifications push (push_intents → worker push.dispatch).
+
+Couvre :
+1. send_push_many   une intention par destinataire, pas d'envoi immédiat
+2. dispatch         rendu i18n par locale (une fois par groupe), multicast par tranches
+3. tokens morts     désactivés d'après la réponse du provider ; sans token → no_token
+4. retry            échec provider → pending + backoff, failed après PUSH_MAX_ATTEMPTS
+5. hooks            liste d'attente : promote met une notification en file
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.metrics import metrics
+from app.core.push.provider import PushProvider, PushTokenResult
+from app.models.push_intent import PushIntent
+from app.models.push_token import PushToken
+from app.repositories import push_token_repository, waitlist_repository
+from app.repositories.user_repository import user_repository
+from app.services import notification_service as notification_module
+from app.services import waitlist_service
+from app.services.notification_service import notification_service
+
+TITLE = "notification.package_low.title"
+BODY = "notification.package_low.body"
+
+
+class _FakePushProvider(PushProvider):
+    max_tokens_per_call = 2
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[list[str], str, str]] = []
+        self.dead: set[str] = set()
+        self.fail = False
+
+    async def send_multicast(self, tokens, title, body, data):
+        self.calls.append((list(tokens), title, body))
+        return [
+            PushTokenResult(
+                token=token,
+                success=not self.fail and token not in self.dead,
+                unregistered=token in self.dead,
+                error_message="boom" if self.fail else None,
+            )
+            for token in tokens
+        ]
+
+
+@pytest.fixture()
+def provider(monkeypatch) -> _FakePushProvider:
+    fake = _FakePushProvider()
+    monkeypatch.setattr(notification_module, "get_push_provider", lambda: fake)
+    return fake
+
+
+async def _user(db: AsyncSession, locale: str = "fr-FR", tokens: int = 1):
+    user = await user_repository.create(
+        db, first_name="Push", last_name="Test",
+        email=f"push_{uuid.uuid4().hex[:8]}@test.com",
+        role="client", password_plain="Password1", locale=locale,
+    )
+    for i in range(tokens):
+        await push_token_repository.upsert_token(db, user.id, f"tok-{user.id.hex[:8]}-{i}", "android")
+    await db.commit()
+    return user
+
+
+async def _intents(db: AsyncSession) -> list[PushIntent]:
+    q = select(PushIntent).execution_options(populate_existing=True)
+    return list((await db.execute(q)).scalars().all())
+
+
+class TestSendPush:
+
+    async def test_enqueue_only(self, db: AsyncSession, provider):
+        """✅ send_push_many → une intention pending par destinataire, aucun appel provider."""
+        users = [await _user(db) for _ in range(3)]
+        n = await notification_service.send_push_many(
+            db, [u.id for u in users] + [users[0].id], TITLE, BODY, {"type": "x"}, name="Pack", remaining=2
+        )
+        await db.commit()
+        assert n == 3
+        intents = await _intents(db)
+        assert {i.status for i in intents} == {"pending"}
+        assert intents[0].params == {"name": "Pack", "remaining": 2}
+        assert provider.calls == []
+
+
+class TestDispatch:
+
+    async def test_rendered_once_per_locale_and_chunked(self, db: AsyncSession, provider):
+        """✅ 2 fr (2 tokens chacun) + 1 en → 2 rendus ; 4 tokens fr en tranches de 2."""
+        fr = [await _user(db, "fr-FR", tokens=2) for _ in range(2)]
+        en = await _user(db, "en-US")
+        await notification_service.send_push_many(
+            db, [u.id for u in fr + [en]], TITLE, BODY, {}, name="Pack", remaining=2
+        )
+        await db.commit()
+
+        renders_before = metrics.counter("push.renders").value
+        assert await notification_service.dispatch(db) == 3
+        assert metrics.counter("push.renders").value == renders_before + 2
+
+        assert sorted(len(tokens) for tokens, _, _ in provider.calls) == [1, 2, 2]
+        titles = {title for _, title, _ in provider.calls}
+        assert titles == {"Forfait bientôt épuisé", "Package running low"}
+        assert {i.status for i in await _intents(db)} == {"sent"}
+
+    async def test_dead_tokens_pruned(self, db: AsyncSession, provider):
+        """❌ Token désinstallé → désactivé ; utilisateur sans autre token → no_token."""
+        user = await _user(db)
+        nobody = await _user(db, tokens=0)
+        (token,) = (await push_token_repository.get_active_tokens_for_users(db, [user.id]))[user.id]
+        provider.dead.add(token)
+        await notification_service.send_push_many(db, [user.id, nobody.id], TITLE, BODY, {}, name="P", remaining=1)
+        await db.commit()
+
+        assert await notification_service.dispatch(db) == 2
+        assert {i.status for i in await _intents(db)} == {"no_token"}
+        active = (await db.execute(
+            select(PushToken.active).execution_options(populate_existing=True)
+        )).scalar_one()
+        assert active is False
+
+    async def test_retry_then_failed(self, db: AsyncSession, provider):
+        """❌ Provider en échec → pending avec backoff, failed au dernier essai."""
+        provider.fail = True
+        user = await _user(db)
+        await notification_service.send_push(db, user.id, TITLE, BODY, {}, name="P", remaining=1)
+        await db.commit()
+
+        max_attempts = get_settings().PUSH_MAX_ATTEMPTS
+        for attempt in range(1, max_attempts + 1):
+            assert await notification_service.dispatch(db) == 1
+            (intent,) = await _intents(db)
+            assert intent.attempts == attempt
+            if attempt < max_attempts:
+                assert intent.status == "pending"
+                assert intent.next_attempt_at is not None
+                await db.execute(update(PushIntent).values(next_attempt_at=None))
+                await db.commit()
+        assert intent.status == "failed"
+
+
+class TestHooks:
+
+    async def test_waitlist_promote_queues_push(self, db: AsyncSession, coach_user, client_user):
+        """✅ Place libérée → notification en file pour le premier en attente."""
+        slot = (datetime.now(timezone.utc) + timedelta(days=2)).replace(microsecond=0)
+        await waitlist_repository.add_entry(db, coach_user.id, slot, client_user.id)
+        await db.commit()
+
+        (entry,) = await waitlist_service.promote(db, [(coach_user.id, slot)])
+        await db.commit()
+
+        (intent,) = await _intents(db)
+        assert intent.user_id == client_user.id
+        assert intent.title_key == "notification.waitlist_slot.title"
+        assert intent.data["entry_id"] == str(entry.id)
@@ -284,6 +284,174 @@ class TestPersonalRecords:
         assert len(prs) >= 1
         assert prs[0]["weight_kg"] == "100.00"
 
+    async def _post_sets(self, client, api_key, ex_id, sets, days_ago=0):
+        resp = await client.post(
+            "/performances",
+            json={
+                "session_date": _days_ago_iso(days_ago), "session_type": "solo_free",
+                "exercise_sets": [
+                    {"exercise_type_id": str(ex_id), "set_order": i + 1, "sets_count": 1,
+                     "reps": reps, "weight_kg": weight}
+                    for i, (weight, reps) in enumerate(sets)
+                ],
+            },
+            headers={"X-API-Key": api_key},
+        )
+        assert resp.status_code == 201
+        return resp.json()
+
+    async def _records(self, client, api_key) -> dict:
+        resp = await client.get("/performances/personal-records", headers={"X-API-Key": api_key})
+        return {r["exercise_type_id"]: r for r in resp.json()}
+
+    async def test_records_e1rm_and_volume(
+        self, client: AsyncClient, coach_api_key: str, db: AsyncSession
+    ):
+        """✅ Une même séance : charge max, 1RM estimé (Epley) et volume max suivis séparément."""
+        ex_id = await _seed_exercise(db)
+        await db.commit()
+        body = await self._post_sets(
+            client, coach_api_key, ex_id, [("100.00", 1), ("90.00", 6), ("60.00", 15)]
+        )
+        # Seul le premier set bat la charge en cours de séance
+        assert [s["is_pr"] for s in body["exercise_sets"]] == [True, False, False]
+
+        record = (await self._records(client, coach_api_key))[str(ex_id)]
+        assert record["weight_kg"] == "100.00"
+        assert record["best_e1rm_kg"] == "108.00"   # 90 × (1 + 6/30)
+        assert record["max_volume_kg"] == "900.00"  # 60 × 15
+
+    async def test_update_pr_set_recomputes_record(
+        self, client: AsyncClient, coach_api_key: str, db: AsyncSession
+    ):
+        """✅ Set record corrigé à la baisse → record recalculé depuis l'historique restant."""
+        ex_id = await _seed_exercise(db)
+        await db.commit()
+        first = await self._post_sets(client, coach_api_key, ex_id, [("80.00", 5)], days_ago=3)
+        second = await self._post_sets(client, coach_api_key, ex_id, [("100.00", 5)])
+        assert second["exercise_sets"][0]["is_pr"] is True
+
+        resp = await client.put(
+            f"/performances/{second['id']}",
+            json={"exercise_sets": [{"exercise_type_id": str(ex_id), "set_order": 1,
+                                     "sets_count": 1, "reps": 5, "weight_kg": "70.00"}]},
+            headers={"X-API-Key": coach_api_key},
+        )
+        assert resp.status_code == 200
+        assert resp.json()["exercise_sets"][0]["is_pr"] is False
+
+        record = (await self._records(client, coach_api_key))[str(ex_id)]
+        assert record["weight_kg"] == "80.00"
+        assert record["session_id"] == first["id"]
+
+    async def test_delete_session_recomputes_or_drops_record(
+        self, client: AsyncClient, coach_api_key: str, db: AsyncSession
+    ):
+        """✅ Séance record supprimée → record précédent ; plus aucune séance → plus de record."""
+        ex_id = await _seed_exercise(db)
+        await db.commit()
+        first = await self._post_sets(client, coach_api_key, ex_id, [("80.00", 5)], days_ago=3)
+        second = await self._post_sets(client, coach_api_key, ex_id, [("100.00", 5)])
+
+        await client.delete(f"/performances/{second['id']}", headers={"X-API-Key": coach_api_key})
+        record = (await self._records(client, coach_api_key))[str(ex_id)]
+        assert record["weight_kg"] == "80.00"
+        assert record["max_volume_kg"] == "400.00"
+
+        await client.delete(f"/performances/{first['id']}", headers={"X-API-Key": coach_api_key})
+        assert str(ex_id) not in await self._records(client, coach_api_key)
+
+    async def test_session_date_change_moves_record_date(
+        self, client: AsyncClient, coach_api_key: str, db: AsyncSession
+    ):
+        """✅ Date de séance modifiée sans toucher aux sets → date du record suivie."""
+        ex_id = await _seed_exercise(db)
+        await db.commit()
+        created = await self._post_sets(client, coach_api_key, ex_id, [("50.00", 10)])
+        new_date = _days_ago_iso(1)
+        await client.put(
+            f"/performances/{created['id']}",
+            json={"session_date": new_date},
+            headers={"X-API-Key": coach_api_key},
+        )
+        record = (await self._records(client, coach_api_key))[str(ex_id)]
+        assert record["achieved_at"][:10] == new_date[:10]
+
+
+class TestBatchIngestion:
+    async def test_batch_flags_prs_chronologically(
+        self, client: AsyncClient, coach_api_key: str, db: AsyncSession
+    ):
+        """✅ Lot désordonné → PRs dans l'ordre chronologique, réponse dans l'ordre de la requête."""
+        ex_id = await _seed_exercise(db)
+        await db.commit()
+
+        def _session(days_ago: int, weight: str) -> dict:
+            return {
+                "session_type": "solo_free", "session_date": _days_ago_iso(days_ago),
+                "exercise_sets": [{"exercise_type_id": str(ex_id), "set_order": 1,
+                                   "sets_count": 1, "reps": 5, "weight_kg": weight}],
+            }
+
+        resp = await client.post(
+            "/performances/batch",
+            json={"sessions": [_session(1, "90.00"), _session(5, "80.00"), _session(3, "85.00")]},
+            headers={"X-API-Key": coach_api_key},
+        )
+        assert resp.status_code == 201
+        body = resp.json()
+        assert [i["exercise_sets"][0]["weight_kg"] for i in body["items"]] == ["90.00", "80.00", "85.00"]
+        # 80 (J-5) puis 85 (J-3) puis 90 (J-1) : chacun bat le précédent
+        assert [i["exercise_sets"][0]["is_pr"] for i in body["items"]] == [True, True, True]
+        assert body["pr_count"] == 3
+
+        history = await client.get("/performances", headers={"X-API-Key": coach_api_key})
+        assert history.json()["total"] == 3
+
+    async def test_batch_single_insert_per_table(self, db: AsyncSession, coach_user):
+        """✅ 5 séances × 12 sets → un INSERT par table, aucun SELECT de rechargement."""
+        from sqlalchemy import event
+
+        from app.schemas.performance import PerformanceSessionCreate
+        from app.services import performance_service
+
+        ex_id = await _seed_exercise(db)
+        await db.commit()
+        items = [
+            PerformanceSessionCreate(
+                session_date=datetime.now(timezone.utc) - timedelta(days=d),
+                exercise_sets=[{"exercise_type_id": ex_id, "set_order": i + 1,
+                                "reps": 10, "weight_kg": 40 + i} for i in range(12)],
+            )
+            for d in range(5)
+        ]
+
+        statements: list[str] = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement.split("(")[0].strip())
+
+        engine = db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            sessions = await performance_service.create_sessions(db, coach_user, items)
+            await db.commit()
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+
+        assert statements.count("INSERT INTO exercise_sets") == 1
+        assert statements.count("INSERT INTO performance_sessions") == 1
+        # Pas de rechargement des entités (get_by_id + selectinload des sets)
+        assert not any(s.startswith("SELECT performance_sessions.id") for s in statements)
+        assert sum(len(s.exercise_sets) for s in sessions) == 60
+
+    async def test_batch_empty_rejected(self, client: AsyncClient, coach_api_key: str):
+        """❌ Lot vide → 422."""
+        resp = await client.post(
+            "/performances/batch", json={"sessions": []}, headers={"X-API-Key": coach_api_key}
+        )
+        assert resp.status_code == 422
+
 
 class TestCoachSessionForClient:
     async def test_coach_can_enter_for_client(
@@ -382,3 +550,201 @@ class TestWeekStats:
         assert data["sessions_count"] == 0
         assert data["total_sets"] == 0
         assert data["muscles_worked"] == []
+
+    async def _week_stats(self, client, api_key, week_start: datetime) -> dict:
+        resp = await client.get(
+            "/performances/stats/week",
+            params={"week_start": week_start.isoformat()},
+            headers={"X-API-Key": api_key},
+        )
+        assert resp.status_code == 200
+        return resp.json()
+
+    async def test_week_rollup_follows_sessions(
+        self, client: AsyncClient, coach_api_key: str, db: AsyncSession
+    ):
+        """✅ Rollup tenu à jour : création puis suppression d'une séance de la semaine."""
+        ex_id = await _seed_exercise(db)   # muscle primaire : chest
+        await db.commit()
+        now = datetime.now(timezone.utc)
+        monday = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+
+        created = []
+        for hours, feeling in ((1, 4), (2, 2)):
+            resp = await client.post(
+                "/performances",
+                json={
+                    "session_type": "solo_free",
+                    "session_date": (monday + timedelta(hours=hours)).isoformat(),
+                    "duration_min": 45, "feeling": feeling,
+                    "exercise_sets": [{"exercise_type_id": str(ex_id), "set_order": i + 1,
+                                       "reps": 10, "weight_kg": "50.00"} for i in range(2)],
+                },
+                headers={"X-API-Key": coach_api_key},
+            )
+            created.append(resp.json()["id"])
+
+        data = await self._week_stats(client, coach_api_key, monday)
+        assert data["sessions_count"] == 2
+        assert data["total_duration_min"] == 90
+        assert data["avg_feeling"] == 3
+        assert data["total_sets"] == 4
+        assert data["total_volume_kg"] == "2000.00"
+        assert data["muscles_worked"] == ["chest"]
+
+        await client.delete(f"/performances/{created[0]}", headers={"X-API-Key": coach_api_key})
+        data = await self._week_stats(client, coach_api_key, monday)
+        assert data["sessions_count"] == 1
+        assert data["total_sets"] == 2
+        assert data["avg_feeling"] == 2
+
+    async def test_unaligned_window_computed_live(
+        self, client: AsyncClient, coach_api_key: str, db: AsyncSession
+    ):
+        """✅ week_start hors lundi 00:00 UTC → fenêtre exacte, calculée à la volée."""
+        ex_id = await _seed_exercise(db)
+        await db.commit()
+        start = datetime.now(timezone.utc) - timedelta(days=3, hours=5)
+        for days_ago in (1, 10):
+            await client.post(
+                "/performances",
+                json={
+                    "session_type": "solo_free", "session_date": _days_ago_iso(days_ago),
+                    "exercise_sets": [{"exercise_type_id": str(ex_id), "reps": 5, "weight_kg": "20.00"}],
+                },
+                headers={"X-API-Key": coach_api_key},
+            )
+        data = await self._week_stats(client, coach_api_key, start)
+        assert data["sessions_count"] == 1
+        assert data["total_volume_kg"] == "100.00"
+
+    async def test_coach_clients_week_stats(
+        self, client: AsyncClient, coach_user, coach_api_key: str, db: AsyncSession
+    ):
+        """✅ Coach → semaine de tous ses clients actifs (client sans séance à zéro)."""
+        from app.repositories import coach_repository
+        from app.repositories.user_repository import user_repository
+        from app.schemas.performance import PerformanceSessionCreate
+        from app.services import performance_service
+
+        ex_id = await _seed_exercise(db)
+        clients = []
+        for status in ("active", "active", "ended"):
+            user = await user_repository.create(
+                db, first_name="C", last_name="W", email=f"cw_{uuid.uuid4().hex[:8]}@test.com",
+                role="client", password_plain="Password1",
+            )
+            await coach_repository.upsert_relation(db, coach_user.id, user.id, status)
+            clients.append(user)
+        for user in (clients[0], clients[2]):
+            await performance_service.create_session(db, user, PerformanceSessionCreate(
+                session_date=datetime.now(timezone.utc),
+                exercise_sets=[{"exercise_type_id": ex_id, "reps": 8, "weight_kg": 30}],
+            ))
+        await db.commit()
+
+        resp = await client.get(
+            "/coaches/clients/stats/week",
+            params={"week_start": datetime.now(timezone.utc).isoformat()},
+            headers={"X-API-Key": coach_api_key},
+        )
+        assert resp.status_code == 200
+        stats = {s["client_id"]: s for s in resp.json()}
+        assert set(stats) == {str(clients[0].id), str(clients[1].id)}
+        assert stats[str(clients[0].id)]["sessions_count"] == 1
+        assert stats[str(clients[0].id)]["total_sets"] == 1
+        assert stats[str(clients[1].id)]["sessions_count"] == 0
+
+
+class TestProgressionAnalytics:
+    async def _batch(self, client, api_key, ex_id, sets_by_days_ago: dict[int, tuple[str, int]]):
+        resp = await client.post(
+            "/performances/batch",
+            json={"sessions": [
+                {"session_type": "solo_free", "session_date": _days_ago_iso(days),
+                 "exercise_sets": [{"exercise_type_id": str(ex_id), "reps": reps, "weight_kg": weight}]}
+                for days, (weight, reps) in sets_by_days_ago.items()
+            ]},
+            headers={"X-API-Key": api_key},
+        )
+        assert resp.status_code == 201
+
+    async def test_monthly_buckets_e1rm_and_moving_average(
+        self, client: AsyncClient, coach_api_key: str, db: AsyncSession
+    ):
+        """✅ Une période par mois ; 1RM Epley et moyenne mobile sur 2 périodes."""
+        ex_id = await _seed_exercise(db)
+        await db.commit()
+        # ~3 mois d'écart entre séances : 3 mois distincts
+        await self._batch(client, coach_api_key, ex_id,
+                          {200: ("60.00", 10), 110: ("90.00", 1), 20: ("75.00", 6)})
+
+        resp = await client.get(
+            f"/performances/stats/exercise/{ex_id}/analytics",
+            params={"bucket": "month", "window": 2},
+            headers={"X-API-Key": coach_api_key},
+        )
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["total_buckets"] == 3
+        points = body["data_points"]
+        assert [p["best_e1rm_kg"] for p in points] == ["80.00", "90.00", "90.00"]
+        assert [p["e1rm_moving_avg"] for p in points] == ["80.00", "85.00", "90.00"]
+        assert points[0]["total_volume_kg"] == "600.00"
+        assert all(p["bucket_start"][8:10] == "01" for p in points)
+
+    async def test_downsampled_to_requested_points(
+        self, client: AsyncClient, coach_api_key: str, db: AsyncSession
+    ):
+        """✅ 30 jours → 8 points (LTTB), premier et dernier conservés."""
+        ex_id = await _seed_exercise(db)
+        await db.commit()
+        await self._batch(client, coach_api_key, ex_id,
+                          {d: (f"{50 + (d * 7) % 13}.00", 5) for d in range(1, 31)})
+
+        resp = await client.get(
+            f"/performances/stats/exercise/{ex_id}/analytics",
+            params={"bucket": "day", "points": 8},
+            headers={"X-API-Key": coach_api_key},
+        )
+        body = resp.json()
+        assert body["total_buckets"] == 30
+        points = body["data_points"]
+        assert len(points) == 8
+        assert points[0]["bucket_start"][:10] == _days_ago_iso(30)[:10]
+        assert points[-1]["bucket_start"][:10] == _days_ago_iso(1)[:10]
+
+    async def test_etag_not_modified_until_data_changes(
+        self, client: AsyncClient, coach_api_key: str, db: AsyncSession
+    ):
+        """✅ If-None-Match identique → 304 ; nouvelle séance → nouvel ETag."""
+        ex_id = await _seed_exercise(db)
+        await db.commit()
+        await self._batch(client, coach_api_key, ex_id, {3: ("40.00", 8)})
+        url = f"/performances/stats/exercise/{ex_id}/analytics"
+        headers = {"X-API-Key": coach_api_key}
+
+        first = await client.get(url, headers=headers)
+        etag = first.headers["etag"]
+        cached = await client.get(url, headers={**headers, "If-None-Match": etag})
+        assert cached.status_code == 304
+
+        other = await client.get(url, params={"bucket": "day"}, headers={**headers, "If-None-Match": etag})
+        assert other.status_code == 200
+
+        await self._batch(client, coach_api_key, ex_id, {1: ("45.00", 8)})
+        changed = await client.get(url, headers={**headers, "If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+
+    def test_lttb_keeps_peaks(self):
+        """✅ LTTB : bornes conservées, pic isolé retenu."""
+        from app.utils.downsampling import lttb
+
+        ys = [1.0] * 50
+        ys[23] = 100.0
+        kept = lttb([(float(i), y) for i, y in enumerate(ys)], 5)
+        assert len(kept) == 5
+        assert kept[0] == 0 and kept[-1] == 49
+        assert 23 in kept
+        assert lttb([(0.0, 1.0), (1.0, 2.0)], 10) == [0, 1]
@@ -11,6 +11,7 @@ Couvre :
 8.  test_no_auth                    sans api key → 401
 9.  test_otp_format                 generate_otp() retourne exactement 6 chars [0-9a-z]
 10. test_rate_limit                 3 OTPs en < 1h → 4ème → 429
+11. test_request_otp_queues_sms     request → SMS pending dans l'outbox, code dans le texte
 """
 from __future__ import annotations
 
@@ -23,6 +24,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.phone_verification_token import PhoneVerificationToken
+from app.models.sms_log import SmsLog
 from app.repositories.api_key_repository import api_key_repository
 from app.repositories.user_repository import user_repository
 from app.utils.otp import OTP_ALPHABET, OTP_LENGTH, generate_otp
@@ -242,3 +244,18 @@ async def test_rate_limit(client: AsyncClient, db: AsyncSession):
         headers={"X-API-Key": key},
     )
     assert resp.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_request_otp_queues_sms(client: AsyncClient, db: AsyncSession):
+    """11. request → SMS pending dans l'outbox (pas d'appel provider dans la requête)."""
+    user, key = await _make_user_with_phone(db)
+    resp = await client.post("/auth/verify-phone/request", headers={"X-API-Key": key})
+    assert resp.status_code == 204
+
+    token = await _get_latest_token(db, user.id)
+    log = (await db.execute(select(SmsLog).where(SmsLog.client_id == user.id))).scalar_one()
+    assert log.status == "pending"
+    assert log.coach_id is None
+    assert log.recipient_phone == "+33612345678"
+    assert token.code in log.message_body
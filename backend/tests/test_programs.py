@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import uuid
 from datetime import date, datetime, timezone
+from decimal import Decimal
 
 import pytest
 from httpx import AsyncClient
@@ -317,3 +318,524 @@ class TestProgressionService:
         from app.services.progression_service import check_and_adjust
         result = await check_and_adjust(db, coach.id, uuid.uuid4())
         assert result is None
+
+
+class TestProgressionEngine:
+    """Moteur par lots : requêtes constantes, journal, pas de double hausse."""
+
+    async def _setup(self, db: AsyncSession, coach_user, client_user, n_exercises: int = 2):
+        from datetime import timedelta
+
+        from app.repositories import program_repository as repo
+        from app.schemas.performance import PerformanceSessionCreate
+
+        ex_ids = [await _seed_exercise(db) for _ in range(n_exercises)]
+        plan = await repo.create_plan(db, created_by_id=coach_user.id, name="Prog", level="beginner")
+        ps = await repo.add_planned_session(db, plan.id, day_of_week=0, session_name="A")
+        planned = [
+            await repo.add_planned_exercise(
+                db, ps.id, exercise_type_id=ex_id, target_reps=8,
+                target_weight_kg=Decimal("40.00") if i == 0 else None, order_index=i + 1,
+            )
+            for i, ex_id in enumerate(ex_ids)
+        ]
+        await repo.assign_plan(db, plan.id, client_user.id, date.today(), "replace_ai", coach_user.id)
+        await db.commit()
+
+        def sessions(days_ago: list[int], reps: int = 8) -> list:
+            return [
+                PerformanceSessionCreate(
+                    session_date=datetime.now(timezone.utc) - timedelta(days=d),
+                    exercise_sets=[{"exercise_type_id": ex_id, "reps": reps, "weight_kg": 40}
+                                   for ex_id in ex_ids],
+                )
+                for d in days_ago
+            ]
+        return ex_ids, planned, sessions
+
+    async def test_batch_session_adjusts_all_exercises(
+        self, db: AsyncSession, coach_user, client_user
+    ):
+        """✅ 3 séances réussies → toutes les charges ajustées, journalisées, notifiées ; pas de double hausse."""
+        from sqlalchemy import select
+
+        from app.models.progression_adjustment import ProgressionAdjustment
+        from app.models.push_intent import PushIntent
+        from app.models.workout_plan import PlannedExercise
+        from app.services import performance_service
+
+        _, planned, sessions = await self._setup(db, coach_user, client_user)
+        await performance_service.create_sessions(db, client_user, sessions([5, 3, 1]))
+        await db.commit()
+
+        weights = dict((await db.execute(
+            select(PlannedExercise.id, PlannedExercise.target_weight_kg)
+            .execution_options(populate_existing=True)
+        )).all())
+        assert weights[planned[0].id] == Decimal("42.50")
+        assert weights[planned[1].id] == Decimal("5.00")
+
+        audit = (await db.execute(select(ProgressionAdjustment))).scalars().all()
+        assert {(a.previous_weight_kg, a.new_weight_kg) for a in audit} == {
+            (Decimal("40.00"), Decimal("42.50")), (None, Decimal("5.00"))
+        }
+        assert {a.trigger for a in audit} == {"session"}
+        intents = (await db.execute(
+            select(PushIntent).where(PushIntent.title_key == "notification.load_increase.title")
+        )).scalars().all()
+        assert sorted(i.params["weight"] for i in intents) == ["42.5", "5"]
+
+        # Une séance de plus : pas 3 nouvelles séances depuis l'ajustement
+        await performance_service.create_sessions(db, client_user, sessions([0]))
+        await db.commit()
+        assert len((await db.execute(select(ProgressionAdjustment))).scalars().all()) == 2
+
+    async def test_reps_missed_no_adjustment(self, db: AsyncSession, coach_user, client_user):
+        """❌ Un set sous les reps cibles dans une des 3 séances → pas de hausse."""
+        from app.services import performance_service, progression_service
+
+        ex_ids, _, sessions = await self._setup(db, coach_user, client_user, n_exercises=1)
+        await performance_service.create_sessions(db, client_user, sessions([5, 3]))
+        await performance_service.create_sessions(db, client_user, sessions([1], reps=6))
+        await db.commit()
+        assert await progression_service.check_and_adjust(db, client_user.id, ex_ids[0]) is None
+
+    async def test_nightly_constant_query_count(self, db: AsyncSession, coach_user, client_user):
+        """✅ Passe de nuit : nombre de requêtes indépendant du nombre d'exercices (6 ici)."""
+        from sqlalchemy import event
+
+        from app.models.performance_session import PerformanceSession
+        from app.repositories import performance_repository
+        from app.services import progression_service
+        from app.services.performance_service import _build_sets
+
+        _, _, sessions = await self._setup(db, coach_user, client_user, n_exercises=6)
+        # Historique inséré directement (import) : le moteur ne s'est pas encore exécuté
+        batch = []
+        for data in sessions([5, 3, 1]):
+            session = PerformanceSession(
+                id=uuid.uuid4(), user_id=client_user.id, session_type="solo_free",
+                session_date=data.session_date, created_at=datetime.now(timezone.utc),
+            )
+            session.exercise_sets = _build_sets(session.id, data.exercise_sets)
+            for ex_set in session.exercise_sets:
+                ex_set.is_pr = False
+            batch.append(session)
+        await performance_repository.insert_sessions(db, batch)
+        await db.commit()
+
+        statements: list[str] = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            adjusted = await progression_service.run_nightly(db)
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+        assert adjusted == 6
+        # clients actifs, candidats, séances récentes, UPDATE, INSERT journal, INSERT push
+        assert len(statements) == 6
+        assert sum(s.startswith("UPDATE planned_exercises") for s in statements) == 1
+
+    async def test_adjustments_endpoint(
+        self, client: AsyncClient, coach_api_key: str, coach_user, client_user, db: AsyncSession
+    ):
+        """✅ Coach → journal des ajustements du client."""
+        from app.repositories import coach_repository
+        from app.services import performance_service
+
+        _, _, sessions = await self._setup(db, coach_user, client_user, n_exercises=1)
+        await performance_service.create_sessions(db, client_user, sessions([5, 3, 1]))
+        await coach_repository.upsert_relation(db, coach_user.id, client_user.id, "active")
+        await db.commit()
+
+        resp = await client.get(
+            f"/coaches/clients/{client_user.id}/progression-adjustments",
+            headers={"X-API-Key": coach_api_key},
+        )
+        assert resp.status_code == 200
+        (entry,) = resp.json()
+        assert entry["new_weight_kg"] == "42.50"
+
+    async def test_adjustments_endpoint_other_coach(
+        self, client: AsyncClient, coach_user, client_user, db: AsyncSession
+    ):
+        """❌ Coach qui ne suit pas le client → 403."""
+        from app.repositories import coach_repository
+        from app.repositories.api_key_repository import api_key_repository
+        from app.repositories.user_repository import user_repository
+
+        other = await user_repository.create(
+            db, first_name="Autre", last_name="Coach",
+            email=f"coach_{uuid.uuid4().hex[:8]}@test.com",
+            role="coach", password_plain="Password1",
+        )
+        other_key, _ = await api_key_repository.create(db, other.id, "d")
+        await coach_repository.upsert_relation(db, coach_user.id, client_user.id, "active")
+        await db.commit()
+
+        resp = await client.get(
+            f"/coaches/clients/{client_user.id}/progression-adjustments",
+            headers={"X-API-Key": other_key},
+        )
+        assert resp.status_code == 403
+
+
+class TestExerciseCatalogue:
+    """Index en mémoire du catalogue — générateur sans requête par slot."""
+
+    async def _seed(self, db: AsyncSession, n_per_muscle: int = 3) -> None:
+        from app.models.exercise_type import ExerciseType, ExerciseTypeMuscle
+        for muscle in ["chest", "shoulders", "triceps", "back", "biceps", "quads", "glutes"]:
+            for i in range(n_per_muscle):
+                et = ExerciseType(id=uuid.uuid4(), name_key=f"exercise.cat_{muscle}_{i}",
+                                  category="strength", difficulty="beginner", active=True)
+                et.muscles = [ExerciseTypeMuscle(id=uuid.uuid4(), muscle_group=muscle, role="primary")]
+                db.add(et)
+        db.add(ExerciseType(id=uuid.uuid4(), name_key="exercise.cat_inactive",
+                            category="strength", difficulty="beginner", active=False))
+        await db.commit()
+
+    async def test_index_invalidated_on_commit(self, db: AsyncSession):
+        """✅ Index servi depuis la mémoire, rechargé après un commit sur le catalogue."""
+        from app.models.exercise_type import ExerciseType
+        from app.services.exercise_catalogue_service import exercise_catalogue
+
+        await self._seed(db, n_per_muscle=1)
+        index = await exercise_catalogue.get(db)
+        assert len(index) == 7  # exercice inactif exclu
+        assert [ex.name_key for ex in index.by_muscle["chest"]] == ["exercise.cat_chest_0"]
+        assert await exercise_catalogue.get(db) is index
+
+        db.add(ExerciseType(id=uuid.uuid4(), name_key="exercise.cat_new",
+                            category="cardio", difficulty="beginner", active=True))
+        await db.commit()
+        reloaded = await exercise_catalogue.get(db)
+        assert reloaded.version > index.version
+        assert [ex.name_key for ex in reloaded.by_category["cardio"]] == ["exercise.cat_new"]
+
+    async def test_generation_in_memory_bulk_insert(self, db: AsyncSession):
+        """✅ Index chaud : aucun SELECT, un INSERT par table, pas de doublon dans le plan."""
+        import random
+
+        from sqlalchemy import event
+
+        from app.repositories import program_repository
+        from app.services.exercise_catalogue_service import exercise_catalogue
+        from app.services.program_generator_service import generate_weekly_program
+
+        await self._seed(db)
+        await exercise_catalogue.get(db)
+
+        statements: list[str] = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            plan = await generate_weekly_program(
+                db, goal="muscle_gain", frequency_per_week=4, level="beginner",
+                rng=random.Random(1),
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+        await db.commit()
+
+        assert [s.split()[2] for s in statements] == [
+            "workout_plans", "planned_sessions", "planned_exercises"
+        ]
+        stored = await program_repository.get_plan_by_id(db, plan.id)
+        exercises = [pe for ps in stored.planned_sessions for pe in ps.planned_exercises]
+        assert len(stored.planned_sessions) == 4
+        assert len(exercises) == sum(len(ps.planned_exercises) for ps in plan.planned_sessions)
+        assert len({pe.exercise_type_id for pe in exercises}) == len(exercises)
+
+    async def test_generation_varies(self, db: AsyncSession):
+        """✅ Deux générations ne tirent pas systématiquement les mêmes exercices."""
+        import random
+
+        from app.services.program_generator_service import generate_weekly_program
+
+        await self._seed(db)
+        picks = []
+        for seed in range(2):
+            plan = await generate_weekly_program(
+                db, goal="muscle_gain", frequency_per_week=3, level="beginner",
+                rng=random.Random(seed),
+            )
+            picks.append([pe.exercise_type_id for ps in plan.planned_sessions
+                          for pe in ps.planned_exercises])
+        assert len(picks[0]) == len(picks[1]) > 0
+        assert picks[0] != picks[1]
+
+
+class TestProgramGenerator:
+    """Recherche sous contraintes — toutes fréquences, aperçu coach."""
+
+    async def test_every_frequency_respects_rules(self):
+        """✅ 1 à 7 séances, chaque objectif et niveau : règles du générateur respectées."""
+        from app.models.workout_plan import PLAN_GOALS, PLAN_LEVELS
+        from app.services.program_generator_service import _admissible, solve
+
+        for goal in PLAN_GOALS:
+            for freq in range(1, 8):
+                for level in PLAN_LEVELS:
+                    layouts = solve(goal, freq, level)
+                    assert layouts, (goal, freq, level)
+                    assert [w.score for w in layouts] == sorted(
+                        (w.score for w in layouts), reverse=True
+                    )
+                    for week in layouts:
+                        assert len(week.days) == len(set(week.days)) == freq
+                        assert _admissible(week.days, week.blocks), (goal, freq, week)
+
+    async def test_unknown_goal_and_level_share_fallback_cache_entry(self, db: AsyncSession):
+        """✅ Objectif / niveau inconnus → clé de repli : le cache de solve ne grossit pas."""
+        from app.services.program_generator_service import generate_weekly_program, solve
+
+        await TestExerciseCatalogue()._seed(db)
+        await generate_weekly_program(db, goal="well_being", frequency_per_week=3, level="beginner")
+        size = solve.cache_info().currsize
+        for i in range(5):
+            plan = await generate_weekly_program(
+                db, goal=f"junk-{i}", frequency_per_week=3, level=f"lvl-{i}"
+            )
+            assert (plan.goal, plan.level) == ("well_being", "beginner")
+        assert solve.cache_info().currsize == size
+
+    async def test_generate_uses_requested_frequency(
+        self, client: AsyncClient, client_api_key: str
+    ):
+        """✅ 5 séances demandées → 5 séances (plus de repli sur un template à 3)."""
+        resp = await client.post(
+            "/clients/program/generate",
+            json={"goal": "muscle_gain", "frequency_per_week": 5, "level": "intermediate"},
+            headers={"X-API-Key": client_api_key},
+        )
+        assert resp.status_code == 201
+        sessions = resp.json()["workout_plan"]["planned_sessions"]
+        assert len(sessions) == 5
+        assert len({s["day_of_week"] for s in sessions}) == 5
+
+    async def test_preview_alternatives(
+        self, client: AsyncClient, coach_api_key: str, db: AsyncSession
+    ):
+        """✅ Aperçu : semaines distinctes, meilleur score d'abord, créables telles quelles."""
+        await TestExerciseCatalogue()._seed(db)
+        resp = await client.post(
+            "/coaches/programs/preview",
+            json={"goal": "muscle_gain", "frequency_per_week": 4, "level": "beginner", "count": 3},
+            headers={"X-API-Key": coach_api_key},
+        )
+        assert resp.status_code == 200
+        previews = resp.json()
+        assert len(previews) == 3
+        assert [p["score"] for p in previews] == sorted((p["score"] for p in previews), reverse=True)
+        weeks = {
+            tuple(sorted(s["session_name"] for s in p["plan"]["planned_sessions"]))
+            for p in previews
+        }
+        assert len(weeks) == 3
+
+        create = await client.post(
+            "/coaches/programs", json=previews[0]["plan"], headers={"X-API-Key": coach_api_key}
+        )
+        assert create.status_code == 201
+        assert len(create.json()["planned_sessions"]) == 4
+
+    async def test_preview_invalid_goal(self, client: AsyncClient, coach_api_key: str):
+        """❌ Objectif inconnu → 422."""
+        resp = await client.post(
+            "/coaches/programs/preview",
+            json={"goal": "become_arnold", "frequency_per_week": 3},
+            headers={"X-API-Key": coach_api_key},
+        )
+        assert resp.status_code == 422
+
+
+class TestPlanDuplication:
+    """Copie profonde : INSERT multi-lignes, lot de clients, pas de rechargement."""
+
+    async def _source_plan(self, db: AsyncSession, coach_user, n_sessions: int = 3, n_exercises: int = 4):
+        from app.schemas.program import WorkoutPlanCreate
+        from app.services import program_service
+
+        ex_ids = [await _seed_exercise(db) for _ in range(n_exercises)]
+        data = WorkoutPlanCreate(
+            name="Template 12 semaines",
+            duration_weeks=12,
+            level="intermediate",
+            goal="muscle_gain",
+            planned_sessions=[
+                {
+                    "day_of_week": day,
+                    "session_name": f"Séance {day}",
+                    "rest_seconds": 60 + day,
+                    "planned_exercises": [
+                        {"exercise_type_id": str(ex_id), "target_sets": 3 + i,
+                         "target_reps": 8 + day, "target_weight_kg": f"{20 + i}.5"}
+                        for i, ex_id in enumerate(ex_ids)
+                    ],
+                }
+                for day in range(n_sessions)
+            ],
+        )
+        plan = await program_service.create_plan(db, coach_user, data)
+        await db.commit()
+        return plan
+
+    @staticmethod
+    def _tree(plan) -> list:
+        return sorted(
+            (ps.day_of_week, ps.session_name, ps.rest_seconds, ps.order_index, sorted(
+                (pe.exercise_type_id, pe.target_sets, pe.target_reps,
+                 Decimal(pe.target_weight_kg), pe.order_index)
+                for pe in ps.planned_exercises
+            ))
+            for ps in plan.planned_sessions
+        )
+
+    async def test_deep_copy_constant_statements(self, db: AsyncSession, coach_user):
+        """✅ Copie identique : 3 lectures + 3 INSERT, quel que soit le nombre de lignes."""
+        from sqlalchemy import event
+
+        from app.repositories import program_repository
+        from app.services import program_service
+
+        source = await self._source_plan(db, coach_user, n_sessions=5, n_exercises=8)
+        statements: list[str] = []
+
+        def _record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            copy = await program_service.duplicate_plan(db, coach_user, source.id)
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+        await db.commit()
+
+        assert [s.split()[0] for s in statements] == ["SELECT"] * 3 + ["INSERT"] * 3
+        assert copy.name == "Template 12 semaines (copie)"
+        assert self._tree(copy) == self._tree(source)
+
+        db.expunge_all()
+        stored = await program_repository.get_plan_by_id(db, copy.id)
+        assert stored.duration_weeks == 12
+        assert self._tree(stored) == self._tree(source)
+        assert not {ps.id for ps in stored.planned_sessions} & {ps.id for ps in source.planned_sessions}
+
+    async def test_duplicate_for_clients(
+        self, client: AsyncClient, coach_api_key: str, coach_user, client_user, db: AsyncSession
+    ):
+        """✅ Une copie par client, assignée ; l'ancienne assignation est désactivée."""
+        from app.repositories import coach_repository, program_repository
+        from app.repositories.user_repository import user_repository
+
+        source = await self._source_plan(db, coach_user)
+        others = [
+            await user_repository.create(
+                db, first_name="Client", last_name=str(i),
+                email=f"dup_{uuid.uuid4().hex[:8]}@test.com",
+                role="client", password_plain="Password1",
+            )
+            for i in range(2)
+        ]
+        previous = await program_repository.assign_plan(
+            db, source.id, client_user.id, date.today(), "replace_ai", coach_user.id
+        )
+        client_ids = [client_user.id, *(u.id for u in others)]
+        for client_id in client_ids:
+            await coach_repository.upsert_relation(db, coach_user.id, client_id, "active")
+        await db.commit()
+
+        resp = await client.post(
+            f"/coaches/programs/{source.id}/duplicate/clients",
+            json={"client_ids": [str(c) for c in client_ids], "start_date": str(date.today())},
+            headers={"X-API-Key": coach_api_key},
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [a["client_id"] for a in data] == [str(c) for c in client_ids]
+        assert len({a["plan_id"] for a in data}) == 3
+        assert all(len(a["workout_plan"]["planned_sessions"]) == 3 for a in data)
+
+        db.expunge_all()
+        for client_id, assignment in zip(client_ids, data, strict=True):
+            current = await program_repository.get_current_assignment(db, client_id)
+            assert str(current.plan_id) == assignment["plan_id"]
+            assert len(current.workout_plan.planned_sessions[0].planned_exercises) == 4
+        assert (await program_repository.get_assignment_by_id(db, previous.id)).active is False
+
+    async def test_duplicate_for_clients_unknown_plan(
+        self, client: AsyncClient, coach_api_key: str, client_user
+    ):
+        """❌ Plan inexistant → 404."""
+        resp = await client.post(
+            f"/coaches/programs/{uuid.uuid4()}/duplicate/clients",
+            json={"client_ids": [str(client_user.id)], "start_date": str(date.today())},
+            headers={"X-API-Key": coach_api_key},
+        )
+        assert resp.status_code == 404
+
+    async def test_duplicate_for_clients_foreign_plan(
+        self, client: AsyncClient, coach_api_key: str, client_user, db: AsyncSession
+    ):
+        """❌ Plan d'un autre coach → 403, aucune copie."""
+        from sqlalchemy import func, select
+
+        from app.models.workout_plan import WorkoutPlan
+        from app.repositories.user_repository import user_repository
+
+        other = await user_repository.create(
+            db, first_name="Autre", last_name="Coach",
+            email=f"coach_{uuid.uuid4().hex[:8]}@test.com",
+            role="coach", password_plain="Password1",
+        )
+        source = await self._source_plan(db, other)
+
+        resp = await client.post(
+            f"/coaches/programs/{source.id}/duplicate/clients",
+            json={"client_ids": [str(client_user.id)], "start_date": str(date.today())},
+            headers={"X-API-Key": coach_api_key},
+        )
+        assert resp.status_code == 403
+        assert await db.scalar(select(func.count()).select_from(WorkoutPlan)) == 1
+
+    async def test_duplicate_for_clients_not_active_client(
+        self, client: AsyncClient, coach_api_key: str, coach_user, client_user, db: AsyncSession
+    ):
+        """❌ Client sans relation active ou inexistant → 403, aucune copie."""
+        from sqlalchemy import func, select
+
+        from app.models.workout_plan import WorkoutPlan
+        from app.repositories import coach_repository
+        from app.repositories.user_repository import user_repository
+
+        source = await self._source_plan(db, coach_user)
+        former = await user_repository.create(
+            db, first_name="Ancien", last_name="Client",
+            email=f"former_{uuid.uuid4().hex[:8]}@test.com",
+            role="client", password_plain="Password1",
+        )
+        await coach_repository.upsert_relation(db, coach_user.id, client_user.id, "active")
+        await coach_repository.upsert_relation(db, coach_user.id, former.id, "ended")
+        await db.commit()
+
+        for stranger in (former.id, uuid.uuid4()):
+            resp = await client.post(
+                f"/coaches/programs/{source.id}/duplicate/clients",
+                json={
+                    "client_ids": [str(client_user.id), str(stranger)],
+                    "start_date": str(date.today()),
+                },
+                headers={"X-API-Key": coach_api_key},
+            )
+            assert resp.status_code == 403
+        assert await db.scalar(select(func.count()).select_from(WorkoutPlan)) == 1
@@ -0,0 +1,157 @@
+"""
+Tests — outbox SMS (sms_logs pending → worker sms.outbox).
+
+Couvre :
+1. enqueue   même transaction que le métier (rollback → rien), dedup_key
+2. drain     envoi + statut sent, doublon destinataire/texte envoyé une seule fois
+3. retry     échec → pending + backoff exponentiel, failed après SMS_MAX_ATTEMPTS
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.sms.provider import SmsProvider, SmsResult
+from app.models.sms_log import SmsLog
+from app.services import sms_outbox_service
+from app.services.sms_outbox_service import OutgoingSms
+
+
+class _RecordingProvider(SmsProvider):
+    name = "test_recording"
+
+    def __init__(self, *, fail: bool = False) -> None:
+        self.fail = fail
+        self.calls: list[tuple[str, str]] = []
+
+    async def send(self, to: str, body: str) -> SmsResult:
+        self.calls.append((to, body))
+        if self.fail:
+            return SmsResult(success=False, error_message="provider down")
+        return SmsResult(success=True, provider_message_id=f"sid-{len(self.calls)}")
+
+
+@pytest.fixture()
+def provider(monkeypatch) -> _RecordingProvider:
+    fake = _RecordingProvider()
+    monkeypatch.setattr(sms_outbox_service, "get_sms_provider", lambda: fake)
+    return fake
+
+
+async def _logs(db: AsyncSession) -> list[SmsLog]:
+    q = select(SmsLog).order_by(SmsLog.created_at).execution_options(populate_existing=True)
+    return list((await db.execute(q)).scalars().all())
+
+
+class TestEnqueue:
+
+    async def test_rollback_discards_sms(self, db: AsyncSession, coach_user):
+        """❌ Transaction métier annulée → aucun SMS en file."""
+        await sms_outbox_service.enqueue(db, [OutgoingSms("+33600000001", "Bonjour", coach_id=coach_user.id)])
+        await db.rollback()
+        assert await _logs(db) == []
+
+    async def test_dedup_key(self, db: AsyncSession, coach_user):
+        """✅ Même dedup_key deux fois (même lot puis lot suivant) → une seule ligne."""
+        msg = OutgoingSms("+33600000001", "Annulé", coach_id=coach_user.id, dedup_key="booking_cancel:1")
+        assert await sms_outbox_service.enqueue(db, [msg, msg]) == 1
+        await db.commit()
+        assert await sms_outbox_service.enqueue(db, [msg]) == 0
+        assert len(await _logs(db)) == 1
+
+    async def test_dedup_key_concurrent_transactions(self, db: AsyncSession, coach_user):
+        """✅ Même dedup_key dans deux transactions concurrentes → la seconde attend
+        le commit de la première puis n'insère rien (index unique partiel)."""
+        import asyncio
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        msg = OutgoingSms("+33600000001", "Annulé", coach_id=coach_user.id, dedup_key="booking_cancel:2")
+        engine = create_async_engine(get_settings().DATABASE_URL)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            async with sessions() as first, sessions() as second:
+                assert await sms_outbox_service.enqueue(first, [msg]) == 1
+                racing = asyncio.create_task(sms_outbox_service.enqueue(second, [msg]))
+                await asyncio.sleep(0.2)
+                assert not racing.done()  # bloquée sur l'index unique
+                await first.commit()
+                assert await racing == 0
+                await second.commit()
+        finally:
+            await engine.dispose()
+        assert len(await _logs(db)) == 1
+
+
+class TestDrain:
+
+    async def test_sends_and_marks_sent(self, db: AsyncSession, coach_user, provider):
+        """✅ 3 SMS en lots de 2 → 3 sent ; doublon numéro + texte d'un lot → un seul appel."""
+        await sms_outbox_service.enqueue(db, [
+            OutgoingSms("+33600000001", "Séance annulée", coach_id=coach_user.id),
+            OutgoingSms("+33600000001", "Séance annulée", coach_id=coach_user.id),
+            OutgoingSms("+33600000002", "Séance annulée", coach_id=coach_user.id),
+        ])
+        await db.commit()
+
+        assert await sms_outbox_service.drain(db, batch_size=2) == 3
+        logs = await _logs(db)
+        assert {log.status for log in logs} == {"sent"}
+        assert all(log.sent_at is not None and log.provider_message_id for log in logs)
+
+        # Lot unique : le doublon n'est envoyé qu'une fois
+        provider.calls.clear()
+        await sms_outbox_service.enqueue(db, [
+            OutgoingSms("+33600000003", "Rappel", coach_id=coach_user.id),
+            OutgoingSms("+33600000003", "Rappel", coach_id=coach_user.id),
+        ])
+        await db.commit()
+        assert await sms_outbox_service.drain(db) == 2
+        assert provider.calls == [("+33600000003", "Rappel")]
+
+    async def test_nothing_due(self, db: AsyncSession, coach_user, provider):
+        """✅ SMS reprogrammé plus tard → ignoré par le worker."""
+        await sms_outbox_service.enqueue(db, [OutgoingSms("+33600000001", "Plus tard", coach_id=coach_user.id)])
+        await db.execute(
+            update(SmsLog).values(next_attempt_at=datetime.now(timezone.utc) + timedelta(hours=1))
+        )
+        await db.commit()
+        assert await sms_outbox_service.drain(db) == 0
+        assert provider.calls == []
+
+
+class TestRetry:
+
+    async def test_backoff_then_failed(self, db: AsyncSession, coach_user, provider):
+        """❌ Provider en échec → pending avec backoff croissant, puis failed au dernier essai."""
+        provider.fail = True
+        settings = get_settings()
+        await sms_outbox_service.enqueue(db, [OutgoingSms("+33600000001", "Bonjour", coach_id=coach_user.id)])
+        await db.commit()
+
+        for attempt in range(1, settings.SMS_MAX_ATTEMPTS + 1):
+            before = datetime.now(timezone.utc)
+            assert await sms_outbox_service.drain(db) == 1
+            (log,) = await _logs(db)
+            assert log.attempts == attempt
+            if attempt < settings.SMS_MAX_ATTEMPTS:
+                assert log.status == "pending"
+                assert log.next_attempt_at.replace(tzinfo=timezone.utc) >= (
+                    before + sms_outbox_service.retry_delay(attempt)
+                )
+                # Échéance atteinte pour le tour suivant
+                await db.execute(update(SmsLog).values(next_attempt_at=None))
+                await db.commit()
+
+        assert log.status == "failed"
+        assert log.error_message == "provider down"
+        assert len(provider.calls) == settings.SMS_MAX_ATTEMPTS
+
+    def test_retry_delay_exponential_and_capped(self):
+        """✅ 30 s, 60 s, 120 s… plafonné à SMS_RETRY_MAX_SECONDS."""
+        settings = get_settings()
+        base = settings.SMS_RETRY_BASE_SECONDS
+        assert sms_outbox_service.retry_delay(1) == timedelta(seconds=base)
+        assert sms_outbox_service.retry_delay(3) == timedelta(seconds=base * 4)
+        assert sms_outbox_service.retry_delay(50) == timedelta(seconds=settings.SMS_RETRY_MAX_SECONDS)
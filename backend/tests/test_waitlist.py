@@ -26,6 +26,21 @@ async def _setup(client, coach_key, client_key, coach_user):
     return slot, resp.json()["id"]
 
 
+async def _clients(db, n: int):
+    """Crée `n` clients (files d'attente à plusieurs)."""
+    from app.repositories.user_repository import user_repository
+    users = [
+        await user_repository.create(
+            db, first_name="Client", last_name=str(i),
+            email=f"wl{i}_{uuid.uuid4().hex[:6]}@test.com",
+            role="client", password_plain="Password1",
+        )
+        for i in range(n)
+    ]
+    await db.commit()
+    return users
+
+
 class TestWaitlist:
     async def test_join_waitlist_ok(
         self,
@@ -195,3 +210,223 @@ class TestWaitlist:
         resp = await client.get("/waitlist", headers={"X-API-Key": wl_key})
         assert resp.status_code == 200
         assert len(resp.json()) == 1
+
+
+class TestWaitlistPositions:
+
+    async def _positions(self, db, coach_id, slot):
+        from sqlalchemy import select
+        from app.models.waitlist_entry import WaitlistEntry
+        db.expunge_all()
+        q = (
+            select(WaitlistEntry.client_id, WaitlistEntry.position)
+            .where(WaitlistEntry.coach_id == coach_id, WaitlistEntry.slot_datetime == slot)
+            .order_by(WaitlistEntry.position)
+        )
+        return [tuple(r) for r in (await db.execute(q)).all()]
+
+    async def test_join_assigns_position_in_one_statement(self, db, coach_user):
+        """✅ Position = fin de file, calculée dans l'INSERT (verrou + un INSERT par ajout)."""
+        from sqlalchemy import event
+        from app.services import waitlist_service
+
+        users = await _clients(db, 3)
+        coach_id = coach_user.id
+        slot = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=3)
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            entries = [
+                await waitlist_service.join_waitlist(db, u, coach_id, slot) for u in users
+            ]
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+
+        assert [e.position for e in entries] == [1, 2, 3]
+        assert [s.split()[0] for s in statements] == ["SELECT", "INSERT"] * 3
+        assert all("pg_advisory_xact_lock" in s for s in statements[::2])
+
+    async def test_duplicate_detected_by_partial_unique_index(self, db, coach_user):
+        """❌ Doublon actif → AlreadyInWaitlistError, transaction toujours utilisable ;
+        ✅ nouvelle entrée possible une fois l'ancienne expirée."""
+        from app.repositories import waitlist_repository
+        from app.services import waitlist_service
+        from app.services.waitlist_service import AlreadyInWaitlistError
+
+        [user] = await _clients(db, 1)
+        slot = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=3)
+        first = await waitlist_service.join_waitlist(db, user, coach_user.id, slot)
+        with pytest.raises(AlreadyInWaitlistError):
+            await waitlist_service.join_waitlist(db, user, coach_user.id, slot)
+
+        await waitlist_repository.update_status(db, first, "expired")
+        again = await waitlist_service.join_waitlist(db, user, coach_user.id, slot)
+        await db.commit()
+        assert again.id != first.id and again.status == "waiting"
+
+    async def test_reorder_single_update(self, db, coach_user):
+        """✅ Départ du 2e → positions 1..n recalculées, seules les lignes décalées écrites."""
+        from app.repositories import waitlist_repository
+        from app.services import waitlist_service
+
+        users = await _clients(db, 4)
+        user_ids = [u.id for u in users]
+        coach_id = coach_user.id
+        slot = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=3)
+        entries = [await waitlist_service.join_waitlist(db, u, coach_id, slot) for u in users]
+        await db.commit()
+
+        await waitlist_repository.remove_entry(db, entries[1])
+        assert await waitlist_repository.reorder(db, coach_id, slot) == 2
+        await db.commit()
+
+        assert await self._positions(db, coach_id, slot) == [
+            (user_ids[0], 1), (user_ids[2], 2), (user_ids[3], 3),
+        ]
+
+
+class TestWaitlistPromotion:
+
+    async def _statuses(self, db):
+        from sqlalchemy import select
+        from app.models.waitlist_entry import WaitlistEntry
+        db.expunge_all()
+        rows = (await db.execute(select(WaitlistEntry.id, WaitlistEntry.status))).all()
+        return {entry_id: status for entry_id, status in rows}
+
+    async def test_cancellation_publishes_event_worker_notifies_next(self, db, coach_user, client_user):
+        """✅ Annulation client → événement place libérée → le worker notifie le 1er en attente."""
+        from sqlalchemy import func, select
+        from app.models.push_intent import PushIntent
+        from app.models.waitlist_slot_event import WaitlistSlotEvent
+        from app.repositories import booking_repository
+        from app.services import booking_service, waitlist_service
+
+        slot = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=3)
+        booking = await booking_repository.create(db, client_user.id, coach_user.id, scheduled_at=slot)
+        waiting = await _clients(db, 2)
+        entries = [await waitlist_service.join_waitlist(db, u, coach_user.id, slot) for u in waiting]
+        first_client = waiting[0].id
+        await db.commit()
+
+        await booking_service.client_cancel_booking(db, client_user, booking.id)
+        await db.commit()
+        assert (await db.execute(select(func.count()).select_from(WaitlistSlotEvent))).scalar_one() == 1
+
+        assert await waitlist_service.run_promotion_worker(db) == 1
+        statuses = await self._statuses(db)
+        assert statuses[entries[0].id] == "notified"
+        assert statuses[entries[1].id] == "waiting"
+        assert (await db.execute(select(func.count()).select_from(WaitlistSlotEvent))).scalar_one() == 0
+        intent = (await db.execute(select(PushIntent))).scalar_one()
+        assert intent.user_id == first_client
+        assert intent.data["entry_id"] == str(entries[0].id)
+
+    async def test_batch_promotion_constant_statements(self, db, coach_user):
+        """✅ 3 créneaux, 4 places → un UPDATE des entrées et un INSERT de push pour le lot."""
+        from sqlalchemy import event
+        from app.services import waitlist_service
+
+        users = await _clients(db, 3)
+        base = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=3)
+        slots = [base + timedelta(hours=h) for h in range(3)]
+        for slot in slots:
+            for u in users:
+                await waitlist_service.join_waitlist(db, u, coach_user.id, slot)
+        freed = [(coach_user.id, s) for s in slots] + [(coach_user.id, slots[0])]
+        await waitlist_service.publish_slot_freed(db, freed, "booking_cancelled")
+        await db.commit()
+        waitlist_service.expiry_timers.reset([], datetime.now(timezone.utc))
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", _record)
+        try:
+            assert await waitlist_service.run_promotion_worker(db) == 4
+        finally:
+            event.remove(engine, "before_cursor_execute", _record)
+
+        assert sum(s.startswith("UPDATE waitlist_entries") for s in statements) == 1
+        assert sum(s.startswith("INSERT INTO push_intents") for s in statements) == 1
+        assert list((await self._statuses(db)).values()).count("notified") == 4
+
+    async def test_expired_window_cascades_to_next(self, db, coach_user):
+        """✅ Fenêtre échue (roue amorcée depuis la base) → expired, le suivant notifié."""
+        from app.services import waitlist_service
+
+        users = await _clients(db, 2)
+        slot = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=3)
+        first, second = [await waitlist_service.join_waitlist(db, u, coach_user.id, slot) for u in users]
+        first.status = "notified"
+        first.expires_at = datetime.now(timezone.utc) - timedelta(seconds=5)
+        await db.commit()
+
+        waitlist_service.expiry_timers.invalidate()
+        assert await waitlist_service.run_promotion_worker(db) == 1
+        statuses = await self._statuses(db)
+        assert statuses[first.id] == "expired"
+        assert statuses[second.id] == "notified"
+        # Nouvelle échéance (second) dans la roue, pas encore atteinte
+        assert len(waitlist_service.expiry_timers.wheel) == 1
+        assert await waitlist_service.run_promotion_worker(db) == 0
+
+    async def test_leaving_notified_entry_frees_slot(self, db, coach_user):
+        """✅ Un notifié quitte la file → la place passe au suivant."""
+        from app.services import waitlist_service
+
+        users = await _clients(db, 2)
+        slot = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=3)
+        first, second = [await waitlist_service.join_waitlist(db, u, coach_user.id, slot) for u in users]
+        await waitlist_service.promote(db, [(coach_user.id, slot)])
+        await db.commit()
+
+        await waitlist_service.leave_waitlist(db, users[0], first.id)
+        await db.commit()
+        waitlist_service.expiry_timers.reset([], datetime.now(timezone.utc))
+        assert await waitlist_service.run_promotion_worker(db) == 1
+        assert (await self._statuses(db))[second.id] == "notified"
+
+
+class TestTimerWheel:
+
+    def test_deadline_fires_once_reached(self):
+        """✅ Échéance signalée au tick qui l'atteint, pas avant, une seule fois."""
+        from app.core.timer_wheel import TimerWheel
+
+        wheel = TimerWheel(tick_seconds=1.0, size=8)
+        now = datetime(2030, 1, 1, tzinfo=timezone.utc)
+        wheel.advance(now)
+        wheel.schedule(now + timedelta(seconds=2.5))
+        wheel.schedule(now + timedelta(seconds=20))  # plusieurs tours plus tard
+
+        assert wheel.advance(now + timedelta(seconds=2)) == 0
+        assert wheel.advance(now + timedelta(seconds=3)) == 1
+        assert wheel.advance(now + timedelta(seconds=4)) == 0
+        assert len(wheel) == 1
+        assert wheel.advance(now + timedelta(seconds=19)) == 0
+        assert wheel.advance(now + timedelta(seconds=20)) == 1
+        assert len(wheel) == 0
+
+    def test_past_deadline_and_long_gap(self):
+        """✅ Échéance déjà passée → signalée au prochain tick ; retard > un tour → tout est vu."""
+        from app.core.timer_wheel import TimerWheel
+
+        wheel = TimerWheel(tick_seconds=1.0, size=4)
+        now = datetime(2030, 1, 1, tzinfo=timezone.utc)
+        wheel.advance(now)
+        wheel.schedule(now - timedelta(minutes=1))
+        assert wheel.advance(now) == 0
+        assert wheel.advance(now + timedelta(seconds=1)) == 1
+
+        for seconds in (3, 7, 30):
+            wheel.schedule(now + timedelta(seconds=seconds))
+        assert wheel.advance(now + timedelta(seconds=10)) == 2
+        assert len(wheel) == 1